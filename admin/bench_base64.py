@@ -0,0 +1,95 @@
+"""
+helper script to benchmark :class:`~passlib.utils.binary.Base64Engine` --
+the binascii-based ``encode_bytes()`` / ``decode_bytes()`` methods vs the
+generic (pure python) implementations, along with ``encode_transposed_bytes()``
+as used to render md5_crypt & sha512_crypt checksums.
+
+usage: bench_base64.py
+"""
+#=============================================================================
+# init script env
+#=============================================================================
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+# make sure passlib source dir is first in import path
+import os, sys
+os.chdir(os.path.abspath(os.path.join(__file__, *[".."]*2)))
+sys.path.insert(0, "")
+
+#=============================================================================
+# imports
+#=============================================================================
+# core
+from timeit import Timer
+# site
+# pkg
+from passlib.handlers.md5_crypt import _transpose_map as md5_transpose_map
+from passlib.handlers.sha2_crypt import _512_transpose_map
+from passlib.utils.binary import h64, h64big, bcrypt64
+from passlib.utils.compat import join_byte_elems
+# local
+
+#=============================================================================
+# main
+#=============================================================================
+def main():
+
+    #--------------------------------------------------------------
+    # config
+    #--------------------------------------------------------------
+    bestof = 3
+    number = 20000
+    # NOTE: 16 bytes ~ salt / md5 digest, 23 bytes ~ bcrypt digest, 64 bytes ~ sha512 digest
+    sizes = [16, 23, 64]
+
+    #--------------------------------------------------------------
+    # harness
+    #--------------------------------------------------------------
+    def timeit(func):
+        return min(Timer(func).repeat(bestof, number)) / number
+
+    def benchmark(label, generic, fast):
+        old = timeit(generic)
+        new = timeit(fast)
+        print("{0:>32s} {1:>8.2f}us {2:>8.2f}us {3:>7.1f}x".format(
+            label, old * 1e6, new * 1e6, old / new))
+
+    def generic_transposed(engine, source, offsets):
+        tmp = join_byte_elems(source[off] for off in offsets)
+        return engine._encode_bytes_generic(tmp)
+
+    #--------------------------------------------------------------
+    # benchmark
+    #--------------------------------------------------------------
+    print("{0:>32s} {1:>10s} {2:>10s} {3:>8s}".format("", "generic", "fast", "speedup"))
+    for name, engine in [("h64", h64), ("h64big", h64big), ("bcrypt64", bcrypt64)]:
+        for size in sizes:
+            raw = os.urandom(size)
+            encoded = engine.encode_bytes(raw)
+            assert engine._encode_bytes_generic(raw) == encoded
+            assert engine._decode_bytes_generic(encoded) == raw
+            benchmark("%s.encode_bytes(%d)" % (name, size),
+                      lambda: engine._encode_bytes_generic(raw),
+                      lambda: engine.encode_bytes(raw))
+            benchmark("%s.decode_bytes(%d)" % (name, size),
+                      lambda: engine._decode_bytes_generic(encoded),
+                      lambda: engine.decode_bytes(encoded))
+
+    for label, offsets in [("md5_crypt", md5_transpose_map),
+                           ("sha512_crypt", _512_transpose_map)]:
+        raw = os.urandom(len(offsets))
+        assert generic_transposed(h64, raw, offsets) == h64.encode_transposed_bytes(raw, offsets)
+        benchmark("%s encode_transposed" % label,
+                  lambda: generic_transposed(h64, raw, offsets),
+                  lambda: h64.encode_transposed_bytes(raw, offsets))
+
+    #--------------------------------------------------------------
+    # done
+    #--------------------------------------------------------------
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
+
+#=============================================================================
+# eoc
+#=============================================================================
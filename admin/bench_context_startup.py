@@ -0,0 +1,85 @@
+"""
+helper script to benchmark how long it takes to create a CryptContext
+from an INI string (via ``CryptContext.from_string()``), vs restoring it from
+a snapshot (via ``CryptContext.from_snapshot()``); both on its own,
+and followed by the first hash() call (which forces the default scheme's
+handler to be created).
+
+usage: bench_context_startup.py [categories]
+"""
+#=============================================================================
+# init script env
+#=============================================================================
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+# make sure passlib source dir is first in import path
+import os, sys
+os.chdir(os.path.abspath(os.path.join(__file__, *[".."]*2)))
+sys.path.insert(0, "")
+
+#=============================================================================
+# imports
+#=============================================================================
+# core
+from timeit import Timer
+# site
+# pkg
+from passlib.context import CryptContext
+# local
+
+#=============================================================================
+# main
+#=============================================================================
+def main(categories=2):
+
+    #--------------------------------------------------------------
+    # config
+    #--------------------------------------------------------------
+    bestof = 3
+    number = 200
+    lines = [
+        "[passlib]",
+        "schemes = sha512_crypt, sha256_crypt, pbkdf2_sha256, md5_crypt, des_crypt, "
+        "ldap_salted_sha1, unix_disabled",
+        "deprecated = auto",
+        "sha512_crypt__min_rounds = 1000",
+        "sha512_crypt__default_rounds = 1000",
+        "sha256_crypt__default_rounds = 1000",
+        "pbkdf2_sha256__default_rounds = 1000",
+    ]
+    for idx in range(int(categories)):
+        lines.append("cat%d__sha512_crypt__default_rounds = %d" % (idx, 2000 + idx))
+    source = "\n".join(lines) + "\n"
+    snapshot = CryptContext.from_string(source).to_snapshot()
+
+    #--------------------------------------------------------------
+    # harness
+    #--------------------------------------------------------------
+    def timeit(func):
+        return min(Timer(func).repeat(bestof, number)) / number
+
+    #--------------------------------------------------------------
+    # benchmark
+    #--------------------------------------------------------------
+    print("categories=%s snapshot=%d bytes\n" % (categories, len(snapshot)))
+    print("{0:>24s} {1:>12s} {2:>13s} {3:>8s}".format("", "from_string", "from_snapshot", "speedup"))
+    cases = [
+        ("create", lambda ctx: ctx),
+        ("create + hash()", lambda ctx: ctx.hash("password")),
+    ]
+    for label, action in cases:
+        parsed = timeit(lambda: action(CryptContext.from_string(source)))
+        restored = timeit(lambda: action(CryptContext.from_snapshot(snapshot)))
+        print("{0:>24s} {1:>10.3f}ms {2:>11.3f}ms {3:>7.1f}x".format(
+            label, parsed * 1000, restored * 1000, parsed / restored))
+
+    #--------------------------------------------------------------
+    # done
+    #--------------------------------------------------------------
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
+
+#=============================================================================
+# eoc
+#=============================================================================
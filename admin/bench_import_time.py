@@ -0,0 +1,133 @@
+"""
+helper script to check how long ``import passlib.context`` takes
+(as measured by ``python -X importtime``, which requires Python 3.7+),
+and that none of the modules passlib imports on demand are loaded by it.
+
+exits with non-zero status if the median import time exceeds the budget,
+or if one of the deferred modules was imported; so it can be used
+as a regression check.
+
+usage: bench_import_time.py [budget_ms [module]]
+"""
+#=============================================================================
+# init script env
+#=============================================================================
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+# make sure passlib source dir is first in import path
+import os, sys
+os.chdir(os.path.abspath(os.path.join(__file__, *[".."]*2)))
+sys.path.insert(0, "")
+
+#=============================================================================
+# imports
+#=============================================================================
+# core
+import subprocess
+# site
+# pkg
+# local
+
+#=============================================================================
+# config
+#=============================================================================
+
+#: default budget for cumulative import time, in milliseconds
+DEFAULT_BUDGET = 75
+
+#: number of interpreters to launch (median is checked against budget)
+SAMPLES = 7
+
+#: stdlib modules which passlib only imports on demand
+#: (slow to import, and not needed just to hash & verify passwords)
+DEFERRED_MODULES = [
+    "configparser",  # only needed by CryptContext INI methods
+    "crypt",  # safe_crypt() uses the underlying _crypt module
+    "inspect",  # only needed when loading backends
+    "json",  # only needed by snapshots & self-test cache
+    "stringprep", "unicodedata",  # only needed by saslprep()
+]
+
+#=============================================================================
+# helpers
+#=============================================================================
+def run_importtime(module):
+    """
+    import *module* in fresh interpreter, returns ``(rows, loaded)``;
+    where *rows* is list of ``(name, self_us, cumulative_us)``,
+    and *loaded* is set of modules present afterwards.
+    """
+    code = "import sys, %s; print(' '.join(sys.modules))" % module
+    proc = subprocess.Popen([sys.executable, "-X", "importtime", "-c", code],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            universal_newlines=True)
+    out, err = proc.communicate()
+    if proc.returncode:
+        raise RuntimeError("failed to import %r:\n%s" % (module, err))
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            rows.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+        except ValueError:
+            # header row
+            continue
+    return rows, set(out.split())
+
+#=============================================================================
+# main
+#=============================================================================
+def main(budget=DEFAULT_BUDGET, module="passlib.context"):
+    if sys.version_info < (3, 7):
+        print("error: python -X importtime requires Python 3.7+")
+        return 2
+    budget = float(budget)
+
+    #--------------------------------------------------------------
+    # benchmark
+    #--------------------------------------------------------------
+    # NOTE: first run is discarded, it may have had to write .pyc files.
+    run_importtime(module)
+    samples = []
+    for _ in range(SAMPLES):
+        rows, loaded = run_importtime(module)
+        total = [cumulative for name, _, cumulative in rows if name == module]
+        assert total, "%r not found in importtime output" % (module,)
+        samples.append((total[-1], rows))
+    samples.sort(key=lambda sample: sample[0])
+    median, rows = samples[len(samples) // 2]
+
+    #--------------------------------------------------------------
+    # report
+    #--------------------------------------------------------------
+    print("import %s: median %.1fms, best %.1fms (budget %.1fms)\n" %
+          (module, median / 1000, samples[0][0] / 1000, budget))
+    print("slowest modules (self time):")
+    for name, self_us, _ in sorted(rows, key=lambda row: -row[1])[:10]:
+        print("  %8.2fms  %s" % (self_us / 1000, name))
+    print()
+
+    failed = False
+    deferred = sorted(set(DEFERRED_MODULES) & loaded)
+    if deferred:
+        print("FAILED: deferred modules were imported: %s" % ", ".join(deferred))
+        failed = True
+    if median > budget * 1000:
+        print("FAILED: import time exceeds budget")
+        failed = True
+    if not failed:
+        print("ok")
+    return 1 if failed else 0
+
+    #--------------------------------------------------------------
+    # done
+    #--------------------------------------------------------------
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
+
+#=============================================================================
+# eoc
+#=============================================================================
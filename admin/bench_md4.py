@@ -0,0 +1,104 @@
+"""
+helper script to benchmark md4 implementations --
+hashlib's native md4 (if OpenSSL still provides it), passlib's builtin ``md4`` class,
+and the builtin ``md4_many()`` batch function; along with ``nthash`` & ``msdcc``
+:meth:`verify_many` using the builtin batch function.
+
+usage: bench_md4.py [batch_size]
+"""
+#=============================================================================
+# init script env
+#=============================================================================
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+# make sure passlib source dir is first in import path
+import os, sys
+os.chdir(os.path.abspath(os.path.join(__file__, *[".."]*2)))
+sys.path.insert(0, "")
+
+#=============================================================================
+# imports
+#=============================================================================
+# core
+import hashlib
+from timeit import Timer
+# site
+# pkg
+from passlib.crypto import _md4
+from passlib.handlers import windows
+from passlib.hash import nthash, msdcc
+# local
+
+#=============================================================================
+# main
+#=============================================================================
+def main(batch_size=1000):
+
+    #--------------------------------------------------------------
+    # config
+    #--------------------------------------------------------------
+    bestof = 3
+    batch_size = int(batch_size)
+    number = max(1, 3000 // batch_size)
+    # NOTE: typical passwords, encoded as utf-16-le (as nthash does)
+    messages = [("password%d" % idx).encode("utf-16-le") for idx in range(batch_size)]
+    secrets = ["password%d" % idx for idx in range(batch_size)]
+    nt_hash = nthash.hash("password0")
+    dcc_hash = msdcc.hash("password0", user="admin")
+
+    try:
+        hashlib.new("md4")
+    except ValueError:
+        native = None
+    else:
+        def native():
+            return [hashlib.new("md4", msg).digest() for msg in messages]
+
+    #--------------------------------------------------------------
+    # harness
+    #--------------------------------------------------------------
+    def timeit(func):
+        return min(Timer(func).repeat(bestof, number)) / number
+
+    baseline = []
+    def benchmark(label, func):
+        if func is None:
+            print("{0:>32s} {1:>10s}".format(label, "-"))
+            return
+        elapsed = timeit(func) / batch_size
+        if not baseline:
+            baseline.append(elapsed)
+        print("{0:>32s} {1:>8.2f}us {2:>7.1f}x".format(
+            label, elapsed * 1e6, baseline[0] / elapsed))
+
+    #--------------------------------------------------------------
+    # benchmark
+    #--------------------------------------------------------------
+    print("batch_size=%d\n" % batch_size)
+    print("{0:>32s} {1:>10s} {2:>8s}".format("", "per item", "speedup"))
+    benchmark("builtin md4()", lambda: [_md4.md4(msg).digest() for msg in messages])
+    benchmark("builtin md4_many()", lambda: _md4.md4_many(messages))
+    benchmark("hashlib md4", native)
+
+    # force windows handlers to use builtin batch function
+    orig = windows._md4_many
+    windows._md4_many = _md4.md4_many
+    try:
+        benchmark("nthash.verify() loop", lambda: [nthash.verify(secret, nt_hash)
+                                                   for secret in secrets])
+        benchmark("nthash.verify_many()", lambda: nthash.verify_many(secrets, nt_hash))
+        benchmark("msdcc.verify_many()", lambda: msdcc.verify_many(secrets, dcc_hash,
+                                                                   user="admin"))
+    finally:
+        windows._md4_many = orig
+
+    #--------------------------------------------------------------
+    # done
+    #--------------------------------------------------------------
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
+
+#=============================================================================
+# eoc
+#=============================================================================
@@ -0,0 +1,112 @@
+"""
+helper script to benchmark the builtin pbkdf2 backend's process pool,
+to find the ``block_count * rounds`` crossover point where using the pool
+becomes faster than calculating blocks serially
+(see ``passlib.crypto.digest.pbkdf2_pool_threshold``).
+
+usage: bench_pbkdf2_pool.py [digest [workers]]
+"""
+#=============================================================================
+# init script env
+#=============================================================================
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+# make sure passlib source dir is first in import path
+import os, sys
+os.chdir(os.path.abspath(os.path.join(__file__, *[".."]*2)))
+sys.path.insert(0, "")
+
+# force builtin pbkdf2 backend (must be set before passlib.crypto.digest is imported)
+os.environ.setdefault("PASSLIB_PBKDF2_BACKEND",
+                      "from-bytes" if sys.version_info >= (3, 0) else "unpack")
+
+#=============================================================================
+# imports
+#=============================================================================
+# core
+from timeit import Timer
+# site
+# pkg
+import passlib.crypto.digest as digest_mod
+from passlib.crypto.digest import pbkdf2_hmac, lookup_hash
+from passlib.utils import cpu_count
+from passlib.utils import handlers as uh
+# local
+
+#=============================================================================
+# main
+#=============================================================================
+def main(digest="sha512", workers=None):
+
+    #--------------------------------------------------------------
+    # config
+    #--------------------------------------------------------------
+    bestof = 3
+    block_counts = [2, 4, 8, 16]
+    rounds_list = [1, 10, 100, 1000, 10000]
+    secret = b"password"
+    salt = b"salt"
+    digest_size = lookup_hash(digest).digest_size
+    assert not digest_mod.PBKDF2_BACKENDS[0].startswith(("fastpbkdf2", "hashlib")), \
+        "expected builtin backend, got %r" % (digest_mod.PBKDF2_BACKENDS,)
+
+    workers = int(workers) if workers else cpu_count()
+    if workers < 2:
+        workers = 2
+        print("NOTE: single cpu detected, forcing 2 workers; pool won't be faster\n")
+    pool = uh.builtin_pool = uh.BuiltinPool(size=workers)
+
+    #--------------------------------------------------------------
+    # harness
+    #--------------------------------------------------------------
+    def timeit(keylen, rounds, threshold):
+        digest_mod.pbkdf2_pool_threshold = threshold
+        func = lambda: pbkdf2_hmac(digest, secret, salt, rounds, keylen)
+        func() # warm up pool
+        number = max(1, 20000 // (rounds * keylen // digest_size))
+        return min(Timer(func).repeat(bestof, number)) / number
+
+    #--------------------------------------------------------------
+    # formatting
+    #--------------------------------------------------------------
+    header = "{0:>10s} {1:>8s} {2:1s}"
+    cell = "{0:>10s} "
+    print("digest=%s workers=%d backend=%s" % (digest, workers, digest_mod.PBKDF2_BACKENDS[0]))
+    print("(speedup of pool vs serial, >1.0 means pool is faster)\n")
+    print(header.format("blocks", "", "") + "".join(cell.format("r=%d" % r) for r in rounds_list))
+    print(header.format("", "", "") + (("-" * 10) + " ") * len(rounds_list))
+
+    #--------------------------------------------------------------
+    # benchmark
+    #--------------------------------------------------------------
+    crossover = None
+    for block_count in block_counts:
+        keylen = block_count * digest_size
+        print(header.format(str(block_count), "", "|"), end="")
+        for rounds in rounds_list:
+            serial = timeit(keylen, rounds, None)
+            pooled = timeit(keylen, rounds, 1)
+            ratio = serial / pooled
+            if ratio > 1 and (crossover is None or block_count * rounds < crossover):
+                crossover = block_count * rounds
+            print(cell.format("%.2f" % ratio), end="")
+            sys.stdout.flush()
+        print()
+
+    pool.shutdown()
+    print()
+    if crossover is None:
+        print("pool was never faster")
+    else:
+        print("smallest block_count * rounds where pool was faster: %d" % crossover)
+
+    #--------------------------------------------------------------
+    # done
+    #--------------------------------------------------------------
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
+
+#=============================================================================
+# eoc
+#=============================================================================
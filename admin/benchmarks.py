@@ -2,6 +2,9 @@
 
 this is a *very* rough benchmark script hacked together when the context
 parsing was being sped up. it could definitely be improved.
+
+see :mod:`passlib.bench` (``python -m passlib.bench``) for the full benchmark suite,
+which can save results as JSON & compare them between runs.
 """
 #=============================================================================
 # init script env
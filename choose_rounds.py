@@ -1,16 +1,20 @@
-"""cli helper for selecting appropriate <rounds> value for a given hash"""
+"""cli helper for selecting appropriate <rounds> value for a given hash
+
+this is a thin wrapper around :func:`passlib.tuning.tune_context`,
+which should be used directly for more control (e.g. concurrency, percentiles).
+"""
 #=============================================================================
 # imports
 #=============================================================================
 from __future__ import division, print_function
 # core
-import math
 import logging; log = logging.getLogger(__name__)
 import sys
 # site
 # pkg
+from passlib.context import CryptContext
 from passlib.registry import get_crypt_handler
-from passlib.utils import tick
+from passlib.tuning import tune_context
 # local
 __all__ = [
     "main",
@@ -19,7 +23,7 @@ __all__ = [
 #=============================================================================
 # main
 #=============================================================================
-_usage = "usage: python choose_rounds.py <hash_name> [<target_milliseconds>] [<backend>]\n"
+_usage = "usage: python choose_rounds.py <hash_name>[,<hash_name>...] [<target_milliseconds>] [<backend>]\n"
 
 def main(*args):
     #---------------------------------------------------------------
@@ -29,20 +33,24 @@ def main(*args):
     def print_error(msg):
         print("error: %s\n" % msg)
 
-    # parse hasher
+    # parse hashers
     if args:
-        name = args.pop(0)
-        if name == "-h" or name == "--help":
+        names = args.pop(0)
+        if names == "-h" or names == "--help":
             print(_usage)
             return 1
-        try:
-            hasher = get_crypt_handler(name)
-        except KeyError:
-            print_error("unknown hash %r" % name)
-            return 1
-        if 'rounds' not in hasher.setting_kwds:
-            print_error("%s does not support variable rounds" % name)
-            return 1
+        names = names.split(",")
+        hashers = []
+        for name in names:
+            try:
+                hasher = get_crypt_handler(name)
+            except KeyError:
+                print_error("unknown hash %r" % name)
+                return 1
+            if 'rounds' not in hasher.setting_kwds:
+                print_error("%s does not support variable rounds" % name)
+                return 1
+            hashers.append(hasher)
     else:
         print_error("hash name not specified")
         print(_usage)
@@ -63,111 +71,27 @@ def main(*args):
     # parse backend
     if args:
         backend = args.pop(0)
-        if hasattr(hasher, "set_backend"):
-            hasher.set_backend(backend)
-        else:
-            print_error("%s does not support multiple backends")
-            return 1
-
-    #---------------------------------------------------------------
-    # setup some helper functions
-    #---------------------------------------------------------------
-    if hasher.rounds_cost == "log2":
-        # time cost varies logarithmically with rounds parameter,
-        # so speed = (2**rounds) / elapsed
-        def rounds_to_cost(rounds):
-            return 2 ** rounds
-        def cost_to_rounds(cost):
-            return math.log(cost, 2)
-    else:
-        # time cost varies linearly with rounds parameter,
-        # so speed = rounds / elapsed
-        assert hasher.rounds_cost == "linear"
-        rounds_to_cost = cost_to_rounds = lambda value: value
-
-    def clamp_rounds(rounds):
-        """convert float rounds to int value, clamped to hasher's limits"""
-        if hasher.max_rounds and rounds > hasher.max_rounds:
-            rounds = hasher.max_rounds
-        rounds = int(rounds)
-        if getattr(hasher, "_avoid_even_rounds", False):
-            rounds |= 1
-        return max(hasher.min_rounds, rounds)
-
-    def average(seq):
-        if not hasattr(seq, "__length__"):
-            seq = tuple(seq)
-        return sum(seq) / len(seq)
-
-    def estimate_speed(rounds):
-        """estimate speed using specified # of rounds"""
-        # time a single verify() call
-        secret = "S0m3-S3Kr1T"
-        hash = hasher.using(rounds=rounds).hash(secret)
-        def helper():
-            start = tick()
-            hasher.verify(secret, hash)
-            return tick() - start
-        # try to get average time over a few samples
-        # XXX: way too much variability between sampling runs,
-        #      would like to improve this bit
-        elapsed = min(average(helper() for _ in range(4)) for _ in range(4))
-        return rounds_to_cost(rounds) / elapsed
-
-    #---------------------------------------------------------------
-    # get rough estimate of speed using fraction of default_rounds
-    # (so we don't take crazy long amounts of time on slow systems)
-    #---------------------------------------------------------------
-    rounds = clamp_rounds(cost_to_rounds(.5 * rounds_to_cost(hasher.default_rounds)))
-    speed = estimate_speed(rounds)
+        for hasher in hashers:
+            if hasattr(hasher, "set_backend"):
+                hasher.set_backend(backend)
+            else:
+                print_error("%s does not support multiple backends" % hasher.name)
+                return 1
 
     #---------------------------------------------------------------
-    # re-do estimate using previous result,
-    # to get more accurate sample using a larger number of rounds.
+    # run tuner & report results
     #---------------------------------------------------------------
-    for _ in range(2):
-        rounds = clamp_rounds(cost_to_rounds(speed * target))
-        speed = estimate_speed(rounds)
-
-    #---------------------------------------------------------------
-    # using final estimate, calc desired number of rounds for target time
-    #---------------------------------------------------------------
-    if hasattr(hasher, "backends"):
-        name = "%s (using %s backend)" % (name, hasher.get_backend())
-    print("hash............: %s" % name)
-    if speed < 1000:
-        speedstr = "%.2f" % speed
-    else:
-        speedstr = int(speed)
-    print("speed...........: %s iterations/second" % speedstr)
-    print("target time.....: %d ms" % (target*1000,))
-    rounds = cost_to_rounds(speed * target)
-    if hasher.rounds_cost == "log2":
-        # for log2 rounds parameter, target time will usually fall
-        # somewhere between two integer values, which will have large gulf
-        # between them. if target is within <tolerance> percent of
-        # one of two ends, report it, otherwise list both and let user decide.
-        tolerance = .05
-        lower = clamp_rounds(rounds)
-        upper = clamp_rounds(math.ceil(rounds))
-        lower_elapsed = rounds_to_cost(lower) / speed
-        upper_elapsed = rounds_to_cost(upper) / speed
-        if (target-lower_elapsed)/target < tolerance:
-            print("target rounds...: %d" % lower)
-        elif (upper_elapsed-target)/target < tolerance:
-            print("target rounds...: %d" % upper)
-        else:
-            faster = (target - lower_elapsed)
-            prin("target rounds...: %d (%dms -- %dms/%d%% faster than requested)" % \
-                  (lower, lower_elapsed*1000, faster * 1000, round(100 * faster / target)))
-            slower = (upper_elapsed - target)
-            print("target rounds...: %d (%dms -- %dms/%d%% slower than requested)" % \
-                  (upper, upper_elapsed*1000, slower * 1000, round(100 * slower / target)))
-    else:
-        # for linear rounds parameter, just use nearest integer value
-        rounds = clamp_rounds(round(rounds))
-        print("target rounds...: %d" % (rounds,))
-    print()
+    report = tune_context(CryptContext(names), target=target)
+    for hasher, result in zip(hashers, report.results):
+        name = result.scheme
+        if hasattr(hasher, "backends"):
+            name = "%s (using %s backend)" % (name, hasher.get_backend())
+        print("hash............: %s" % name)
+        print("target time.....: %d ms" % (target*1000,))
+        print("target rounds...: %d (%d ms)" % (result.settings['default_rounds'],
+                                                result.latency * 1000))
+        print()
+    print(report.to_string(), end="")
 
 if __name__ == "__main__":
     sys.exit(main(*sys.argv[1:]))
@@ -0,0 +1,237 @@
+"""passlib._aio -- implementation of passlib.aio
+
+This uses ``async def`` syntax, so it can only be parsed under Python 3.5 or newer;
+it should be imported via :mod:`passlib.aio`, not directly.
+"""
+#=============================================================================
+# imports
+#=============================================================================
+# core
+from __future__ import absolute_import, division, print_function
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+import logging; log = logging.getLogger(__name__)
+# site
+# pkg
+from passlib.context import CryptContext
+from passlib.exc import ExpectedTypeError
+from passlib.utils import timer
+from passlib.utils.handlers import shared_parse_scope
+# local
+__all__ = [
+    "AsyncCryptContext",
+]
+
+#=============================================================================
+# sync helpers run inside the executor
+#=============================================================================
+
+def _verify_record(record, secret, hash, kwds):
+    """returns ``(verified, elapsed)``"""
+    start = timer()
+    ok = record.verify(secret, hash, **kwds)
+    return ok, timer() - start
+
+def _verify_and_update_record(context, record, secret, hash, category, kwds, clean_kwds):
+    """returns ``(verified, replacement_hash, elapsed)``"""
+    start = timer()
+    with shared_parse_scope():
+        if not record.verify(secret, hash, **clean_kwds):
+            return False, None, timer() - start
+        update = record.deprecated or record.needs_update(hash, secret=secret)
+    if update:
+        # NOTE: we re-hash with default scheme, not current one.
+        return True, context.hash(secret, category=category, **kwds), 0
+    else:
+        return True, None, 0
+
+def _get_min_verify_time(context):
+    return context.min_verify_time
+
+#=============================================================================
+# async wrapper
+#=============================================================================
+class AsyncCryptContext(object):
+    """asyncio wrapper around a :class:`~passlib.context.CryptContext`.
+
+    This offers coroutine versions of the main :class:`!CryptContext` methods,
+    which run the actual hashing inside an executor, so it doesn't block the event loop.
+
+    :arg context:
+        :class:`!CryptContext` instance to wrap.
+
+    :param executor:
+        :class:`concurrent.futures.Executor` used for all categories not
+        listed in *category_executors*. If omitted, a :class:`!ThreadPoolExecutor`
+        will be created (and shut down by :meth:`close`).
+
+    :param max_workers:
+        max number of threads for the default executor, if one is created.
+
+    :param category_executors:
+        optional dict mapping :ref:`user category <user-categories>` -> executor,
+        allowing e.g. admin logins to use a separate pool.
+
+    :param max_pending:
+        if set, max number of calls which may be queued or running in each executor
+        at once. additional calls will wait (without blocking the event loop)
+        until a slot is free. by default, there is no limit.
+
+    When :ref:`harden_verify <context-harden-verify-option>` is enabled,
+    the delay added to failed verify calls is implemented via :func:`asyncio.sleep`,
+    rather than by blocking an executor thread with :func:`time.sleep`.
+
+    .. versionadded:: 1.8
+    """
+    #===================================================================
+    # instance attrs
+    #===================================================================
+
+    #: the wrapped CryptContext
+    context = None
+
+    # default executor
+    _executor = None
+
+    # flag indicating if we created _executor, and should shut it down
+    _owns_executor = False
+
+    # dict mapping category -> executor
+    _category_executors = None
+
+    # max number of pending calls per executor (or None)
+    max_pending = None
+
+    # dict mapping id(executor) -> asyncio.Semaphore, populated on demand
+    _semaphores = None
+
+    #===================================================================
+    # init
+    #===================================================================
+    def __init__(self, context, executor=None, max_workers=None,
+                 category_executors=None, max_pending=None):
+        if not isinstance(context, CryptContext):
+            raise ExpectedTypeError(context, "CryptContext", "context")
+        self.context = context
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers)
+            self._owns_executor = True
+        elif not isinstance(executor, Executor):
+            raise ExpectedTypeError(executor, "Executor", "executor")
+        self._executor = executor
+        self._category_executors = dict(category_executors or {})
+        for value in self._category_executors.values():
+            if not isinstance(value, Executor):
+                raise ExpectedTypeError(value, "Executor", "category_executors value")
+        if max_pending is not None and max_pending < 1:
+            raise ValueError("max_pending must be >= 1")
+        self.max_pending = max_pending
+        self._semaphores = {}
+
+    def __repr__(self):
+        return "<AsyncCryptContext 0x%0x context=%r>" % (id(self), self.context)
+
+    def close(self):
+        """shut down the default executor, if it was created by this object"""
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+    #===================================================================
+    # executor dispatch
+    #===================================================================
+    def _get_executor(self, category):
+        if category is not None:
+            try:
+                return self._category_executors[category]
+            except KeyError:
+                pass
+        return self._executor
+
+    async def _run(self, category, func, *args):
+        """run ``func(*args)`` in the executor for category"""
+        executor = self._get_executor(category)
+        loop = asyncio.get_event_loop()
+        if self.max_pending is None:
+            return await loop.run_in_executor(executor, partial(func, *args))
+        key = id(executor)
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = self._semaphores[key] = asyncio.Semaphore(self.max_pending)
+        async with semaphore:
+            return await loop.run_in_executor(executor, partial(func, *args))
+
+    #===================================================================
+    # harden_verify support
+    #===================================================================
+    async def dummy_verify(self, elapsed=0):
+        """
+        async version of :meth:`CryptContext.dummy_verify`,
+        which waits via :func:`asyncio.sleep`.
+        """
+        assert elapsed >= 0
+        context = self.context
+        min_verify_time = type(context).min_verify_time.peek_cache(context)
+        if min_verify_time is None:
+            # estimate is expensive, so calculate it inside the executor
+            min_verify_time = await self._run(None, _get_min_verify_time, context)
+        remaining = min_verify_time - elapsed
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    #===================================================================
+    # password hash api
+    #===================================================================
+    def _prepare_record(self, hash, category, kwds):
+        """identify record for hash, and strip unused kwds"""
+        context = self.context
+        record = context._identify_record(hash, category)
+        strip_unused = context._strip_unused_context_kwds
+        if strip_unused and kwds:
+            clean_kwds = kwds.copy()
+            strip_unused(clean_kwds, record)
+        else:
+            clean_kwds = kwds
+        return record, clean_kwds
+
+    async def hash(self, secret, category=None, **kwds):
+        """async version of :meth:`CryptContext.hash`"""
+        context = self.context
+        return await self._run(category, partial(context.hash, category=category, **kwds),
+                               secret)
+
+    async def verify(self, secret, hash, category=None, **kwds):
+        """async version of :meth:`CryptContext.verify`"""
+        if hash is None:
+            if self.context.harden_verify:
+                await self.dummy_verify()
+            return False
+        record, clean_kwds = self._prepare_record(hash, category, kwds)
+        ok, elapsed = await self._run(category, _verify_record, record, secret, hash,
+                                      clean_kwds)
+        if not ok and self.context.harden_verify:
+            await self.dummy_verify(elapsed)
+        return ok
+
+    async def verify_and_update(self, secret, hash, category=None, **kwds):
+        """async version of :meth:`CryptContext.verify_and_update`"""
+        context = self.context
+        if hash is None:
+            if context.harden_verify:
+                await self.dummy_verify()
+            return False, None
+        record, clean_kwds = self._prepare_record(hash, category, kwds)
+        ok, new_hash, elapsed = await self._run(category, _verify_and_update_record,
+                                                context, record, secret, hash,
+                                                category, kwds, clean_kwds)
+        if not ok and context.harden_verify:
+            await self.dummy_verify(elapsed)
+        return ok, new_hash
+
+    #===================================================================
+    # eoc
+    #===================================================================
+
+#=============================================================================
+# eof
+#=============================================================================
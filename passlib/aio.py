@@ -0,0 +1,26 @@
+"""passlib.aio -- asyncio front-end for CryptContext
+
+.. note::
+
+    This module requires Python 3.5 or newer.
+"""
+#=============================================================================
+# imports
+#=============================================================================
+# core
+import sys
+# site
+# pkg
+if sys.version_info < (3, 5):
+    raise ImportError("passlib.aio requires Python 3.5 or newer")
+# NOTE: the implementation lives in passlib._aio, since it uses 'async def' syntax,
+#       and this module has to remain parseable under older pythons.
+from passlib._aio import AsyncCryptContext
+# local
+__all__ = [
+    "AsyncCryptContext",
+]
+
+#=============================================================================
+# eof
+#=============================================================================
@@ -5,7 +5,16 @@
 #=============================================================================
 from __future__ import with_statement
 # core
+from collections import OrderedDict
+from contextlib import contextmanager
+try:
+    from collections.abc import MutableMapping
+except ImportError: # pragma: no cover -- py2
+    from collections import MutableMapping
+import hashlib
+import hmac
 import logging; log = logging.getLogger(__name__)
+import mmap
 import os
 from warnings import warn
 # site
@@ -14,7 +23,7 @@ from passlib import exc, registry
 from passlib.context import CryptContext
 from passlib.exc import ExpectedStringError
 from passlib.hash import htdigest
-from passlib.utils import render_bytes, to_bytes, is_ascii_codec
+from passlib.utils import render_bytes, to_bytes, is_ascii_codec, consteq, timer, LRUCache
 from passlib.utils.decor import deprecated_method
 from passlib.utils.compat import join_bytes, unicode, BytesIO, PY3
 # local
@@ -37,6 +46,310 @@ _INVALID_FIELD_CHARS = b":\n\r\t\x00"
 #: _CommonFile._source token types
 _SKIPPED = "skipped"
 _RECORD = "record"
+_MAPPED = "mapped"
+
+#: values allowed for _CommonFile.save_mode
+_SAVE_MODES = ("rewrite", "append")
+
+#=============================================================================
+# check_password() cache
+#=============================================================================
+class _CheckCache(object):
+    """
+    TTL-bounded cache of successful check_password() results,
+    used by :class:`HtpasswdFile` (ala apache's mod_authn_socache).
+
+    stores at most one entry per user, containing an HMAC of
+    ``(user, hash, password)`` under a random per-instance key;
+    so neither the password nor the hash is kept in memory.
+    """
+    #: number of lookups which found / didn't find a valid entry
+    hits = 0
+    misses = 0
+
+    def __init__(self, ttl, max_size=1024):
+        if ttl <= 0:
+            raise ValueError("cache_ttl must be positive")
+        if max_size < 1:
+            raise ValueError("cache_size must be at least 1")
+        self.ttl = ttl
+        self._key = os.urandom(32)
+        # maps user -> (expires, digest)
+        self._entries = LRUCache(max_size)
+
+    def _digest(self, user, hash, password):
+        # NOTE: user & hash can't contain ':', so fields can't run together
+        return hmac.new(self._key, user + _BCOLON + hash + _BCOLON + password,
+                        hashlib.sha256).digest()
+
+    def check(self, user, hash, password):
+        """
+        return True if matching entry is present.
+        a hit marks the user as most-recently-checked; expired entries are discarded.
+        """
+        digest = self._digest(user, hash, password)
+        entries = self._entries
+        entry = entries.get(user)
+        if entry is not None:
+            if entry[0] <= timer():
+                entries.pop(user)
+            elif consteq(entry[1], digest):
+                self.hits += 1
+                return True
+        self.misses += 1
+        return False
+
+    def add(self, user, hash, password):
+        """record successful check"""
+        self._entries.set(user, (timer() + self.ttl, self._digest(user, hash, password)))
+
+    def discard(self, user):
+        """remove entry for user (if any)"""
+        self._entries.pop(user)
+
+    def clear(self):
+        """remove all entries"""
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+#=============================================================================
+# memory-mapped records
+#=============================================================================
+
+#: replace file atomically (os.replace() isn't available under py2)
+_replace_file = getattr(os, "replace", os.rename)
+
+class _MappedRecords(MutableMapping):
+    """
+    dict-like replacement for :attr:`_CommonFile._records`,
+    used when file is loaded with ``use_mmap=True``.
+
+    rather than parsing every line up front, the file is mmap'd,
+    and this only stores a map of ``key -> offset of line``;
+    values are parsed from the file on demand. changes made after loading
+    are stored in a separate (small) overlay dict.
+
+    :arg parse:
+        parse_record() method of owning file object.
+    """
+    #===================================================================
+    # instance attrs
+    #===================================================================
+
+    #: mmap of file (or empty bytes if file was empty)
+    _map = b''
+
+    #: number of bytes of file which have been indexed
+    _size = 0
+
+    #: offset after which file contains only whitespace
+    _content_end = 0
+
+    #: number of lines indexed (for error messages)
+    _lines = 0
+
+    #: (st_dev, st_ino) of mapped file
+    _file_id = None
+
+    #: copy of first & last few bytes of indexed region,
+    #: used to detect if file was only appended to.
+    _head = _tail = b''
+
+    #: size of _head & _tail samples
+    _sample_size = 4096
+
+    def __init__(self, parse):
+        self._parse = parse
+        # maps key -> offset of line in file
+        self._index = {}
+        # maps key -> value for records changed since loading
+        self._overlay = {}
+        # keys in index which have been deleted
+        self._deleted = set()
+
+    #===================================================================
+    # loading
+    #===================================================================
+    def open(self, fh):
+        """map & index entire file"""
+        st = os.fstat(fh.fileno())
+        self._file_id = (st.st_dev, st.st_ino)
+        self._index_lines(self._map_file(fh, st.st_size), 0, st.st_size)
+
+    def extend(self, fh):
+        """
+        try to re-index only the new tail of a file which has been appended to
+        since it was mapped, updating this instance in place.
+        any changes made since loading are discarded (same as a full reload).
+
+        :returns:
+            ``True`` if successful, or ``False`` if file has changed in some other way,
+            and needs to be fully reloaded.
+        """
+        st = os.fstat(fh.fileno())
+        size = self._size
+        if (st.st_dev, st.st_ino) != self._file_id or st.st_size < size or \
+                (size and self._tail[-1:] != b"\n"):
+            return False
+        # NOTE: can't compare against self._map, since mmap would reflect
+        #       any in-place rewrite of the file.
+        fh.seek(0)
+        if fh.read(len(self._head)) != self._head:
+            return False
+        fh.seek(size - len(self._tail))
+        if fh.read(len(self._tail)) != self._tail:
+            return False
+        self._index_lines(self._map_file(fh, st.st_size), size, st.st_size)
+        self._overlay.clear()
+        self._deleted.clear()
+        return True
+
+    @staticmethod
+    def _map_file(fh, size):
+        if not size:
+            # can't mmap empty file
+            return b''
+        return mmap.mmap(fh.fileno(), size, access=mmap.ACCESS_READ)
+
+    def _index_lines(self, data, start, stop):
+        """
+        add lines in range ``[start, stop)`` of *data* to index,
+        and switch to reading records from *data*.
+        """
+        parse = self._parse
+        index = self._index
+        # NOTE: new keys collected separately, and only merged once parsing succeeds,
+        #       so this instance remains valid if parsing fails.
+        added = {}
+        lineno = self._lines
+        content_end = self._content_end
+        pos = start
+        while pos < stop:
+            end = data.find(b"\n", pos, stop)
+            end = stop if end < 0 else end + 1
+            lineno += 1
+            line = data[pos:end]
+            tmp = line.lstrip()
+            if tmp:
+                if tmp.startswith(_BHASH):
+                    # preserve trailing comments & whitespace (same as _load_lines)
+                    content_end = stop
+                else:
+                    key = parse(line, lineno)[0]
+                    if key in index or key in added:
+                        log.warning("username occurs multiple times in source file: %r" % key)
+                    else:
+                        added[key] = pos
+                    content_end = max(content_end, end)
+            pos = end
+        index.update(added)
+        self._map = data
+        self._lines = lineno
+        self._content_end = content_end
+        self._size = stop
+        sample = self._sample_size
+        self._head = data[:sample]
+        self._tail = data[max(0, stop - sample):stop]
+
+    def close(self):
+        """release mmap"""
+        if not isinstance(self._map, bytes):
+            self._map.close()
+        self._map = b''
+
+    #===================================================================
+    # mapping interface
+    #===================================================================
+    def _read(self, key, pos):
+        """parse value from line at specified offset"""
+        data = self._map
+        end = data.find(b"\n", pos, self._size)
+        if end < 0:
+            end = self._size
+        actual, value = self._parse(data[pos:end], 0)
+        if actual != key:
+            # should only happen if file was rewritten in-place while mapped
+            raise RuntimeError("file contents changed since it was loaded, "
+                               "reload required")
+        return value
+
+    def __getitem__(self, key):
+        overlay = self._overlay
+        if key in overlay:
+            return overlay[key]
+        if key in self._deleted:
+            raise KeyError(key)
+        return self._read(key, self._index[key])
+
+    def __setitem__(self, key, value):
+        self._overlay[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._overlay.pop(key, None)
+        if key in self._index:
+            self._deleted.add(key)
+
+    def __contains__(self, key):
+        return key in self._overlay or (key in self._index and key not in self._deleted)
+
+    def _iter_added(self):
+        """iterate over keys added since loading (or deleted & re-added)"""
+        index = self._index
+        deleted = self._deleted
+        return (key for key in self._overlay if key not in index or key in deleted)
+
+    def __iter__(self):
+        deleted = self._deleted
+        for key in self._index:
+            if key not in deleted:
+                yield key
+        for key in self._iter_added():
+            yield key
+
+    def __len__(self):
+        return (len(self._index) - len(self._deleted) +
+                sum(1 for _ in self._iter_added()))
+
+    #===================================================================
+    # serialization
+    #===================================================================
+    def iter_source(self):
+        """
+        iterate over mapped file's content, yielding ``(key, value)`` for lines
+        containing live records, and ``(None, line)`` for whitespace, comments,
+        and duplicate records.  deleted records are skipped, and changed records
+        yield their new value.
+        """
+        data = self._map
+        parse = self._parse
+        index = self._index
+        overlay = self._overlay
+        deleted = self._deleted
+        stop = self._content_end
+        pos = 0
+        while pos < stop:
+            end = data.find(b"\n", pos, stop)
+            end = stop if end < 0 else end + 1
+            line = data[pos:end]
+            tmp = line.lstrip()
+            if not tmp or tmp.startswith(_BHASH):
+                yield None, line
+            else:
+                key, value = parse(line, 0)
+                if index.get(key) != pos:
+                    yield None, line
+                elif key not in deleted:
+                    yield key, overlay.get(key, value)
+                # else: record was deleted (if re-added, it'll be in _source separately)
+            pos = end
+
+    #===================================================================
+    # eoc
+    #===================================================================
 
 #=============================================================================
 # common helpers
@@ -61,6 +374,24 @@ class _CommonFile(object):
     # if true, automatically save to local file after changes are made.
     autosave = False
 
+    # if true, files are loaded via mmap, and records are parsed on demand.
+    use_mmap = False
+
+    # how save() updates ``self.path``: "rewrite" or "append".
+    save_mode = "rewrite"
+
+    #: ordered set of keys added since last load/save, which haven't been written to self.path
+    _appended = None
+
+    #: set when a change was made which can't be saved by appending to self.path
+    _rewrite_needed = False
+
+    #: >0 while inside batch() context, changes autosave is deferred until exit
+    _batch_depth = 0
+
+    #: set if autosave was deferred by batch()
+    _batch_dirty = False
+
     # dict mapping key -> value for all records in database.
     # (e.g. user => hash for Htpasswd)
     _records = None
@@ -110,7 +441,8 @@ class _CommonFile(object):
     # XXX: add a new() classmethod, ala TOTP.new()?
 
     def __init__(self, path=None, new=False, autosave=False,
-                 encoding="utf-8", return_unicode=PY3,
+                 encoding="utf-8", return_unicode=PY3, use_mmap=False,
+                 save_mode="rewrite",
                  ):
         # set encoding
         if not encoding:
@@ -124,8 +456,13 @@ class _CommonFile(object):
         # set other attrs
         self.return_unicode = return_unicode
         self.autosave = autosave
+        self.use_mmap = use_mmap
+        if save_mode not in _SAVE_MODES:
+            raise ValueError("unknown save_mode: %r" % (save_mode,))
+        self.save_mode = save_mode
         self._path = path
         self._mtime = 0
+        self._appended = OrderedDict()
 
         # init db
         if path and not new:
@@ -170,6 +507,16 @@ class _CommonFile(object):
             raise RuntimeError("%r is not bound to a local file" % self)
         if self._mtime and self._mtime == os.path.getmtime(self._path):
             return False
+        records = self._records
+        if isinstance(records, _MappedRecords) and self.use_mmap:
+            # try to only index what was appended to file
+            with open(self._path, "rb") as fh:
+                mtime = os.path.getmtime(self._path)
+                if records.extend(fh):
+                    self._mtime = mtime
+                    self._source = [(_MAPPED, None)]
+                    self._loaded()
+                    return True
         self.load()
         return True
 
@@ -180,14 +527,15 @@ class _CommonFile(object):
         :type path: str
         :arg path: local file to load from
         """
+        load = self._load_mapped if self.use_mmap else self._load_lines
         if path is not None:
             with open(path, "rb") as fh:
                 self._mtime = 0
-                self._load_lines(fh)
+                load(fh)
         elif self._path:
             with open(self._path, "rb") as fh:
                 self._mtime = os.path.getmtime(self._path)
-                self._load_lines(fh)
+                load(fh)
         else:
             raise RuntimeError("%s().path is not set, an explicit path is required" %
                                self.__class__.__name__)
@@ -240,6 +588,20 @@ class _CommonFile(object):
         # NOTE: not replacing ._records until parsing succeeds, so loading is atomic.
         self._records = records
         self._source = source
+        self._loaded()
+
+    def _load_mapped(self, fh):
+        """load from file object, using mmap"""
+        records = _MappedRecords(self._parse_record)
+        records.open(fh)
+        self._records = records
+        self._source = [(_MAPPED, None)]
+        self._loaded()
+
+    def _loaded(self):
+        """called whenever new state has been loaded"""
+        self._appended = OrderedDict()
+        self._rewrite_needed = False
 
     def _parse_record(self, record, lineno): # pragma: no cover - abstract method
         """parse line of file into (key, value) pair"""
@@ -257,30 +619,168 @@ class _CommonFile(object):
         records[key] = value
         if not existing:
             self._source.append((_RECORD, key))
+            self._appended[key] = True
+        elif key not in self._appended:
+            self._rewrite_needed = True
         return existing
 
+    def _del_record(self, key):
+        """
+        helper for deleting record.
+
+        :returns:
+            bool if key was present
+        """
+        try:
+            del self._records[key]
+        except KeyError:
+            return False
+        if self._appended.pop(key, None) is None:
+            # record was present in file, so file needs to be rewritten
+            self._rewrite_needed = True
+        return True
+
     #===================================================================
     # saving
     #===================================================================
     def _autosave(self):
         """subclass helper to call save() after any changes"""
         if self.autosave and self._path:
-            self.save()
+            if self._batch_depth:
+                self._batch_dirty = True
+            else:
+                self.save()
+
+    @contextmanager
+    def batch(self):
+        """
+        Context manager which defers :attr:`autosave` until the block exits,
+        so that many changes can be made with only a single save::
+
+            >>> with ht.batch():
+            ...     for user, password in new_users:
+            ...         ht.set_password(user, password)
+
+        Changes are saved on exit even if the block raises an error
+        (same as they would have been without :meth:`!batch`).
+        Batches may be nested, saving happens when the outermost one exits.
+
+        .. versionadded:: 1.8
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._batch_dirty:
+                self._batch_dirty = False
+                self._autosave()
 
     def save(self, path=None):
         """Save current state to file.
         If no path is specified, attempts to save to ``self.path``.
+
+        .. versionchanged:: 1.8
+            Added support for ``save_mode="append"``, see class constructor.
         """
         if path is not None:
-            with open(path, "wb") as fh:
-                fh.writelines(self._iter_lines())
+            records = self._records
+            if isinstance(records, _MappedRecords):
+                # NOTE: can't overwrite mapped file in-place, since we're reading from it;
+                #       so write to temp file, and then replace the original.
+                if path != self._path:
+                    # saving a copy elsewhere -- keep reading from original file.
+                    self._replace_file(path)
+                    return
+                self._replace_file(path, close=records.close)
+                # remap new file, so pending changes are no longer kept in memory.
+                with open(path, "rb") as fh:
+                    records = _MappedRecords(self._parse_record)
+                    records.open(fh)
+                self._records = records
+                self._source = [(_MAPPED, None)]
+            else:
+                with open(path, "wb") as fh:
+                    fh.writelines(self._iter_lines())
         elif self._path:
-            self.save(self._path)
-            self._mtime = os.path.getmtime(self._path)
+            path = self._path
+            if self.save_mode == "append":
+                if not self._save_appended(path):
+                    # compact file, replacing it atomically
+                    if isinstance(self._records, _MappedRecords):
+                        self.save(path)
+                    else:
+                        self._replace_file(path)
+            else:
+                self.save(path)
+            self._mtime = os.path.getmtime(path)
+            self._appended = OrderedDict()
+            self._rewrite_needed = False
         else:
             raise RuntimeError("%s().path is not set, cannot autosave" %
                                self.__class__.__name__)
 
+    def _replace_file(self, path, close=None):
+        """
+        write to temp file, and then rename it over *path*
+        (preserving its permissions).
+
+        :param close:
+            optional callback to release mmap before renaming (needed under windows).
+        """
+        tmp_path = "%s.%s.tmp" % (path, os.getpid())
+        try:
+            with open(tmp_path, "wb") as fh:
+                fh.writelines(self._iter_lines())
+            try:
+                os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+            except OSError:
+                # path doesn't exist yet (or can't chmod)
+                pass
+            if close and os.name == "nt":
+                # NOTE: windows won't replace a file while it's mapped
+                close()
+            _replace_file(tmp_path, path)
+        except:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _save_appended(self, path):
+        """
+        try to save changes by just appending new records to *path*.
+
+        :returns:
+            False if file needs to be rewritten instead: because existing records
+            were changed or deleted, or file was changed by another program since
+            it was last loaded / saved.
+        """
+        if self._rewrite_needed or not self._mtime or \
+                not os.path.exists(path) or os.path.getmtime(path) != self._mtime:
+            return False
+        records = self._records
+        lines = [self._render_record(key, records[key]) for key in self._appended]
+        if not lines:
+            return True
+        with open(path, "r+b") as fh:
+            fh.seek(0, 2)
+            if fh.tell():
+                # make sure last line is terminated
+                fh.seek(-1, 2)
+                if fh.read(1) != b"\n":
+                    lines.insert(0, b"\n")
+                fh.seek(0, 2)
+            fh.writelines(lines)
+        if isinstance(records, _MappedRecords):
+            # index appended lines, so they're no longer kept in memory
+            with open(path, "rb") as fh:
+                if not records.extend(fh):
+                    records = _MappedRecords(self._parse_record)
+                    records.open(fh)
+            self._records = records
+            self._source = [(_MAPPED, None)]
+        return True
+
     def to_string(self):
         """Export current state as a string of bytes"""
         return join_bytes(self._iter_lines())
@@ -304,6 +804,15 @@ class _CommonFile(object):
             if action == _SKIPPED:
                 # 'content' is whitespace/comments to write
                 yield content
+            elif action == _MAPPED:
+                # contents of mapped file (see _MappedRecords.iter_source)
+                for key, value in records.iter_source():
+                    if key is None:
+                        yield value
+                    else:
+                        yield self._render_record(key, value)
+                        if __debug__:
+                            pending.remove(key)
             else:
                 assert action == _RECORD
                 # 'content' is record key
@@ -551,6 +1060,43 @@ class HtpasswdFile(_CommonFile):
 
         This is also exposed as a readonly instance attribute.
 
+    :type use_mmap: bool
+    :param use_mmap:
+        If ``True``, files will be loaded via :mod:`mmap`: instead of parsing every
+        line up front, an index of ``user -> offset`` is built, and each hash is
+        only parsed when it's looked up. Additionally, if the file has only been
+        appended to, :meth:`load_if_changed` will only index the new lines.
+        This is meant for very large files (e.g. millions of users),
+        where reloading the whole file would be slow.
+
+        When saving to a mapped file, a temporary file is written and then
+        renamed over the original. Other programs which modify the file
+        should likewise either append to it, or replace it atomically;
+        truncating & rewriting a mapped file in-place may cause errors
+        until it's reloaded.
+
+        Defaults to ``False``.
+
+        .. versionadded:: 1.8
+
+    :type save_mode: str
+    :param save_mode:
+        Controls how :meth:`save` updates the file at *path*:
+
+        * ``"rewrite"`` (the default) -- rewrite the whole file in-place.
+
+        * ``"append"`` -- if the only changes since the file was last loaded or saved
+          are new users, just append them to the file. Otherwise (existing users were
+          changed or deleted, or another program modified the file) the whole file
+          is written to a temporary file, which is then renamed over the original.
+          This makes saving new users O(1) instead of O(file size),
+          so it's well suited to bulk provisioning with ``autosave=True``.
+
+        (Changes to existing users can't be appended, since Apache uses the *first*
+        entry for a user). See also :meth:`batch`.
+
+        .. versionadded:: 1.8
+
     :type default_scheme: str
     :param default_scheme:
         Optionally specify default scheme to use when encoding new passwords.
@@ -608,6 +1154,31 @@ class HtpasswdFile(_CommonFile):
             will probably not be usable by another application,
             and particularly not by Apache.
 
+    :type cache_ttl: int or float
+    :param cache_ttl:
+        Optionally enable caching of successful :meth:`check_password` calls,
+        for up to this many seconds (ala Apache's ``mod_authn_socache``).
+        Since HTTP Basic auth resends the credentials with every request,
+        this can save a slow hash (e.g. bcrypt) from being verified each time.
+
+        Instead of the password, the cache stores an HMAC of the user, stored hash,
+        and password, under a random key generated for each :class:`!HtpasswdFile` instance.
+        A user's entry is discarded if their hash is changed or deleted,
+        and all entries are discarded whenever the file is (re)loaded.
+
+        Disabled by default.
+
+        .. versionadded:: 1.8
+
+    :type cache_size: int
+    :param cache_size:
+        Max number of users to keep in the :meth:`check_password` cache,
+        when it's enabled (defaults to 1024).
+        Least-recently-checked users are evicted first
+        (a cache hit counts as a check, and moves the user to the back of the queue).
+
+        .. versionadded:: 1.8
+
     Loading & Saving
     ================
     .. automethod:: load
@@ -615,6 +1186,7 @@ class HtpasswdFile(_CommonFile):
     .. automethod:: load_string
     .. automethod:: save
     .. automethod:: to_string
+    .. automethod:: batch
 
     Inspection
     ================
@@ -644,6 +1216,13 @@ class HtpasswdFile(_CommonFile):
         Writeable flag indicating whether changes will be automatically
         written to *path*.
 
+    .. attribute:: cache_stats
+
+        ``(hits, misses)`` tuple counting :meth:`check_password` cache lookups,
+        or ``None`` if the cache isn't enabled.
+
+        .. versionadded:: 1.8
+
     Errors
     ======
     :raises ValueError:
@@ -658,11 +1237,16 @@ class HtpasswdFile(_CommonFile):
     # NOTE: _records map stores <user> for the key, and <hash> for the value,
     #       both in bytes which use self.encoding
 
+    #: _CheckCache instance used by check_password(), if enabled
+    _check_cache = None
+
     #===================================================================
     # init & serialization
     #===================================================================
     def __init__(self, path=None, default_scheme=None, context=htpasswd_context,
-                 **kwds):
+                 cache_ttl=None, cache_size=1024, **kwds):
+        if cache_ttl:
+            self._check_cache = _CheckCache(cache_ttl, cache_size)
         if default_scheme:
             if default_scheme in _warn_no_bcrypt:
                 warn("HtpasswdFile: no bcrypt backends available, "
@@ -684,6 +1268,18 @@ class HtpasswdFile(_CommonFile):
     def _render_record(self, user, hash):
         return render_bytes("%s:%s\n", user, hash)
 
+    def _loaded(self):
+        super(HtpasswdFile, self)._loaded()
+        if self._check_cache is not None:
+            self._check_cache.clear()
+
+    @property
+    def cache_stats(self):
+        cache = self._check_cache
+        if cache is None:
+            return None
+        return cache.hits, cache.misses
+
     #===================================================================
     # public methods
     #===================================================================
@@ -748,6 +1344,8 @@ class HtpasswdFile(_CommonFile):
             hash = hash.encode(self.encoding)
         user = self._encode_user(user)
         existing = self._set_record(user, hash)
+        if self._check_cache is not None:
+            self._check_cache.discard(user)
         self._autosave()
         return existing
 
@@ -759,10 +1357,11 @@ class HtpasswdFile(_CommonFile):
             * ``True`` if user deleted.
             * ``False`` if user not found.
         """
-        try:
-            del self._records[self._encode_user(user)]
-        except KeyError:
+        user = self._encode_user(user)
+        if not self._del_record(user):
             return False
+        if self._check_cache is not None:
+            self._check_cache.discard(user)
         self._autosave()
         return True
 
@@ -789,12 +1388,19 @@ class HtpasswdFile(_CommonFile):
             # NOTE: encoding password to match file, making the assumption
             # that server will use same encoding to hash the password.
             password = password.encode(self.encoding)
+        cache = self._check_cache
+        if cache is not None and cache.check(user, hash, password):
+            return True
         ok, new_hash = self.context.verify_and_update(password, hash)
         if ok and new_hash is not None:
             # rehash user's password if old hash was deprecated
-            assert user in self._records  # otherwise would have to use ._set_record()
-            self._records[user] = new_hash
+            if PY3 and isinstance(new_hash, str):
+                new_hash = new_hash.encode(self.encoding)
+            self._set_record(user, new_hash)
+            hash = new_hash
             self._autosave()
+        if ok and cache is not None:
+            cache.add(user, hash, password)
         return ok
 
     #===================================================================
@@ -874,6 +1480,43 @@ class HtdigestFile(_CommonFile):
 
         This is also exposed as a readonly instance attribute.
 
+    :type use_mmap: bool
+    :param use_mmap:
+        If ``True``, files will be loaded via :mod:`mmap`: instead of parsing every
+        line up front, an index of ``user -> offset`` is built, and each hash is
+        only parsed when it's looked up. Additionally, if the file has only been
+        appended to, :meth:`load_if_changed` will only index the new lines.
+        This is meant for very large files (e.g. millions of users),
+        where reloading the whole file would be slow.
+
+        When saving to a mapped file, a temporary file is written and then
+        renamed over the original. Other programs which modify the file
+        should likewise either append to it, or replace it atomically;
+        truncating & rewriting a mapped file in-place may cause errors
+        until it's reloaded.
+
+        Defaults to ``False``.
+
+        .. versionadded:: 1.8
+
+    :type save_mode: str
+    :param save_mode:
+        Controls how :meth:`save` updates the file at *path*:
+
+        * ``"rewrite"`` (the default) -- rewrite the whole file in-place.
+
+        * ``"append"`` -- if the only changes since the file was last loaded or saved
+          are new users, just append them to the file. Otherwise (existing users were
+          changed or deleted, or another program modified the file) the whole file
+          is written to a temporary file, which is then renamed over the original.
+          This makes saving new users O(1) instead of O(file size),
+          so it's well suited to bulk provisioning with ``autosave=True``.
+
+        (Changes to existing users can't be appended, since Apache uses the *first*
+        entry for a user). See also :meth:`batch`.
+
+        .. versionadded:: 1.8
+
     Loading & Saving
     ================
     .. automethod:: load
@@ -881,6 +1524,7 @@ class HtdigestFile(_CommonFile):
     .. automethod:: load_string
     .. automethod:: save
     .. automethod:: to_string
+    .. automethod:: batch
 
     Inspection
     ==========
@@ -1091,9 +1735,7 @@ class HtdigestFile(_CommonFile):
             * ``False`` if user not found in realm.
         """
         key = self._encode_key(user, realm)
-        try:
-            del self._records[key]
-        except KeyError:
+        if not self._del_record(key):
             return False
         self._autosave()
         return True
@@ -1109,7 +1751,7 @@ class HtdigestFile(_CommonFile):
         records = self._records
         keys = [key for key in records if key[1] == realm]
         for key in keys:
-            del records[key]
+            self._del_record(key)
         self._autosave()
         return len(keys)
 
@@ -0,0 +1,630 @@
+"""passlib.bench -- benchmark suite for passlib's hashes, CryptContext, and TOTP
+
+This package measures the hash & verify throughput and latency of every registered
+handler (and each of its available backends), how throughput scales across
+multiple worker processes, and the overhead of common :class:`~passlib.context.CryptContext`
+and :class:`~passlib.totp.TOTP` operations. Results can be saved as JSON,
+and two runs compared to detect regressions (e.g. when vetting an upgrade).
+
+It can be run from the command line via ``python -m passlib.bench``.
+
+.. versionadded:: 1.8
+"""
+#=============================================================================
+# imports
+#=============================================================================
+# core
+from __future__ import absolute_import, division, print_function
+import json
+import logging; log = logging.getLogger(__name__)
+import math
+import platform
+import time
+import warnings
+# site
+# pkg
+from passlib import __version__
+from passlib.exc import PasslibWarning
+from passlib.registry import get_crypt_handler, list_crypt_handlers
+from passlib.utils import consteq, timer
+from passlib.utils.compat import irange, int_types, u, unicode_or_bytes_types
+# local
+__all__ = [
+    # measurement
+    "Measurement",
+    "measure",
+    "measure_scaling",
+
+    # running
+    "BenchResults",
+    "run_benchmarks",
+    "load_results",
+
+    # comparing
+    "Comparison",
+    "compare_results",
+]
+
+#=============================================================================
+# constants
+#=============================================================================
+
+#: version of the JSON results format
+RESULTS_FORMAT = 1
+
+#: secret used for all handler benchmarks
+SAMPLE_SECRET = u("bench-S3cr3t")
+
+#: user used by handlers which require one (e.g. msdcc, postgres_md5)
+SAMPLE_USER = u("admin")
+
+#: schemes which measure_scaling() is run for by default (if available)
+DEFAULT_SCALING_SCHEMES = ["bcrypt", "sha512_crypt", "pbkdf2_sha256", "argon2", "scrypt"]
+
+#: calls which take less than this many seconds are timed in batches
+_BATCH_THRESHOLD = 1e-4
+
+#: target duration of each batch (in seconds)
+_BATCH_TARGET = 1e-3
+
+#=============================================================================
+# measurement
+#=============================================================================
+def _percentile(values, percent):
+    """return nearest-rank *percent*'th percentile of (sorted, non-empty) *values*"""
+    rank = int(math.ceil(percent / 100.0 * len(values)))
+    return values[max(rank, 1) - 1]
+
+class Measurement(object):
+    """
+    timing results for a single function, as returned by :func:`measure`.
+
+    .. attribute:: calls
+
+        number of calls which were timed
+
+    .. attribute:: elapsed
+
+        total time taken by timed calls (in seconds)
+
+    .. attribute:: ops_per_sec
+
+        calls per second
+
+    .. attribute:: p50
+    .. attribute:: p99
+
+        median & 99th percentile latency of a single call (in seconds).
+    """
+    def __init__(self, calls, elapsed, p50=None, p99=None):
+        self.calls = calls
+        self.elapsed = elapsed
+        self.p50 = p50
+        self.p99 = p99
+
+    @property
+    def ops_per_sec(self):
+        return self.calls / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self):
+        """return json-compatible dict"""
+        return dict(calls=self.calls, elapsed=self.elapsed, ops_per_sec=self.ops_per_sec,
+                    p50=self.p50, p99=self.p99)
+
+    def __repr__(self):
+        return "<Measurement %.1f ops/sec calls=%d>" % (self.ops_per_sec, self.calls)
+
+def measure(func, duration=.5, min_calls=3, warmup=1):
+    """
+    call *func* repeatedly for *duration* seconds (and at least *min_calls* times),
+    after *warmup* untimed calls.
+
+    :returns:
+        :class:`Measurement` instance.
+
+    .. note::
+
+        Calls faster than 100usec are timed in batches (of roughly 1ms each),
+        so the timer's own overhead doesn't dominate the results;
+        the latencies are then those of the average call within each batch.
+    """
+    for _ in irange(warmup):
+        func()
+
+    # pick batch size
+    start = timer()
+    func()
+    batch = 1
+    single = timer() - start
+    if single < _BATCH_THRESHOLD:
+        batch = int(_BATCH_TARGET / max(single, 1e-7)) + 1
+    loop = irange(batch)
+
+    latencies = []
+    calls = 0
+    end = timer() + duration
+    while True:
+        start = timer()
+        for _ in loop:
+            func()
+        stop = timer()
+        latencies.append((stop - start) / batch)
+        calls += batch
+        if stop >= end and calls >= min_calls:
+            break
+    latencies.sort()
+    return Measurement(calls, sum(latencies) * batch,
+                       _percentile(latencies, 50), _percentile(latencies, 99))
+
+def _load_handler(name, backend, settings):
+    """helper to load handler, configured for benchmarking"""
+    handler = get_crypt_handler(name)
+    if backend:
+        handler.set_backend(backend)
+    if settings:
+        handler = handler.using(**settings)
+    return handler
+
+def _context_kwds(handler):
+    """helper to return context keywords handler requires"""
+    if "user" in handler.context_kwds:
+        return dict(user=SAMPLE_USER)
+    return {}
+
+def _scaling_worker(name, backend, settings, duration):
+    """
+    measure_scaling() helper, run in each worker process --
+    returns ``(calls, elapsed)`` for verify() loop.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", PasslibWarning)
+        handler = _load_handler(name, backend, settings)
+        kwds = _context_kwds(handler)
+        hash = handler.hash(SAMPLE_SECRET, **kwds)
+        verify = handler.verify
+        calls = 0
+        start = timer()
+        end = start + duration
+        while True:
+            verify(SAMPLE_SECRET, hash, **kwds)
+            calls += 1
+            stop = timer()
+            if stop >= end:
+                return calls, stop - start
+
+def measure_scaling(name, backend=None, settings=None, workers=(1, 2), duration=.5):
+    """
+    measure verify() throughput of the named handler, when running in
+    each of the specified numbers of worker processes at once.
+
+    :arg name:
+        name of registered handler.
+    :param backend:
+        optional backend to use.
+    :param settings:
+        optional dict of settings to pass to :meth:`~passlib.ifc.PasswordHash.using`.
+    :param workers:
+        list of worker counts to measure.
+    :param duration:
+        how long each worker should run for (in seconds).
+
+    :returns:
+        list of ``(workers, ops_per_sec, efficiency)`` tuples, one for each worker count;
+        where *efficiency* is throughput relative to ``workers * <throughput of 1 worker>``.
+
+    .. note::
+
+        Since it requires separate processes, this only works for registered handlers;
+        and the workers will be using the default backend unless *backend* is specified.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    results = []
+    base = None
+    for count in workers:
+        with ProcessPoolExecutor(count) as pool:
+            # NOTE: first round starts up the worker processes & loads the handler,
+            #       so that the timed round's workers all start at roughly the same time.
+            args = (name, backend, settings)
+            futures = [pool.submit(_scaling_worker, *(args + (.01,))) for _ in irange(count)]
+            for future in futures:
+                future.result()
+            futures = [pool.submit(_scaling_worker, *(args + (duration,)))
+                       for _ in irange(count)]
+            ops_per_sec = sum(calls / elapsed for calls, elapsed in
+                              (future.result() for future in futures))
+        if base is None:
+            base = ops_per_sec / count
+        results.append((count, ops_per_sec, ops_per_sec / (count * base)))
+    return results
+
+#=============================================================================
+# benchmark cases
+#=============================================================================
+def _cost_settings(handler):
+    """return dict of handler's cost settings (recorded alongside its results)"""
+    settings = {}
+    if "rounds" in handler.setting_kwds:
+        settings['rounds'] = handler.default_rounds
+    for key in ("memory_cost", "block_size", "parallelism"):
+        if key in handler.setting_kwds:
+            value = getattr(handler, key, None)
+            if isinstance(value, int_types):
+                settings[key] = value
+    return settings
+
+def _iter_backends(handler):
+    """yield names of available backends for handler (or ``None`` if it has none)"""
+    backends = getattr(handler, "backends", None)
+    if not backends:
+        yield None
+        return
+    for backend in backends:
+        try:
+            available = handler.has_backend(backend)
+        except Exception:  # pragma: no cover -- buggy backend loader
+            log.debug("error checking %s backend %r", handler.name, backend, exc_info=True)
+            available = False
+        if available:
+            yield backend
+
+def _handler_cases(name, rounds, duration):
+    """
+    yield ``(id, info)`` for hash & verify benchmarks of each backend of handler,
+    where *info* is a dict containing the :class:`Measurement` fields.
+    """
+    base = get_crypt_handler(name)
+    orig_backend = base.get_backend() if getattr(base, "backends", None) else None
+    try:
+        for backend in _iter_backends(base):
+            if backend:
+                base.set_backend(backend)
+            handler = base
+            if rounds == "min" and "rounds" in handler.setting_kwds:
+                handler = handler.using(rounds=handler.min_rounds)
+            settings = _cost_settings(handler)
+            kwds = _context_kwds(handler)
+            hash = handler.hash(SAMPLE_SECRET, **kwds)
+            info = dict(scheme=name, backend=backend, settings=settings)
+            key = "handler:%s:%s" % (name, backend or "default")
+            result = measure(lambda: handler.hash(SAMPLE_SECRET, **kwds), duration)
+            yield key + ":hash", dict(info, **result.to_dict())
+            result = measure(lambda: handler.verify(SAMPLE_SECRET, hash, **kwds), duration)
+            yield key + ":verify", dict(info, **result.to_dict())
+    finally:
+        if orig_backend:
+            base.set_backend(orig_backend)
+
+#: config used by context benchmarks
+_SAMPLE_CONFIG = u("""\
+[passlib]
+schemes = sha512_crypt, sha256_crypt, pbkdf2_sha256, md5_crypt, des_crypt, ldap_salted_sha1, hex_md5
+deprecated = auto
+sha512_crypt__min_rounds = 1000
+sha512_crypt__default_rounds = 1000
+admin__sha512_crypt__default_rounds = 2000
+""")
+
+def _context_cases(duration):
+    """yield ``(id, info)`` for CryptContext overhead benchmarks"""
+    from passlib.context import CryptContext
+    context = CryptContext.from_string(_SAMPLE_CONFIG)
+    # NOTE: using last scheme, so identify() can't stop early
+    hash = context.handler("hex_md5").hash(SAMPLE_SECRET)
+    left = b"x" * 64
+    right = b"x" * 63 + b"y"
+    cases = [
+        ("context:from_string", lambda: CryptContext.from_string(_SAMPLE_CONFIG)),
+        ("context:identify", lambda: context.identify(hash)),
+        ("context:verify", lambda: context.verify(SAMPLE_SECRET, hash)),
+        ("context:needs_update", lambda: context.needs_update(hash)),
+        ("utils:consteq", lambda: consteq(left, right)),
+    ]
+    for key, func in cases:
+        yield key, measure(func, duration).to_dict()
+
+def _totp_cases(duration):
+    """yield ``(id, info)`` for TOTP benchmarks"""
+    from passlib.totp import TOTP, TokenError
+    otp = TOTP(key=b"x" * 20, format="raw")
+    now = 1500000000
+    # NOTE: token from edge of window, so match() has to search most of it
+    token = otp.generate(now - 30).token
+    bad_token = "000000" if token != "000000" else "111111"
+
+    def match_miss():
+        try:
+            otp.match(bad_token, now)
+        except TokenError:
+            pass
+
+    yield "totp:match", measure(lambda: otp.match(token, now), duration).to_dict()
+    yield "totp:match_miss", measure(match_miss, duration).to_dict()
+
+#=============================================================================
+# runner
+#=============================================================================
+class BenchResults(object):
+    """
+    results of :func:`run_benchmarks`.
+
+    .. attribute:: results
+
+        dict mapping benchmark id -> dict of measurements.
+        ids are of the form ``"handler:<scheme>:<backend>:<hash|verify>"``,
+        ``"scaling:<scheme>:<backend>:<workers>"``, ``"context:<operation>"``, etc.
+        measurements include ``ops_per_sec``, ``p50``, and ``p99`` keys
+        (the latencies will be ``None`` for scaling results).
+
+    .. attribute:: skipped
+
+        dict mapping benchmark id -> reason it couldn't be run.
+
+    .. attribute:: metadata
+
+        dict containing passlib version, python version, platform, etc.
+
+    .. automethod:: save
+    .. automethod:: to_json
+    """
+    def __init__(self, results=None, skipped=None, metadata=None):
+        self.results = results if results is not None else {}
+        self.skipped = skipped if skipped is not None else {}
+        self.metadata = metadata if metadata is not None else _get_metadata()
+
+    def to_json(self):
+        """render results as json string"""
+        return json.dumps(dict(format=RESULTS_FORMAT, metadata=self.metadata,
+                               results=self.results, skipped=self.skipped),
+                          indent=2, sort_keys=True)
+
+    def save(self, path):
+        """save results to json file"""
+        with open(path, "w") as fh:
+            fh.write(self.to_json())
+            fh.write("\n")
+
+    @classmethod
+    def from_json(cls, source):
+        """parse results from json string"""
+        data = json.loads(source)
+        if not isinstance(data, dict) or data.get("format") != RESULTS_FORMAT:
+            raise ValueError("unsupported benchmark results format")
+        return cls(data['results'], data.get("skipped", {}), data.get("metadata", {}))
+
+    def __repr__(self):
+        return "<BenchResults %d results, %d skipped>" % (len(self.results), len(self.skipped))
+
+def load_results(path):
+    """load :class:`BenchResults` from json file created by :meth:`BenchResults.save`"""
+    with open(path) as fh:
+        return BenchResults.from_json(fh.read())
+
+def _get_metadata():
+    """return dict describing environment benchmark is running in"""
+    try:
+        import multiprocessing
+        cpu_count = multiprocessing.cpu_count()
+    except (ImportError, NotImplementedError):  # pragma: no cover
+        cpu_count = None
+    return dict(
+        passlib_version=__version__,
+        python_version=platform.python_version(),
+        python_implementation=platform.python_implementation(),
+        platform=platform.platform(),
+        machine=platform.machine(),
+        cpu_count=cpu_count,
+        timestamp=int(time.time()),
+    )
+
+def _default_workers():
+    """return default list of worker counts for scaling benchmarks: 1, 2, 4 ... cpu_count"""
+    import multiprocessing
+    limit = multiprocessing.cpu_count()
+    workers = []
+    count = 1
+    while count < limit:
+        workers.append(count)
+        count *= 2
+    workers.append(limit)
+    return workers
+
+def run_benchmarks(schemes=None, rounds="default", duration=.5, scaling_schemes=None,
+                   workers=None, context=True, totp=True, progress=None):
+    """
+    run benchmark suite.
+
+    :param schemes:
+        list of handler names to benchmark (defaults to all registered handlers).
+        each available backend of each handler is measured.
+
+    :param rounds:
+        ``"default"`` to measure handlers using their default cost settings,
+        or ``"min"`` to use their minimum rounds (much quicker, but less representative).
+        the settings used are recorded alongside each result.
+
+    :param duration:
+        how long to run each benchmark for (in seconds).
+
+    :param scaling_schemes:
+        list of handler names to measure multi-process scaling for
+        (using their default backend). defaults to :data:`DEFAULT_SCALING_SCHEMES`
+        (restricted to those in *schemes*). pass an empty list to disable.
+
+    :param workers:
+        list of worker counts for scaling benchmarks.
+        defaults to ``1, 2, 4 ...`` up to the number of cpus.
+
+    :param context:
+        whether to run :class:`~passlib.context.CryptContext` benchmarks.
+
+    :param totp:
+        whether to run :class:`~passlib.totp.TOTP` benchmarks.
+
+    :param progress:
+        optional callback, invoked as ``progress(id, info)`` after each result,
+        or ``progress(id, None)`` for skipped benchmarks.
+
+    :returns:
+        :class:`BenchResults` instance.
+    """
+    if rounds not in ("default", "min"):
+        raise ValueError("rounds must be 'default' or 'min'")
+    if duration <= 0:
+        raise ValueError("duration must be > 0")
+    if schemes is None:
+        schemes = list_crypt_handlers()
+    if scaling_schemes is None:
+        scaling_schemes = [name for name in DEFAULT_SCALING_SCHEMES if name in schemes]
+    if workers is None:
+        workers = _default_workers()
+
+    report = BenchResults()
+    results = report.results
+    skipped = report.skipped
+
+    def add(key, info):
+        results[key] = info
+        if progress:
+            progress(key, info)
+
+    def skip(key, err):
+        log.debug("skipping benchmark %r", key, exc_info=True)
+        skipped[key] = "%s: %s" % (type(err).__name__, err)
+        if progress:
+            progress(key, None)
+
+    with warnings.catch_warnings():
+        # e.g. deprecation warnings from legacy handlers
+        warnings.simplefilter("ignore", PasslibWarning)
+        warnings.simplefilter("ignore", DeprecationWarning)
+
+        for name in schemes:
+            try:
+                for key, info in _handler_cases(name, rounds, duration):
+                    add(key, info)
+            except Exception as err:
+                skip("handler:%s" % name, err)
+
+        for name in scaling_schemes:
+            try:
+                handler = get_crypt_handler(name)
+                backend = handler.get_backend() if getattr(handler, "backends", None) else None
+                settings = None
+                if rounds == "min" and "rounds" in handler.setting_kwds:
+                    settings = dict(rounds=handler.min_rounds)
+                    handler = handler.using(**settings)
+                info = dict(scheme=name, backend=backend, settings=_cost_settings(handler))
+                for count, ops_per_sec, efficiency in measure_scaling(
+                        name, backend, settings, workers, duration):
+                    add("scaling:%s:%s:%d" % (name, backend or "default", count),
+                        dict(info, workers=count, ops_per_sec=ops_per_sec,
+                             efficiency=efficiency, p50=None, p99=None))
+            except Exception as err:
+                skip("scaling:%s" % name, err)
+
+        groups = []
+        if context:
+            groups.append(("context", _context_cases))
+        if totp:
+            groups.append(("totp", _totp_cases))
+        for group, cases in groups:
+            try:
+                for key, info in cases(duration):
+                    add(key, info)
+            except Exception as err:  # pragma: no cover -- shouldn't happen
+                skip(group, err)
+
+    return report
+
+#=============================================================================
+# comparison
+#=============================================================================
+class Comparison(object):
+    """
+    comparison of a single benchmark between two runs, as returned by :func:`compare_results`.
+
+    .. attribute:: id
+
+        benchmark id
+
+    .. attribute:: status
+
+        one of ``"regression"``, ``"improvement"``, ``"ok"``;
+        ``"settings-changed"`` if the handler's cost settings differ between runs
+        (so throughput isn't comparable); or ``"removed"`` / ``"added"``
+        if the benchmark is only present in one of the runs.
+
+    .. attribute:: old
+    .. attribute:: new
+
+        ops/sec for old & new runs (``None`` if not present).
+
+    .. attribute:: change
+
+        relative change in ops/sec (e.g. ``-.25`` if new run is 25% slower),
+        or ``None``.
+    """
+    def __init__(self, id, status, old=None, new=None, change=None):
+        self.id = id
+        self.status = status
+        self.old = old
+        self.new = new
+        self.change = change
+
+    def __repr__(self):
+        return "<Comparison %s %s change=%r>" % (self.id, self.status, self.change)
+
+def compare_results(old, new, threshold=.10):
+    """
+    compare two sets of benchmark results.
+
+    :arg old:
+        baseline :class:`BenchResults` (or path to json file).
+
+    :arg new:
+        new :class:`BenchResults` (or path to json file).
+
+    :param threshold:
+        relative change in ops/sec which is considered a regression
+        (or improvement). defaults to ``.10`` (10%).
+
+    :returns:
+        list of :class:`Comparison` instances, sorted by id.
+    """
+    if isinstance(old, unicode_or_bytes_types):
+        old = load_results(old)
+    if isinstance(new, unicode_or_bytes_types):
+        new = load_results(new)
+    if threshold <= 0:
+        raise ValueError("threshold must be > 0")
+    old_results = old.results
+    new_results = new.results
+    out = []
+    for key in sorted(set(old_results) | set(new_results)):
+        prev = old_results.get(key)
+        cur = new_results.get(key)
+        if prev is None:
+            out.append(Comparison(key, "added", new=cur['ops_per_sec']))
+            continue
+        if cur is None:
+            out.append(Comparison(key, "removed", old=prev['ops_per_sec']))
+            continue
+        old_ops = prev['ops_per_sec']
+        new_ops = cur['ops_per_sec']
+        change = (new_ops - old_ops) / old_ops if old_ops else None
+        if prev.get("settings") != cur.get("settings"):
+            status = "settings-changed"
+        elif change is None:
+            status = "ok"
+        elif change <= -threshold:
+            status = "regression"
+        elif change >= threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        out.append(Comparison(key, status, old_ops, new_ops, change))
+    return out
+
+#=============================================================================
+# eof
+#=============================================================================
@@ -0,0 +1,142 @@
+"""passlib.bench.__main__ -- command line interface for the benchmark suite
+
+usage::
+
+    python -m passlib.bench run [-o results.json] [--schemes a,b] [--rounds min] ...
+    python -m passlib.bench compare old.json new.json [--threshold 10]
+
+``compare`` exits with status 1 if any regressions were found.
+"""
+#=============================================================================
+# imports
+#=============================================================================
+from __future__ import absolute_import, division, print_function
+# core
+import logging; log = logging.getLogger(__name__)
+import sys
+# site
+# pkg
+from passlib.bench import compare_results, load_results, run_benchmarks
+# local
+__all__ = [
+    "main",
+]
+
+#=============================================================================
+# helpers
+#=============================================================================
+def _split_list(value):
+    """parse comma-separated list argument"""
+    return [elem.strip() for elem in value.split(",") if elem.strip()]
+
+def _format_time(secs):
+    """pretty-print latency"""
+    if secs is None:
+        return "-"
+    if secs < 1e-3:
+        return "%.2fus" % (secs * 1e6)
+    if secs < 1:
+        return "%.2fms" % (secs * 1e3)
+    return "%.2fs" % secs
+
+def _print_result(key, info):
+    """progress callback for run command"""
+    if info is None:
+        print("%-52s skipped" % key)
+        return
+    extra = ""
+    if "efficiency" in info:
+        extra = " (%d%% efficiency)" % (info['efficiency'] * 100)
+    print("%-52s %12.1f/s  p50 %9s  p99 %9s%s" % (
+        key, info['ops_per_sec'], _format_time(info['p50']), _format_time(info['p99']), extra))
+    sys.stdout.flush()
+
+#=============================================================================
+# commands
+#=============================================================================
+def run_command(opts):
+    """run benchmarks, optionally saving results"""
+    kwds = dict(rounds=opts.rounds, duration=opts.duration,
+                context=not opts.no_context, totp=not opts.no_totp)
+    if opts.schemes is not None:
+        kwds['schemes'] = _split_list(opts.schemes)
+    if opts.scaling is not None:
+        kwds['scaling_schemes'] = _split_list(opts.scaling)
+    if opts.workers is not None:
+        kwds['workers'] = [int(count) for count in _split_list(opts.workers)]
+    report = run_benchmarks(progress=None if opts.quiet else _print_result, **kwds)
+    if report.skipped and not opts.quiet:
+        print()
+        for key, reason in sorted(report.skipped.items()):
+            print("skipped %s -- %s" % (key, reason))
+    if opts.output:
+        report.save(opts.output)
+        print("saved %d results to %s" % (len(report.results), opts.output))
+    return 0
+
+def compare_command(opts):
+    """compare two results files, returns 1 if regressions found"""
+    old = load_results(opts.old)
+    new = load_results(opts.new)
+    threshold = opts.threshold / 100.0
+    regressions = 0
+    for comp in compare_results(old, new, threshold=threshold):
+        if comp.status == "regression":
+            regressions += 1
+        elif comp.status == "ok" and not opts.verbose:
+            continue
+        change = "-" if comp.change is None else "%+.1f%%" % (comp.change * 100)
+        old_ops = "-" if comp.old is None else "%.1f/s" % comp.old
+        new_ops = "-" if comp.new is None else "%.1f/s" % comp.new
+        print("%-52s %14s %14s %8s  %s" % (comp.id, old_ops, new_ops, change, comp.status))
+    print("%d regression(s) found (threshold %g%%)" % (regressions, opts.threshold))
+    return 1 if regressions else 0
+
+#=============================================================================
+# main
+#=============================================================================
+def main(*args):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m passlib.bench",
+                                     description="passlib benchmark suite")
+    subparsers = parser.add_subparsers(dest="command")
+
+    run = subparsers.add_parser("run", help="run benchmarks")
+    run.add_argument("-o", "--output", help="write results to json file")
+    run.add_argument("--schemes", help="comma-separated list of schemes to benchmark "
+                                       "(default: all registered)")
+    run.add_argument("--rounds", choices=["default", "min"], default="default",
+                     help="cost settings to benchmark handlers with (default: %(default)s)")
+    run.add_argument("--duration", type=float, default=.5,
+                     help="seconds to run each benchmark for (default: %(default)s)")
+    run.add_argument("--scaling", help="comma-separated list of schemes to measure "
+                                       "multi-process scaling for ('' to disable)")
+    run.add_argument("--workers", help="comma-separated list of worker counts "
+                                       "(default: 1,2,4...cpu count)")
+    run.add_argument("--no-context", action="store_true", help="skip CryptContext benchmarks")
+    run.add_argument("--no-totp", action="store_true", help="skip TOTP benchmarks")
+    run.add_argument("-q", "--quiet", action="store_true", help="don't print results")
+    run.set_defaults(func=run_command)
+
+    compare = subparsers.add_parser("compare", help="compare two results files")
+    compare.add_argument("old", help="baseline results file")
+    compare.add_argument("new", help="new results file")
+    compare.add_argument("--threshold", type=float, default=10,
+                         help="percent drop in ops/sec considered a regression "
+                              "(default: %(default)s)")
+    compare.add_argument("-v", "--verbose", action="store_true",
+                         help="list unchanged benchmarks too")
+    compare.set_defaults(func=compare_command)
+
+    opts = parser.parse_args(list(args))
+    if not opts.command:
+        parser.print_help()
+        return 2
+    return opts.func(opts)
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
+
+#=============================================================================
+# eof
+#=============================================================================
@@ -4,6 +4,7 @@
 #=============================================================================
 # core
 from __future__ import absolute_import, division, print_function
+from itertools import islice
 import re
 import logging; log = logging.getLogger(__name__)
 import threading
@@ -11,7 +12,8 @@ import time
 from warnings import warn
 # site
 # pkg
-from passlib.exc import ExpectedStringError, ExpectedTypeError, PasslibConfigWarning
+from passlib.exc import ExpectedStringError, ExpectedTypeError, PasslibConfigWarning, \
+                        MissingBackendError
 from passlib.registry import get_crypt_handler, _validate_handler_name
 from passlib.utils import (handlers as uh, to_bytes,
                            to_unicode, splitcomma,
@@ -19,7 +21,7 @@ from passlib.utils import (handlers as uh, to_bytes,
                            )
 from passlib.utils.binary import BASE64_CHARS
 from passlib.utils.compat import (iteritems, num_types, irange,
-                                  PY2, PY3, unicode, SafeConfigParser,
+                                  PY2, PY3, unicode,
                                   NativeStringIO, BytesIO,
                                   unicode_or_bytes_types, native_string_types,
                                   )
@@ -77,6 +79,128 @@ def _always_needs_update(hash, secret=None):
 #: list of keys allowed under wildcard "all" scheme w/o a security warning.
 _global_settings = set(["truncate_error", "vary_rounds"])
 
+def _get_identify_prefixes(handler):
+    """
+    helper for _CryptConfig's identify index --
+    returns tuple of unicode prefixes if handler's :meth:`identify` is known
+    to be nothing more than a ``hash.startswith(prefixes)`` check;
+    otherwise returns ``None``, signalling handler must be checked via identify().
+    """
+    # NOTE: only trusting the stock GenericHandler & HasManyIdents implementations,
+    #       any handler which overrides identify() may use additional logic.
+    func = getattr(handler.identify, "__func__", None)
+    if func is None:
+        return None
+    if func is _generic_identify:
+        prefixes = (handler.ident,)
+    elif func is _many_idents_identify:
+        prefixes = tuple(handler.ident_values or ())
+    else:
+        return None
+    if not prefixes or not all(prefix and isinstance(prefix, unicode)
+                               for prefix in prefixes):
+        return None
+    return prefixes
+
+_generic_identify = uh.GenericHandler.identify.__func__
+_many_idents_identify = uh.HasManyIdents.identify.__func__
+
+#=============================================================================
+# snapshot helpers
+#=============================================================================
+
+#: version of the format written by _CryptConfig.to_snapshot()
+_SNAPSHOT_FORMAT = 1
+
+class _DeferredRecordMap(dict):
+    """
+    dict mapping ``(scheme, category) -> record``, used by :meth:`_CryptConfig.from_snapshot`.
+    records listed in *specs* (which maps the same keys -> settings dict)
+    aren't created until the first time they're looked up.
+    """
+    def __init__(self, handlers, specs):
+        super(_DeferredRecordMap, self).__init__()
+        self._handlers = handlers
+        self._specs = specs
+
+    def __missing__(self, key):
+        # NOTE: raises KeyError for unknown keys, same as plain dict.
+        kwds = self._specs[key]
+        scheme, category = key
+        record = self[key] = _CryptConfig._create_record(self._handlers[scheme],
+                                                         category, **kwds)
+        return record
+
+if PY2:
+    def _native_str(value):
+        """helper for from_snapshot() -- convert json's unicode strings to native str"""
+        if isinstance(value, unicode):
+            return value.encode("utf-8")
+        elif isinstance(value, list):
+            return [_native_str(elem) for elem in value]
+        return value
+else:
+    def _native_str(value):
+        """helper for from_snapshot() -- convert json's unicode strings to native str"""
+        return value
+
+def _native_kwds(kwds):
+    """helper for from_snapshot() -- convert keys & values of settings dict to native str"""
+    return dict((_native_str(key), _native_str(value)) for key, value in iteritems(kwds))
+
+#=============================================================================
+# batch operation helpers
+#=============================================================================
+
+#: names of backends which are implemented in pure python,
+#: and so won't release the GIL while hashing.
+_pure_python_backends = set(["builtin", "builtin_array", "builtin_batch", "argon2pure"])
+
+def _import_futures():
+    """helper to import concurrent.futures on demand (used by batch methods)"""
+    try:
+        from concurrent import futures
+    except ImportError: # pragma: no cover -- py2 w/o 'futures' backport
+        raise RuntimeError("CryptContext batch methods require the 'concurrent.futures' "
+                           "module (under Python 2, install the 'futures' package)")
+    return futures
+
+def _is_pure_python_record(record):
+    """check if record is using a pure-python backend"""
+    get_backend = getattr(record, "get_backend", None)
+    if get_backend is None:
+        return False
+    try:
+        return get_backend() in _pure_python_backends
+    except MissingBackendError:
+        return False
+
+def _run_batch(context, method, items, kwds):
+    """
+    invoke ``context.method(*args, **kwds)`` for each args tuple in *items*.
+    returns list of ``(True, result)`` or ``(False, error)`` pairs,
+    so an error in one item doesn't discard the rest of the chunk.
+    """
+    func = getattr(context, method)
+    results = []
+    for args in items:
+        try:
+            results.append((True, func(*args, **kwds)))
+        except Exception as err:
+            results.append((False, err))
+    return results
+
+#: cache of CryptContext instances used by worker processes, keyed by config string.
+_worker_contexts = {}
+
+def _run_worker_batch(source, method, items, kwds):
+    """wrapper for _run_batch() invoked inside worker processes"""
+    try:
+        context = _worker_contexts[source]
+    except KeyError:
+        context = _worker_contexts[source] = CryptContext.from_string(source)
+    return _run_batch(context, method, items, kwds)
+
 #=============================================================================
 # _CryptConfig helper class
 #=============================================================================
@@ -124,6 +248,10 @@ class _CryptConfig(object):
     # in order of schemes(). populated on demand by _get_record_list()
     _record_lists = None
 
+    # dict mapping category -> identify index used by identify_record().
+    # populated on demand by _get_identify_index()
+    _identify_indexes = None
+
     #===================================================================
     # constructor
     #===================================================================
@@ -485,6 +613,13 @@ class _CryptConfig(object):
         # NOTE: default records for specific category stored under the
         # key (None,category); these are populated on-demand by get_record().
 
+        # build identify index for all known categories up front,
+        # other categories will be indexed on-demand by identify_record().
+        self._identify_indexes = {}
+        if self.handlers:
+            for cat in categories:
+                self._get_identify_index(cat)
+
     @staticmethod
     def _create_record(handler, category=None, deprecated=False, **settings):
         # create custom handler if needed.
@@ -597,6 +732,44 @@ class _CryptConfig(object):
             ]
         return value
 
+    def _get_identify_index(self, category=None):
+        """return identify index for category (cached)
+
+        this is an internal helper used only by identify_record().
+        the index is a tuple of ``(sizes, prefix_map, fallback, stats)``:
+
+        * *prefix_map* maps each identifying prefix -> ``(position, record)``,
+          for all records whose identify() is just a prefix check.
+          (if multiple records share a prefix, the first one wins).
+        * *sizes* is a tuple of the distinct prefix lengths in *prefix_map*.
+        * *fallback* is a tuple of ``(position, record)`` for the remaining
+          records, which have to be checked via their identify() method.
+        * *stats* is a list of ``[indexed, scanned, unidentified]`` lookup counters.
+
+        *position* is the record's index within :attr:`schemes`,
+        used to preserve the "first scheme wins" ordering of the linear search.
+        """
+        # type check of category - handled by _get_record_list()
+        # quick lookup in cache
+        try:
+            return self._identify_indexes[category]
+        except KeyError:
+            pass
+        # cache miss - build index from scratch
+        prefix_map = {}
+        fallback = []
+        for position, record in enumerate(self._get_record_list(category)):
+            prefixes = _get_identify_prefixes(record)
+            if prefixes is None:
+                fallback.append((position, record))
+            else:
+                for prefix in prefixes:
+                    prefix_map.setdefault(prefix, (position, record))
+        sizes = tuple(sorted(set(len(prefix) for prefix in prefix_map)))
+        value = self._identify_indexes[category] = (sizes, prefix_map,
+                                                    tuple(fallback), [0, 0, 0])
+        return value
+
     def identify_record(self, hash, category, required=True):
         """internal helper to identify appropriate custom handler for hash"""
         # NOTE: this is part of the critical path shared by
@@ -606,14 +779,32 @@ class _CryptConfig(object):
         #        this will only return first match. might want to do something
         #        about this in future, but for now only hashes with
         #        unique identifiers will work properly in a CryptContext.
-        # XXX: if all handlers have a unique prefix (e.g. all are MCF / LDAP),
-        #      could use dict-lookup to speed up this search.
         if not isinstance(hash, unicode_or_bytes_types):
             raise ExpectedStringError(hash, "hash")
-        # type check of category - handled by _get_record_list()
-        for record in self._get_record_list(category):
+        # type check of category - handled by _get_identify_index()
+        sizes, prefix_map, fallback, stats = self._get_identify_index(category)
+
+        # find earliest record whose prefix matches, via dict lookup.
+        match = None
+        if sizes:
+            uhash = uh.to_unicode_for_identify(hash)
+            for size in sizes:
+                entry = prefix_map.get(uhash[:size])
+                if entry is not None and (match is None or entry[0] < match[0]):
+                    match = entry
+
+        # check any prefix-less records which come before the match.
+        for position, record in fallback:
+            if match is not None and position > match[0]:
+                break
             if record.identify(hash):
+                stats[1] += 1
                 return record
+        if match is not None:
+            stats[0] += 1
+            return match[1]
+
+        stats[2] += 1
         if not required:
             return None
         elif not self.schemes:
@@ -621,6 +812,19 @@ class _CryptConfig(object):
         else:
             raise ValueError("hash could not be identified")
 
+    def get_identify_stats(self):
+        """return dict mapping category -> identify lookup stats (see CryptContext.identify_stats)"""
+        result = {}
+        for category, (sizes, prefix_map, fallback, stats) in iteritems(self._identify_indexes):
+            indexed, scanned, unidentified = stats
+            result[category] = dict(
+                indexed=indexed,
+                scanned=scanned,
+                unidentified=unidentified,
+                fallback_schemes=[record.name for _, record in fallback],
+            )
+        return result
+
     @memoized_property
     def disabled_record(self):
         for record in self._get_record_list(None):
@@ -680,6 +884,101 @@ class _CryptConfig(object):
                     for key in sorted(kwds):
                         yield (cat, scheme, key), kwds[key]
 
+    def to_snapshot(self):
+        """serialize fully-normalized config to string (see CryptContext.to_snapshot)"""
+        import json
+        from passlib import __version__
+        for handler in self.handlers:
+            if not _is_handler_registered(handler):
+                raise ValueError("can't snapshot config using unregistered "
+                                 "handler: %r" % (handler.name,))
+        # NOTE: record settings are regenerated here rather than kept around
+        #       after _init_records(), since snapshots are rarely needed.
+        records = []
+        for scheme in self.schemes:
+            for cat in (None,) + self.categories:
+                kwds, has_cat_options = self._get_record_options_with_flag(scheme, cat)
+                if cat is None or has_cat_options:
+                    records.append([scheme, cat, kwds])
+        data = dict(
+            format=_SNAPSHOT_FORMAT,
+            passlib=__version__,
+            schemes=list(self.schemes),
+            categories=list(self.categories),
+            scheme_options=[[scheme, cat, kwds]
+                            for scheme, category_map in sorted(iteritems(self._scheme_options))
+                            for cat, kwds in iteritems(category_map)],
+            # NOTE: 'schemes' option is omitted, it may contain handler objects,
+            #       and iter_config() uses .schemes instead anyways.
+            context_options=[[key, cat, value]
+                             for key, category_map in sorted(iteritems(self._context_options))
+                             for cat, value in iteritems(category_map)
+                             if key != "schemes"],
+            default_schemes=[[cat, scheme] for cat, scheme in iteritems(self._default_schemes)],
+            records=records,
+        )
+        try:
+            return json.dumps(data, sort_keys=True, separators=(",", ":"))
+        except TypeError as err:
+            raise ValueError("can't snapshot config: %s" % (err,))
+
+    @classmethod
+    def from_snapshot(cls, source):
+        """
+        restore config from string returned by :meth:`to_snapshot`.
+
+        this bypasses :meth:`__init__` entirely -- the options are already
+        normalized & validated, so they're loaded as-is; and records are
+        only created when first used (via :class:`_DeferredRecordMap`).
+        """
+        import json
+        from passlib import __version__
+        if isinstance(source, bytes):
+            source = source.decode("utf-8")
+        try:
+            data = json.loads(source)
+            version = (data["format"], data["passlib"])
+        except (ValueError, TypeError, KeyError):
+            raise ValueError("malformed CryptContext snapshot")
+        if version != (_SNAPSHOT_FORMAT, __version__):
+            raise ValueError("CryptContext snapshot was created by passlib %s "
+                             "(format %s), can't be loaded by passlib %s" %
+                             (version[1], version[0], __version__))
+        try:
+            schemes = tuple(_native_str(scheme) for scheme in data["schemes"])
+        except (TypeError, KeyError):
+            raise ValueError("malformed CryptContext snapshot")
+        # NOTE: lets KeyError through if scheme is no longer registered
+        handlers = tuple(get_crypt_handler(scheme) for scheme in schemes)
+        self = cls.__new__(cls)
+        self.handlers = handlers
+        self.schemes = schemes
+        try:
+            self.categories = tuple(_native_str(cat) for cat in data["categories"])
+
+            scheme_options = self._scheme_options = {}
+            for scheme, cat, kwds in data["scheme_options"]:
+                scheme_options.setdefault(_native_str(scheme), {})[_native_str(cat)] = \
+                    _native_kwds(kwds)
+            context_options = self._context_options = {}
+            for key, cat, value in data["context_options"]:
+                context_options.setdefault(_native_str(key), {})[_native_str(cat)] = \
+                    _native_str(value)
+            self._default_schemes = dict((_native_str(cat), _native_str(scheme))
+                                         for cat, scheme in data["default_schemes"])
+
+            all_context_kwds = self.context_kwds = set()
+            for handler in handlers:
+                all_context_kwds.update(handler.context_kwds)
+            specs = dict(((_native_str(scheme), _native_str(cat)), _native_kwds(kwds))
+                         for scheme, cat, kwds in data["records"])
+        except (ValueError, TypeError, KeyError, AttributeError):
+            raise ValueError("malformed CryptContext snapshot")
+        self._records = _DeferredRecordMap(dict(zip(schemes, handlers)), specs)
+        self._record_lists = {}
+        self._identify_indexes = {}
+        return self
+
     #===================================================================
     # eoc
     #===================================================================
@@ -726,6 +1025,14 @@ class CryptContext(object):
     _get_record = None
     _identify_record = None
 
+    # tuple of observers added via add_observer(), or None if there aren't any.
+    # NOTE: replaced rather than modified, so hash() & verify() don't need a lock to read it.
+    _observers = None
+
+    #: global lock used to serialize add_observer() / remove_observer(),
+    #: so concurrent calls don't lose each other's changes.
+    _observer_lock = threading.Lock()
+
     #===================================================================
     # secondary constructors
     #===================================================================
@@ -811,6 +1118,35 @@ class CryptContext(object):
         self.load_path(path, section=section, encoding=encoding)
         return self
 
+    @classmethod
+    def from_snapshot(cls, source):
+        """create new CryptContext instance from a string returned by :meth:`to_snapshot`.
+
+        :type source: unicode or bytes
+        :arg source:
+            snapshot string.
+
+        :raises ValueError:
+            if the snapshot is malformed, or was created by
+            a different version of Passlib.
+
+        :raises KeyError:
+            if one of the schemes in the snapshot isn't registered.
+
+        :returns:
+            new :class:`CryptContext` instance, with the same configuration
+            as the one :meth:`!to_snapshot` was called on.
+
+        .. versionadded:: 1.8
+
+        .. seealso:: :ref:`context-snapshots`
+        """
+        if not isinstance(source, unicode_or_bytes_types):
+            raise ExpectedTypeError(source, "unicode or bytes", "source")
+        self = cls(_autoload=False)
+        self._set_config(_CryptConfig.from_snapshot(source))
+        return self
+
     def copy(self, **kwds):
         """Return copy of existing CryptContext instance.
 
@@ -890,6 +1226,8 @@ class CryptContext(object):
         # NOTE: this expects a unicode stream under py3,
         # and a utf-8 bytes stream under py2,
         # allowing the resulting dict to always use native strings.
+        # NOTE: configparser is imported on demand, since it's only needed by INI methods.
+        from passlib.utils.compat import SafeConfigParser
         p = SafeConfigParser()
         if PY3:
             # python 3.2 deprecated readfp in favor of read_file
@@ -1027,7 +1365,10 @@ class CryptContext(object):
         #-----------------------------------------------------------
         # compile into _CryptConfig instance, and update state
         #-----------------------------------------------------------
-        config = _CryptConfig(source)
+        self._set_config(_CryptConfig(source))
+
+    def _set_config(self, config):
+        """helper for load() & from_snapshot() -- install new _CryptConfig instance"""
         self._config = config
         self.reset_min_verify_time()
         self._get_record = config.get_record
@@ -1283,6 +1624,105 @@ class CryptContext(object):
         """
         return self._config.context_kwds
 
+    def identify_stats(self):
+        """[experimental method] return hash identification statistics.
+
+        Returns a dict mapping each category which has been used for
+        identification (``None`` for the default category) to a dict containing:
+
+        * ``indexed`` -- number of hashes resolved via the prefix index.
+        * ``scanned`` -- number of hashes resolved by calling a scheme's :meth:`identify`.
+        * ``unidentified`` -- number of hashes which couldn't be identified.
+        * ``fallback_schemes`` -- list of schemes which lack a known prefix,
+          and have to be checked via their :meth:`identify` method.
+
+        Counters are reset whenever the configuration is reloaded,
+        and are not updated atomically, so should be considered approximate
+        under concurrent use.
+
+        .. versionadded:: 1.8
+        """
+        return self._config.get_identify_stats()
+
+    def add_observer(self, observer):
+        """
+        Add an observer, which will be invoked after each call to
+        :meth:`hash`, :meth:`verify`, and :meth:`verify_and_update`,
+        as ``observer(operation, scheme, category, elapsed, outcome)``
+        (see :class:`passlib.metrics.ContextObserver` for details).
+
+        This is mainly meant for collecting metrics,
+        e.g. via a :class:`passlib.metrics.MetricsCollector`.
+        Observers aren't affected by :meth:`load`, and aren't copied by :meth:`copy`.
+
+        When :meth:`verify_and_update` re-hashes the secret, it only reports
+        a single ``"verify_and_update"`` event (with an outcome of ``"rehash"``),
+        not an additional ``"hash"`` event; and its elapsed time covers
+        verifying the existing hash, not generating the new one.
+
+        .. note::
+
+            The batch methods (:meth:`hash_many`, :meth:`verify_many`, etc)
+            invoke observers for items run in a thread pool, but not for items
+            run in worker processes (which use their own copy of the context).
+
+        .. versionadded:: 1.8
+
+        .. seealso:: :ref:`context-observers`
+        """
+        if not callable(observer):
+            raise ExpectedTypeError(observer, "callable", "observer")
+        with self._observer_lock:
+            self._observers = (self._observers or ()) + (observer,)
+
+    def remove_observer(self, observer):
+        """
+        Remove an observer added via :meth:`add_observer`.
+
+        :raises ValueError: if observer wasn't added to this context.
+
+        .. versionadded:: 1.8
+        """
+        with self._observer_lock:
+            observers = list(self._observers or ())
+            observers.remove(observer)
+            self._observers = tuple(observers) or None
+
+    def _notify(self, operation, scheme, category, elapsed, outcome):
+        """invoke observers (only called when there are some)"""
+        for observer in self._observers or ():
+            try:
+                observer(operation, scheme, category, elapsed, outcome)
+            except Exception:
+                log.exception("error in CryptContext observer %r", observer)
+
+    def warmup(self, cache_path=None):
+        """
+        Eagerly load the backends for all the schemes in this context,
+        running any self-tests they need; and estimate :attr:`min_verify_time`
+        if :ref:`harden_verify <context-harden-verify-option>` is enabled.
+
+        Normally all of this happens lazily, the first time each scheme is used.
+        Servers which fork worker processes can call this in the parent process,
+        so the workers all inherit the loaded state (instead of each repeating
+        the work while handling their first request).
+
+        :param cache_path:
+            Optional path to a JSON file for caching backend self-test results
+            between processes (see :func:`passlib.registry.warmup`).
+
+        :returns:
+            dict mapping scheme name -> name of loaded backend
+            (see :func:`passlib.registry.warmup`).
+
+        .. versionadded:: 1.8
+        """
+        from passlib.registry import warmup
+        result = warmup(self._config.handlers, cache_path=cache_path)
+        if self.harden_verify:
+            self.min_verify_time
+        return result
+
     #===================================================================
     # exporting config
     #===================================================================
@@ -1387,6 +1827,7 @@ class CryptContext(object):
 
         .. seealso:: the :ref:`context-serialization-example` example in the tutorial.
         """
+        from passlib.utils.compat import SafeConfigParser
         parser = SafeConfigParser()
         self._write_to_parser(parser, section)
         buf = NativeStringIO()
@@ -1402,6 +1843,31 @@ class CryptContext(object):
             out = out.decode("utf-8")
         return out
 
+    def to_snapshot(self):
+        """serialize the fully parsed & normalized configuration to a compact string.
+
+        Unlike :meth:`to_string`, the output isn't intended to be edited,
+        it's only accepted by :meth:`from_snapshot`, which can restore it
+        without re-parsing or re-validating the options; and which only builds
+        the internal per-scheme handlers the first time each one is used.
+        This makes it useful for processes which have to recreate the same
+        context at startup (e.g. short-lived workers).
+
+        Snapshots are tied to the version of Passlib which created them.
+
+        :raises ValueError:
+            if the context uses a handler which isn't registered with Passlib,
+            or an option value which can't be serialized.
+
+        :returns:
+            snapshot as native string.
+
+        .. versionadded:: 1.8
+
+        .. seealso:: :ref:`context-snapshots`
+        """
+        return self._config.to_snapshot()
+
     # XXX: is this useful enough to enable?
     ##def write_to_path(self, path, section="passlib", update=False):
     ##    "write to INI file"
@@ -1815,7 +2281,16 @@ class CryptContext(object):
         strip_unused = self._strip_unused_context_kwds
         if strip_unused:
             strip_unused(kwds, record)
-        return record.hash(secret, **kwds)
+        if self._observers is None:
+            return record.hash(secret, **kwds)
+        start = timer()
+        try:
+            result = record.hash(secret, **kwds)
+        except Exception:
+            self._notify("hash", record.name, category, timer() - start, "error")
+            raise
+        self._notify("hash", record.name, category, timer() - start, "ok")
+        return result
 
     @deprecated_method(deprecated="1.7", removed="2.0", replacement="CryptContext.hash()")
     def encrypt(self, *args, **kwds):
@@ -1900,13 +2375,28 @@ class CryptContext(object):
             # isn't found / has no hash; mainly to get dummy_verify() benefit.
             if self.harden_verify:
                 self.dummy_verify()
+            if self._observers is not None:
+                self._notify("verify", None, category, 0, "missing")
             return False
-        record = self._get_or_identify_record(hash, scheme, category)
+        try:
+            record = self._get_or_identify_record(hash, scheme, category)
+        except ValueError:
+            if self._observers is not None:
+                self._notify("verify", None, category, 0, "unidentified")
+            raise
         strip_unused = self._strip_unused_context_kwds
         if strip_unused:
             strip_unused(kwds, record)
         start = timer()
-        ok = record.verify(secret, hash, **kwds)
+        try:
+            ok = record.verify(secret, hash, **kwds)
+        except Exception:
+            if self._observers is not None:
+                self._notify("verify", record.name, category, timer() - start, "error")
+            raise
+        if self._observers is not None:
+            self._notify("verify", record.name, category, timer() - start,
+                         "valid" if ok else "invalid")
         if not ok and self.harden_verify:
             self.dummy_verify(timer() - start)
         return ok
@@ -1984,28 +2474,282 @@ class CryptContext(object):
             # isn't found / has no hash; mainly to get dummy_verify() benefit.
             if self.harden_verify:
                 self.dummy_verify()
+            if self._observers is not None:
+                self._notify("verify_and_update", None, category, 0, "missing")
             return False, None
-        record = self._get_or_identify_record(hash, scheme, category)
+        try:
+            record = self._get_or_identify_record(hash, scheme, category)
+        except ValueError:
+            if self._observers is not None:
+                self._notify("verify_and_update", None, category, 0, "unidentified")
+            raise
         strip_unused = self._strip_unused_context_kwds
         if strip_unused and kwds:
             clean_kwds = kwds.copy()
             strip_unused(clean_kwds, record)
         else:
             clean_kwds = kwds
-        # XXX: if record is default scheme, could extend PasswordHash
-        #      api to combine verify & needs_update to single call,
-        #      potentially saving some round-trip parsing.
-        #      but might make these codepaths more complex...
+        # NOTE: shared_parse_scope() lets verify() & needs_update() share
+        #       the parsed hash, rather than each calling from_string().
         start = timer()
-        if not record.verify(secret, hash, **clean_kwds):
+        try:
+            with uh.shared_parse_scope():
+                if not record.verify(secret, hash, **clean_kwds):
+                    verified = False
+                else:
+                    verified = True
+                    update = record.deprecated or record.needs_update(hash, secret=secret)
+            # NOTE: elapsed time measured before re-hashing, so observers see
+            #       the cost of verifying the existing hash, same as verify().
+            elapsed = timer() - start
+            if verified and update:
+                # NOTE: we re-hash with default scheme, not current one.
+                new_hash = self._hash_without_observers(secret, category, kwds)
+            else:
+                new_hash = None
+        except Exception:
+            if self._observers is not None:
+                self._notify("verify_and_update", record.name, category, timer() - start,
+                             "error")
+            raise
+        if self._observers is not None:
+            self._notify("verify_and_update", record.name, category, elapsed,
+                         "rehash" if new_hash else ("valid" if verified else "invalid"))
+        if not verified:
             if self.harden_verify:
-                self.dummy_verify(timer() - start)
+                self.dummy_verify(elapsed)
             return False, None
-        elif record.deprecated or record.needs_update(hash, secret=secret):
-            # NOTE: we re-hash with default scheme, not current one.
-            return True, self.hash(secret, category=category, **kwds)
+        return True, new_hash
+
+    def _hash_without_observers(self, secret, category, kwds):
+        """
+        helper for verify_and_update() --
+        same as :meth:`hash`, but doesn't invoke observers
+        (the re-hash is reported as part of the ``"verify_and_update"`` event).
+        """
+        record = self._get_record(None, category)
+        strip_unused = self._strip_unused_context_kwds
+        if strip_unused:
+            kwds = kwds.copy()
+            strip_unused(kwds, record)
+        return record.hash(secret, **kwds)
+
+    #===================================================================
+    # batch operations
+    #===================================================================
+
+    def hash_many(self, secrets, category=None, executor="auto", max_workers=None,
+                  chunksize=16, **kwds):
+        """hash multiple secrets using a pool of workers.
+
+        This acts like calling :meth:`hash` for each secret, but dispatches the work
+        to a :mod:`concurrent.futures` executor.
+
+        :arg secrets:
+            iterable of secrets to hash.
+
+        :type category: str or None
+        :param category:
+            Optional :ref:`user category <user-categories>`, used for all secrets.
+
+        :param executor:
+            Controls how the work is dispatched. May be one of:
+
+            * ``"auto"`` (the default) -- schemes using a pure-python backend
+              (which holds the GIL) are dispatched to a process pool,
+              everything else is dispatched to a thread pool.
+            * ``"thread"`` -- always use a thread pool.
+            * ``"process"`` -- always use a process pool.
+            * a :class:`concurrent.futures.Executor` instance, which will be used
+              for all work (and not shut down afterwards).
+
+            Process pools require all schemes in the context be registered handlers,
+            since the worker processes recreate the context from :meth:`to_string`;
+            under ``"auto"``, contexts which don't meet this requirement use threads.
+
+        :param max_workers:
+            max number of workers for any pools created by this call.
+
+        :param chunksize:
+            number of items sent to a worker per task.
+
+        :param \*\*kwds:
+            all additional keywords are passed to :meth:`hash`.
+
+        :returns:
+            generator which yields the hashes, in the same order as *secrets*.
+            If hashing an item raises an error, it will be raised when that item is reached.
+
+        .. versionadded:: 1.8
+        """
+        record = self._get_record(None, category)
+        kwds['category'] = category
+        items = ((secret,) for secret in secrets)
+        return self._iter_batch("hash", items, lambda args: record,
+                                executor, max_workers, chunksize, kwds)
+
+    def verify_many(self, pairs, category=None, executor="auto", max_workers=None,
+                    chunksize=16, **kwds):
+        """verify multiple secrets using a pool of workers.
+
+        This acts like calling :meth:`verify` for each item, but groups the hashes
+        by scheme, and dispatches the work to a :mod:`concurrent.futures` executor.
+
+        :arg pairs:
+            iterable of ``(secret, hash)`` pairs.
+
+        :returns:
+            generator which yields ``True`` or ``False`` for each pair,
+            in the same order as *pairs*.
+            If verifying an item raises an error (e.g. the hash could not be identified),
+            it will be raised when that item is reached.
+
+        See :meth:`hash_many` for a description of the remaining arguments.
+
+        .. versionadded:: 1.8
+        """
+        return self._iter_verify_batch("verify", pairs, category, executor,
+                                       max_workers, chunksize, kwds)
+
+    def verify_and_update_many(self, pairs, category=None, executor="auto",
+                               max_workers=None, chunksize=16, **kwds):
+        """verify & update multiple secrets using a pool of workers.
+
+        This acts like calling :meth:`verify_and_update` for each item,
+        but groups the hashes by scheme, and dispatches the work to
+        a :mod:`concurrent.futures` executor.
+
+        :arg pairs:
+            iterable of ``(secret, hash)`` pairs.
+
+        :returns:
+            generator which yields a ``(verified, replacement_hash)`` tuple for each pair,
+            in the same order as *pairs*.
+
+        See :meth:`hash_many` for a description of the remaining arguments.
+
+        .. versionadded:: 1.8
+        """
+        return self._iter_verify_batch("verify_and_update", pairs, category, executor,
+                                       max_workers, chunksize, kwds)
+
+    def _iter_verify_batch(self, method, pairs, category, executor, max_workers,
+                           chunksize, kwds):
+        """helper for verify_many() & verify_and_update_many()"""
+        identify_record = self._identify_record
+
+        def get_record(args):
+            hash = args[1]
+            if hash is None:
+                return None
+            try:
+                return identify_record(hash, category)
+            except (TypeError, ValueError, KeyError):
+                # let the worker raise the error when this item is processed
+                return None
+
+        kwds['category'] = category
+        return self._iter_batch(method, pairs, get_record, executor,
+                                max_workers, chunksize, kwds)
+
+    def _iter_batch(self, method, items, get_record, executor, max_workers,
+                    chunksize, kwds):
+        """
+        internal helper for the batch methods --
+        invokes ``self.method(*args, **kwds)`` for each args tuple in *items*,
+        grouping items by ``get_record(args)`` and dispatching chunks of
+        each group to an executor. yields results in original order.
+        """
+        futures = _import_futures()
+        if chunksize < 1:
+            raise ValueError("chunksize must be >= 1")
+
+        # figure out which executor(s) to use
+        source = None
+        if isinstance(executor, native_string_types):
+            if executor not in ("auto", "thread", "process"):
+                raise ValueError("unknown executor: %r" % (executor,))
+            if executor != "thread":
+                if self._get_unregistered_handlers():
+                    if executor == "process":
+                        raise ValueError("executor='process' requires all schemes "
+                                         "to be registered handlers")
+                    executor = "thread"
+                else:
+                    source = self.to_string()
+            pools = {}
+        elif isinstance(executor, futures.Executor):
+            pools = None
+        else:
+            raise ExpectedTypeError(executor, "str or Executor", "executor")
+
+        def get_pool(record):
+            """returns (pool, use_process) for record"""
+            if pools is None:
+                return executor, False
+            use_process = executor == "process" or (executor == "auto" and
+                                                    _is_pure_python_record(record))
+            try:
+                return pools[use_process], use_process
+            except KeyError:
+                pass
+            if use_process:
+                pool = futures.ProcessPoolExecutor(max_workers)
+            else:
+                pool = futures.ThreadPoolExecutor(max_workers)
+            pools[use_process] = pool
+            return pool, use_process
+
+        # NOTE: input is consumed in windows, so huge iterables
+        #       don't all have to be queued up in memory at once.
+        if max_workers:
+            workers = max_workers
         else:
-            return True, None
+            import multiprocessing
+            workers = multiprocessing.cpu_count()
+        window = chunksize * workers * 4
+        items = iter(items)
+        try:
+            while True:
+                batch = list(islice(items, window))
+                if not batch:
+                    break
+
+                # group items by record
+                groups = {}
+                for index, args in enumerate(batch):
+                    record = get_record(args)
+                    try:
+                        groups[record].append(index)
+                    except KeyError:
+                        groups[record] = [index]
+
+                # submit chunks from each group, tracking where each item ended up
+                slots = [None] * len(batch)
+                for record, indexes in iteritems(groups):
+                    pool, use_process = get_pool(record)
+                    for start in irange(0, len(indexes), chunksize):
+                        part = indexes[start:start+chunksize]
+                        chunk = [batch[index] for index in part]
+                        if use_process:
+                            future = pool.submit(_run_worker_batch, source, method,
+                                                 chunk, kwds)
+                        else:
+                            future = pool.submit(_run_batch, self, method, chunk, kwds)
+                        for offset, index in enumerate(part):
+                            slots[index] = (future, offset)
+                del batch, groups
+
+                # yield results in order
+                for future, offset in slots:
+                    ok, value = future.result()[offset]
+                    if not ok:
+                        raise value
+                    yield value
+        finally:
+            if pools:
+                for pool in pools.values():
+                    pool.shutdown()
 
     #===================================================================
     # disabled hash support
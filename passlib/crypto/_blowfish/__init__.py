@@ -4,7 +4,7 @@ This is a pure-python implementation of the EKS-Blowfish algorithm described by
 Provos and Mazieres in `A Future-Adaptable Password Scheme
 <http://www.openbsd.org/papers/bcrypt-paper.ps>`_.
 
-This package contains two submodules:
+This package contains three submodules:
 
 * ``_blowfish/base.py`` contains a class implementing the eks-blowfish algorithm
   using easy-to-examine code.
@@ -16,6 +16,9 @@ This package contains two submodules:
 
   This module is auto-generated by a script, ``_blowfish/_gen_files.py``.
 
+* ``_blowfish/batch.py`` contains a numpy-based engine which runs the key schedule
+  for many passwords at once, used by :func:`raw_bcrypt_many`.
+
 Status
 ------
 This implementation is usable, but is an order of magnitude too slow to be
@@ -62,6 +65,7 @@ from passlib.crypto._blowfish.unrolled import BlowfishEngine
 __all__ = [
     'BlowfishEngine',
     'raw_bcrypt',
+    'raw_bcrypt_many',
 ]
 
 #=============================================================================
@@ -85,19 +89,15 @@ digest_struct = struct.Struct(">6I")
 #=============================================================================
 BNULL = b'\x00'
 
-def raw_bcrypt(password, ident, salt, log_rounds):
-    """perform central password hashing step in bcrypt scheme.
+#: min number of passwords before raw_bcrypt_many() will use the numpy-based
+#: BatchBlowfishEngine; below this, the overhead of numpy outweighs the gain.
+batch_min_size = 16
 
-    :param password: the password to hash
-    :param ident: identifier w/ minor version (e.g. 2, 2a)
-    :param salt: the binary salt to use (encoded in bcrypt-base64)
-    :param log_rounds: the log2 of the number of rounds (as int)
-    :returns: bcrypt-base64 encoded checksum
+def _parse_bcrypt_args(password, ident, salt, log_rounds):
+    """
+    helper for raw_bcrypt() & raw_bcrypt_many() --
+    validates inputs, and returns ``(pass_words, salt_words)`` pair.
     """
-    #===================================================================
-    # parse inputs
-    #===================================================================
-
     # parse ident
     assert isinstance(ident, native_string_types)
     add_null_padding = True
@@ -128,6 +128,24 @@ def raw_bcrypt(password, ident, salt, log_rounds):
     if log_rounds < 4 or log_rounds > 31:
         raise ValueError("Bad number of rounds")
 
+    # convert password & salt into list of 18 32-bit integers (72 bytes total).
+    key_to_words = BlowfishEngine.key_to_words
+    return key_to_words(password), key_to_words(salt)
+
+def raw_bcrypt(password, ident, salt, log_rounds):
+    """perform central password hashing step in bcrypt scheme.
+
+    :param password: the password to hash
+    :param ident: identifier w/ minor version (e.g. 2, 2a)
+    :param salt: the binary salt to use (encoded in bcrypt-base64)
+    :param log_rounds: the log2 of the number of rounds (as int)
+    :returns: bcrypt-base64 encoded checksum
+    """
+    #===================================================================
+    # parse inputs
+    #===================================================================
+    pass_words, salt_words = _parse_bcrypt_args(password, ident, salt, log_rounds)
+
     #===================================================================
     #
     # run EKS-Blowfish algorithm
@@ -140,10 +158,6 @@ def raw_bcrypt(password, ident, salt, log_rounds):
 
     engine = BlowfishEngine()
 
-    # convert password & salt into list of 18 32-bit integers (72 bytes total).
-    pass_words = engine.key_to_words(password)
-    salt_words = engine.key_to_words(salt)
-
     # truncate salt_words to original 16 byte salt, or loop won't wrap
     # correctly when passed to .eks_salted_expand()
     salt_words16 = salt_words[:4]
@@ -164,6 +178,53 @@ def raw_bcrypt(password, ident, salt, log_rounds):
     raw = digest_struct.pack(*data)[:-1]
     return bcrypt64.encode_bytes(raw)
 
+def raw_bcrypt_many(passwords, ident, salts, log_rounds):
+    """batch version of :func:`raw_bcrypt`.
+
+    :param passwords: list of passwords to hash
+    :param ident: identifier w/ minor version (e.g. 2, 2a)
+    :param salts: list of binary salts (encoded in bcrypt-base64), one per password
+    :param log_rounds: the log2 of the number of rounds (as int), shared by all passwords
+    :returns: list of bcrypt-base64 encoded checksums
+
+    if numpy is available, and there are at least :data:`batch_min_size` passwords,
+    the key schedules for all the passwords are run in lockstep by a
+    :class:`~passlib.crypto._blowfish.batch.BatchBlowfishEngine`.
+    otherwise this just calls :func:`raw_bcrypt` for each password.
+    """
+    if len(passwords) != len(salts):
+        raise ValueError("passwords & salts must be the same length")
+    size = len(passwords)
+    if size < batch_min_size:
+        return [raw_bcrypt(password, ident, salt, log_rounds)
+                for password, salt in zip(passwords, salts)]
+    from passlib.crypto._blowfish.batch import BatchBlowfishEngine, np
+    if np is None:
+        return [raw_bcrypt(password, ident, salt, log_rounds)
+                for password, salt in zip(passwords, salts)]
+
+    # parse inputs into (words, lanes) arrays
+    parsed = [_parse_bcrypt_args(password, ident, salt, log_rounds)
+              for password, salt in zip(passwords, salts)]
+    pass_words = np.array([pair[0] for pair in parsed], dtype=np.uint32).T.copy()
+    salt_words = np.array([pair[1] for pair in parsed], dtype=np.uint32).T.copy()
+
+    # run EKS-Blowfish algorithm for all lanes, as in raw_bcrypt()
+    engine = BatchBlowfishEngine(size)
+    engine.eks_salted_expand(pass_words, salt_words[:4])
+    engine.eks_repeated_expand(pass_words, salt_words, 1<<log_rounds)
+    data = [np.full(size, word, dtype=np.uint32) for word in BCRYPT_CDATA]
+    i = 0
+    while i < 6:
+        data[i], data[i+1] = engine.repeat_encipher(data[i], data[i+1], 64)
+        i += 2
+
+    # encode each lane's digest
+    pack = digest_struct.pack
+    encode = bcrypt64.encode_bytes
+    rows = np.array(data).T.tolist()
+    return [encode(pack(*row)[:-1]) for row in rows]
+
 #=============================================================================
 # eof
 #=============================================================================
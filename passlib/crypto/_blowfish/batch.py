@@ -0,0 +1,191 @@
+"""passlib.crypto._blowfish.batch - numpy-vectorized blowfish engine,
+which runs the eks-blowfish key schedule for many keys at once.
+
+each "lane" of the engine is an independent blowfish state.
+all lanes' S-boxes are stored in a single flat ``uint32`` buffer,
+and each step of the algorithm is performed for every lane at once,
+using numpy's fancy indexing to do the S-box lookups.
+
+this only pays off when running a decent number of lanes,
+see :data:`passlib.crypto._blowfish.batch_min_size`.
+"""
+#=============================================================================
+# imports
+#=============================================================================
+# core
+from itertools import chain
+import sys
+# site
+try:
+    import numpy as np
+except ImportError: # pragma: no cover -- numpy is optional
+    np = None
+# pkg
+from passlib.utils.compat import irange
+from passlib.crypto._blowfish import base as _base
+# local
+__all__ = [
+    "BatchBlowfishEngine",
+    "np",
+]
+
+#=============================================================================
+# engine
+#=============================================================================
+
+#: cached ``(P, S)`` templates as numpy arrays, filled in by _get_templates()
+_templates = None
+
+def _get_templates():
+    global _templates
+    if _templates is None:
+        if _base.BLOWFISH_P is None:
+            _base._init_constants()
+        P = np.array(_base.BLOWFISH_P, dtype=np.uint32)
+        S = np.array(list(chain.from_iterable(_base.BLOWFISH_S)), dtype=np.uint32)
+        assert S.shape == (1024,)
+        _templates = P, S
+    return _templates
+
+class BatchBlowfishEngine(object):
+    """
+    blowfish engine which operates on *size* independent lanes at once.
+    this has the same methods as :class:`~passlib.crypto._blowfish.base.BlowfishEngine`,
+    except all word arguments are numpy ``uint32`` arrays with one entry per lane
+    (or for key / salt words, arrays of shape ``(words, size)``).
+
+    .. warning::
+        requires numpy, and does NO validation of input types or sizes.
+    """
+    #===================================================================
+    # instance attrs
+    #===================================================================
+
+    #: number of lanes
+    size = 0
+
+    #: P arrays for each lane, as ``(18, size)`` array
+    P = None
+
+    #: S boxes for all lanes, as flat array of ``size * 1024`` words;
+    #: lane ``k`` has boxes 0-3 starting at ``k*1024 + [0, 256, 512, 768]``.
+    S = None
+
+    #: offset of each lane's S boxes within :attr:`S`
+    _offsets = None
+
+    #: ``(size, 4)`` array of offsets added to the bytes of a word
+    #: (most significant first) to get the index of the matching S box entry.
+    _byte_offsets = None
+
+    #: slice which reorders the bytes of a word (viewed as uint8)
+    #: from native order to most significant first.
+    _byte_order = slice(None, None, -1) if sys.byteorder == "little" else slice(None)
+
+    #===================================================================
+    # init
+    #===================================================================
+    def __init__(self, size):
+        assert np is not None, "numpy required"
+        P, S = _get_templates()
+        self.size = size
+        self.P = np.repeat(P[:, None], size, axis=1)
+        self.S = np.tile(S, size)
+        self._offsets = offsets = np.arange(size, dtype=np.intp) * 1024
+        # box 0 uses the most significant byte, box 3 the least significant.
+        self._byte_offsets = offsets[:, None] + np.array([0, 256, 512, 768], dtype=np.intp)
+
+    def zeros(self):
+        """return array of zero words, one per lane"""
+        return np.zeros(self.size, dtype=np.uint32)
+
+    #===================================================================
+    # blowfish routines
+    #===================================================================
+    def encipher(self, l, r):
+        """blowfish encipher one 64-bit block per lane, encoded as two word arrays"""
+        P = self.P
+        take = self.S.take
+        byte_offsets = self._byte_offsets
+        shape = byte_offsets.shape
+        order = self._byte_order
+        l = l ^ P[0]
+        i = 1
+        while i < 17:
+            # Feistel substitution on left word --
+            # looks up all 4 S box entries for every lane via a single take(),
+            # so column k of 'v' is Sk[k'th most significant byte of l].
+            # NOTE: uint32 addition wraps, so no need to mask the result.
+            v = take(byte_offsets + l.view(np.uint8).reshape(shape)[:, order])
+            r = r ^ ((((v[:, 0] + v[:, 1]) ^ v[:, 2]) + v[:, 3]) ^ P[i])
+            # swap vars so even rounds do Feistel substition on right word
+            l, r = r, l
+            i += 1
+        return r ^ P[17], l
+
+    def _fill_boxes(self, l, r, salt_words=None):
+        """
+        helper for expand() & eks_salted_expand() --
+        fills P & S by repeatedly enciphering (l, r),
+        optionally xoring in the salt words before each step.
+        """
+        P, S, encipher = self.P, self.S, self.encipher
+        offsets = self._offsets
+        if salt_words is not None:
+            salt_size = len(salt_words)
+        s = 0
+        i = 0
+        while i < 1042:
+            if salt_words is not None:
+                l = l ^ salt_words[s]
+                r = r ^ salt_words[s+1]
+                s += 2
+                if s == salt_size:
+                    s = 0
+            l, r = encipher(l, r)
+            if i < 18:
+                P[i] = l
+                P[i+1] = r
+            else:
+                j = i - 18
+                S[offsets + j] = l
+                S[offsets + (j + 1)] = r
+            i += 2
+
+    def expand(self, key_words):
+        """perform stock Blowfish keyschedule setup for all lanes"""
+        self.P ^= key_words
+        self._fill_boxes(self.zeros(), self.zeros())
+
+    #===================================================================
+    # eks-blowfish routines
+    #===================================================================
+    def eks_salted_expand(self, key_words, salt_words):
+        """perform EKS' salted version of Blowfish keyschedule setup for all lanes"""
+        assert salt_words.shape[0] and not salt_words.shape[0] & 1
+        self.P ^= key_words
+        self._fill_boxes(self.zeros(), self.zeros(), salt_words)
+
+    def eks_repeated_expand(self, key_words, salt_words, rounds):
+        """perform rounds stage of EKS keyschedule setup for all lanes"""
+        expand = self.expand
+        n = 0
+        while n < rounds:
+            expand(key_words)
+            expand(salt_words)
+            n += 1
+
+    def repeat_encipher(self, l, r, count):
+        """repeatedly apply encipher operation to a block in each lane"""
+        encipher = self.encipher
+        for _ in irange(count):
+            l, r = encipher(l, r)
+        return l, r
+
+    #===================================================================
+    # eoc
+    #===================================================================
+
+#=============================================================================
+# eof
+#=============================================================================
@@ -10,7 +10,9 @@ Implementated based on rfc at http://www.faqs.org/rfcs/rfc1320.html
 .. note::
 
     This shouldn't be imported directly, it's merely used conditionally
-    by ``passlib.crypto.lookup_hash()`` when a native implementation can't be found.
+    by ``passlib.crypto.lookup_hash()`` when a native implementation can't be found
+    (e.g. hashlib under OpenSSL 3, which disables MD4 by default).
+    :func:`md4_many` is used by :mod:`passlib.handlers.windows` to hash batches of messages.
 """
 
 #=============================================================================
@@ -20,23 +22,256 @@ Implementated based on rfc at http://www.faqs.org/rfcs/rfc1320.html
 from binascii import hexlify
 import struct
 # site
+from passlib.utils import bytes_to_int, int_to_bytes
 from passlib.utils.compat import bascii_to_str, irange, PY3
 # local
-__all__ = ["md4"]
+__all__ = ["md4", "md4_many"]
 
 #=============================================================================
 # utils
 #=============================================================================
-def F(x,y,z):
-    return (x&y) | ((~x) & z)
+MASK_32 = 2**32-1
 
-def G(x,y,z):
-    return (x&y) | (x&z) | (y&z)
+#: initial state of [a,b,c,d] registers
+_IV = (0x67452301, 0xefcdab89, 0x98badcfe, 0x10325476)
 
-##def H(x,y,z):
-##    return x ^ y ^ z
+#: constants added in rounds 2 & 3
+_K2 = 0x5a827999
+_K3 = 0x6ed9eba1
 
-MASK_32 = 2**32-1
+_unpack_block = struct.Struct("<16I").unpack_from
+_pack_state = struct.Struct("<4I").pack
+_pack_bitlen = struct.Struct("<Q").pack
+
+def _pad(tail, msglen):
+    """
+    return final block(s) for message of *msglen* bytes, ending in *tail*
+    (the partial block left over):
+    tail + 0x80, then 0x00 padding until congruent w/ 56 mod 64 bytes,
+    then last 8 bytes = msg length in bits
+    """
+    return tail + b'\x80' + b'\x00' * ((55 - len(tail)) % 64) + \
+        _pack_bitlen((msglen << 3) & 0xffffffffffffffff)
+
+#=============================================================================
+# compression function
+#=============================================================================
+def _compress_words(state, words, M, K2, K3):
+    """
+    run md4 compression function on 16 message *words*,
+    returns updated ``(a,b,c,d)`` state tuple.
+
+    this only uses bitwise ops, addition, and shifts, followed by masking with *M*;
+    so the registers & words may either be 32 bit ints (with *M* = ``MASK_32``),
+    or "lanes" of 32 bit ints packed into a single large int (see :func:`md4_many`).
+    """
+    # NOTE: rounds are unrolled, with registers & message words kept in locals,
+    #       since function calls & list indexing dominated the cost of the
+    #       original table-driven implementation. round 1's F() is written as
+    #       d^(b&(c^d)), and round 2's G() as (b&c)|(d&(b|c)) -- equivalent
+    #       to the rfc's versions, but with fewer ops, and no negative ints from ~x.
+    (x0, x1, x2, x3, x4, x5, x6, x7,
+     x8, x9, x10, x11, x12, x13, x14, x15) = words
+    a, b, c, d = state
+
+    # round 1
+    t = (a + (d ^ (b & (c ^ d))) + x0) & M
+    a = ((t << 3) | (t >> 29)) & M
+    t = (d + (c ^ (a & (b ^ c))) + x1) & M
+    d = ((t << 7) | (t >> 25)) & M
+    t = (c + (b ^ (d & (a ^ b))) + x2) & M
+    c = ((t << 11) | (t >> 21)) & M
+    t = (b + (a ^ (c & (d ^ a))) + x3) & M
+    b = ((t << 19) | (t >> 13)) & M
+    t = (a + (d ^ (b & (c ^ d))) + x4) & M
+    a = ((t << 3) | (t >> 29)) & M
+    t = (d + (c ^ (a & (b ^ c))) + x5) & M
+    d = ((t << 7) | (t >> 25)) & M
+    t = (c + (b ^ (d & (a ^ b))) + x6) & M
+    c = ((t << 11) | (t >> 21)) & M
+    t = (b + (a ^ (c & (d ^ a))) + x7) & M
+    b = ((t << 19) | (t >> 13)) & M
+    t = (a + (d ^ (b & (c ^ d))) + x8) & M
+    a = ((t << 3) | (t >> 29)) & M
+    t = (d + (c ^ (a & (b ^ c))) + x9) & M
+    d = ((t << 7) | (t >> 25)) & M
+    t = (c + (b ^ (d & (a ^ b))) + x10) & M
+    c = ((t << 11) | (t >> 21)) & M
+    t = (b + (a ^ (c & (d ^ a))) + x11) & M
+    b = ((t << 19) | (t >> 13)) & M
+    t = (a + (d ^ (b & (c ^ d))) + x12) & M
+    a = ((t << 3) | (t >> 29)) & M
+    t = (d + (c ^ (a & (b ^ c))) + x13) & M
+    d = ((t << 7) | (t >> 25)) & M
+    t = (c + (b ^ (d & (a ^ b))) + x14) & M
+    c = ((t << 11) | (t >> 21)) & M
+    t = (b + (a ^ (c & (d ^ a))) + x15) & M
+    b = ((t << 19) | (t >> 13)) & M
+    # round 2
+    t = (a + ((b & c) | (d & (b | c))) + x0 + K2) & M
+    a = ((t << 3) | (t >> 29)) & M
+    t = (d + ((a & b) | (c & (a | b))) + x4 + K2) & M
+    d = ((t << 5) | (t >> 27)) & M
+    t = (c + ((d & a) | (b & (d | a))) + x8 + K2) & M
+    c = ((t << 9) | (t >> 23)) & M
+    t = (b + ((c & d) | (a & (c | d))) + x12 + K2) & M
+    b = ((t << 13) | (t >> 19)) & M
+    t = (a + ((b & c) | (d & (b | c))) + x1 + K2) & M
+    a = ((t << 3) | (t >> 29)) & M
+    t = (d + ((a & b) | (c & (a | b))) + x5 + K2) & M
+    d = ((t << 5) | (t >> 27)) & M
+    t = (c + ((d & a) | (b & (d | a))) + x9 + K2) & M
+    c = ((t << 9) | (t >> 23)) & M
+    t = (b + ((c & d) | (a & (c | d))) + x13 + K2) & M
+    b = ((t << 13) | (t >> 19)) & M
+    t = (a + ((b & c) | (d & (b | c))) + x2 + K2) & M
+    a = ((t << 3) | (t >> 29)) & M
+    t = (d + ((a & b) | (c & (a | b))) + x6 + K2) & M
+    d = ((t << 5) | (t >> 27)) & M
+    t = (c + ((d & a) | (b & (d | a))) + x10 + K2) & M
+    c = ((t << 9) | (t >> 23)) & M
+    t = (b + ((c & d) | (a & (c | d))) + x14 + K2) & M
+    b = ((t << 13) | (t >> 19)) & M
+    t = (a + ((b & c) | (d & (b | c))) + x3 + K2) & M
+    a = ((t << 3) | (t >> 29)) & M
+    t = (d + ((a & b) | (c & (a | b))) + x7 + K2) & M
+    d = ((t << 5) | (t >> 27)) & M
+    t = (c + ((d & a) | (b & (d | a))) + x11 + K2) & M
+    c = ((t << 9) | (t >> 23)) & M
+    t = (b + ((c & d) | (a & (c | d))) + x15 + K2) & M
+    b = ((t << 13) | (t >> 19)) & M
+    # round 3
+    t = (a + (b ^ c ^ d) + x0 + K3) & M
+    a = ((t << 3) | (t >> 29)) & M
+    t = (d + (a ^ b ^ c) + x8 + K3) & M
+    d = ((t << 9) | (t >> 23)) & M
+    t = (c + (d ^ a ^ b) + x4 + K3) & M
+    c = ((t << 11) | (t >> 21)) & M
+    t = (b + (c ^ d ^ a) + x12 + K3) & M
+    b = ((t << 15) | (t >> 17)) & M
+    t = (a + (b ^ c ^ d) + x2 + K3) & M
+    a = ((t << 3) | (t >> 29)) & M
+    t = (d + (a ^ b ^ c) + x10 + K3) & M
+    d = ((t << 9) | (t >> 23)) & M
+    t = (c + (d ^ a ^ b) + x6 + K3) & M
+    c = ((t << 11) | (t >> 21)) & M
+    t = (b + (c ^ d ^ a) + x14 + K3) & M
+    b = ((t << 15) | (t >> 17)) & M
+    t = (a + (b ^ c ^ d) + x1 + K3) & M
+    a = ((t << 3) | (t >> 29)) & M
+    t = (d + (a ^ b ^ c) + x9 + K3) & M
+    d = ((t << 9) | (t >> 23)) & M
+    t = (c + (d ^ a ^ b) + x5 + K3) & M
+    c = ((t << 11) | (t >> 21)) & M
+    t = (b + (c ^ d ^ a) + x13 + K3) & M
+    b = ((t << 15) | (t >> 17)) & M
+    t = (a + (b ^ c ^ d) + x3 + K3) & M
+    a = ((t << 3) | (t >> 29)) & M
+    t = (d + (a ^ b ^ c) + x11 + K3) & M
+    d = ((t << 9) | (t >> 23)) & M
+    t = (c + (d ^ a ^ b) + x7 + K3) & M
+    c = ((t << 11) | (t >> 21)) & M
+    t = (b + (c ^ d ^ a) + x15 + K3) & M
+    b = ((t << 15) | (t >> 17)) & M
+
+
+    return ((state[0] + a) & M, (state[1] + b) & M,
+            (state[2] + c) & M, (state[3] + d) & M)
+
+def _compress(state, block, offset=0):
+    """
+    process 64 byte block starting at *offset* of *block*,
+    returns updated ``(a,b,c,d)`` state tuple.
+    """
+    return _compress_words(state, _unpack_block(block, offset), MASK_32, _K2, _K3)
+
+#=============================================================================
+# batch api
+#=============================================================================
+
+#: minimum number of same-sized messages for md4_many() to process them as lanes
+_MIN_LANES = 6
+
+def md4_many(messages):
+    """
+    return list containing raw md4 digest of each message in *messages*
+    (an iterable of bytes).
+
+    Messages which pad out to the same number of blocks are hashed together,
+    by packing each 32 bit register & message word into a 64 bit "lane" of a single
+    (large) python int. Each operation of the compression function then processes
+    the entire group at once (the upper 32 bits of each lane absorb carries
+    from addition & shifting, and are masked off), which is several times faster
+    than hashing them one by one.
+    """
+    messages = list(messages)
+    result = [None] * len(messages)
+
+    # group messages by padded size
+    groups = {}
+    for idx, msg in enumerate(messages):
+        if not isinstance(msg, bytes):
+            raise TypeError("expected bytes")
+        size = len(msg)
+        end = size & ~63
+        block = msg[end:]
+        padded = (msg[:end] if end else b'') + _pad(block, size)
+        groups.setdefault(len(padded), []).append((idx, padded))
+
+    for size, group in groups.items():
+        if len(group) < _MIN_LANES:
+            # not worth packing, hash individually
+            for idx, padded in group:
+                state = _IV
+                for offset in irange(0, size, 64):
+                    state = _compress(state, padded, offset)
+                result[idx] = _pack_state(*state)
+            continue
+        for idx, digest in zip([idx for idx, _ in group],
+                               _md4_lanes([padded for _, padded in group], size)):
+            result[idx] = digest
+    return result
+
+def _md4_lanes(padded, size):
+    """
+    helper for md4_many() --
+    hash list of padded messages which are all *size* bytes long.
+    """
+    count = len(padded)
+    lanes_size = count * 8
+
+    # constants replicated across all lanes
+    # NOTE: lanes are little-endian, so buffers are reversed when passed
+    #       to bytes_to_int() & int_to_bytes(), which are big-endian.
+    ones = bytes_to_int(b'\x00\x00\x00\x00\x00\x00\x00\x01' * count)
+    M = MASK_32 * ones
+    K2 = _K2 * ones
+    K3 = _K3 * ones
+    state = tuple(value * ones for value in _IV)
+
+    # word i of block j for message k is at source[size*k + 64*j + 4*i];
+    # which gets copied to bytes 8k thru 8k+3 of lane buffer
+    source = b''.join(padded)
+    buf = bytearray(lanes_size)
+    for offset in irange(0, size, 64):
+        words = []
+        for word in irange(offset, offset + 64, 4):
+            buf[0::8] = source[word::size]
+            buf[1::8] = source[word+1::size]
+            buf[2::8] = source[word+2::size]
+            buf[3::8] = source[word+3::size]
+            words.append(bytes_to_int(bytes(buf[::-1])))
+        state = _compress_words(state, words, M, K2, K3)
+
+    # unpack lanes into digests:
+    # register r of message k goes to bytes 16k+4r thru 16k+4r+3 of output
+    output = bytearray(count * 16)
+    for reg, value in enumerate(state):
+        lanes = int_to_bytes(value, lanes_size)[::-1]
+        for pos in irange(4):
+            output[4*reg+pos::16] = lanes[pos::8]
+    output = bytes(output)
+    return [output[pos:pos+16] for pos in irange(0, count * 16, 16)]
 
 #=============================================================================
 # main class
@@ -72,113 +307,16 @@ class md4(object):
     block_size = 64
 
     _count = 0 # number of 64-byte blocks processed so far (not including _buf)
-    _state = None # list of [a,b,c,d] 32 bit ints used as internal register
+    _state = None # tuple of (a,b,c,d) 32 bit ints used as internal register
     _buf = None # data processed in 64 byte blocks, this holds leftover from last update
 
     def __init__(self, content=None):
         self._count = 0
-        self._state = [0x67452301, 0xefcdab89, 0x98badcfe, 0x10325476]
+        self._state = _IV
         self._buf = b''
         if content:
             self.update(content)
 
-    # round 1 table - [abcd k s]
-    _round1 = [
-        [0,1,2,3, 0,3],
-        [3,0,1,2, 1,7],
-        [2,3,0,1, 2,11],
-        [1,2,3,0, 3,19],
-
-        [0,1,2,3, 4,3],
-        [3,0,1,2, 5,7],
-        [2,3,0,1, 6,11],
-        [1,2,3,0, 7,19],
-
-        [0,1,2,3, 8,3],
-        [3,0,1,2, 9,7],
-        [2,3,0,1, 10,11],
-        [1,2,3,0, 11,19],
-
-        [0,1,2,3, 12,3],
-        [3,0,1,2, 13,7],
-        [2,3,0,1, 14,11],
-        [1,2,3,0, 15,19],
-    ]
-
-    # round 2 table - [abcd k s]
-    _round2 = [
-        [0,1,2,3, 0,3],
-        [3,0,1,2, 4,5],
-        [2,3,0,1, 8,9],
-        [1,2,3,0, 12,13],
-
-        [0,1,2,3, 1,3],
-        [3,0,1,2, 5,5],
-        [2,3,0,1, 9,9],
-        [1,2,3,0, 13,13],
-
-        [0,1,2,3, 2,3],
-        [3,0,1,2, 6,5],
-        [2,3,0,1, 10,9],
-        [1,2,3,0, 14,13],
-
-        [0,1,2,3, 3,3],
-        [3,0,1,2, 7,5],
-        [2,3,0,1, 11,9],
-        [1,2,3,0, 15,13],
-    ]
-
-    # round 3 table - [abcd k s]
-    _round3 = [
-        [0,1,2,3, 0,3],
-        [3,0,1,2, 8,9],
-        [2,3,0,1, 4,11],
-        [1,2,3,0, 12,15],
-
-        [0,1,2,3, 2,3],
-        [3,0,1,2, 10,9],
-        [2,3,0,1, 6,11],
-        [1,2,3,0, 14,15],
-
-        [0,1,2,3, 1,3],
-        [3,0,1,2, 9,9],
-        [2,3,0,1, 5,11],
-        [1,2,3,0, 13,15],
-
-        [0,1,2,3, 3,3],
-        [3,0,1,2, 11,9],
-        [2,3,0,1, 7,11],
-        [1,2,3,0, 15,15],
-    ]
-
-    def _process(self, block):
-        """process 64 byte block"""
-        # unpack block into 16 32-bit ints
-        X = struct.unpack("<16I", block)
-
-        # clone state
-        orig = self._state
-        state = list(orig)
-
-        # round 1 - F function - (x&y)|(~x & z)
-        for a,b,c,d,k,s in self._round1:
-            t = (state[a] + F(state[b],state[c],state[d]) + X[k]) & MASK_32
-            state[a] = ((t<<s) & MASK_32) + (t>>(32-s))
-
-        # round 2 - G function
-        for a,b,c,d,k,s in self._round2:
-            t = (state[a] + G(state[b],state[c],state[d]) + X[k] + 0x5a827999) & MASK_32
-            state[a] = ((t<<s) & MASK_32) + (t>>(32-s))
-
-        # round 3 - H function - x ^ y ^ z
-        for a,b,c,d,k,s in self._round3:
-            t = (state[a] + (state[b] ^ state[c] ^ state[d]) + X[k] + 0x6ed9eba1) & MASK_32
-            state[a] = ((t<<s) & MASK_32) + (t>>(32-s))
-
-        # add back into original state
-        for i in irange(4):
-            orig[i] = (orig[i]+state[i]) & MASK_32
-
     def update(self, content):
         if not isinstance(content, bytes):
             if PY3:
@@ -189,48 +327,30 @@ class md4(object):
         buf = self._buf
         if buf:
             content = buf + content
-        idx = 0
-        end = len(content)
-        while True:
-            next = idx + 64
-            if next <= end:
-                self._process(content[idx:next])
-                self._count += 1
-                idx = next
-            else:
-                self._buf = content[idx:]
-                return
+        end = len(content) & ~63
+        state = self._state
+        for idx in range(0, end, 64):
+            state = _compress(state, content, idx)
+        self._state = state
+        self._count += end >> 6
+        self._buf = content[end:]
 
     def copy(self):
         other = md4()
         other._count = self._count
-        other._state = list(self._state)
+        other._state = self._state
         other._buf = self._buf
         return other
 
     def digest(self):
-        # NOTE: backing up state so we can restore it after _process is called,
-        #       in case object is updated again (this is only attr altered by this method)
-        orig = list(self._state)
-
-        # final block: buf + 0x80,
-        # then 0x00 padding until congruent w/ 56 mod 64 bytes
-        # then last 8 bytes = msg length in bits
+        # NOTE: state is an immutable tuple, so finalizing doesn't alter this object,
+        #       and it can be updated further afterwards.
         buf = self._buf
-        msglen = self._count*512 + len(buf)*8
-        block = buf + b'\x80' + b'\x00' * ((119-len(buf)) % 64) + \
-            struct.pack("<2I", msglen & MASK_32, (msglen>>32) & MASK_32)
+        block = _pad(buf, self._count * 64 + len(buf))
+        state = _compress(self._state, block)
         if len(block) == 128:
-            self._process(block[:64])
-            self._process(block[64:])
-        else:
-            assert len(block) == 64
-            self._process(block)
-
-        # render digest & restore un-finalized state
-        out = struct.pack("<4I", *self._state)
-        self._state = orig
-        return out
+            state = _compress(state, block, 64)
+        return _pack_state(*state)
 
     def hexdigest(self):
         return bascii_to_str(hexlify(self.digest()))
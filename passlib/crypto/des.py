@@ -53,6 +53,7 @@ from passlib.utils.compat import join_byte_values, byte_elem_value, \
 __all__ = [
     "expand_des_key",
     "des_encrypt_block",
+    "des_encrypt_int_blocks",
 ]
 
 #=============================================================================
@@ -843,6 +844,182 @@ def des_encrypt_int_block(key, input, salt=0, rounds=1):
         )
     return _permute(C, CF6464)
 
+#=============================================================================
+# batch des encryption
+#=============================================================================
+
+#: min number of blocks before des_encrypt_int_blocks() will use numpy;
+#: below this, the per-call overhead of numpy outweighs the gain.
+batch_min_size = 16
+
+def _get_numpy():
+    """helper to import numpy on demand, returns None if not installed"""
+    try:
+        import numpy
+    except ImportError: # pragma: no cover -- numpy is optional
+        return None
+    return numpy
+
+#: cache of DES tables converted to numpy arrays, filled in by _get_numpy_tables()
+_numpy_tables = None
+
+def _get_numpy_tables(np):
+    """
+    returns ``(PCXROT, IE3264, SPE, CF6464)`` as flattened ``uint64`` arrays,
+    for use by :func:`_np_permute` and :func:`_des_encrypt_int_blocks_numpy`.
+    """
+    global _numpy_tables
+    if _numpy_tables is None:
+        if PCXROT is None:
+            _load_tables()
+        def flatten(table):
+            return np.array([value for row in table for value in row], dtype=np.uint64)
+        _numpy_tables = (
+            [(flatten(p_even), flatten(p_odd)) for p_even, p_odd in PCXROT],
+            flatten(IE3264),
+            flatten(SPE),
+            flatten(CF6464),
+        )
+    return _numpy_tables
+
+def _np_permute(np, c, table):
+    """numpy version of :func:`_permute`, operating on array of codes at once"""
+    rows = len(table) >> 4
+    shifts = np.arange(0, rows << 2, 4, dtype=np.uint64)[:, None]
+    offsets = np.arange(0, rows << 4, 16, dtype=np.uint64)[:, None]
+    index = ((c[None, :] >> shifts) & 0xf) + offsets
+    return np.bitwise_or.reduce(table.take(index.astype(np.intp)), axis=0)
+
+def _des_encrypt_int_blocks_numpy(np, keys, inputs, salts, rounds):
+    """
+    numpy version of :func:`des_encrypt_int_block`,
+    which runs all the blocks through DES at once.
+    this follows the same steps, just applied to arrays of values.
+    """
+    PCXROT_, IE3264_, SPE_, CF6464_ = _get_numpy_tables(np)
+    keys = np.array(keys, dtype=np.uint64)
+    inputs = np.array(inputs, dtype=np.uint64)
+    salts = np.array(salts, dtype=np.uint64)
+
+    # generate key schedule for each key
+    ks_list = []
+    ks_odd = keys
+    for p_even, p_odd in PCXROT_:
+        ks_even = _np_permute(np, ks_odd, p_even)
+        ks_odd = _np_permute(np, ks_even, p_odd)
+        ks_list.append((ks_even & _KS_MASK, ks_odd & _KS_MASK))
+
+    # expand 24 bit salt -> 32 bit per des_crypt & bsdi_crypt
+    salts = (
+        ((salts & 0x00003f) << 26) |
+        ((salts & 0x000fc0) << 12) |
+        ((salts & 0x03f000) >> 2) |
+        ((salts & 0xfc0000) >> 16)
+        )
+
+    # init L & R
+    L = ((inputs >> 31) & 0xaaaaaaaa) | (inputs & 0x55555555)
+    L = _np_permute(np, L, IE3264_)
+    R = ((inputs >> 32) & 0xaaaaaaaa) | ((inputs >> 1) & 0x55555555)
+    R = _np_permute(np, R, IE3264_)
+
+    # main DES loop --
+    # all 8 SPE lookups for every block are done via a single take()
+    # against the flattened SPE table.
+    spe_shifts = np.arange(58, -6, -8, dtype=np.uint64)[:, None]
+    spe_offsets = np.arange(0, 512, 64, dtype=np.uint64)[:, None]
+    take = SPE_.take
+    xor_reduce = np.bitwise_xor.reduce
+    intp = np.intp
+    while rounds:
+        rounds -= 1
+        for ks_even, ks_odd in ks_list:
+            k = ((R >> 32) ^ R) & salts # use the salt to flip specific bits
+            B = (k << 32) ^ k ^ R ^ ks_even
+            L ^= xor_reduce(take((((B >> spe_shifts) & 0x3f) + spe_offsets).astype(intp)),
+                            axis=0)
+
+            k = ((L >> 32) ^ L) & salts # use the salt to flip specific bits
+            B = (k << 32) ^ k ^ L ^ ks_odd
+            R ^= xor_reduce(take((((B >> spe_shifts) & 0x3f) + spe_offsets).astype(intp)),
+                            axis=0)
+
+        # swap L and R
+        L, R = R, L
+
+    # return final result
+    C = (
+            ((L >> 3) & 0x0f0f0f0f00000000)
+            |
+            ((L << 33) & 0xf0f0f0f000000000)
+            |
+            ((R >> 35) & 0x000000000f0f0f0f)
+            |
+            ((R << 1) & 0x00000000f0f0f0f0)
+        )
+    return _np_permute(np, C, CF6464_).tolist()
+
+def des_encrypt_int_blocks(keys, inputs, salts, rounds=1):
+    """encrypt multiple blocks of data using DES, operates on lists of 64-bit integers.
+
+    this is the batch version of :func:`des_encrypt_int_block`:
+    the ``i``'th result is ``des_encrypt_int_block(keys[i], inputs[i], salts[i], rounds)``.
+
+    :arg keys:
+        list of DES keys as 64-bit integers (the parity bits are ignored).
+
+    :arg inputs:
+        list of input blocks as 64-bit integers, one per key.
+
+    :arg salts:
+        list of 24-bit salt integers, one per key.
+
+    :arg rounds:
+        optional number of rounds of to apply the DES key schedule,
+        shared by all the blocks. defaults to ``1``.
+
+    :raises TypeError: if any of the provided args are of the wrong type.
+    :raises ValueError:
+        if the lists are different lengths, any of the values are out of range,
+        or the rounds value is out of range.
+
+    :returns:
+        list of resulting ciphertexts as 64-bit integers.
+
+    if numpy is available, and there are at least :data:`batch_min_size` blocks,
+    all the blocks are run through DES in lockstep using ``uint64`` arrays.
+    otherwise this just calls :func:`des_encrypt_int_block` for each block.
+    """
+    size = len(keys)
+    if len(inputs) != size or len(salts) != size:
+        raise ValueError("keys, inputs, and salts must be the same length")
+    if size < batch_min_size:
+        return [des_encrypt_int_block(key, input, salt, rounds)
+                for key, input, salt in zip(keys, inputs, salts)]
+    np = _get_numpy()
+    if np is None:
+        return [des_encrypt_int_block(key, input, salt, rounds)
+                for key, input, salt in zip(keys, inputs, salts)]
+
+    # validate inputs, as done by des_encrypt_int_block()
+    if rounds < 1:
+        raise ValueError("rounds must be positive integer")
+    for salt in salts:
+        if salt < 0 or salt > INT_24_MASK:
+            raise ValueError("salt must be 24-bit non-negative integer")
+    for key in keys:
+        if not isinstance(key, int_types):
+            raise exc.ExpectedTypeError(key, "int", "key")
+        elif key < 0 or key > INT_64_MASK:
+            raise ValueError("key must be 64-bit non-negative integer")
+    for input in inputs:
+        if not isinstance(input, int_types):
+            raise exc.ExpectedTypeError(input, "int", "input")
+        elif input < 0 or input > INT_64_MASK:
+            raise ValueError("input must be 64-bit non-negative integer")
+
+    return _des_encrypt_int_blocks_numpy(np, keys, inputs, salts, rounds)
+
 #=============================================================================
 # eof
 #=============================================================================
@@ -638,6 +638,11 @@ def pbkdf2_hmac(digest, secret, salt, rounds, keylen=None):
 
         See :data:`passlib.crypto.digest.PBKDF2_BACKENDS` to determine
         which backend(s) are in use.
+
+    .. versionchanged:: 1.8
+
+        If :data:`pbkdf2_pool_threshold` is set, the builtin backend will calculate
+        the independent output blocks of large outputs concurrently in a process pool.
     """
     # validate secret & salt
     secret = to_bytes(secret, param="secret")
@@ -691,17 +696,65 @@ def pbkdf2_hmac(digest, secret, salt, rounds, keylen=None):
     # otherwise use our own implementation
     #
 
+    # for large outputs, try to calculate blocks concurrently in process pool
+    threshold = pbkdf2_pool_threshold
+    if block_count > 1 and threshold is not None and block_count * rounds >= threshold:
+        result = _pbkdf2_pool_blocks(digest_info.name, secret, salt, rounds, block_count)
+        if result is not None:
+            return result[:keylen]
+
+    # assemble & return result
+    return _pbkdf2_blocks(digest, secret, salt, rounds, 1, block_count + 1)[:keylen]
+
+def _pbkdf2_blocks(digest, secret, salt, rounds, start, stop):
+    """
+    helper for builtin pbkdf2_hmac() backend --
+    returns concatenation of pbkdf2 blocks ``start <= i < stop``
+    (block numbers start at 1).  *secret* & *salt* must be bytes.
+    """
     # generated keyed hmac
     keyed_hmac = compile_hmac(digest, secret)
 
     # get helper to calculate pbkdf2 inner loop efficiently
-    calc_block = _get_pbkdf2_looper(digest_size)
+    calc_block = _get_pbkdf2_looper(keyed_hmac.digest_info.digest_size)
 
-    # assemble & return result
     return join_bytes(
         calc_block(keyed_hmac, keyed_hmac(salt + _pack_uint32(i)), rounds)
-        for i in irange(1, block_count + 1)
-    )[:keylen]
+        for i in irange(start, stop)
+    )
+
+#-------------------------------------------------------------------------------------
+# calculate builtin pbkdf2 blocks concurrently in process pool
+#-------------------------------------------------------------------------------------
+
+#: min ``block_count * rounds`` value before the builtin pbkdf2_hmac() backend
+#: calculates output blocks concurrently in a process pool
+#: (the shared :class:`~passlib.utils.handlers.BuiltinPool`).
+#: this is ``None`` by default, which disables the pool: since it means starting
+#: worker processes, and sending the secret to them, applications have to opt in
+#: (e.g. by setting this to ``1 << 13``; see ``admin/bench_pbkdf2_pool.py``
+#: for measuring the crossover point below which the pool's overhead outweighs the gain).
+#: the pool isn't used if it only has a single worker (e.g. on single-cpu systems).
+pbkdf2_pool_threshold = None
+
+def _pbkdf2_pool_blocks(name, secret, salt, rounds, block_count):
+    """
+    calculate pbkdf2 blocks ``1 .. block_count`` using the shared
+    :class:`~passlib.utils.handlers.BuiltinPool`, split into one contiguous range per worker.
+    returns concatenated blocks, or ``None`` if pool isn't available.
+    """
+    from passlib.utils.handlers import get_builtin_pool
+    pool = get_builtin_pool()
+    if pool.size < 2:
+        # e.g. single cpu, no gain from using pool
+        return None
+    chunks = min(pool.size, block_count)
+    bounds = [1 + (block_count * idx) // chunks for idx in irange(chunks + 1)]
+    results = pool.run_many(_pbkdf2_blocks, [(name, secret, salt, rounds, start, stop)
+                                             for start, stop in zip(bounds, bounds[1:])])
+    if results is None:
+        return None
+    return join_bytes(results)
 
 #-------------------------------------------------------------------------------------
 # pick best choice for pure-python helper
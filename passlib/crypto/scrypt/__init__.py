@@ -117,7 +117,13 @@ def scrypt(secret, salt, n, r, p=1, keylen=32):
     return _scrypt(secret, salt, n, r, p, keylen)
 
 #: list of potential backends
-backend_values = ("scrypt", "builtin")
+backend_values = ("scrypt", "builtin_array", "builtin")
+
+def _warn_builtin_slowdown():
+    slowdown = 10 if PYPY else 100
+    warn("Using builtin scrypt backend, which is %dx slower than is required "
+         "for adequate security. Installing scrypt support (via 'pip install scrypt') "
+         "is strongly recommended" % slowdown, exc.PasslibSecurityWarning)
 
 def _builtin_first_run(*args, **kwds):
     """
@@ -125,15 +131,22 @@ def _builtin_first_run(*args, **kwds):
     then replaces itself with actual function
     (assumes this will be installed as _scrypt global when called)
     """
-    slowdown = 10 if PYPY else 100
-    warn("Using builtin scrypt backend, which is %dx slower than is required "
-         "for adequate security. Installing scrypt support (via 'pip install scrypt') "
-         "is strongly recommended" % slowdown, exc.PasslibSecurityWarning)
+    _warn_builtin_slowdown()
     from ._builtin import ScryptEngine
     global _scrypt
     _scrypt = ScryptEngine.execute
     return _scrypt(*args, **kwds)
 
+def _builtin_array_first_run(*args, **kwds):
+    """
+    same as _builtin_first_run(), but for the array-based engine
+    """
+    _warn_builtin_slowdown()
+    from ._builtin_array import ArrayScryptEngine
+    global _scrypt
+    _scrypt = ArrayScryptEngine.execute
+    return _scrypt(*args, **kwds)
+
 def _load_backend(name):
     """
     try to load specified scrypt backend
@@ -158,6 +171,8 @@ def _load_backend(name):
         else:
             warn("'scrypt' package is too old (lacks ``hash()`` method)", exc.PasslibWarning)
         return None
+    if name == "builtin_array":
+        return _builtin_array_first_run
     if name == "builtin":
         return _builtin_first_run
     raise ValueError("unknown scrypt backend %r" % name)
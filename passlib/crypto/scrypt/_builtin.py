@@ -151,7 +151,8 @@ class ScryptEngine(object):
         #
         # time cost -- O(n * r) -- n loops, bmix is O(r)
         # mem cost -- O(n * r) -- V is n-element array of r-element tuples
-        # NOTE: could do time / memory tradeoff to shrink size of V
+        # NOTE: _builtin_array.ArrayScryptEngine implements a time / memory tradeoff
+        #       to shrink size of V, see its "max_v_bytes" setting.
         def vgen():
             i = 0
             while i < n:
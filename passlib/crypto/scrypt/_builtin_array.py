@@ -0,0 +1,351 @@
+"""passlib.utils.scrypt._builtin_array -- scrypt() kdf in pure-python, using flat arrays"""
+#==========================================================================
+# imports
+#==========================================================================
+# core
+from array import array
+from operator import xor
+# pkg
+from passlib.utils.compat import irange
+from passlib.crypto.digest import pbkdf2_hmac
+from passlib.crypto.scrypt._builtin import ScryptEngine
+from passlib.crypto.scrypt._salsa import salsa20_xor
+# local
+__all__ =[
+    "ArrayScryptEngine",
+    "smix_stats",
+    "reset_smix_stats",
+]
+
+#==========================================================================
+# memory budget
+#==========================================================================
+
+#: max number of bytes smix() may use to store ``V``, or ``None`` for no limit.
+#: if ``V`` would be larger than this, only every k-th entry is stored
+#: (for the smallest power-of-2 ``k`` which fits the budget),
+#: and the remaining entries are recomputed as needed.
+#: this shrinks memory use by a factor of ``k``, but increases the time
+#: taken by the second half of smix() by a factor of roughly ``(k+1)/2``.
+max_v_bytes = None
+
+#: running stats about smix() memory usage, updated by ArrayScryptEngine.run():
+#:
+#: * ``calls`` -- number of smix() lanes run.
+#: * ``tradeoff_calls`` -- number of lanes which had to use the time / memory tradeoff.
+#: * ``peak_v_bytes`` -- largest ``V`` table allocated by any lane.
+#: * ``recomputed_blocks`` -- total number of extra bmix() calls spent recomputing ``V`` entries.
+smix_stats = dict(calls=0, tradeoff_calls=0, peak_v_bytes=0, recomputed_blocks=0)
+
+def reset_smix_stats():
+    """reset all :data:`smix_stats` counters to 0"""
+    for key in smix_stats:
+        smix_stats[key] = 0
+
+def _update_smix_stats(v_bytes, recomputed, interval):
+    """record stats from a single smix() call"""
+    # NOTE: not guarded by a lock -- counters may be slightly off
+    #       if multiple threads are hashing concurrently.
+    smix_stats['calls'] += 1
+    if interval > 1:
+        smix_stats['tradeoff_calls'] += 1
+    if v_bytes > smix_stats['peak_v_bytes']:
+        smix_stats['peak_v_bytes'] = v_bytes
+    smix_stats['recomputed_blocks'] += recomputed
+
+def _get_v_interval(n, smix_bytes, limit):
+    """
+    return interval ``k`` between stored ``V`` entries,
+    such that ``V`` takes up no more than *limit* bytes.
+    """
+    interval = 1
+    if limit is not None:
+        while interval < n and (n // interval) * smix_bytes > limit:
+            interval <<= 1
+    return interval
+
+#==========================================================================
+# lane pool helper
+#==========================================================================
+def _smix_lane(n, r, v_interval, input):
+    """
+    run smix() for a single lane (invoked inside worker processes).
+    returns ``(output, v_bytes, recomputed)``.
+    """
+    engine = ArrayScryptEngine(n, r, 1)
+    engine.v_interval = v_interval
+    output = engine.smix(input)
+    return output, engine.last_v_bytes, engine.last_recomputed
+
+#==========================================================================
+# scrypt engine
+#==========================================================================
+class ArrayScryptEngine(ScryptEngine):
+    """
+    variant of :class:`~passlib.crypto.scrypt._builtin.ScryptEngine`
+    which stores ``V`` in a single contiguous ``array('I')``,
+    and mixes blocks via :func:`salsa20_xor` instead of generator expressions.
+    this takes roughly 1/8th the memory of the tuple-based engine.
+
+    when ``p > 1``, and ``n * r`` is at least :attr:`lane_pool_threshold` (if set),
+    the ``p`` smix() lanes are run concurrently in a process pool
+    (the shared :class:`~passlib.utils.handlers.BuiltinPool`).
+
+    if ``V`` would exceed :data:`max_v_bytes`, only every :attr:`v_interval`'th
+    entry of ``V`` is stored, and the rest are recomputed on demand.
+
+    .. warning::
+        this class does NO validation of the input ranges or types.
+
+        it's not intended to be used directly,
+        but only as a backend for :func:`passlib.utils.scrypt.scrypt()`.
+    """
+    #=================================================================
+    # class attrs
+    #=================================================================
+
+    #: min ``n * r`` value before lanes are dispatched to the process pool
+    #: (below roughly ``1 << 13``, the overhead of sending data to the pool outweighs the gain).
+    #: this is ``None`` by default, which disables the pool: since it means starting
+    #: worker processes, and sending the secret-derived input to them, applications have to opt in.
+    lane_pool_threshold = None
+
+    #=================================================================
+    # instance attrs
+    #=================================================================
+
+    #: interval between stored ``V`` entries (1 means all entries are stored)
+    v_interval = 1
+
+    #: size of ``V`` in bytes, and number of recomputed ``V`` entries,
+    #: from the most recent smix() call.
+    last_v_bytes = 0
+    last_recomputed = 0
+
+    #=================================================================
+    # init
+    #=================================================================
+    def __init__(self, n, r, p):
+        super(ArrayScryptEngine, self).__init__(n, r, p)
+        assert array("I").itemsize == 4
+        self.v_interval = _get_v_interval(n, self.smix_bytes, max_v_bytes)
+
+    #=================================================================
+    # frontend
+    #=================================================================
+    def run(self, secret, salt, keylen):
+        """
+        run scrypt kdf for specified secret, salt, and keylen
+
+        .. note::
+
+            * time cost is ``O(n * r * p)``
+            * mem cost is ``O(n * r)`` per concurrently running lane,
+              or ``O(n * r / v_interval)`` when limited by :data:`max_v_bytes`.
+        """
+        # stretch salt into initial byte array via pbkdf2
+        iv_bytes = self.iv_bytes
+        input = pbkdf2_hmac("sha256", secret, salt, rounds=1, keylen=iv_bytes)
+
+        # split initial byte array into 'p' mflen-sized chunks,
+        # and run each chunk through smix() to generate output chunk.
+        if self.p == 1:
+            output = self.smix(input)
+            _update_smix_stats(self.last_v_bytes, self.last_recomputed, self.v_interval)
+        else:
+            smix_bytes = self.smix_bytes
+            chunks = [input[offset:offset+smix_bytes]
+                      for offset in irange(0, iv_bytes, smix_bytes)]
+            output = b''.join(self._smix_lanes(chunks))
+
+        # stretch final byte array into output via pbkdf2
+        return pbkdf2_hmac("sha256", secret, output, rounds=1, keylen=keylen)
+
+    def _smix_lanes(self, chunks):
+        """run smix() for each of the 'p' input chunks, returns list of outputs"""
+        n, r, v_interval = self.n, self.r, self.v_interval
+        threshold = self.lane_pool_threshold
+        if threshold is not None and n * r >= threshold:
+            from passlib.utils.handlers import get_builtin_pool
+            pool = get_builtin_pool()
+            results = None
+            if pool.size > 1:
+                results = pool.run_many(_smix_lane, [(n, r, v_interval, chunk)
+                                                     for chunk in chunks])
+            if results is not None:
+                for _, v_bytes, recomputed in results:
+                    _update_smix_stats(v_bytes, recomputed, v_interval)
+                return [output for output, _, _ in results]
+        smix = self.smix
+        outputs = []
+        for chunk in chunks:
+            outputs.append(smix(chunk))
+            _update_smix_stats(self.last_v_bytes, self.last_recomputed, v_interval)
+        return outputs
+
+    #=================================================================
+    # smix() helper
+    #=================================================================
+    def smix(self, input):
+        """run SCrypt smix function on a single input block
+
+        :arg input:
+            byte string containing input data.
+            interpreted as 32*r little endian 4 byte integers.
+
+        :returns:
+            byte string containing output data
+            derived by mixing input using n & r parameters.
+
+        .. note:: time & mem cost are both ``O(n * r)``
+        """
+        if self.v_interval > 1:
+            return self._smix_tradeoff(input)
+
+        # gather locals
+        bmix = self.bmix
+        bmix_struct = self.bmix_struct
+        bmix_len = self.bmix_len
+        integerify = self.integerify
+        n = self.n
+
+        # parse input into 32*r integers ('X' in scrypt source),
+        # and allocate second buffer for bmix() to write into.
+        buffer = list(bmix_struct.unpack(input))
+        spare = list(buffer)
+
+        # derive V, as in ScryptEngine.smix(); but appending each
+        # buffer state to a flat array, rather than storing tuples.
+        #
+        # mem cost -- O(n * r) -- V is array of n*32*r uint32 values
+        V = array("I")
+        extend = V.extend
+        i = 0
+        while i < n:
+            extend(buffer)
+            bmix(buffer, spare)
+            buffer, spare = spare, buffer
+            i += 1
+
+        # generate result from X & V.
+        # NOTE: V[j] is xor'd into buffer in place, and bmix() writes into spare,
+        #       so no new list is allocated per step.
+        n_mask = n - 1
+        i = 0
+        while i < n:
+            start = (integerify(buffer) & n_mask) * bmix_len
+            buffer[:] = map(xor, buffer, V[start:start+bmix_len])
+            bmix(buffer, spare)
+            buffer, spare = spare, buffer
+            i += 1
+
+        self.last_v_bytes = len(V) * 4
+        self.last_recomputed = 0
+        return bmix_struct.pack(*buffer)
+
+    def _smix_tradeoff(self, input):
+        """
+        variant of smix() which only stores every k-th entry of ``V``
+        (where ``k = self.v_interval``), and recomputes ``V[j]``
+        by running bmix() ``j % k`` times on the nearest stored entry.
+
+        .. note::
+
+            * mem cost is ``O(n * r / k)``
+            * time cost is still ``O(n * r)``, but roughly ``(k + 3) / 4`` times
+              that of smix() -- first loop is unchanged, second loop performs
+              ``(k - 1) / 2`` extra bmix() calls per iteration on average.
+        """
+        # gather locals
+        bmix = self.bmix
+        bmix_struct = self.bmix_struct
+        bmix_len = self.bmix_len
+        integerify = self.integerify
+        n = self.n
+        interval = self.v_interval
+        assert interval > 1 and not (interval & (interval - 1))
+        shift = interval.bit_length() - 1
+        offset_mask = interval - 1
+
+        # parse input, as in smix()
+        buffer = list(bmix_struct.unpack(input))
+        spare = list(buffer)
+
+        # derive V, only storing every k-th buffer state.
+        V = array("I")
+        extend = V.extend
+        i = 0
+        while i < n:
+            if not (i & offset_mask):
+                extend(buffer)
+            bmix(buffer, spare)
+            buffer, spare = spare, buffer
+            i += 1
+
+        # generate result from X & V, recomputing missing entries
+        # from the closest stored entry that precedes them.
+        # NOTE: block & other are scratch buffers for recomputing entries,
+        #       allocated once rather than per step.
+        n_mask = n - 1
+        recomputed = 0
+        block = list(buffer)
+        other = list(buffer)
+        i = 0
+        while i < n:
+            j = integerify(buffer) & n_mask
+            start = (j >> shift) * bmix_len
+            count = j & offset_mask
+            if count:
+                recomputed += count
+                block[:] = V[start:start+bmix_len]
+                while count:
+                    bmix(block, other)
+                    block, other = other, block
+                    count -= 1
+                buffer[:] = map(xor, buffer, block)
+            else:
+                buffer[:] = map(xor, buffer, V[start:start+bmix_len])
+            bmix(buffer, spare)
+            buffer, spare = spare, buffer
+            i += 1
+
+        self.last_v_bytes = len(V) * 4
+        self.last_recomputed = recomputed
+        return bmix_struct.pack(*buffer)
+
+    #=================================================================
+    # bmix() helper
+    #=================================================================
+    def bmix(self, source, target):
+        """
+        block mixing function used by smix(),
+        see :meth:`ScryptEngine.bmix` for details.
+
+        .. warning::
+
+            this operates *in place* on target,
+            so source & target should NOT be same list.
+        """
+        half = self.bmix_half_len # 16*r out of 32*r - start of Y_1
+        tmp = source[-16:]
+        i = j = 0
+        while j < half:
+            jn = j + 16
+            target[j:jn] = tmp = salsa20_xor(tmp, source[i:i+16])
+            target[half+j:half+jn] = tmp = salsa20_xor(tmp, source[i+16:i+32])
+            i += 32
+            j = jn
+
+    def _bmix_1(self, source, target):
+        """special bmix() method optimized for ``r=1`` case"""
+        B = source[16:]
+        target[:16] = tmp = salsa20_xor(B, source[:16])
+        target[16:] = salsa20_xor(tmp, B)
+
+    #=================================================================
+    # eoc
+    #=================================================================
+
+#==========================================================================
+# eof
+#==========================================================================
@@ -75,37 +75,12 @@ _SALSA_OPS = [
         ( 15, 14, 13, 18),
 ]
 
-def main():
-    target = os.path.join(os.path.dirname(__file__), "_salsa.py")
-    fh = file(target, "w")
-    write = fh.write
-
+def _write_salsa_body(write, kwds):
+    """write salsa20/8 rounds & final addition (shared by all salsa functions)"""
     VNAMES = ["v%d" % i for i in range(16)]
-
     PAD = " " * 4
-    PAD2 = " " * 8
-    PAD3 = " " * 12
-    TLIST = ", ".join("b%d" % i for i in range(16))
-    VLIST = ", ".join(VNAMES)
-    kwds = dict(
-        VLIST=VLIST,
-        TLIST=TLIST,
-    )
 
     write('''\
-"""passlib.utils.scrypt._salsa - salsa 20/8 core, autogenerated by _gen_salsa.py"""
-#=================================================================
-# salsa function
-#=================================================================
-
-def salsa20(input):
-    \"""apply the salsa20/8 core to the provided input
-
-    :args input: input list containing 16 32-bit integers
-    :returns: result list containing 16 32-bit integers
-    \"""
-
-    %(TLIST)s = input
     %(VLIST)s = \\
         %(TLIST)s
 
@@ -140,12 +115,67 @@ def salsa20(input):
     write('''\
 
     return %(TLIST)s
+''' % kwds)
+
+def main():
+    target = os.path.join(os.path.dirname(__file__), "_salsa.py")
+    fh = open(target, "w")
+    write = fh.write
+
+    PAD = " " * 4
+    kwds = dict(
+        VLIST=", ".join("v%d" % i for i in range(16)),
+        TLIST=", ".join("b%d" % i for i in range(16)),
+        XLIST=", ".join("x%d" % i for i in range(16)),
+        YLIST=", ".join("y%d" % i for i in range(16)),
+    )
+
+    write('''\
+"""passlib.utils.scrypt._salsa - salsa 20/8 core, autogenerated by _gen_salsa.py"""
+#=================================================================
+# salsa function
+#=================================================================
+
+def salsa20(input):
+    """apply the salsa20/8 core to the provided input
+
+    :args input: input list containing 16 32-bit integers
+    :returns: result list containing 16 32-bit integers
+    """
+
+    %(TLIST)s = input
+''' % kwds)
+
+    _write_salsa_body(write, kwds)
+
+    write('''\
+
+def salsa20_xor(x, y):
+    """apply the salsa20/8 core to ``x xor y``,
+    without having to construct the xor'd input first.
+
+    :args x: input sequence containing 16 32-bit integers
+    :args y: input sequence containing 16 32-bit integers
+    :returns: result tuple containing 16 32-bit integers
+    """
+
+    %(XLIST)s = x
+    %(YLIST)s = y
+''' % kwds)
+
+    for idx in range(16):
+        write(PAD + "b%d = x%d ^ y%d\n" % (idx,idx,idx))
+
+    _write_salsa_body(write, kwds)
+
+    write('''\
 
 #=================================================================
 # eof
 #=================================================================
-''' % kwds)
-        
+''')
+    fh.close()
+
 if __name__ == "__main__":
     main()
 
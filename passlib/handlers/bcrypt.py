@@ -24,6 +24,7 @@ _pybcrypt = None # dynamically imported by _load_backend_pybcrypt()
 _bcryptor = None # dynamically imported by _load_backend_bcryptor()
 # pkg
 _builtin_bcrypt = None  # dynamically imported by _load_backend_builtin()
+_builtin_bcrypt_many = None  # dynamically imported by _load_backend_builtin_batch()
 from passlib.exc import PasslibHashWarning, PasslibSecurityWarning, PasslibSecurityError
 from passlib.utils import safe_crypt, repeat_string, to_bytes, parse_version, \
                           rng, getrandstr, test_crypt, to_unicode
@@ -83,6 +84,14 @@ def _detect_pybcrypt():
         return False
     return True
 
+def _warn_wraparound_bug(backend):
+    """issue warning about backend being vulnerable to bsd wraparound bug"""
+    warn("passlib.hash.bcrypt: Your installation of the %r backend is vulnerable to "
+         "the bsd wraparound bug, "
+         "and should be upgraded or replaced with another backend "
+         "(enabling workaround for now)." % backend,
+         uh.exc.PasslibSecurityWarning)
+
 #=============================================================================
 # backend mixins
 #=============================================================================
@@ -153,6 +162,14 @@ class _BcryptCommon(uh.SubclassBackendMixin, uh.TruncateMixin, uh.HasManyIdents,
     _lacks_2b_support = False
     _fallback_ident = IDENT_2A
 
+    #: attrs set by _finalize_backend_mixin()'s self-tests
+    _selftest_attrs = ("_has_2a_wraparound_bug", "_lacks_20_support",
+                       "_lacks_2y_support", "_lacks_2b_support", "_fallback_ident")
+
+    #: string identifying version of library used by backend (set by _load_backend_mixin()),
+    #: used as key for uh.selftest_cache.  ``None`` if results shouldn't be cached.
+    _backend_version = None
+
     #===================================================================
     # formatting
     #===================================================================
@@ -281,6 +298,15 @@ class _BcryptCommon(uh.SubclassBackendMixin, uh.TruncateMixin, uh.HasManyIdents,
         if mixin_cls._workrounds_initialized:
             return True
 
+        # check for cached self-test results
+        cache = uh.selftest_cache
+        version = mixin_cls._backend_version
+        if cache is not None and version is not None:
+            state = cache.get(bcrypt, backend, version)
+            if state is not None and mixin_cls._set_selftest_state(state, backend):
+                log.debug("%r backend: using cached self-test results", backend)
+                return True
+
         verify = mixin_cls.verify
 
         err_types = (ValueError,)
@@ -390,11 +416,7 @@ class _BcryptCommon(uh.SubclassBackendMixin, uh.TruncateMixin, uh.HasManyIdents,
         else:
             assert_lacks_8bit_bug(IDENT_2A)
             if detect_wrap_bug(IDENT_2A):
-                warn("passlib.hash.bcrypt: Your installation of the %r backend is vulnerable to "
-                     "the bsd wraparound bug, "
-                     "and should be upgraded or replaced with another backend "
-                     "(enabling workaround for now)." % backend,
-                     uh.exc.PasslibSecurityWarning)
+                _warn_wraparound_bug(backend)
                 mixin_cls._has_2a_wraparound_bug = True
 
         #----------------------------------------------------------------
@@ -434,6 +456,31 @@ class _BcryptCommon(uh.SubclassBackendMixin, uh.TruncateMixin, uh.HasManyIdents,
 
         # set flag so we don't have to run this again
         mixin_cls._workrounds_initialized = True
+        if cache is not None and version is not None:
+            cache.set(bcrypt, backend, version, mixin_cls._get_selftest_state())
+        return True
+
+    @classmethod
+    def _get_selftest_state(mixin_cls):
+        """return dict of results from _finalize_backend_mixin()"""
+        return dict((attr, getattr(mixin_cls, attr)) for attr in mixin_cls._selftest_attrs)
+
+    @classmethod
+    def _set_selftest_state(mixin_cls, state, backend):
+        """
+        restore results returned by _get_selftest_state(),
+        returns False if *state* is malformed.
+        """
+        attrs = mixin_cls._selftest_attrs
+        if not isinstance(state, dict) or set(state) != set(attrs) or \
+                state['_fallback_ident'] not in (IDENT_2A, IDENT_2B):
+            return False
+        for attr in attrs:
+            setattr(mixin_cls, attr, state[attr])
+        if mixin_cls._has_2a_wraparound_bug:
+            # NOTE: re-issuing warning, since it's only issued by self-test otherwise.
+            _warn_wraparound_bug(backend)
+        mixin_cls._workrounds_initialized = True
         return True
 
     #===================================================================
@@ -532,6 +579,10 @@ class _NoBackend(_BcryptCommon):
         #       call subclass's wrapped _calc_checksum, e.g. bcrypt_sha256._calc_checksum
         return super(bcrypt, self)._calc_checksum(secret)
 
+    def _calc_checksum_many(self, secrets):
+        self._stub_requires_backend()
+        return super(bcrypt, self)._calc_checksum_many(secrets)
+
     #===================================================================
     # eoc
     #===================================================================
@@ -562,6 +613,7 @@ class _BcryptBackend(_BcryptCommon):
             version = '<unknown>'
 
         log.debug("detected 'bcrypt' backend, version %r", version)
+        mixin_cls._backend_version = None if version == '<unknown>' else version
         return mixin_cls._finalize_backend_mixin(name, dryrun)
 
     # # TODO: would like to implementing verify() directly,
@@ -613,6 +665,7 @@ class _BcryptorBackend(_BcryptCommon):
             import bcryptor as _bcryptor
         except ImportError: # pragma: no cover
             return False
+        mixin_cls._backend_version = getattr(_bcryptor, "__version__", None)
         return mixin_cls._finalize_backend_mixin(name, dryrun)
 
     def _calc_checksum(self, secret):
@@ -668,6 +721,7 @@ class _PyBcryptBackend(_BcryptCommon):
                 mixin_cls._calc_lock = threading.Lock()
             mixin_cls._calc_checksum = mixin_cls._calc_checksum_threadsafe.__func__
 
+        mixin_cls._backend_version = None if version == "<unknown>" else version
         return mixin_cls._finalize_backend_mixin(name, dryrun)
 
     def _calc_checksum_threadsafe(self, secret):
@@ -703,6 +757,8 @@ class _OsCryptBackend(_BcryptCommon):
     def _load_backend_mixin(mixin_cls, name, dryrun):
         if not test_crypt("test", TEST_HASH_2A):
             return False
+        # NOTE: not setting _backend_version, since there's no reliable way
+        #       to detect when the host's crypt() implementation has changed.
         return mixin_cls._finalize_backend_mixin(name, dryrun)
 
     def _calc_checksum(self, secret):
@@ -741,6 +797,38 @@ class _BuiltinBackend(_BcryptCommon):
             return False
         global _builtin_bcrypt
         from passlib.crypto._blowfish import raw_bcrypt as _builtin_bcrypt
+        # NOTE: passlib version is already part of selftest_cache key
+        mixin_cls._backend_version = "builtin"
+        return mixin_cls._finalize_backend_mixin(name, dryrun)
+
+    def _calc_checksum(self, secret):
+        secret, ident = self._prepare_digest_args(secret)
+        chk = _builtin_bcrypt(secret, ident[1:-1],
+                              self.salt.encode("ascii"), self.rounds)
+        return chk.decode("ascii")
+
+#-----------------------------------------------------------------------
+# builtin batch backend
+#-----------------------------------------------------------------------
+class _BuiltinBatchBackend(_BcryptCommon):
+    """
+    backend which uses passlib's pure-python implementation,
+    with numpy used to run :meth:`verify_many` candidates in lockstep.
+    """
+    @classmethod
+    def _load_backend_mixin(mixin_cls, name, dryrun):
+        from passlib.utils import as_bool
+        if not as_bool(os.environ.get("PASSLIB_BUILTIN_BCRYPT")):
+            log.debug("bcrypt 'builtin_batch' backend not enabled via $PASSLIB_BUILTIN_BCRYPT")
+            return False
+        from passlib.crypto._blowfish.batch import np
+        if np is None:
+            log.debug("bcrypt 'builtin_batch' backend requires numpy")
+            return False
+        global _builtin_bcrypt, _builtin_bcrypt_many
+        from passlib.crypto._blowfish import raw_bcrypt as _builtin_bcrypt, \
+                                             raw_bcrypt_many as _builtin_bcrypt_many
+        mixin_cls._backend_version = "numpy %s" % np.__version__
         return mixin_cls._finalize_backend_mixin(name, dryrun)
 
     def _calc_checksum(self, secret):
@@ -749,6 +837,18 @@ class _BuiltinBackend(_BcryptCommon):
                               self.salt.encode("ascii"), self.rounds)
         return chk.decode("ascii")
 
+    def _calc_checksum_many(self, secrets):
+        prepared = [self._prepare_digest_args(secret) for secret in secrets]
+        if not prepared:
+            return []
+        # NOTE: ident only depends on class config, so will be same for all secrets.
+        ident = prepared[0][1]
+        assert all(pair[1] == ident for pair in prepared)
+        salt = self.salt.encode("ascii")
+        chks = _builtin_bcrypt_many([pair[0] for pair in prepared], ident[1:-1],
+                                    [salt] * len(prepared), self.rounds)
+        return [chk.decode("ascii") for chk in chks]
+
 #=============================================================================
 # handler
 #=============================================================================
@@ -828,7 +928,7 @@ class bcrypt(_NoBackend, _BcryptCommon):
     #       in order to load the appropriate backend.
 
     #: list of potential backends
-    backends = ("bcrypt", "pybcrypt", "bcryptor", "os_crypt", "builtin")
+    backends = ("bcrypt", "pybcrypt", "bcryptor", "os_crypt", "builtin_batch", "builtin")
 
     #: flag that this class's bases should be modified by SubclassBackendMixin
     _backend_mixin_target = True
@@ -840,6 +940,7 @@ class bcrypt(_NoBackend, _BcryptCommon):
         "pybcrypt": _PyBcryptBackend,
         "bcryptor": _BcryptorBackend,
         "os_crypt": _OsCryptBackend,
+        "builtin_batch": _BuiltinBatchBackend,
         "builtin": _BuiltinBackend,
     }
 
@@ -885,6 +986,11 @@ class _wrapped_bcrypt(bcrypt):
         # disable check performed by bcrypt(), since this doesn't truncate passwords.
         pass
 
+    def _calc_checksum_many(self, secrets):
+        # bypass backend's batch implementation, since it won't apply
+        # the wrapper's transformation of the secret in _calc_checksum().
+        return [self._calc_checksum(secret) for secret in secrets]
+
 #=============================================================================
 # bcrypt sha256 wrapper
 #=============================================================================
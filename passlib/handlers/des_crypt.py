@@ -11,7 +11,7 @@ from warnings import warn
 from passlib.utils import safe_crypt, test_crypt, to_unicode
 from passlib.utils.binary import h64, h64big
 from passlib.utils.compat import byte_elem_value, u, uascii_to_str, unicode, suppress_cause
-from passlib.crypto.des import des_encrypt_int_block
+from passlib.crypto.des import des_encrypt_int_block, des_encrypt_int_blocks
 import passlib.utils.handlers as uh
 # local
 __all__ = [
@@ -40,6 +40,18 @@ def _crypt_secret_to_key(secret):
     return sum((byte_elem_value(c) & 0x7f) << (57-i*8)
                for i, c in enumerate(secret[:8]))
 
+def _norm_des_secret(secret, handler):
+    """helper for des_crypt backends -- encode secret & reject NULL chars"""
+    # gotta do something - no official policy since this predates unicode
+    if isinstance(secret, unicode):
+        secret = secret.encode("utf-8")
+    assert isinstance(secret, bytes)
+
+    # forbidding NULL char because underlying crypt() rejects them too.
+    if _BNULL in secret:
+        raise uh.exc.NullPasswordError(handler)
+    return secret
+
 def _raw_des_crypt(secret, salt):
     """pure-python backed for des_crypt"""
     assert len(salt) == 2
@@ -52,14 +64,7 @@ def _raw_des_crypt(secret, salt):
     #       and openbsd does (something) which creates an invalid hash.
     salt_value = h64.decode_int12(salt)
 
-    # gotta do something - no official policy since this predates unicode
-    if isinstance(secret, unicode):
-        secret = secret.encode("utf-8")
-    assert isinstance(secret, bytes)
-
-    # forbidding NULL char because underlying crypt() rejects them too.
-    if _BNULL in secret:
-        raise uh.exc.NullPasswordError(des_crypt)
+    secret = _norm_des_secret(secret, des_crypt)
 
     # convert first 8 bytes of secret string into an integer
     key_value = _crypt_secret_to_key(secret)
@@ -70,6 +75,19 @@ def _raw_des_crypt(secret, salt):
     # run h64 encode on result
     return h64big.encode_int64(result)
 
+def _raw_des_crypt_many(secrets, salts):
+    """
+    batch version of :func:`_raw_des_crypt`,
+    which runs all the secrets through :func:`des_encrypt_int_blocks` at once.
+    """
+    assert all(len(salt) == 2 for salt in salts)
+    salt_values = [h64.decode_int12(salt) for salt in salts]
+    keys = [_crypt_secret_to_key(_norm_des_secret(secret, des_crypt))
+            for secret in secrets]
+    results = des_encrypt_int_blocks(keys, [0] * len(keys), salt_values, 25)
+    encode = h64big.encode_int64
+    return [encode(result) for result in results]
+
 def _bsdi_secret_to_key(secret):
     """convert secret to DES key used by bsdi_crypt"""
     key_value = _crypt_secret_to_key(secret)
@@ -82,20 +100,29 @@ def _bsdi_secret_to_key(secret):
         idx = next
     return key_value
 
+def _bsdi_secrets_to_keys(secrets):
+    """batch version of :func:`_bsdi_secret_to_key`"""
+    keys = [_crypt_secret_to_key(secret) for secret in secrets]
+    idx = 8
+    active = [i for i, secret in enumerate(secrets) if len(secret) > idx]
+    while active:
+        # encrypt current key for all secrets that have another 8 byte chunk
+        next = idx + 8
+        values = [keys[i] for i in active]
+        values = des_encrypt_int_blocks(values, values, [0] * len(values))
+        for i, value in zip(active, values):
+            keys[i] = value ^ _crypt_secret_to_key(secrets[i][idx:next])
+        idx = next
+        active = [i for i in active if len(secrets[i]) > idx]
+    return keys
+
 def _raw_bsdi_crypt(secret, rounds, salt):
     """pure-python backend for bsdi_crypt"""
 
     # decode salt
     salt_value = h64.decode_int24(salt)
 
-    # gotta do something - no official policy since this predates unicode
-    if isinstance(secret, unicode):
-        secret = secret.encode("utf-8")
-    assert isinstance(secret, bytes)
-
-    # forbidding NULL char because underlying crypt() rejects them too.
-    if _BNULL in secret:
-        raise uh.exc.NullPasswordError(bsdi_crypt)
+    secret = _norm_des_secret(secret, bsdi_crypt)
 
     # convert secret string into an integer
     key_value = _bsdi_secret_to_key(secret)
@@ -106,6 +133,40 @@ def _raw_bsdi_crypt(secret, rounds, salt):
     # run h64 encode on result
     return h64big.encode_int64(result)
 
+def _raw_bsdi_crypt_many(secrets, rounds, salts):
+    """
+    batch version of :func:`_raw_bsdi_crypt`,
+    which runs all the secrets through :func:`des_encrypt_int_blocks` at once.
+    all secrets must use the same number of rounds.
+    """
+    salt_values = [h64.decode_int24(salt) for salt in salts]
+    secrets = [_norm_des_secret(secret, bsdi_crypt) for secret in secrets]
+    keys = _bsdi_secrets_to_keys(secrets)
+    results = des_encrypt_int_blocks(keys, [0] * len(keys), salt_values, rounds)
+    encode = h64big.encode_int64
+    return [encode(result) for result in results]
+
+def _raw_bigcrypt_many(secrets, salts):
+    """
+    batch version of bigcrypt's checksum calculation --
+    each 8 byte chunk of each secret is run through :func:`_raw_des_crypt_many`,
+    salted using the previous chunk's checksum.
+    """
+    secrets = [secret.encode("utf-8") if isinstance(secret, unicode) else secret
+               for secret in secrets]
+    chks = _raw_des_crypt_many(secrets, salts)
+    idx = 8
+    active = [i for i, secret in enumerate(secrets) if len(secret) > idx]
+    while active:
+        next = idx + 8
+        parts = _raw_des_crypt_many([secrets[i][idx:next] for i in active],
+                                    [chks[i][-11:-9] for i in active])
+        for i, part in zip(active, parts):
+            chks[i] += part
+        idx = next
+        active = [i for i in active if len(secrets[i]) > idx]
+    return chks
+
 #=============================================================================
 # handlers
 #=============================================================================
@@ -236,6 +297,16 @@ class des_crypt(uh.TruncateMixin, uh.HasManyBackends, uh.HasSalt, uh.GenericHand
     def _calc_checksum_builtin(self, secret):
         return _raw_des_crypt(secret, self.salt.encode("ascii")).decode("ascii")
 
+    def _calc_checksum_many(self, secrets):
+        if self.get_backend() != "builtin":
+            return super(des_crypt, self)._calc_checksum_many(secrets)
+        if self.use_defaults:
+            for secret in secrets:
+                self._check_truncate_policy(secret)
+        salt = self.salt.encode("ascii")
+        return [chk.decode("ascii")
+                for chk in _raw_des_crypt_many(secrets, [salt] * len(secrets))]
+
     #===================================================================
     # eoc
     #===================================================================
@@ -399,6 +470,13 @@ class bsdi_crypt(uh.HasManyBackends, uh.HasRounds, uh.HasSalt, uh.GenericHandler
     def _calc_checksum_builtin(self, secret):
         return _raw_bsdi_crypt(secret, self.rounds, self.salt.encode("ascii")).decode("ascii")
 
+    def _calc_checksum_many(self, secrets):
+        if self.get_backend() != "builtin":
+            return super(bsdi_crypt, self)._calc_checksum_many(secrets)
+        salt = self.salt.encode("ascii")
+        return [chk.decode("ascii") for chk in
+                _raw_bsdi_crypt_many(secrets, self.rounds, [salt] * len(secrets))]
+
     #===================================================================
     # eoc
     #===================================================================
@@ -482,6 +560,11 @@ class bigcrypt(uh.HasSalt, uh.GenericHandler):
             idx = next
         return chk.decode("ascii")
 
+    def _calc_checksum_many(self, secrets):
+        salt = self.salt.encode("ascii")
+        return [chk.decode("ascii")
+                for chk in _raw_bigcrypt_many(secrets, [salt] * len(secrets))]
+
     #===================================================================
     # eoc
     #===================================================================
@@ -379,7 +379,7 @@ class scram(uh.HasRounds, uh.HasRawSalt, uh.HasRawChecksum, uh.GenericHandler):
     @classmethod
     def verify(cls, secret, hash, full=False):
         uh.validate_secret(secret)
-        self = cls.from_string(hash)
+        self = cls._from_string_cached(hash)
         chkmap = self.checksum
         if not chkmap:
             raise ValueError("expected %s hash, got %s config string instead" %
@@ -139,7 +139,7 @@ class sha1_crypt(uh.HasManyBackends, uh.HasRounds, uh.HasSalt, uh.GenericHandler
             result = keyed_hmac(result)
         return h64.encode_transposed_bytes(result, self._chk_offsets).decode("ascii")
 
-    _chk_offsets = [
+    _chk_offsets = (
         2,1,0,
         5,4,3,
         8,7,6,
@@ -147,7 +147,7 @@ class sha1_crypt(uh.HasManyBackends, uh.HasRounds, uh.HasSalt, uh.GenericHandler
         14,13,12,
         17,16,15,
         0,19,18,
-    ]
+    )
 
     #===================================================================
     # eoc
@@ -13,6 +13,12 @@ from passlib.utils.compat import unicode
 from passlib.crypto.digest import lookup_hash
 md4 = lookup_hash("md4").const
 import passlib.utils.handlers as uh
+if md4.__module__ == "passlib.crypto._md4":
+    # hashlib lacks md4 (e.g. OpenSSL 3), use builtin's batch implementation
+    from passlib.crypto._md4 import md4_many as _md4_many
+else:
+    def _md4_many(messages):
+        return [md4(msg).digest() for msg in messages]
 # local
 __all__ = [
     "lmhash",
@@ -168,6 +174,9 @@ class nthash(uh.StaticHandler):
     def _calc_checksum(self, secret):
         return hexlify(self.raw(secret)).decode("ascii")
 
+    def _calc_checksum_many(self, secrets):
+        return [hexlify(raw).decode("ascii") for raw in self.raw_many(secrets)]
+
     @classmethod
     def raw(cls, secret):
         """encode password using MD4-based NTHASH algorithm
@@ -180,6 +189,19 @@ class nthash(uh.StaticHandler):
         # XXX: found refs that say only first 128 chars are used.
         return md4(secret.encode("utf-16-le")).digest()
 
+    @classmethod
+    def raw_many(cls, secrets):
+        """encode multiple passwords using NTHASH algorithm
+
+        :arg secrets: iterable of secrets, as unicode or utf-8 encoded bytes
+
+        :returns: returns list of raw bytes, one per secret
+
+        .. versionadded:: 1.8
+        """
+        return _md4_many([to_unicode(secret, "utf-8", param="secret").encode("utf-16-le")
+                          for secret in secrets])
+
     #===================================================================
     # eoc
     #===================================================================
@@ -258,6 +280,9 @@ class msdcc(uh.HasUserContext, uh.StaticHandler):
     def _calc_checksum(self, secret):
         return hexlify(self.raw(secret, self.user)).decode("ascii")
 
+    def _calc_checksum_many(self, secrets):
+        return [hexlify(raw).decode("ascii") for raw in self.raw_many(secrets, self.user)]
+
     @classmethod
     def raw(cls, secret, user):
         """encode password using mscash v1 algorithm
@@ -271,6 +296,20 @@ class msdcc(uh.HasUserContext, uh.StaticHandler):
         user = to_unicode(user, "utf-8", param="user").lower().encode("utf-16-le")
         return md4(md4(secret).digest() + user).digest()
 
+    @classmethod
+    def raw_many(cls, secrets, user):
+        """encode multiple passwords for the same user using mscash v1 algorithm
+
+        :arg secrets: iterable of secrets, as unicode or utf-8 encoded bytes
+        :arg user: username to use as salt
+
+        :returns: returns list of raw bytes, one per secret
+
+        .. versionadded:: 1.8
+        """
+        user = to_unicode(user, "utf-8", param="user").lower().encode("utf-16-le")
+        return _md4_many([digest + user for digest in nthash.raw_many(secrets)])
+
 #=============================================================================
 # msdcc2 aka mscash2
 #=============================================================================
@@ -303,6 +342,12 @@ class msdcc2(uh.HasUserContext, uh.StaticHandler):
     def _calc_checksum(self, secret):
         return hexlify(self.raw(secret, self.user)).decode("ascii")
 
+    def _calc_checksum_many(self, secrets):
+        from passlib.crypto.digest import pbkdf2_hmac
+        user = to_unicode(self.user, "utf-8", param="user").lower().encode("utf-16-le")
+        return [hexlify(pbkdf2_hmac("sha1", tmp, user, 10240, 16)).decode("ascii")
+                for tmp in msdcc.raw_many(secrets, self.user)]
+
     @classmethod
     def raw(cls, secret, user):
         """encode password using msdcc v2 algorithm
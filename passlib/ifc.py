@@ -21,7 +21,12 @@ def recreate_with_metaclass(meta):
     def builder(cls):
         if meta is type(cls):
             return cls
-        return meta(cls.__name__, cls.__bases__, cls.__dict__.copy())
+        # NOTE: dropping original class's '__dict__' & '__weakref__' descriptors,
+        #       which would refuse to operate on instances of the new class.
+        attrs = cls.__dict__.copy()
+        attrs.pop("__dict__", None)
+        attrs.pop("__weakref__", None)
+        return meta(cls.__name__, cls.__bases__, attrs)
     return builder
 
 #=============================================================================
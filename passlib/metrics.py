@@ -0,0 +1,277 @@
+"""passlib.metrics -- collect per-scheme statistics from CryptContext operations
+
+This module provides observers which can be attached to a :class:`~passlib.context.CryptContext`
+via :meth:`~passlib.context.CryptContext.add_observer`, in order to track which schemes
+users' hashes are using, how long each scheme takes to verify, and how often
+:meth:`~passlib.context.CryptContext.verify_and_update` has to re-hash a password.
+
+.. versionadded:: 1.8
+"""
+#=============================================================================
+# imports
+#=============================================================================
+# core
+from __future__ import absolute_import, division, print_function
+from bisect import bisect_left
+import logging; log = logging.getLogger(__name__)
+import threading
+# site
+# pkg
+# local
+__all__ = [
+    "ContextObserver",
+    "MetricsCollector",
+    "render_prometheus",
+    "DEFAULT_BUCKETS",
+    "PROMETHEUS_CONTENT_TYPE",
+]
+
+#=============================================================================
+# constants
+#=============================================================================
+
+#: default histogram bucket boundaries (in seconds) used by :class:`MetricsCollector`
+DEFAULT_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+
+#: content type of :func:`render_prometheus` output
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+#=============================================================================
+# observer interface
+#=============================================================================
+class ContextObserver(object):
+    """
+    base class for :class:`~passlib.context.CryptContext` observers.
+
+    Observers don't have to inherit from this class: any callable
+    accepting the same arguments as :meth:`__call__` can be passed to
+    :meth:`CryptContext.add_observer() <passlib.context.CryptContext.add_observer>`.
+
+    .. automethod:: __call__
+    """
+    def __call__(self, operation, scheme, category, elapsed, outcome):
+        """
+        invoked by :class:`!CryptContext` after each operation.
+
+        :arg operation:
+            ``"hash"``, ``"verify"``, or ``"verify_and_update"``.
+
+        :arg scheme:
+            name of the scheme that was used, or ``None`` if the hash couldn't be identified
+            (or was ``None``).
+
+        :arg category:
+            the :ref:`user category <user-categories>` passed to the operation (or ``None``).
+
+        :arg elapsed:
+            how long the operation took (in seconds).
+            this is ``0`` if the operation didn't get as far as invoking the scheme;
+            and doesn't include any delay added by ``harden_verify``,
+            or the time verify_and_update() spent generating a replacement hash.
+
+        :arg outcome:
+            one of:
+
+            * ``"ok"`` -- hash() completed.
+            * ``"valid"`` / ``"invalid"`` -- whether the secret verified.
+            * ``"rehash"`` -- secret verified, and verify_and_update() generated a replacement hash.
+            * ``"missing"`` -- hash was ``None``.
+            * ``"unidentified"`` -- hash didn't match any of the context's schemes.
+            * ``"error"`` -- the scheme raised an error (e.g. malformed hash).
+
+        This will be called from whichever thread ran the operation,
+        so implementations should be thread-safe & fast.
+        Any errors it raises are logged, and otherwise ignored.
+        """
+        raise NotImplementedError("should be implemented by subclass")
+
+#=============================================================================
+# collector
+#=============================================================================
+class MetricsCollector(ContextObserver):
+    """
+    :class:`ContextObserver` which counts operations, and records
+    a latency histogram, for each distinct ``(operation, scheme, category, outcome)``.
+
+    Each thread records into its own set of counters, which are only combined
+    when they're read (via :meth:`snapshot`, :meth:`count`, or :func:`render_prometheus`);
+    so recording never needs to acquire a lock.
+
+    :param buckets:
+        sorted list of histogram bucket boundaries, in seconds
+        (defaults to :data:`DEFAULT_BUCKETS`).
+
+    .. automethod:: snapshot
+    .. automethod:: count
+    .. automethod:: reset
+    """
+    #===================================================================
+    # init
+    #===================================================================
+    def __init__(self, buckets=None):
+        if buckets is None:
+            buckets = DEFAULT_BUCKETS
+        buckets = tuple(float(bound) for bound in buckets)
+        if not buckets or list(buckets) != sorted(set(buckets)):
+            raise ValueError("buckets must be non-empty, sorted, and unique")
+        self.buckets = buckets
+        self.reset()
+
+    def reset(self):
+        """discard all recorded data"""
+        # NOTE: threads will create a new shard when they notice _local has been replaced.
+        self._local = threading.local()
+        self._shards = []
+
+    def __repr__(self):
+        return "<MetricsCollector at 0x%x>" % id(self)
+
+    #===================================================================
+    # recording
+    #===================================================================
+    def __call__(self, operation, scheme, category, elapsed, outcome):
+        # NOTE: each thread only ever writes to its own shard, which is a dict mapping
+        #       key -> [count, sum, bucket_0 ... bucket_n, overflow].
+        local = self._local
+        try:
+            shard = local.shard
+        except AttributeError:
+            shard = local.shard = {}
+            self._shards.append(shard)
+        key = (operation, scheme, category, outcome)
+        entry = shard.get(key)
+        if entry is None:
+            entry = shard[key] = [0, 0.0] + [0] * (len(self.buckets) + 1)
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2 + bisect_left(self.buckets, elapsed)] += 1
+
+    #===================================================================
+    # reading
+    #===================================================================
+    def snapshot(self):
+        """
+        return combined data from all threads, as dict mapping
+        ``(operation, scheme, category, outcome)`` -> dict containing:
+
+        * ``count`` -- number of operations
+        * ``sum`` -- total elapsed time (in seconds)
+        * ``buckets`` -- list of cumulative counts for each of :attr:`buckets`,
+          plus a final entry for ``+Inf`` (which equals ``count``).
+        """
+        totals = {}
+        for shard in list(self._shards):
+            # NOTE: dict.copy() is atomic, so shard's thread can keep writing to it.
+            for key, entry in shard.copy().items():
+                total = totals.get(key)
+                if total is None:
+                    totals[key] = list(entry)
+                else:
+                    for idx, value in enumerate(entry):
+                        total[idx] += value
+        result = {}
+        for key, entry in totals.items():
+            cumulative = []
+            running = 0
+            for value in entry[2:]:
+                running += value
+                cumulative.append(running)
+            result[key] = dict(count=entry[0], sum=entry[1], buckets=cumulative)
+        return result
+
+    def count(self, operation=None, scheme=None, category=None, outcome=None):
+        """
+        return number of recorded operations matching all the specified values,
+        e.g. ``collector.count("verify_and_update", outcome="rehash")``.
+        """
+        total = 0
+        for key, sample in self.snapshot().items():
+            if (operation is None or key[0] == operation) and \
+                    (scheme is None or key[1] == scheme) and \
+                    (category is None or key[2] == category) and \
+                    (outcome is None or key[3] == outcome):
+                total += sample['count']
+        return total
+
+    #===================================================================
+    # eoc
+    #===================================================================
+
+#=============================================================================
+# prometheus renderer
+#=============================================================================
+def _escape_label(value):
+    """escape label value for prometheus text format"""
+    if value is None:
+        return ""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+def render_prometheus(collector, namespace="passlib"):
+    """
+    render data recorded by a :class:`MetricsCollector` using the
+    `Prometheus text exposition format <https://prometheus.io/docs/instrumenting/exposition_formats/>`_
+    (which should be served using :data:`PROMETHEUS_CONTENT_TYPE`).
+
+    This renders two metrics:
+
+    * ``<namespace>_context_operations_total`` -- counter, labeled by
+      ``operation``, ``scheme``, ``category``, and ``outcome``.
+    * ``<namespace>_context_duration_seconds`` -- histogram, labeled by
+      ``operation``, ``scheme``, and ``category``
+      (this omits operations where the hash was missing or unidentified).
+
+    ``None`` values (e.g. the default category) are rendered as empty labels.
+
+    :returns: native string.
+    """
+    snapshot = collector.snapshot()
+    bounds = [_format_value(bound) for bound in collector.buckets] + ["+Inf"]
+
+    # combine histograms across outcomes
+    histograms = {}
+    for key, sample in snapshot.items():
+        if key[1] is None:
+            # hash was missing / unidentified, so there's no latency to report
+            continue
+        hkey = tuple(_escape_label(value) for value in key[:3])
+        total = histograms.get(hkey)
+        if total is None:
+            histograms[hkey] = dict(count=sample['count'], sum=sample['sum'],
+                                    buckets=list(sample['buckets']))
+        else:
+            total['count'] += sample['count']
+            total['sum'] += sample['sum']
+            total['buckets'] = [a + b for a, b in zip(total['buckets'], sample['buckets'])]
+
+    lines = []
+    name = namespace + "_context_operations_total"
+    lines.append("# HELP %s Number of CryptContext operations." % name)
+    lines.append("# TYPE %s counter" % name)
+    label_names = ("operation", "scheme", "category", "outcome")
+    rows = sorted((tuple(_escape_label(value) for value in key), sample['count'])
+                  for key, sample in snapshot.items())
+    for labels, count in rows:
+        lines.append("%s{%s} %d" % (name, ",".join('%s="%s"' % pair for pair in
+                                                   zip(label_names, labels)), count))
+
+    name = namespace + "_context_duration_seconds"
+    lines.append("# HELP %s Time taken by CryptContext operations." % name)
+    lines.append("# TYPE %s histogram" % name)
+    label_names = ("operation", "scheme", "category")
+    for labels in sorted(histograms):
+        sample = histograms[labels]
+        base = ",".join('%s="%s"' % pair for pair in zip(label_names, labels))
+        for bound, count in zip(bounds, sample['buckets']):
+            lines.append('%s_bucket{%s,le="%s"} %d' % (name, base, bound, count))
+        lines.append("%s_sum{%s} %s" % (name, base, _format_value(sample['sum'])))
+        lines.append("%s_count{%s} %d" % (name, base, sample['count']))
+    return "\n".join(lines) + "\n"
+
+#=============================================================================
+# eof
+#=============================================================================
@@ -22,6 +22,7 @@ __all__ = [
     "register_crypt_handler",
     "get_crypt_handler",
     "list_crypt_handlers",
+    "warmup",
 ]
 
 #=============================================================================
@@ -497,6 +498,61 @@ def has_backend(hasher, backend=ANY, safe=False):
     else:
         raise exc.UnknownBackendError(hasher, backend)
 
+#------------------------------------------------------------------
+# warmup
+#------------------------------------------------------------------
+def warmup(names, cache_path=None):
+    """
+    Eagerly load the specified hashers, along with their default backends.
+
+    Normally this happens lazily, the first time each hasher is used.
+    For servers which fork worker processes, that means the work is repeated
+    in every worker, while it's handling a live request.  Calling this
+    in the parent process before it forks (e.g. in gunicorn's master)
+    lets all the workers inherit the loaded state instead.
+    Loading a backend may include importing modules, and running self-tests
+    (e.g. :class:`~passlib.hash.bcrypt` runs a number of known-answer tests).
+
+    :arg names:
+        list of hasher names or objects.
+
+    :param cache_path:
+        Optional path to a JSON file in which to cache backend self-test results
+        (see :class:`passlib.utils.handlers.SelfTestCache`).
+        If the file exists, backends whose library version hasn't changed
+        will skip their self-tests.
+
+    :returns:
+        dict mapping hasher name -> name of loaded backend.
+        This will be ``"builtin"`` for hashers which don't have multiple backends,
+        and ``None`` for hashers which have no backends available
+        (a warning is logged for these).
+
+    .. versionadded:: 1.8
+    """
+    import passlib.utils.handlers as uh
+    cache = orig = uh.selftest_cache
+    if cache_path is not None:
+        cache = uh.SelfTestCache(cache_path)
+    uh.selftest_cache = cache
+    try:
+        result = {}
+        for hasher in names:
+            hasher = _resolve(hasher, "names")
+            if not hasattr(hasher, "get_backend"):
+                result[hasher.name] = BUILTIN
+                continue
+            try:
+                result[hasher.name] = hasher.get_backend()
+            except exc.MissingBackendError as err:
+                log.warning("warmup(): %s", err)
+                result[hasher.name] = None
+    finally:
+        uh.selftest_cache = orig
+    if cache_path is not None:
+        cache.save()
+    return result
+
 #------------------------------------------------------------------
 # os crypt
 #------------------------------------------------------------------
@@ -0,0 +1,132 @@
+"""tests for passlib.aio"""
+#=============================================================================
+# imports
+#=============================================================================
+from __future__ import with_statement
+# core
+import logging; log = logging.getLogger(__name__)
+import sys
+import time
+# site
+# pkg
+from passlib.context import CryptContext
+from passlib.tests.utils import TestCase
+# module
+
+#=============================================================================
+# AsyncCryptContext
+#=============================================================================
+class AsyncCryptContextTest(TestCase):
+    descriptionPrefix = "AsyncCryptContext"
+
+    def setUp(self):
+        super(AsyncCryptContextTest, self).setUp()
+        if sys.version_info < (3, 5):
+            raise self.skipTest("passlib.aio requires Python 3.5+")
+        import asyncio
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def create_context(self, **kwds):
+        from passlib.aio import AsyncCryptContext
+        cc = CryptContext(["sha256_crypt", "md5_crypt"], deprecated="auto",
+                          sha256_crypt__default_rounds=5000)
+        actx = AsyncCryptContext(cc, **kwds)
+        self.addCleanup(actx.close)
+        return actx
+
+    def test_basic(self):
+        """test hash(), verify(), verify_and_update()"""
+        actx = self.create_context()
+        cc = actx.context
+
+        hash = self.run_async(actx.hash("test"))
+        self.assertEqual(cc.identify(hash), "sha256_crypt")
+        self.assertTrue(self.run_async(actx.verify("test", hash)))
+        self.assertFalse(self.run_async(actx.verify("wrong", hash)))
+        self.assertFalse(self.run_async(actx.verify("test", None)))
+
+        # verify_and_update() should rehash deprecated hashes
+        old_hash = cc.handler("md5_crypt").hash("test")
+        self.assertEqual(self.run_async(actx.verify_and_update("test", hash)), (True, None))
+        self.assertEqual(self.run_async(actx.verify_and_update("wrong", old_hash)),
+                         (False, None))
+        ok, new_hash = self.run_async(actx.verify_and_update("test", old_hash))
+        self.assertTrue(ok)
+        self.assertEqual(cc.identify(new_hash), "sha256_crypt")
+        self.assertEqual(self.run_async(actx.verify_and_update("test", None)), (False, None))
+
+        # errors should be raised as normal
+        self.assertRaises(ValueError, self.run_async, actx.verify("test", "$9$abc"))
+
+    def test_max_pending(self):
+        """test max_pending limits concurrent calls"""
+        import asyncio
+        actx = self.create_context(max_workers=4, max_pending=2)
+        active = []
+        peak = []
+
+        def slow(value):
+            active.append(value)
+            peak.append(len(active))
+            time.sleep(.05)
+            active.remove(value)
+            return value
+
+        # NOTE: test avoids 'async def', so this module can be parsed under py2.
+        tasks = [self.loop.create_task(actx._run(None, slow, idx)) for idx in range(6)]
+        self.assertEqual(self.run_async(asyncio.gather(*tasks)), list(range(6)))
+        self.assertLessEqual(max(peak), 2)
+
+        self.assertRaises(ValueError, self.create_context, max_pending=0)
+
+    def test_category_executors(self):
+        """test category_executors routes calls"""
+        from concurrent.futures import ThreadPoolExecutor
+        import threading
+        admin_pool = ThreadPoolExecutor(1)
+        self.addCleanup(admin_pool.shutdown)
+        actx = self.create_context(category_executors=dict(admin=admin_pool))
+        self.assertIs(actx._get_executor("admin"), admin_pool)
+        self.assertIsNot(actx._get_executor("other"), admin_pool)
+        self.assertIsNot(actx._get_executor(None), admin_pool)
+
+        get_name = lambda: threading.current_thread().name
+        admin_thread = self.run_async(actx._run("admin", get_name))
+        self.assertEqual(self.run_async(actx._run("admin", get_name)), admin_thread)
+
+        self.assertRaises(TypeError, self.create_context, executor="bad")
+        self.assertRaises(TypeError, self.create_context, category_executors=dict(admin=1))
+
+    def test_harden_verify(self):
+        """test harden_verify delays failed verify without blocking loop"""
+        actx = self.create_context()
+        cc = actx.context.copy(harden_verify=True)
+        actx.context = cc
+        cc.min_verify_time = .1
+        hash = cc.hash("test")
+
+        # schedule ticker which should keep running while verify() is delayed
+        ticks = []
+        handle = []
+        def tick():
+            ticks.append(1)
+            if len(ticks) < 100:
+                handle[:] = [self.loop.call_later(.01, tick)]
+        handle.append(self.loop.call_soon(tick))
+
+        start = time.time()
+        result = self.run_async(actx.verify("wrong", hash))
+        elapsed = time.time() - start
+        handle[0].cancel()
+        self.assertFalse(result)
+        self.assertGreaterEqual(elapsed, .09)
+        # loop should have kept running during delay
+        self.assertGreater(len(ticks), 3)
+
+#=============================================================================
+# eof
+#=============================================================================
@@ -356,10 +356,303 @@ class HtpasswdFileTest(TestCase):
         )
         self.assertEqual(ht.to_string(), target)
 
+    def test_14_check_password_cache(self):
+        """test check_password() cache"""
+        from passlib import apache as apache_mod
+        ht = apache.HtpasswdFile.from_string(self.sample_01)
+        self.assertIs(ht.cache_stats, None)
+        self.assertRaises(ValueError, apache.HtpasswdFile, cache_ttl=-1)
+        self.assertRaises(ValueError, apache.HtpasswdFile, cache_ttl=10, cache_size=0)
+
+        now = [1000.0]
+        self.patchAttr(apache_mod, "timer", lambda: now[0])
+        path = self.mktemp()
+        set_file(path, self.sample_01)
+        backdate_file_mtime(path, 5)
+        ht = apache.HtpasswdFile(path, cache_ttl=10, cache_size=2)
+        cache = ht._check_cache
+
+        # count calls to context.verify_and_update()
+        calls = []
+        orig = ht.context.verify_and_update
+        def verify_and_update(secret, hash):
+            calls.append(secret)
+            return orig(secret, hash)
+        self.patchAttr(ht.context, "verify_and_update", verify_and_update)
+
+        # successful checks are cached; failed checks & unknown users aren't
+        self.assertTrue(ht.check_password("user1", "pass1"))
+        self.assertTrue(ht.check_password("user1", "pass1"))
+        self.assertFalse(ht.check_password("user1", "pass2"))
+        self.assertFalse(ht.check_password("user1", "pass2"))
+        self.assertIs(ht.check_password("user9", "pass9"), None)
+        self.assertEqual(calls, [b"pass1", b"pass2", b"pass2"])
+        self.assertEqual(ht.cache_stats, (1, 3))
+
+        # cache shouldn't contain password or hash
+        for user, entry in cache._entries.items():
+            self.assertNotIn(b"pass1", entry[1])
+            self.assertNotIn(b"GPIWVUo8sQ", entry[1])
+
+        # ttl expiration
+        now[0] += 11
+        del calls[:]
+        self.assertTrue(ht.check_password("user1", "pass1"))
+        self.assertTrue(ht.check_password("user1", "pass1"))
+        self.assertEqual(calls, [b"pass1"])
+
+        # max size eviction
+        self.assertTrue(ht.check_password("user2", "pass2"))
+        self.assertTrue(ht.check_password("user3", "pass3"))
+        self.assertEqual(len(cache), 2)
+        del calls[:]
+        self.assertTrue(ht.check_password("user1", "pass1"))
+        self.assertEqual(calls, [b"pass1"])
+
+        # cache hits should refresh user's position in eviction order
+        cache.clear()
+        self.assertTrue(ht.check_password("user1", "pass1"))
+        self.assertTrue(ht.check_password("user2", "pass2"))
+        self.assertTrue(ht.check_password("user1", "pass1"))
+        self.assertTrue(ht.check_password("user3", "pass3"))
+        self.assertEqual(cache._entries.keys(), [b"user1", b"user3"])
+        del calls[:]
+        self.assertTrue(ht.check_password("user1", "pass1"))
+        self.assertEqual(calls, [])
+
+        # expired entries should be discarded on lookup
+        now[0] += 11
+        self.assertFalse(ht.check_password("user3", "wrong"))
+        self.assertEqual(cache._entries.keys(), [b"user1"])
+
+        # set_password(), set_hash() & delete() invalidate user's entry
+        del calls[:]
+        ht.set_password("user1", "pass1x")
+        self.assertFalse(ht.check_password("user1", "pass1"))
+        self.assertTrue(ht.check_password("user1", "pass1x"))
+        ht.set_hash("user1", "pass1y")
+        self.assertFalse(ht.check_password("user1", "pass1x"))
+        self.assertTrue(ht.check_password("user1", "pass1y"))
+        self.assertTrue(ht.check_password("user1", "pass1y"))
+        self.assertEqual(len(calls), 4)
+        ht.delete("user1")
+        self.assertIs(ht.check_password("user1", "pass1y"), None)
+        self.assertNotIn(b"user1", cache._entries)
+
+        # load_if_changed() clears cache
+        self.assertTrue(ht.check_password("user3", "pass3"))
+        self.assertEqual(len(cache), 1)
+        self.assertFalse(ht.load_if_changed())
+        self.assertEqual(len(cache), 1)
+        set_file(path, self.sample_02)
+        self.assertTrue(ht.load_if_changed())
+        self.assertEqual(len(cache), 0)
+
+    def test_15_mmap(self):
+        """test use_mmap=True"""
+        path = self.mktemp()
+
+        # should render the same as regular loader
+        for data in [self.sample_01, self.sample_dup, b"",
+                     b"\n# comment\nuser1:pass1\n\n  \n# trailing\n\n",
+                     b"user1:pass1\n\n\n", b"user1:pass1"]:
+            set_file(path, data)
+            ht = apache.HtpasswdFile(path, use_mmap=True)
+            self.assertIsInstance(ht._records, apache._MappedRecords)
+            self.assertEqual(ht.to_string(), apache.HtpasswdFile.from_string(data).to_string())
+
+        # track which byte ranges get indexed
+        calls = []
+        orig = apache._MappedRecords._index_lines
+        def _index_lines(self, data, start, stop):
+            calls.append((start, stop))
+            return orig(self, data, start, stop)
+        self.patchAttr(apache._MappedRecords, "_index_lines", _index_lines)
+
+        set_file(path, self.sample_01)
+        backdate_file_mtime(path, 5)
+        ht = apache.HtpasswdFile(path, use_mmap=True)
+        self.assertEqual(calls, [(0, len(self.sample_01))])
+        self.assertEqual(sorted(ht.users()), ["user1", "user2", "user3", "user4"])
+        self.assertEqual(ht.get_hash("user4"), b"pass4")
+        self.assertIs(ht.get_hash("user5"), None)
+        self.assertTrue(ht.check_password("user4", "pass4"))
+
+        # local changes are kept in overlay
+        ht.set_hash("user2", "pass2x")
+        ht.delete("user1")
+        ht.set_hash("user5", "pass5")
+        self.assertEqual(len(ht._records), 4)
+        self.assertEqual(ht.to_string(), self.sample_03.replace(
+            b"user1:$apr1$t4tc7jTh$GPIWVUo8sQKJlUdV8V5vu0\n", b""))
+        ht.set_hash("user1", "pass1")
+        self.assertEqual(sorted(ht.users()), ["user1", "user2", "user3", "user4", "user5"])
+        self.assertTrue(ht.to_string().endswith(b"user5:pass5\nuser1:pass1\n"))
+
+        # appending to file should only index new lines (discarding local changes),
+        # updating existing index in place
+        del calls[:]
+        records = ht._records
+        with open(path, "ab") as fh:
+            fh.write(b"user6:pass6\nuser4:pass4x\n")
+        self.assertTrue(ht.load_if_changed())
+        size = len(self.sample_01)
+        self.assertEqual(calls, [(size, size + 25)])
+        self.assertIs(ht._records, records)
+        self.assertEqual(sorted(ht.users()), ["user1", "user2", "user3", "user4", "user6"])
+
+        # if appended lines fail to parse, index should be left unchanged
+        with open(path, "ab") as fh:
+            fh.write(b"user7:pass7\nbad line\n")
+        self.assertRaises(ValueError, ht.load_if_changed)
+        self.assertEqual(sorted(ht.users()), ["user1", "user2", "user3", "user4", "user6"])
+        set_file(path, get_file(path)[:-len(b"user7:pass7\nbad line\n")])
+        backdate_file_mtime(path, 5)
+        self.assertTrue(ht.load_if_changed())
+        self.assertEqual(ht.get_hash("user4"), b"pass4")
+        self.assertEqual(ht.get_hash("user6"), b"pass6")
+        self.assertEqual(ht.to_string(), get_file(path))
+
+        # rewriting file should trigger full reload
+        del calls[:]
+        backdate_file_mtime(path, 5)
+        set_file(path, self.sample_02 + b"user6:pass6\n")
+        self.assertTrue(ht.load_if_changed())
+        self.assertEqual(calls, [(0, len(self.sample_02) + 12)])
+        self.assertEqual(sorted(ht.users()), ["user3", "user4", "user6"])
+
+        # lookups should detect if file was rewritten in-place
+        backdate_file_mtime(path, 5)
+        set_file(path, self.sample_02.replace(b"user3", b"userX") + b"user6:pass6\n")
+        self.assertRaises(RuntimeError, ht.get_hash, "user3")
+        self.assertEqual(ht.get_hash("user4"), b"pass4")
+        self.assertTrue(ht.load_if_changed())
+        self.assertIs(ht.get_hash("user3"), None)
+
+        # save should replace file, and remap it
+        del calls[:]
+        ht.set_hash("user7", "pass7")
+        ht.save()
+        self.assertEqual(calls, [(0, len(get_file(path)))])
+        self.assertEqual(ht.get_hash("user7"), b"pass7")
+        self.assertFalse(ht._records._overlay)
+        self.assertFalse(ht.load_if_changed())
+        self.assertEqual(get_file(path), ht.to_string())
+
+        # saving to another path should write copy, but keep mapping original file
+        del calls[:]
+        ht.set_hash("user8", "pass8")
+        records = ht._records
+        path2 = self.mktemp()
+        ht.save(path2)
+        self.assertEqual(calls, [])
+        self.assertIs(ht._records, records)
+        self.assertEqual(get_file(path2), ht.to_string())
+        self.assertNotIn(b"user8", get_file(path))
+        self.assertEqual(ht.get_hash("user8"), b"pass8")
+        ht.set_hash("user9", "pass9")
+        self.assertNotIn(b"user9", get_file(path2))
+
+    def test_16_save_append(self):
+        """test save_mode='append'"""
+        self.assertRaises(ValueError, apache.HtpasswdFile, save_mode="xxx")
+
+        # track how file gets written
+        calls = []
+        orig = apache._CommonFile._replace_file
+        def _replace_file(self, path, close=None):
+            calls.append("replace")
+            return orig(self, path, close)
+        self.patchAttr(apache._CommonFile, "_replace_file", _replace_file)
+
+        path = self.mktemp()
+        set_file(path, self.sample_01.rstrip())
+        os.chmod(path, 0o640)
+        backdate_file_mtime(path, 10)
+        ht = apache.HtpasswdFile(path, save_mode="append", autosave=True)
+
+        # new users should be appended
+        ht.set_hash("user5", "pass5")
+        self.assertEqual(calls, [])
+        self.assertEqual(get_file(path), self.sample_01 + b"user5:pass5\n")
+        self.assertEqual(ht.to_string(), get_file(path))
+
+        # changing existing user should rewrite file, preserving permissions
+        ht.set_hash("user5", "pass5x")
+        self.assertEqual(calls, ["replace"])
+        self.assertEqual(get_file(path), self.sample_01 + b"user5:pass5x\n")
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o640)
+        self.assertEqual([name for name in os.listdir(os.path.dirname(path))
+                          if name.startswith(os.path.basename(path) + ".")], [])
+
+        # deleting existing user should rewrite file
+        del calls[:]
+        ht.delete("user1")
+        self.assertEqual(calls, ["replace"])
+        self.assertEqual(get_file(path), self.sample_01.replace(
+            b"user1:$apr1$t4tc7jTh$GPIWVUo8sQKJlUdV8V5vu0\n", b"") + b"user5:pass5x\n")
+
+        # file changed by someone else -- should rewrite file
+        del calls[:]
+        backdate_file_mtime(path, 5)
+        ht.set_hash("user7", "pass7")
+        self.assertEqual(calls, ["replace"])
+        self.assertEqual(get_file(path), ht.to_string())
+
+        # batch() should defer autosave till exit;
+        # and changing users added within batch shouldn't require rewrite
+        del calls[:]
+        with ht.batch():
+            with ht.batch():
+                for idx in irange(10, 20):
+                    ht.set_hash("user%d" % idx, "pass%d" % idx)
+                ht.set_hash("user11", "pass11x")
+                ht.delete("user12")
+            self.assertNotIn(b"user10:", get_file(path))
+        self.assertEqual(calls, [])
+        self.assertEqual(get_file(path), ht.to_string())
+        self.assertIn(b"user11:pass11x\nuser13:pass13\n", get_file(path))
+
+        with ht.batch():
+            ht.set_hash("user2", "pass2x")
+            ht.set_hash("user20", "pass20")
+        self.assertEqual(calls, ["replace"])
+        self.assertEqual(get_file(path), ht.to_string())
+
+        # batch() should save even if error occurs
+        def helper():
+            with ht.batch():
+                ht.set_hash("user30", "pass30")
+                raise ValueError
+        self.assertRaises(ValueError, helper)
+        self.assertEqual(get_file(path), ht.to_string())
+        self.assertTrue(get_file(path).endswith(b"user30:pass30\n"))
+
+        # batch() shouldn't save if nothing changed, or autosave not enabled
+        ht.autosave = False
+        with ht.batch():
+            ht.set_hash("user31", "pass31")
+        self.assertNotIn(b"user31", get_file(path))
+
     #===================================================================
     # eoc
     #===================================================================
 
+class _MmapTestMixin(object):
+    """mixin which defaults use_mmap=True"""
+
+    def setUp(self):
+        super(_MmapTestMixin, self).setUp()
+        orig = apache._CommonFile.__init__
+        def __init__(self, *args, **kwds):
+            kwds.setdefault("use_mmap", True)
+            orig(self, *args, **kwds)
+        self.patchAttr(apache._CommonFile, "__init__", __init__)
+
+class HtpasswdFileMmapTest(_MmapTestMixin, HtpasswdFileTest):
+    """test HtpasswdFile class w/ use_mmap=True"""
+    descriptionPrefix = "HtpasswdFile (use_mmap)"
+
 #=============================================================================
 # htdigest
 #=============================================================================
@@ -598,6 +891,10 @@ class HtdigestFileTest(TestCase):
     # eoc
     #===================================================================
 
+class HtdigestFileMmapTest(_MmapTestMixin, HtdigestFileTest):
+    """test HtdigestFile class w/ use_mmap=True"""
+    descriptionPrefix = "HtdigestFile (use_mmap)"
+
 #=============================================================================
 # eof
 #=============================================================================
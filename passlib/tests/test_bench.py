@@ -0,0 +1,185 @@
+"""tests for passlib.bench"""
+#=============================================================================
+# imports
+#=============================================================================
+from __future__ import with_statement
+# core
+import json
+import logging; log = logging.getLogger(__name__)
+# site
+# pkg
+from passlib import bench
+from passlib.bench import BenchResults, compare_results, load_results, measure, run_benchmarks
+from passlib.bench.__main__ import main
+from passlib.registry import get_crypt_handler
+from passlib.tests.utils import TestCase
+# module
+
+#=============================================================================
+# helpers
+#=============================================================================
+def _make_results(**ops):
+    """create BenchResults from id -> ops/sec keywords"""
+    results = {}
+    for key, value in ops.items():
+        results[key.replace("__", ":")] = dict(ops_per_sec=value, p50=None, p99=None)
+    return BenchResults(results)
+
+#=============================================================================
+# measurement
+#=============================================================================
+class MeasureTest(TestCase):
+    descriptionPrefix = "passlib.bench"
+
+    def test_measure(self):
+        """test measure()"""
+        calls = []
+        result = measure(lambda: calls.append(1), duration=.01)
+        # warmup & batch-sizing calls aren't counted
+        self.assertEqual(result.calls, len(calls) - 2)
+        self.assertGreater(result.calls, 10)
+        self.assertGreater(result.ops_per_sec, 0)
+        self.assertLessEqual(result.p50, result.p99)
+
+    def test_measure_min_calls(self):
+        """test measure() honors min_calls for slow functions"""
+        import time
+        result = measure(lambda: time.sleep(.002), duration=.001, min_calls=3)
+        self.assertEqual(result.calls, 3)
+        self.assertGreaterEqual(result.p50, .002)
+
+    def test_measure_scaling(self):
+        """test measure_scaling()"""
+        self.require_TEST_MODE("full")
+        results = bench.measure_scaling("md5_crypt", "builtin", workers=[1, 2], duration=.05)
+        self.assertEqual([row[0] for row in results], [1, 2])
+        self.assertEqual(results[0][2], 1.0)
+        for count, ops_per_sec, efficiency in results:
+            self.assertGreater(ops_per_sec, 0)
+
+#=============================================================================
+# runner
+#=============================================================================
+class RunBenchmarksTest(TestCase):
+    descriptionPrefix = "passlib.bench"
+
+    def test_run(self):
+        """test run_benchmarks()"""
+        handler = get_crypt_handler("md5_crypt")
+        orig_backend = handler.get_backend()
+        progress = []
+        report = run_benchmarks(schemes=["md5_crypt", "sha256_crypt", "msdcc", "plaintext",
+                                         "no_such_hash"],
+                                rounds="min", duration=.01, scaling_schemes=[],
+                                progress=lambda key, info: progress.append(key))
+        results = report.results
+
+        # handler benchmarks, for each backend
+        for backend in ["builtin"] + (["os_crypt"] if handler.has_backend("os_crypt") else []):
+            for op in ["hash", "verify"]:
+                info = results["handler:md5_crypt:%s:%s" % (backend, op)]
+                self.assertEqual(info['backend'], backend)
+                self.assertGreater(info['ops_per_sec'], 0)
+        self.assertEqual(handler.get_backend(), orig_backend)
+        self.assertEqual(results["handler:sha256_crypt:builtin:hash"]['settings'],
+                         dict(rounds=1000))
+        self.assertIn("handler:msdcc:default:verify", results)
+        self.assertIn("handler:plaintext:default:verify", results)
+        self.assertIn("handler:no_such_hash", report.skipped)
+
+        # other benchmarks
+        for key in ["context:identify", "context:from_string", "utils:consteq",
+                    "totp:match", "totp:match_miss"]:
+            self.assertGreater(results[key]['ops_per_sec'], 0)
+
+        self.assertEqual(sorted(progress), sorted(list(results) + list(report.skipped)))
+        self.assertEqual(report.metadata['passlib_version'], bench.__version__)
+
+    def test_run_bad_args(self):
+        """test run_benchmarks() arg validation"""
+        self.assertRaises(ValueError, run_benchmarks, schemes=[], rounds="max")
+        self.assertRaises(ValueError, run_benchmarks, schemes=[], duration=0)
+
+    def test_scaling(self):
+        """test run_benchmarks() records scaling results"""
+        def measure_scaling(name, backend, settings, workers, duration):
+            self.assertEqual(settings, dict(rounds=1000))
+            return [(count, 100.0 * count, 1.0) for count in workers]
+        self.patchAttr(bench, "measure_scaling", measure_scaling)
+        report = run_benchmarks(schemes=[], rounds="min", scaling_schemes=["sha512_crypt"],
+                                workers=[1, 3], context=False, totp=False)
+        backend = get_crypt_handler("sha512_crypt").get_backend()
+        info = report.results["scaling:sha512_crypt:%s:3" % backend]
+        self.assertEqual(info['ops_per_sec'], 300)
+        self.assertEqual(info['workers'], 3)
+        self.assertEqual(info['settings'], dict(rounds=1000))
+        self.assertEqual(len(report.results), 2)
+
+    def test_default_workers(self):
+        """test _default_workers()"""
+        import multiprocessing
+        self.patchAttr(multiprocessing, "cpu_count", lambda: 6)
+        self.assertEqual(bench._default_workers(), [1, 2, 4, 6])
+        self.patchAttr(multiprocessing, "cpu_count", lambda: 1)
+        self.assertEqual(bench._default_workers(), [1])
+
+    def test_json(self):
+        """test BenchResults save / load"""
+        report = _make_results(context__identify=1000.0)
+        report.skipped["handler:bcrypt"] = "MissingBackendError: ..."
+        path = self.mktemp()
+        report.save(path)
+        other = load_results(path)
+        self.assertEqual(other.results, report.results)
+        self.assertEqual(other.skipped, report.skipped)
+        self.assertEqual(other.metadata, report.metadata)
+
+        # unknown format
+        with open(path, "w") as fh:
+            json.dump(dict(format=999, results={}), fh)
+        self.assertRaises(ValueError, load_results, path)
+
+#=============================================================================
+# comparison
+#=============================================================================
+class CompareResultsTest(TestCase):
+    descriptionPrefix = "passlib.bench"
+
+    def test_compare(self):
+        """test compare_results()"""
+        old = _make_results(a=100.0, b=100.0, c=100.0, d=100.0, e=100.0)
+        new = _make_results(a=95.0, b=80.0, c=130.0, d=100.0, f=10.0)
+        new.results['d']['settings'] = dict(rounds=2000)
+        statuses = dict((comp.id, comp.status) for comp in compare_results(old, new))
+        self.assertEqual(statuses, dict(a="ok", b="regression", c="improvement",
+                                        d="settings-changed", e="removed", f="added"))
+
+        comps = compare_results(old, new, threshold=.01)
+        self.assertEqual([comp.id for comp in comps], list("abcdef"))
+        self.assertEqual(comps[0].status, "regression")
+        self.assertAlmostEqual(comps[0].change, -.05)
+        self.assertEqual((comps[0].old, comps[0].new), (100.0, 95.0))
+
+        self.assertRaises(ValueError, compare_results, old, new, threshold=0)
+
+    def test_cli(self):
+        """test command line interface"""
+        old_path = self.mktemp()
+        new_path = self.mktemp()
+        _make_results(a=100.0, b=100.0).save(old_path)
+        _make_results(a=100.0, b=50.0).save(new_path)
+        self.assertEqual(main("compare", old_path, old_path), 0)
+        self.assertEqual(main("compare", old_path, new_path), 1)
+        self.assertEqual(main("compare", "--threshold", "60", old_path, new_path), 0)
+
+        # run subcommand
+        self.assertEqual(main("run", "-q", "--schemes", "md5_crypt", "--rounds", "min",
+                              "--duration", ".01", "--scaling", "", "--no-context",
+                              "--no-totp", "-o", new_path), 0)
+        results = load_results(new_path).results
+        self.assertIn("handler:md5_crypt:builtin:hash", results)
+        self.assertNotIn("context:identify", results)
+
+#=============================================================================
+# eof
+#=============================================================================
@@ -868,6 +868,64 @@ sha512_crypt__min_rounds = 45000
         self.assertRegex(dump, r"# NOTE: the 'unsalted_test_hash' handler\(s\)"
                                r" are not registered with Passlib")
 
+    def test_36_snapshot(self):
+        """test to_snapshot() / from_snapshot() methods"""
+        # round trip should reproduce config
+        ctx = CryptContext(**self.sample_1_dict)
+        ctx.update(admin__context__deprecated="auto",
+                   admin__bsdi_crypt__default_rounds=25003)
+        snapshot = ctx.to_snapshot()
+        self.assertIsInstance(snapshot, str)
+        ctx2 = CryptContext.from_snapshot(snapshot)
+        self.assertEqual(ctx2.to_dict(), ctx.to_dict())
+        self.assertEqual(ctx2.to_string(), ctx.to_string())
+        self.assertEqual(ctx2.to_snapshot(), snapshot)
+        self.assertEqual(CryptContext.from_snapshot(snapshot.encode("ascii")).to_dict(),
+                         ctx.to_dict())
+
+        # records should be created on demand, and match the original's
+        records = ctx2._config._records
+        self.assertEqual(len(records), 0)
+        for scheme in self.sample_1_schemes:
+            for category in [None, "admin"]:
+                self.assertEqual(ctx2.handler(scheme, category).__dict__.get("deprecated"),
+                                 ctx.handler(scheme, category).__dict__.get("deprecated"))
+        self.assertEqual(ctx2.handler("bsdi_crypt", "admin").default_rounds, 25003)
+        self.assertEqual(ctx2.handler("bsdi_crypt").default_rounds, 25001)
+        self.assertTrue(handler_derived_from(ctx2.handler("bsdi_crypt"), hash.bsdi_crypt))
+        self.assertEqual(ctx2.default_scheme("admin"), "md5_crypt")
+
+        # hash api should work as usual
+        hash1 = ctx.hash("test", scheme="md5_crypt")
+        self.assertTrue(ctx2.verify("test", hash1))
+        self.assertFalse(ctx2.needs_update(hash1))
+        self.assertTrue(ctx2.needs_update(ctx.hash("test", scheme="des_crypt"),
+                                          category="admin"))
+        self.assertEqual(ctx2.identify(hash1), "md5_crypt")
+        self.assertRaises(KeyError, ctx2.handler, "sha256_crypt")
+
+        # empty context
+        ctx3 = CryptContext.from_snapshot(CryptContext().to_snapshot())
+        self.assertEqual(ctx3.schemes(), ())
+        self.assertRaises(KeyError, ctx3.hash, "test")
+
+        # unregistered handlers can't be snapshotted
+        from passlib.tests.test_utils_handlers import UnsaltedHash
+        self.assertRaises(ValueError, CryptContext([UnsaltedHash]).to_snapshot)
+
+        # bad input
+        self.assertRaises(TypeError, CryptContext.from_snapshot, None)
+        self.assertRaises(ValueError, CryptContext.from_snapshot, "[passlib]")
+        self.assertRaises(ValueError, CryptContext.from_snapshot, "{}")
+        self.assertRaises(ValueError, CryptContext.from_snapshot,
+                          snapshot.replace('"records":[', '"records":[1,'))
+
+        # snapshot from another version should be rejected
+        import passlib
+        old = snapshot.replace('"passlib":"%s"' % passlib.__version__, '"passlib":"0.0"')
+        self.assertNotEqual(old, snapshot)
+        self.assertRaises(ValueError, CryptContext.from_snapshot, old)
+
     #===================================================================
     # password hash api
     #===================================================================
@@ -1093,6 +1151,54 @@ sha512_crypt__min_rounds = 45000
         # bad category values
         self.assertRaises(TypeError, cc.identify, None, category=1)
 
+    def test_44_identify_index(self):
+        """test identify() prefix index"""
+        # NOTE: des_crypt & plaintext have no prefix, so are checked via identify();
+        #       the rest should all be resolved via the prefix index.
+        cc = CryptContext(["sha256_crypt", "des_crypt", "bcrypt", "md5_crypt",
+                           "plaintext"],
+                          admin__sha256_crypt__default_rounds=5000)
+        stats = cc.identify_stats()
+        self.assertEqual(sorted(stats, key=str), [None, "admin"])
+        self.assertEqual(stats[None]['fallback_schemes'], ["des_crypt", "plaintext"])
+
+        # check prefix matches
+        self.assertEqual(cc.identify("$5$rounds=5000$abc$"), "sha256_crypt")
+        self.assertEqual(cc.identify(b"$2b$12$abc"), "bcrypt")
+        self.assertEqual(cc.identify("$2y$12$abc", category="admin"), "bcrypt")
+
+        # earlier prefix-less scheme should still win over later prefix match
+        des_hash = hash.des_crypt.hash("test")
+        self.assertEqual(cc.identify(des_hash), "des_crypt")
+
+        # later prefix-less scheme should lose to earlier prefix match,
+        # and catch everything else.
+        self.assertEqual(cc.identify("$1$abc$"), "md5_crypt")
+        self.assertEqual(cc.identify("$9$abc$"), "plaintext")
+
+        # check stats
+        stats = cc.identify_stats()
+        self.assertEqual(stats[None]['indexed'], 3)
+        self.assertEqual(stats[None]['scanned'], 2)
+        self.assertEqual(stats[None]['unidentified'], 0)
+        self.assertEqual(stats["admin"]['indexed'], 1)
+
+        # check unidentified hashes are counted, and uncached categories are added
+        cc = CryptContext(["sha256_crypt", "md5_crypt"])
+        self.assertIs(cc.identify("$9$abc", category="other"), None)
+        self.assertRaises(ValueError, cc.identify, "", required=True)
+        stats = cc.identify_stats()
+        self.assertEqual(stats["other"]['unidentified'], 1)
+        self.assertEqual(stats[None]['unidentified'], 1)
+        self.assertEqual(stats[None]['fallback_schemes'], [])
+
+        # shared prefix -- first scheme listed wins
+        class dummy_prefix(uh.StaticHandler):
+            name = "dummy_prefix"
+            ident = u("$1$")
+        cc = CryptContext([dummy_prefix, "md5_crypt"])
+        self.assertEqual(cc.identify("$1$abc$"), "dummy_prefix")
+
     def test_45_verify(self):
         """test verify() scheme kwd"""
         handlers = ["md5_crypt", "des_crypt", "bsdi_crypt"]
@@ -1243,6 +1349,17 @@ sha512_crypt__min_rounds = 45000
         self.assertTrue(ok)
         self.assertIs(new_hash, None)
 
+        # stored hash should only be parsed once
+        record = cc.handler("sha256_crypt")
+        calls = []
+        orig = record.from_string.__func__
+        def from_string(cls, hash, **kwds):
+            calls.append(hash)
+            return orig(cls, hash, **kwds)
+        self.patchAttr(record, "from_string", classmethod(from_string))
+        self.assertEqual(cc.verify_and_update("password", h2), (True, None))
+        self.assertEqual(calls, [h2])
+
         #--------------------------------------------------------------
         # border cases
         #--------------------------------------------------------------
@@ -1273,6 +1390,85 @@ sha512_crypt__min_rounds = 45000
         # bad category values
         self.assertRaises(TypeError, cc.verify_and_update, 'secret', refhash, category=1)
 
+    def test_47_observers(self):
+        """test add_observer() / remove_observer()"""
+        cc = CryptContext(**self.sample_4_dict)
+        h1 = cc.handler("des_crypt").hash("password")
+        h2 = cc.handler("sha256_crypt").hash("password")
+
+        events = []
+        def observer(operation, scheme, category, elapsed, outcome):
+            self.assertGreaterEqual(elapsed, 0)
+            events.append((operation, scheme, category, outcome))
+        cc.add_observer(observer)
+
+        # hash()
+        cc.hash("password", category="admin")
+        self.assertEqual(events, [("hash", "sha256_crypt", "admin", "ok")])
+        del events[:]
+
+        # verify()
+        self.assertTrue(cc.verify("password", h1))
+        self.assertFalse(cc.verify("wrong", h2))
+        self.assertFalse(cc.verify("password", None))
+        self.assertRaises(ValueError, cc.verify, "password", "$9$unknown")
+        self.assertRaises(ValueError, cc.verify, "password", h2[:-3])
+        self.assertEqual(events, [
+            ("verify", "des_crypt", None, "valid"),
+            ("verify", "sha256_crypt", None, "invalid"),
+            ("verify", None, None, "missing"),
+            ("verify", None, None, "unidentified"),
+            ("verify", "sha256_crypt", None, "error"),
+        ])
+        del events[:]
+
+        # verify_and_update() -- rehash shouldn't report separate hash() event
+        self.assertEqual(cc.verify_and_update("password", h2), (True, None))
+        self.assertEqual(cc.verify_and_update("wrong", h1), (False, None))
+        self.assertTrue(cc.verify_and_update("password", h1)[1])
+        self.assertEqual(cc.verify_and_update("password", None), (False, None))
+        self.assertEqual(events, [
+            ("verify_and_update", "sha256_crypt", None, "valid"),
+            ("verify_and_update", "des_crypt", None, "invalid"),
+            ("verify_and_update", "des_crypt", None, "rehash"),
+            ("verify_and_update", None, None, "missing"),
+        ])
+        del events[:]
+
+        # verify_and_update() -- elapsed time shouldn't include rehash
+        import passlib.context as mod
+        now = [0]
+        def fake_timer():
+            now[0] += 1
+            return now[0]
+        self.patchAttr(mod, "timer", fake_timer)
+        timings = []
+        cc.add_observer(lambda *args: timings.append(args[3]))
+        self.assertTrue(cc.verify_and_update("password", h1)[1])
+        self.assertEqual(timings, [1])
+        cc.remove_observer(cc._observers[-1])
+        del events[:]
+
+        # errors in observers should be logged & ignored
+        def bad_observer(*args):
+            raise RuntimeError("bad observer")
+        cc.add_observer(bad_observer)
+        logged = []
+        self.patchAttr(mod.log, "exception", lambda *args: logged.append(args))
+        self.assertTrue(cc.verify("password", h1))
+        self.assertEqual(len(events), 1)
+        self.assertEqual(logged, [("error in CryptContext observer %r", bad_observer)])
+
+        # observers aren't copied, and can be removed
+        self.assertIs(cc.copy()._observers, None)
+        cc.remove_observer(bad_observer)
+        cc.remove_observer(observer)
+        self.assertIs(cc._observers, None)
+        cc.verify("password", h1)
+        self.assertEqual(len(events), 1)
+        self.assertRaises(ValueError, cc.remove_observer, observer)
+        self.assertRaises(TypeError, cc.add_observer, 1)
+
     def test_48_context_kwds(self):
         """hash(), verify(), and verify_and_update() -- discard unused context keywords"""
 
@@ -1345,6 +1541,65 @@ sha512_crypt__min_rounds = 45000
         self.assertEqual(cc3.verify_and_update("stub", des_hash, user="root"),
                          (True, pg_root_hash))
 
+    def test_49_batch(self):
+        """hash_many(), verify_many(), verify_and_update_many()"""
+        cc = CryptContext(**self.sample_4_dict)
+        h1 = cc.handler("des_crypt").hash("password")
+        h2 = cc.handler("sha256_crypt").hash("password")
+        h3 = cc.handler("md5_crypt").hash("test")
+
+        pairs = [("password", h1), ("wrong", h2), ("password", h2), ("test", h3),
+                 ("test", None), ("password", h1)]
+        for executor in ["thread", "process"]:
+            # verify_many() should match verify(), in order
+            result = list(cc.verify_many(pairs, executor=executor, max_workers=2,
+                                         chunksize=1))
+            self.assertEqual(result, [True, False, True, True, False, True])
+
+            # verify_and_update_many() should match verify_and_update()
+            result = list(cc.verify_and_update_many(pairs, executor=executor,
+                                                    max_workers=2))
+            self.assertEqual([item[0] for item in result],
+                             [True, False, True, True, False, True])
+            self.assertEqual([item[1] is None for item in result],
+                             [False, True, True, True, True, False])
+            self.assertEqual(cc.identify(result[0][1]), "sha256_crypt")
+
+            # hash_many() should return hashes in order
+            secrets = ["a", "b", "c"]
+            result = list(cc.hash_many(secrets, executor=executor, max_workers=2))
+            self.assertEqual(len(result), 3)
+            for secret, hash in zip(secrets, result):
+                self.assertEqual(cc.identify(hash), "sha256_crypt")
+                self.assertTrue(cc.verify(secret, hash))
+
+        # should accept caller-provided executor
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(2) as executor:
+            result = list(cc.verify_many(pairs[:3], executor=executor))
+            self.assertEqual(result, [True, False, True])
+
+        # errors should be raised when the item is reached
+        gen = cc.verify_many([("password", h1), ("password", "$9$unknown")],
+                             executor="thread")
+        self.assertTrue(next(gen))
+        self.assertRaises(ValueError, next, gen)
+
+        # bad executor values
+        self.assertRaises(ValueError, list, cc.verify_many(pairs, executor="fake"))
+        self.assertRaises(TypeError, list, cc.verify_many(pairs, executor=1))
+
+        # process pool should require registered handlers
+        class dummy_batch(uh.StaticHandler):
+            name = "dummy_batch"
+            _hash_prefix = u("@")
+            def _calc_checksum(self, secret):
+                return to_unicode(secret)
+        cc = CryptContext([dummy_batch])
+        self.assertEqual(list(cc.verify_many([("a", "@a"), ("b", "@a")])), [True, False])
+        self.assertRaises(ValueError, list, cc.verify_many([("a", "@a")],
+                                                           executor="process"))
+
     #===================================================================
     # rounds options
     #===================================================================
@@ -1681,6 +1936,26 @@ sha512_crypt__min_rounds = 45000
         """harden_verify -- min_verify_time honored by verify_and_update()"""
         self.test_harden_verify_w_verify(verify_and_update=True)
 
+    def test_warmup(self):
+        """warmup()"""
+        calls = []
+        self.patchAttr(CryptContext, "_calc_min_verify_time",
+                       lambda self: calls.append(1) or 0.5)
+
+        # should load backends, and skip min_verify_time w/o harden_verify
+        ctx = CryptContext(schemes=["md5_crypt", "hex_md5"])
+        result = ctx.warmup()
+        self.assertEqual(result, dict(md5_crypt=hash.md5_crypt.get_backend(),
+                                      hex_md5="builtin"))
+        self.assertEqual(calls, [])
+
+        # should estimate min_verify_time w/ harden_verify
+        ctx.update(harden_verify=True)
+        ctx.warmup()
+        self.assertEqual(calls, [1])
+        self.assertEqual(ctx.min_verify_time, 0.5)
+        self.assertEqual(calls, [1])
+
     #===================================================================
     # feature tests
     #===================================================================
@@ -100,6 +100,33 @@ class _Common_MD4_Test(TestCase):
         self.assertEqual(h.hexdigest(), 'c5225580bfe176f6deeee33dee98732c')
 
 
+#------------------------------------------------------------------------
+# batch api
+#------------------------------------------------------------------------
+class MD4_Many_Test(TestCase):
+    descriptionPrefix = "passlib.crypto._md4.md4_many()"
+
+    def test_md4_many(self):
+        """md4_many()"""
+        from passlib.crypto import _md4
+        from passlib.crypto._md4 import md4, md4_many
+        from passlib.utils import getrandbytes
+        vectors = _Common_MD4_Test.vectors
+        inputs = [input for input, _ in vectors]
+        digests = [bascii_to_str(hexlify(digest)) for digest in md4_many(inputs)]
+        self.assertEqual(digests, [hex for _, hex in vectors])
+        self.assertEqual(md4_many([]), [])
+        self.assertEqual(md4_many(iter([b"abc"])), [md4(b"abc").digest()])
+        self.assertRaises(TypeError, md4_many, [b"abc", u("abc")])
+
+        # lane packing -- mix of messages padding out to 1, 2, & 3 blocks,
+        # with more than _MIN_LANES of each size.
+        self.assertGreater(20, _md4._MIN_LANES)
+        rng = self.getRandom()
+        inputs = [getrandbytes(rng, size)
+                  for size in list(range(0, 150, 2)) * 2]
+        self.assertEqual(md4_many(inputs), [md4(input).digest() for input in inputs])
+
 #------------------------------------------------------------------------
 # create subclasses to test various backends
 #------------------------------------------------------------------------
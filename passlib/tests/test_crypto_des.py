@@ -189,6 +189,39 @@ class DesTest(TestCase):
         # check invalid rounds
         self.assertRaises(ValueError, des_encrypt_int_block, 0, 0, 0, rounds=0)
 
+    def test_05_encrypt_int_blocks(self):
+        """des_encrypt_int_blocks()"""
+        from passlib.crypto import des
+        from passlib.crypto.des import des_encrypt_int_block, des_encrypt_int_blocks
+
+        # NOTE: run with default batch size, and with numpy (if present) forced for any size
+        for min_size in [des.batch_min_size, 1]:
+            self.patchAttr(des, "batch_min_size", min_size)
+
+            # run through test vectors
+            keys, plaintexts, correct = zip(*self.des_test_vectors)
+            salts = [0] * len(keys)
+            self.assertEqual(des_encrypt_int_blocks(keys, plaintexts, salts), list(correct))
+
+            # check salts & rounds match des_encrypt_int_block()
+            rng = self.getRandom()
+            keys = [rng.getrandbits(64) for _ in range(40)]
+            plaintexts = [rng.getrandbits(64) for _ in range(40)]
+            salts = [rng.getrandbits(24) for _ in range(40)]
+            self.assertEqual(des_encrypt_int_blocks(keys, plaintexts, salts, 5),
+                             [des_encrypt_int_block(key, plaintext, salt, 5)
+                              for key, plaintext, salt in zip(keys, plaintexts, salts)])
+            self.assertEqual(des_encrypt_int_blocks([], [], []), [])
+
+            # check invalid values
+            self.assertRaises(ValueError, des_encrypt_int_blocks, [0], [0, 0], [0])
+            self.assertRaises(TypeError, des_encrypt_int_blocks, [b'\x00'], [0], [0])
+            self.assertRaises(ValueError, des_encrypt_int_blocks, [-1], [0], [0])
+            self.assertRaises(TypeError, des_encrypt_int_blocks, [0], [b'\x00'], [0])
+            self.assertRaises(ValueError, des_encrypt_int_blocks, [0], [1<<64], [0])
+            self.assertRaises(ValueError, des_encrypt_int_blocks, [0], [0], [1<<24])
+            self.assertRaises(ValueError, des_encrypt_int_blocks, [0], [0], [0], rounds=0)
+
 #=============================================================================
 # eof
 #=============================================================================
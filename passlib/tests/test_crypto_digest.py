@@ -459,6 +459,41 @@ class Pbkdf2Test(TestCase):
             # XXX: only true as long as this is preferred over hexlify
             self.assertIn("builtin-unpack", PBKDF2_BACKENDS)
 
+    def test_pool(self):
+        """test builtin backend's process pool"""
+        from passlib.crypto import digest as digest_mod
+        from passlib.crypto.digest import lookup_hash
+        from passlib.utils import handlers as uh
+        for name in ["sha1", "sha512"]:
+            info = lookup_hash(name)
+            self.patchAttr(info, "supported_by_fastpbkdf2", False)
+            self.patchAttr(info, "supported_by_hashlib_pbkdf2", False)
+
+        # pool should be opt-in
+        self.assertIs(digest_mod.pbkdf2_pool_threshold, None)
+
+        # force pool use (even on single-cpu systems)
+        self.patchAttr(digest_mod, "pbkdf2_pool_threshold", 1)
+        pool = uh.BuiltinPool(size=2)
+        self.addCleanup(pool.shutdown)
+        self.patchAttr(uh, "builtin_pool", pool)
+        self.test_known()
+        self.assertTrue(pool._executor)
+
+        # long output split across workers
+        result = pbkdf2_hmac("sha1", b"password", b"salt", 3, 20 * 7 + 3)
+        self.assertEqual(len(result), 143)
+        self.patchAttr(digest_mod, "pbkdf2_pool_threshold", None)
+        self.assertEqual(pbkdf2_hmac("sha1", b"password", b"salt", 3, 143), result)
+
+        # pool falls back to serial if broken
+        self.patchAttr(digest_mod, "pbkdf2_pool_threshold", 1)
+        def bad_submit(*a, **k):
+            raise RuntimeError("pool broken")
+        self.patchAttr(pool._executor, "submit", bad_submit)
+        self.assertEqual(pbkdf2_hmac("sha1", b"password", b"salt", 3, 143), result)
+        self.assertIs(pool._executor, False)
+
     def test_border(self):
         """test border cases"""
         def helper(secret=b'password', salt=b'salt', rounds=1, keylen=None, digest="sha1"):
@@ -21,6 +21,7 @@ from passlib.crypto import scrypt as scrypt_mod
 __all__ = [
     "ScryptEngineTest",
     "BuiltinScryptTest",
+    "BuiltinArrayScryptTest",
     "FastScryptTest",
 ]
 
@@ -57,9 +58,13 @@ def seed_bytes(seed, count):
 class ScryptEngineTest(TestCase):
     descriptionPrefix = "passlib.crypto.scrypt._builtin"
 
+    def get_engine_class(self):
+        from passlib.crypto.scrypt._builtin import ScryptEngine
+        return ScryptEngine
+
     def test_smix(self):
         """smix()"""
-        from passlib.crypto.scrypt._builtin import ScryptEngine
+        ScryptEngine = self.get_engine_class()
         rng = self.getRandom()
 
         #-----------------------------------------------------------------------
@@ -95,7 +100,7 @@ class ScryptEngineTest(TestCase):
 
     def test_bmix(self):
         """bmix()"""
-        from passlib.crypto.scrypt._builtin import ScryptEngine
+        ScryptEngine = self.get_engine_class()
         rng = self.getRandom()
 
         # NOTE: bmix() call signature currently takes in list of 32*r uint32 elements,
@@ -285,10 +290,99 @@ class ScryptEngineTest(TestCase):
             """))
         self.assertEqual(salsa20(input), output)
 
+    def test_salsa_xor(self):
+        """salsa20_xor()"""
+        from passlib.crypto.scrypt._salsa import salsa20, salsa20_xor
+        rng = self.getRandom()
+        for _ in range(10):
+            x = [rng.randint(0, 0xffffffff) for _ in range(16)]
+            y = [rng.randint(0, 0xffffffff) for _ in range(16)]
+            self.assertEqual(salsa20_xor(x, y), salsa20([a ^ b for a, b in zip(x, y)]))
+
     #=============================================================================
     # eof
     #=============================================================================
 
+class ArrayScryptEngineTest(ScryptEngineTest):
+    descriptionPrefix = "passlib.crypto.scrypt._builtin_array"
+
+    def get_engine_class(self):
+        from passlib.crypto.scrypt._builtin_array import ArrayScryptEngine
+        return ArrayScryptEngine
+
+    def test_run(self):
+        """run() matches original engine"""
+        from passlib.crypto.scrypt._builtin import ScryptEngine
+        ArrayScryptEngine = self.get_engine_class()
+        rng = self.getRandom()
+        for _ in range(5):
+            secret = getrandbytes(rng, rng.randint(0, 32))
+            salt = getrandbytes(rng, rng.randint(0, 32))
+            n = 1 << rng.randint(1, 6)
+            r = rng.randint(1, 4)
+            p = rng.randint(1, 3)
+            self.assertEqual(ArrayScryptEngine.execute(secret, salt, n, r, p, 32),
+                             ScryptEngine.execute(secret, salt, n, r, p, 32))
+
+    def test_lane_pool(self):
+        """run() with p lanes dispatched to process pool"""
+        from passlib.crypto.scrypt._builtin import ScryptEngine
+        from passlib.utils import handlers as uh
+        ArrayScryptEngine = self.get_engine_class()
+        # pool should be opt-in
+        self.assertIs(ArrayScryptEngine.lane_pool_threshold, None)
+        self.patchAttr(ArrayScryptEngine, "lane_pool_threshold", 0)
+        pool = uh.BuiltinPool(size=2)
+        self.addCleanup(pool.shutdown)
+        self.patchAttr(uh, "builtin_pool", pool)
+        self.assertEqual(ArrayScryptEngine.execute(b"secret", b"salt", 16, 2, 3, 32),
+                         ScryptEngine.execute(b"secret", b"salt", 16, 2, 3, 32))
+        self.assertTrue(pool._executor)
+
+        # if pool is unavailable, should fall back to serial
+        pool._disable(RuntimeError("pool broken"))
+        self.assertIs(pool._get_executor(), None)
+        self.assertEqual(ArrayScryptEngine.execute(b"secret", b"salt", 16, 2, 3, 32),
+                         ScryptEngine.execute(b"secret", b"salt", 16, 2, 3, 32))
+
+    def test_max_v_bytes(self):
+        """smix() time / memory tradeoff when limited by max_v_bytes"""
+        from passlib.crypto.scrypt import _builtin_array
+        from passlib.crypto.scrypt._builtin import ScryptEngine
+        ArrayScryptEngine = self.get_engine_class()
+        get_interval = _builtin_array._get_v_interval
+
+        # interval should be smallest power of 2 which fits budget
+        self.assertEqual(get_interval(16, 128, None), 1)
+        self.assertEqual(get_interval(16, 128, 2048), 1)
+        self.assertEqual(get_interval(16, 128, 2047), 2)
+        self.assertEqual(get_interval(16, 128, 512), 4)
+        self.assertEqual(get_interval(16, 128, 0), 16)
+
+        # output should match original engine for all intervals
+        self.patchAttr(_builtin_array, "smix_stats", dict(_builtin_array.smix_stats))
+        stats = _builtin_array.smix_stats
+        rng = self.getRandom()
+        for limit in [None, 4096, 1024, 256, 0]:
+            self.patchAttr(_builtin_array, "max_v_bytes", limit)
+            for _ in range(3):
+                secret = getrandbytes(rng, rng.randint(0, 32))
+                salt = getrandbytes(rng, rng.randint(0, 32))
+                n = 1 << rng.randint(4, 6)
+                r = rng.randint(1, 3)
+                p = rng.randint(1, 2)
+                _builtin_array.reset_smix_stats()
+                self.assertEqual(ArrayScryptEngine.execute(secret, salt, n, r, p, 32),
+                                 ScryptEngine.execute(secret, salt, n, r, p, 32))
+                interval = get_interval(n, r << 7, limit)
+                self.assertEqual(stats['calls'], p)
+                self.assertEqual(stats['tradeoff_calls'], p if interval > 1 else 0)
+                self.assertEqual(stats['peak_v_bytes'], (n // interval) * (r << 7))
+                if limit is not None:
+                    self.assertLessEqual(stats['peak_v_bytes'], max(limit, r << 7))
+                if interval == 1:
+                    self.assertEqual(stats['recomputed_blocks'], 0)
+
 #=============================================================================
 # test scrypt
 #=============================================================================
@@ -367,7 +461,7 @@ class _CommonScryptTest(TestCase):
             if n >= 1024 and TEST_MODE(max="default"):
                 # skip large values unless we're running full test suite
                 continue
-            if n > 16384 and self.backend == "builtin":
+            if n > 16384 and self.backend.startswith("builtin"):
                 # skip largest vector for builtin, takes WAAY too long
                 # (46s under pypy, ~5m under cpython)
                 continue
@@ -576,6 +670,11 @@ class BuiltinScryptTest(_CommonScryptTest):
             raise self.skipTest("'scrypt' backend is present")
         self.assertRaises(exc.MissingBackendError, scrypt_mod._set_backend, 'scrypt')
 
+# NOTE: builtin_array has the same runtime constraints as builtin.
+@skipUnless(PYPY or TEST_MODE(min="default"), "skipped under current test mode")
+class BuiltinArrayScryptTest(BuiltinScryptTest):
+    backend = "builtin_array"
+
 def _can_import_scrypt():
     """check if scrypt package is importable"""
     try:
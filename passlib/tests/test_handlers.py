@@ -84,6 +84,12 @@ class apr_md5_crypt_test(HandlerCase):
 #=============================================================================
 # bigcrypt
 #=============================================================================
+def prepare_des_verify_many(self):
+    """HandlerCase.prepare_verify_many() hook for des_crypt family"""
+    from passlib.crypto import des
+    # force batch DES engine to be used (if numpy is present), even for a few secrets
+    self.patchAttr(des, "batch_min_size", 2)
+
 class bigcrypt_test(HandlerCase):
     handler = hash.bigcrypt
 
@@ -122,6 +128,8 @@ class bigcrypt_test(HandlerCase):
         self.assertRaises(ValueError, hash.bigcrypt, use_defaults=True,
                           checksum=u('yh4XPJGsOZ'))
 
+    prepare_verify_many = prepare_des_verify_many
+
 #=============================================================================
 # bsdi crypt
 #=============================================================================
@@ -193,6 +201,8 @@ class _bsdi_crypt_test(HandlerCase):
         new_hash = handler.hash("stub")
         self.assertFalse(handler.needs_update(new_hash))
 
+    prepare_verify_many = prepare_des_verify_many
+
 # create test cases for specific backends
 bsdi_crypt_os_crypt_test = _bsdi_crypt_test.create_backend_case("os_crypt")
 bsdi_crypt_builtin_test = _bsdi_crypt_test.create_backend_case("builtin")
@@ -496,6 +506,8 @@ class _des_crypt_test(HandlerCase):
         ("freebsd|openbsd|netbsd|linux|solaris|darwin", True),
     ]
 
+    prepare_verify_many = prepare_des_verify_many
+
 # create test cases for specific backends
 des_crypt_os_crypt_test = _des_crypt_test.create_backend_case("os_crypt")
 des_crypt_builtin_test = _des_crypt_test.create_backend_case("builtin")
@@ -912,6 +924,14 @@ md5_crypt_builtin_test = _md5_crypt_test.create_backend_case("builtin")
 #=============================================================================
 # msdcc 1 & 2
 #=============================================================================
+def prepare_windows_verify_many(self):
+    """HandlerCase.prepare_verify_many() hook for md4-based windows hashes"""
+    from passlib.crypto import _md4
+    from passlib.handlers import windows
+    # force builtin batch md4 to be used, and to pack lanes even for a few secrets
+    self.patchAttr(windows, "_md4_many", _md4.md4_many)
+    self.patchAttr(_md4, "_MIN_LANES", 2)
+
 class msdcc_test(UserHandlerMixin, HandlerCase):
     handler = hash.msdcc
     user_case_insensitive = True
@@ -970,6 +990,8 @@ class msdcc_test(UserHandlerMixin, HandlerCase):
             "b1176c2587478785ec1037e5abc916d0"),
     ]
 
+    prepare_verify_many = prepare_windows_verify_many
+
 class msdcc2_test(UserHandlerMixin, HandlerCase):
     handler = hash.msdcc2
     user_case_insensitive = True
@@ -1002,6 +1024,8 @@ class msdcc2_test(UserHandlerMixin, HandlerCase):
         ((UPASS_TABLE, 'bob'), 'cad511dc9edefcf69201da72efb6bb55'),
     ]
 
+    prepare_verify_many = prepare_windows_verify_many
+
 #=============================================================================
 # mssql 2000 & 2005
 #=============================================================================
@@ -1088,6 +1112,16 @@ class mssql2000_test(HandlerCase):
         u('0x01005B200543327G2E1BC2E7C5DF0F9EBFE486E9BEE063E8D3B332752E1BC2E7C5DF0F9EBFE486E9BEE063E8D3B3'),
     ]
 
+    def test_verify_many(self):
+        """test verify_many() matches verify()"""
+        # NOTE: mssql2000 overrides verify() to also check upper-cased secret,
+        #       so verify_many() has to defer to it.
+        hash = self.known_correct_hashes[0][1]
+        secrets = ['Test', 'test', 'TEST', 'wrong']
+        self.assertEqual(self.handler.verify_many(secrets, hash),
+                         [self.handler.verify(secret, hash) for secret in secrets])
+        self.assertEqual(self.handler.verify_many(secrets, hash), [True, True, True, False])
+
 class mssql2005_test(HandlerCase):
     handler = hash.mssql2005
 
@@ -1274,6 +1308,8 @@ class nthash_test(HandlerCase):
         '7f8fe03093cc84b267b109625f6bbfxb',
     ]
 
+    prepare_verify_many = prepare_windows_verify_many
+
 class bsd_nthash_test(HandlerCase):
     handler = hash.bsd_nthash
 
@@ -12,14 +12,20 @@ import warnings
 from passlib import hash
 from passlib.handlers.bcrypt import IDENT_2, IDENT_2X
 from passlib.utils import repeat_string, to_bytes
-from passlib.utils.compat import irange
-from passlib.tests.utils import HandlerCase, TEST_MODE
+from passlib.utils.compat import irange, u
+from passlib.tests.utils import HandlerCase, TestCase, TEST_MODE
 from passlib.tests.test_handlers import UPASS_TABLE
 # module
 
 #=============================================================================
 # bcrypt
 #=============================================================================
+def prepare_bcrypt_verify_many(self):
+    """HandlerCase.prepare_verify_many() hook for bcrypt & bcrypt_sha256"""
+    from passlib.crypto import _blowfish
+    # force builtin_batch to use BatchBlowfishEngine, even for a few secrets
+    self.patchAttr(_blowfish, "batch_min_size", 2)
+
 class _bcrypt_test(HandlerCase):
     """base for BCrypt test cases"""
     handler = hash.bcrypt
@@ -164,7 +170,7 @@ class _bcrypt_test(HandlerCase):
     #===================================================================
     def setUp(self):
         # ensure builtin is enabled for duration of test.
-        if TEST_MODE("full") and self.backend == "builtin":
+        if TEST_MODE("full") and self.backend in ("builtin", "builtin_batch"):
             key = "PASSLIB_BUILTIN_BCRYPT"
             orig = os.environ.get(key)
             if orig:
@@ -177,7 +183,7 @@ class _bcrypt_test(HandlerCase):
 
     def populate_settings(self, kwds):
         # builtin is still just way too slow.
-        if self.backend == "builtin":
+        if self.backend in ("builtin", "builtin_batch"):
             kwds.setdefault("rounds", 4)
         super(_bcrypt_test, self).populate_settings(kwds)
 
@@ -408,6 +414,8 @@ class _bcrypt_test(HandlerCase):
         self.assertTrue(bcrypt.needs_update(BAD1))
         self.assertFalse(bcrypt.needs_update(GOOD1))
 
+    prepare_verify_many = prepare_bcrypt_verify_many
+
     #===================================================================
     # eoc
     #===================================================================
@@ -417,6 +425,7 @@ bcrypt_bcrypt_test = _bcrypt_test.create_backend_case("bcrypt")
 bcrypt_pybcrypt_test = _bcrypt_test.create_backend_case("pybcrypt")
 bcrypt_bcryptor_test = _bcrypt_test.create_backend_case("bcryptor")
 bcrypt_os_crypt_test = _bcrypt_test.create_backend_case("os_crypt")
+bcrypt_builtin_batch_test = _bcrypt_test.create_backend_case("builtin_batch")
 bcrypt_builtin_test = _bcrypt_test.create_backend_case("builtin")
 
 #=============================================================================
@@ -494,7 +503,7 @@ class _bcrypt_sha256_test(HandlerCase):
     #===================================================================
     def setUp(self):
         # ensure builtin is enabled for duration of test.
-        if TEST_MODE("full") and self.backend == "builtin":
+        if TEST_MODE("full") and self.backend in ("builtin", "builtin_batch"):
             key = "PASSLIB_BUILTIN_BCRYPT"
             orig = os.environ.get(key)
             if orig:
@@ -507,10 +516,12 @@ class _bcrypt_sha256_test(HandlerCase):
 
     def populate_settings(self, kwds):
         # builtin is still just way too slow.
-        if self.backend == "builtin":
+        if self.backend in ("builtin", "builtin_batch"):
             kwds.setdefault("rounds", 4)
         super(_bcrypt_sha256_test, self).populate_settings(kwds)
 
+    prepare_verify_many = prepare_bcrypt_verify_many
+
     #===================================================================
     # override ident tests for now
     #===================================================================
@@ -537,8 +548,96 @@ bcrypt_sha256_bcrypt_test = _bcrypt_sha256_test.create_backend_case("bcrypt")
 bcrypt_sha256_pybcrypt_test = _bcrypt_sha256_test.create_backend_case("pybcrypt")
 bcrypt_sha256_bcryptor_test = _bcrypt_sha256_test.create_backend_case("bcryptor")
 bcrypt_sha256_os_crypt_test = _bcrypt_sha256_test.create_backend_case("os_crypt")
+bcrypt_sha256_builtin_batch_test = _bcrypt_sha256_test.create_backend_case("builtin_batch")
 bcrypt_sha256_builtin_test = _bcrypt_sha256_test.create_backend_case("builtin")
 
+#=============================================================================
+# self-test cache
+#=============================================================================
+class BcryptSelfTestCacheTest(TestCase):
+    """test bcrypt backends' use of selftest_cache"""
+    descriptionPrefix = "bcrypt"
+
+    def test_selftest_cache(self):
+        """test self-test results are cached"""
+        import passlib.utils.handlers as uh
+        from passlib.handlers.bcrypt import TEST_HASH_2A
+        bcrypt = hash.bcrypt
+
+        # fake backend which acts like a correct, modern implementation
+        good = set([b"$2$04$5BJqKfqMQvV7nS.yUguNcuRfMMOXK0xPWavM7pOzjEi5ze5T1k8/S"])
+        for ident in [b"$2a$", b"$2y$", b"$2b$"]:
+            good.update([
+                TEST_HASH_2A.replace(b"$2a$", ident),
+                ident + b"05$/OK.fbVrR/bpIqNJ5ianF.Sa7shbm4.OzKpvFnX1pQLmQW96oUlCq",
+                ident + b"04$R1lJ2gkNaoPGdafE.H.16.1MKHPvmKwryeulRe225LKProWYwt9Oi",
+            ])
+        calls = []
+        class fake_backend(bcrypt._backend_mixin_map["builtin"]):
+            _backend_version = "1.0"
+
+            @staticmethod
+            def verify(secret, hash):
+                calls.append(hash)
+                return to_bytes(hash) in good
+
+        self.patchAttr(bcrypt, "_backend_mixin_map",
+                       dict(bcrypt._backend_mixin_map, builtin=fake_backend))
+        path = self.mktemp()
+        cache = uh.SelfTestCache(path)
+        self.patchAttr(uh, "selftest_cache", cache)
+        def reset():
+            fake_backend._workrounds_initialized = False
+            fake_backend._fallback_ident = u("$2a$")
+            del calls[:]
+
+        # first load should run self-tests, and store results
+        self.assertTrue(fake_backend._finalize_backend_mixin("builtin", False))
+        self.assertTrue(calls)
+        expected = dict(_has_2a_wraparound_bug=False, _lacks_20_support=False,
+                        _lacks_2y_support=False, _lacks_2b_support=False,
+                        _fallback_ident=u("$2b$"))
+        self.assertEqual(cache.get(bcrypt, "builtin", "1.0"), expected)
+
+        # later load should use cached results (even from another process)
+        cache.save()
+        self.patchAttr(uh, "selftest_cache", uh.SelfTestCache(path))
+        reset()
+        self.assertTrue(fake_backend._finalize_backend_mixin("builtin", False))
+        self.assertEqual(calls, [])
+        self.assertTrue(fake_backend._workrounds_initialized)
+        self.assertEqual(fake_backend._fallback_ident, u("$2b$"))
+
+        # version change should cause self-tests to run again
+        reset()
+        fake_backend._backend_version = "2.0"
+        self.assertTrue(fake_backend._finalize_backend_mixin("builtin", False))
+        self.assertTrue(calls)
+
+        # malformed entry should be ignored
+        reset()
+        uh.selftest_cache.set(bcrypt, "builtin", "2.0", dict(_fallback_ident="$2x$"))
+        self.assertTrue(fake_backend._finalize_backend_mixin("builtin", False))
+        self.assertTrue(calls)
+        self.assertEqual(uh.selftest_cache.get(bcrypt, "builtin", "2.0"), expected)
+
+        # cached wraparound bug should re-issue security warning
+        reset()
+        uh.selftest_cache.set(bcrypt, "builtin", "2.0",
+                              dict(expected, _has_2a_wraparound_bug=True))
+        self.addCleanup(setattr, fake_backend, "_has_2a_wraparound_bug", False)
+        with self.assertWarningList(["vulnerable to the bsd wraparound bug"]):
+            self.assertTrue(fake_backend._finalize_backend_mixin("builtin", False))
+        self.assertEqual(calls, [])
+        self.assertTrue(fake_backend._has_2a_wraparound_bug)
+        fake_backend._has_2a_wraparound_bug = False
+
+        # backends w/o version shouldn't be cached
+        reset()
+        fake_backend._backend_version = None
+        self.assertTrue(fake_backend._finalize_backend_mixin("builtin", False))
+        self.assertTrue(calls)
+
 #=============================================================================
 # eof
 #=============================================================================
@@ -475,6 +475,18 @@ class scram_test(HandlerCase):
         self.assertRaises(ValueError, vfull, 'pencil', h)
         self.assertRaises(ValueError, vfull, 'tape', h)
 
+    def test_97_verify_many(self):
+        """test verify_many() matches verify()"""
+        # NOTE: scram overrides verify(), so verify_many() has to defer to it,
+        #       rather than comparing _calc_checksum() output.
+        h = ('$scram$4096$QSXCR.Q6sek8bf92$'
+             'sha-1=HZbuOlKbWl.eR8AfIposuKbhX30,'
+             'sha-256=qXUXrlcvnaxxWG00DdRgVioR2gnUpuX5r.3EZ1rdhVY')
+        secrets = ['pencil', 'tape', 'Pencil']
+        self.assertEqual(self.handler.verify_many(secrets, h),
+                         [self.handler.verify(secret, h) for secret in secrets])
+        self.assertEqual(self.handler.verify_many(secrets, h), [True, False, False])
+
 #=============================================================================
 # eof
 #=============================================================================
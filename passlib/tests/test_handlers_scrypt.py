@@ -90,7 +90,7 @@ class _scrypt_test(HandlerCase):
 
     def populate_settings(self, kwds):
         # builtin is still just way too slow.
-        if self.backend == "builtin":
+        if self.backend in ("builtin", "builtin_array"):
             kwds.setdefault("rounds", 6)
         super(_scrypt_test, self).populate_settings(kwds)
 
@@ -102,6 +102,7 @@ class _scrypt_test(HandlerCase):
 
 # create test cases for specific backends
 scrypt_scrypt_test = _scrypt_test.create_backend_case("scrypt")
+scrypt_builtin_array_test = _scrypt_test.create_backend_case("builtin_array")
 scrypt_builtin_test = _scrypt_test.create_backend_case("builtin")
 
 #=============================================================================
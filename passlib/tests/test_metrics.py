@@ -0,0 +1,140 @@
+"""tests for passlib.metrics"""
+#=============================================================================
+# imports
+#=============================================================================
+from __future__ import with_statement
+# core
+import logging; log = logging.getLogger(__name__)
+import threading
+# site
+# pkg
+from passlib.context import CryptContext
+from passlib.metrics import ContextObserver, MetricsCollector, render_prometheus
+from passlib.tests.utils import TestCase
+from passlib.utils.compat import irange
+# module
+
+#=============================================================================
+# collector
+#=============================================================================
+class MetricsCollectorTest(TestCase):
+    descriptionPrefix = "passlib.metrics"
+
+    def test_observer_base(self):
+        """test ContextObserver base class"""
+        self.assertRaises(NotImplementedError, ContextObserver(),
+                          "verify", "des_crypt", None, 0, "valid")
+
+    def test_init(self):
+        """test MetricsCollector() constructor"""
+        self.assertEqual(MetricsCollector(buckets=[1, 2]).buckets, (1.0, 2.0))
+        self.assertRaises(ValueError, MetricsCollector, buckets=[])
+        self.assertRaises(ValueError, MetricsCollector, buckets=[2, 1])
+        self.assertRaises(ValueError, MetricsCollector, buckets=[1, 1])
+
+    def test_record(self):
+        """test recording & snapshot()"""
+        collector = MetricsCollector(buckets=[.1, 1])
+        collector("verify", "des_crypt", None, .05, "valid")
+        collector("verify", "des_crypt", None, .1, "valid")
+        collector("verify", "des_crypt", None, .5, "valid")
+        collector("verify", "des_crypt", None, 5, "valid")
+        collector("verify", "des_crypt", None, .05, "invalid")
+        collector("hash", "sha256_crypt", "admin", .2, "ok")
+
+        snapshot = collector.snapshot()
+        self.assertEqual(sorted(snapshot), [
+            ("hash", "sha256_crypt", "admin", "ok"),
+            ("verify", "des_crypt", None, "invalid"),
+            ("verify", "des_crypt", None, "valid"),
+        ])
+        sample = snapshot["verify", "des_crypt", None, "valid"]
+        self.assertEqual(sample['count'], 4)
+        self.assertAlmostEqual(sample['sum'], 5.65)
+        # NOTE: buckets are cumulative, bucket bounds are inclusive
+        self.assertEqual(sample['buckets'], [2, 3, 4])
+
+        self.assertEqual(collector.count(), 6)
+        self.assertEqual(collector.count("verify"), 5)
+        self.assertEqual(collector.count(scheme="des_crypt", outcome="valid"), 4)
+        self.assertEqual(collector.count(category="admin"), 1)
+
+        collector.reset()
+        self.assertEqual(collector.snapshot(), {})
+        collector("hash", "sha256_crypt", None, .2, "ok")
+        self.assertEqual(collector.count(), 1)
+
+    def test_threads(self):
+        """test recording from multiple threads"""
+        collector = MetricsCollector()
+        def worker():
+            for _ in irange(1000):
+                collector("verify", "des_crypt", None, .001, "valid")
+        threads = [threading.Thread(target=worker) for _ in irange(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        collector("verify", "des_crypt", None, .001, "valid")
+        self.assertEqual(len(collector._shards), 5)
+        self.assertEqual(collector.count(), 4001)
+
+    def test_context(self):
+        """test collecting from CryptContext"""
+        cc = CryptContext(["sha256_crypt", "des_crypt"], deprecated=["des_crypt"],
+                          sha256_crypt__default_rounds=1000)
+        collector = MetricsCollector()
+        cc.add_observer(collector)
+        hash = cc.handler("des_crypt").hash("password")
+        self.assertTrue(cc.verify_and_update("password", hash)[1])
+        self.assertFalse(cc.verify_and_update("wrong", hash)[0])
+        self.assertEqual(collector.count("verify_and_update", outcome="rehash"), 1)
+        self.assertEqual(collector.count("verify_and_update", scheme="des_crypt"), 2)
+        # rehash shouldn't be counted as separate hash() call
+        self.assertEqual(collector.count("hash"), 0)
+
+#=============================================================================
+# prometheus
+#=============================================================================
+class RenderPrometheusTest(TestCase):
+    descriptionPrefix = "passlib.metrics"
+
+    def test_render(self):
+        """test render_prometheus()"""
+        collector = MetricsCollector(buckets=[.1, 1])
+        collector("verify", "des_crypt", None, .05, "valid")
+        collector("verify", "des_crypt", None, .5, "invalid")
+        collector("verify", None, None, 0, "missing")
+        collector("hash", "sha256_crypt", 'a"b\\c', .25, "ok")
+        result = render_prometheus(collector)
+        self.assertEqual(result, """\
+# HELP passlib_context_operations_total Number of CryptContext operations.
+# TYPE passlib_context_operations_total counter
+passlib_context_operations_total{operation="hash",scheme="sha256_crypt",category="a\\"b\\\\c",outcome="ok"} 1
+passlib_context_operations_total{operation="verify",scheme="",category="",outcome="missing"} 1
+passlib_context_operations_total{operation="verify",scheme="des_crypt",category="",outcome="invalid"} 1
+passlib_context_operations_total{operation="verify",scheme="des_crypt",category="",outcome="valid"} 1
+# HELP passlib_context_duration_seconds Time taken by CryptContext operations.
+# TYPE passlib_context_duration_seconds histogram
+passlib_context_duration_seconds_bucket{operation="hash",scheme="sha256_crypt",category="a\\"b\\\\c",le="0.1"} 0
+passlib_context_duration_seconds_bucket{operation="hash",scheme="sha256_crypt",category="a\\"b\\\\c",le="1.0"} 1
+passlib_context_duration_seconds_bucket{operation="hash",scheme="sha256_crypt",category="a\\"b\\\\c",le="+Inf"} 1
+passlib_context_duration_seconds_sum{operation="hash",scheme="sha256_crypt",category="a\\"b\\\\c"} 0.25
+passlib_context_duration_seconds_count{operation="hash",scheme="sha256_crypt",category="a\\"b\\\\c"} 1
+passlib_context_duration_seconds_bucket{operation="verify",scheme="des_crypt",category="",le="0.1"} 1
+passlib_context_duration_seconds_bucket{operation="verify",scheme="des_crypt",category="",le="1.0"} 2
+passlib_context_duration_seconds_bucket{operation="verify",scheme="des_crypt",category="",le="+Inf"} 2
+passlib_context_duration_seconds_sum{operation="verify",scheme="des_crypt",category=""} 0.55
+passlib_context_duration_seconds_count{operation="verify",scheme="des_crypt",category=""} 2
+""")
+
+        # custom namespace
+        result = render_prometheus(collector, namespace="myapp")
+        self.assertIn("# TYPE myapp_context_operations_total counter", result)
+
+        # empty collector
+        self.assertEqual(render_prometheus(MetricsCollector()).count("\n"), 4)
+
+#=============================================================================
+# eof
+#=============================================================================
@@ -206,6 +206,73 @@ class RegistryTest(TestCase):
             self.assertFalse(name.startswith("_"), "%r: " % name)
         unload_handler_name("_fake")
 
+    def test_warmup(self):
+        """test warmup()"""
+        from passlib.registry import warmup
+        import json
+
+        seen = []
+        class dummy_backends(uh.HasManyBackends, uh.StaticHandler):
+            name = "dummy_backends"
+            backends = ("missing", "present")
+
+            @classmethod
+            def _load_backend_missing(cls):
+                return False
+
+            @classmethod
+            def _load_backend_present(cls):
+                seen.append(uh.selftest_cache)
+                cls._set_calc_checksum_backend(cls._calc_checksum_present)
+                return True
+
+            def _calc_checksum_present(self, secret):
+                return secret
+
+        class dummy_unavailable(uh.HasManyBackends, uh.StaticHandler):
+            name = "dummy_unavailable"
+            backends = ("missing",)
+
+            @classmethod
+            def _load_backend_missing(cls):
+                return False
+
+        # should load backends, and report which were loaded
+        path = self.mktemp()
+        result = warmup([dummy_backends, dummy_unavailable, "hex_md5"], cache_path=path)
+        self.assertEqual(result, dict(dummy_backends="present", dummy_unavailable=None,
+                                      hex_md5="builtin"))
+
+        # cache should only be active during warmup()
+        self.assertEqual(len(seen), 1)
+        self.assertIsInstance(seen[0], uh.SelfTestCache)
+        self.assertIs(uh.selftest_cache, None)
+
+        # test SelfTestCache persistence
+        cache = uh.SelfTestCache(path)
+        self.assertEqual(len(cache), 0)
+        self.assertIs(cache.get(dummy_backends, "present", "1.0"), None)
+        cache.set(dummy_backends, "present", "1.0", dict(flag=True))
+        cache.save()
+        cache = uh.SelfTestCache(path)
+        self.assertEqual(cache.get(dummy_backends, "present", "1.0"), dict(flag=True))
+        self.assertIs(cache.get(dummy_backends, "present", "1.1"), None)
+        self.assertIs(cache.get(dummy_backends, "missing", "1.0"), None)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+        # entries from another environment should be ignored
+        with open(path) as fh:
+            data = json.load(fh)
+        data['environ']['passlib'] = "0.0"
+        with open(path, "w") as fh:
+            json.dump(data, fh)
+        self.assertEqual(len(uh.SelfTestCache(path)), 0)
+
+        # malformed file should be ignored
+        with open(path, "w") as fh:
+            fh.write("{")
+        self.assertEqual(len(uh.SelfTestCache(path)), 0)
+
     def test_handlers(self):
         """verify we have tests for all builtin handlers"""
         from passlib.registry import list_crypt_handlers
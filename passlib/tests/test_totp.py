@@ -1082,6 +1082,96 @@ class TotpTest(TestCase):
                            last_counter=counter, window=0)
         self.assertEqual(err.expire_time, expire_time)
 
+    def test_match_search_order(self):
+        """match() -- searches outward from expected counter"""
+        otp = self.randotp()
+        period = otp.period
+        time = self.randtime()
+        expected = otp._time_to_counter(int(time))
+        window = 10 * period
+
+        # record which counters are generated
+        calls = []
+        orig = otp._generate
+        def wrapper(counter):
+            calls.append(counter)
+            return orig(counter)
+        self.patchAttr(otp, "_generate", wrapper)
+
+        # match should start at expected counter, and alternate before & after it
+        token = orig(expected + 2)
+        result = otp.match(token, time, window=window)
+        self.assertEqual(result.counter, expected + 2)
+        self.assertEqual(calls, [expected, expected - 1, expected + 1,
+                                 expected - 2, expected + 2])
+
+        # if token matches multiple counters, closest one wins
+        del calls[:]
+        self.patchAttr(otp, "_generate", lambda counter: token)
+        self.assertEqual(otp.match(token, time, window=window).counter, expected)
+
+        # ... but last counter is checked first, so reused token is always rejected
+        self.assertRaises(exc.UsedTokenError, otp.match, token, time,
+                          window=window, last_counter=expected - 3)
+
+    def test_resync(self):
+        """resync()"""
+        from passlib.totp import TotpMatch
+        otp = self.randotp()
+        period = otp.period
+        time = int(self.randtime())
+        expected = otp._time_to_counter(time)
+
+        # client running 7 periods ahead
+        tokens = [otp.generate(time + (7 + offset) * period).token
+                  for offset in (-2, -1, 0)]
+        result = otp.resync(tokens, time, window=10 * period)
+        self.assertIsInstance(result, TotpMatch)
+        self.assertEqual(result.counter, expected + 7)
+        self.assertEqual(result.skipped, 7)
+
+        # skew from result should let match() work with default window
+        next_token = otp.generate(time + 8 * period).token
+        self.assertEqual(otp.match(next_token, time + period,
+                                   skew=result.skipped * period).counter, expected + 8)
+
+        # client running behind
+        tokens = [otp.generate(time + (offset - 5) * period).token for offset in (-1, 0)]
+        self.assertEqual(otp.resync(tokens, time, window=10 * period).skipped, -5)
+
+        # outside window
+        self.assertRaises(exc.InvalidTokenError, otp.resync, tokens, time, window=4 * period)
+
+        # tokens must be consecutive & in order
+        self.assertRaises(exc.InvalidTokenError, otp.resync, tokens[::-1], time,
+                          window=10 * period)
+        tokens = [otp.generate(time + offset * period).token for offset in (-2, 0)]
+        self.assertRaises(exc.InvalidTokenError, otp.resync, tokens, time,
+                          window=10 * period)
+
+        # last counter
+        tokens = [otp.generate(time + offset * period).token for offset in (-1, 0)]
+        self.assertEqual(otp.resync(tokens, time, last_counter=expected - 2).counter, expected)
+        self.assertRaises(exc.InvalidTokenError, otp.resync, tokens, time,
+                          last_counter=expected - 1)
+
+        # token count & normalization
+        self.assertRaises(ValueError, otp.resync, tokens[-1:], time)
+        self.assertEqual(otp.resync(tokens[-1:], time, min_tokens=1).counter, expected)
+        self.assertRaises(ValueError, otp.resync, [], time, min_tokens=0)
+        self.assertRaises(exc.MalformedTokenError, otp.resync, ["abc"] + tokens, time)
+
+        # should compare every token against every counter (no short-circuiting),
+        # and only generate each counter's token once.
+        calls = []
+        orig = otp._generate
+        def wrapper(counter):
+            calls.append(counter)
+            return orig(counter)
+        self.patchAttr(otp, "_generate", wrapper)
+        otp.resync(tokens, time, window=3 * period)
+        self.assertEqual(sorted(calls), list(range(expected - 4, expected + 4)))
+
     def test_match_w_token_normalization(self):
         """match() -- token normalization"""
         # setup test helper
@@ -1558,6 +1648,346 @@ class TotpTest(TestCase):
     # eoc
     #=============================================================================
 
+#=============================================================================
+# TotpVerifier
+#=============================================================================
+class TotpVerifierTest(TestCase):
+    descriptionPrefix = "passlib.totp.TotpVerifier"
+
+    def test_ctor(self):
+        """constructor"""
+        from passlib.totp import TotpVerifier
+        self.assertIs(TotpVerifier().factory, TOTP)
+        factory = TOTP.using(period=60)
+        self.assertIs(TotpVerifier(factory).factory, factory)
+        self.assertRaises(TypeError, TotpVerifier, AppWallet)
+        self.assertRaises(TypeError, TotpVerifier, max_size="1")
+        self.assertRaises(ValueError, TotpVerifier, max_size=0)
+
+    def test_load(self):
+        """load() caching"""
+        from passlib.totp import TotpVerifier
+        verifier = TotpVerifier(max_size=2)
+        self.assertEqual(verifier.hit_rate, 0.0)
+        sources = [TOTP(new=True).to_json() for _ in range(3)]
+
+        # cache miss, then hit returns same instance
+        otp = verifier.load(sources[0])
+        self.assertEqual(otp.key, TOTP.from_source(sources[0]).key)
+        self.assertIsNot(otp._keyed_hmac, None)
+        self.assertIs(verifier.load(sources[0]), otp)
+        self.assertEqual((verifier.hits, verifier.misses), (1, 1))
+        self.assertEqual(verifier.hit_rate, 0.5)
+
+        # LRU eviction
+        verifier.load(sources[1])
+        verifier.load(sources[0])
+        verifier.load(sources[2])
+        self.assertEqual(len(verifier), 2)
+        self.assertIs(verifier.load(sources[0]), otp)
+        self.assertEqual((verifier.hits, verifier.misses), (3, 3))
+
+        # errors aren't cached, dicts aren't cached
+        self.assertRaises(ValueError, verifier.load, "{}")
+        self.assertRaises(ValueError, verifier.load, "{}")
+        otp2 = verifier.load(dict(v=1, type="totp", key=KEY1))
+        self.assertEqual(otp2.base32_key, KEY1)
+        self.assertEqual(len(verifier), 2)
+
+        # clear
+        verifier.clear()
+        self.assertEqual(len(verifier), 0)
+        self.assertEqual((verifier.hits, verifier.misses), (0, 0))
+
+        # factory used to load sources
+        verifier = TotpVerifier(TOTP.using(digits=8))
+        self.assertEqual(verifier.load(dict(v=1, type="totp", key=KEY1)).digits, 8)
+        self.assertEqual(verifier.load(TOTP(KEY1, digits=7).to_json()).digits, 7)
+
+    def test_match(self):
+        """match() & match_many()"""
+        from passlib.totp import TotpVerifier, TotpMatch
+        verifier = TotpVerifier()
+        time = 1419622729
+        source1 = TOTP(KEY1).to_json()
+        source2 = TOTP(KEY4).to_json()
+        token1 = TOTP(KEY1).generate(time).token
+        token2 = TOTP(KEY4).generate(time).token
+        counter = time // 30
+
+        # match
+        result = verifier.match(source1, token1, time)
+        self.assertIsInstance(result, TotpMatch)
+        self.assertEqual(result.counter, counter)
+        self.assertIs(result.totp, verifier.load(source1))
+        self.assertRaises(exc.InvalidTokenError, verifier.match, source2, token1, time)
+        self.assertRaises(exc.UsedTokenError, verifier.match, source1, token1, time,
+                          last_counter=counter)
+
+        # match_many
+        results = verifier.match_many([
+            (source1, token1, None),
+            (source2, token2, counter - 1),
+            (source2, token1, None),
+            (source1, token1, counter),
+            (source1, "abc", None),
+            ("{}", token1, None),
+        ], time=time)
+        self.assertEqual(len(results), 6)
+        self.assertEqual(results[0].counter, counter)
+        self.assertEqual(results[1].counter, counter)
+        self.assertEqual(results[1].totp.base32_key, KEY4)
+        self.assertIsInstance(results[2], exc.InvalidTokenError)
+        self.assertIsInstance(results[3], exc.UsedTokenError)
+        self.assertIsInstance(results[4], exc.MalformedTokenError)
+        self.assertIsInstance(results[5], ValueError)
+
+        # window / skew passed through
+        token3 = TOTP(KEY1).generate(time + 300).token
+        results = verifier.match_many([(source1, token3, None)], time=time, skew=300, window=0)
+        self.assertEqual(results[0].counter, (time + 300) // 30)
+
+        # time defaults to now
+        token4 = TOTP(KEY1).generate().token
+        self.assertIsInstance(verifier.match_many([(source1, token4, None)])[0], TotpMatch)
+
+        # TOTP instances should be shared
+        self.assertEqual(len(verifier), 2)
+
+#=============================================================================
+# counter stores
+#=============================================================================
+class CounterStoreTest(TestCase):
+    """test CounterStore subclasses & TOTP.match(store=...)"""
+    descriptionPrefix = "passlib.totp.CounterStore"
+
+    def _check_store(self, store):
+        """common CounterStore behavior"""
+        self.assertIs(store.get("a"), None)
+
+        # compare_and_set() -- new entry
+        self.assertTrue(store.compare_and_set("a", None, 10))
+        self.assertFalse(store.compare_and_set("a", None, 11))
+        self.assertEqual(store.get("a"), 10)
+
+        # compare_and_set() -- existing entry
+        self.assertFalse(store.compare_and_set("a", 9, 11))
+        self.assertTrue(store.compare_and_set("a", 10, 11))
+        self.assertEqual(store.get("a"), 11)
+
+        # set_many() -- should only raise counters
+        store.set_many([("a", 5), ("b", 20)])
+        self.assertEqual(store.get("a"), 11)
+        self.assertEqual(store.get("b"), 20)
+        store.set_many([("a", 15)])
+        self.assertEqual(store.get("a"), 15)
+
+    def _check_match(self, store):
+        """TOTP.match() using store"""
+        otp = TOTP(KEY1)
+        time = 1419622729
+        token = otp.generate(time).token
+
+        result = otp.match(token, time, store=store, store_key="user")
+        self.assertEqual(result.counter, time // 30)
+        self.assertEqual(store.get("user"), time // 30)
+
+        # reuse should be rejected, even by other TOTP instance w/ same key
+        self.assertRaises(exc.UsedTokenError, TOTP(KEY1).match, token, time,
+                          store=store, store_key="user")
+
+        # separate keys are independent
+        otp.match(token, time, store=store, store_key="other")
+
+        # verify() should pass store through
+        self.assertRaises(exc.UsedTokenError, TOTP.verify, token, otp.to_json(), time=time,
+                          store=store, store_key="user")
+        token2 = otp.generate(time + 30).token
+        result = TOTP.verify(token2, otp.to_json(), time=time + 30, store=store, store_key="user")
+        self.assertEqual(result.counter, time // 30 + 1)
+
+    def test_base(self):
+        """CounterStore base class"""
+        from passlib.totp import CounterStore
+        store = CounterStore()
+        self.assertRaises(NotImplementedError, store.get, "a")
+        self.assertRaises(NotImplementedError, store.compare_and_set, "a", None, 1)
+        store.flush()
+        store.close()
+
+        # default set_many() should use get() & compare_and_set()
+        class DictStore(CounterStore):
+            def __init__(self):
+                self.entries = {}
+            def get(self, key):
+                return self.entries.get(key)
+            def compare_and_set(self, key, expected, counter):
+                if self.entries.get(key) != expected:
+                    return False
+                self.entries[key] = counter
+                return True
+        self._check_store(DictStore())
+        self._check_match(DictStore())
+
+    def test_match_options(self):
+        """TOTP.match() store & store_key options"""
+        from passlib.totp import MemoryCounterStore
+        otp = TOTP(KEY1)
+        time = 1419622729
+        token = otp.generate(time).token
+        store = MemoryCounterStore()
+
+        # store_key required
+        self.assertRaises(TypeError, otp.match, token, time, store=store)
+
+        # can't combine with last_counter
+        self.assertRaises(TypeError, otp.match, token, time, last_counter=1,
+                          store=store, store_key="user")
+
+        # older counter stored -- should be updated
+        store.compare_and_set("user", None, time // 30 - 2)
+        otp.match(token, time, store=store, store_key="user")
+        self.assertEqual(store.get("user"), time // 30)
+
+    def test_match_race(self):
+        """TOTP.match() w/ store -- concurrent update"""
+        from passlib.totp import MemoryCounterStore
+        otp = TOTP(KEY1)
+        time = 1419622729
+        counter = time // 30
+        token = otp.generate(time).token
+
+        # simulate another request using same token between get() & compare_and_set()
+        store = MemoryCounterStore()
+        orig = store.compare_and_set
+        def compare_and_set(key, expected, value):
+            orig(key, expected, value)
+            return orig(key, expected, value)
+        self.patchAttr(store, "compare_and_set", compare_and_set)
+        self.assertRaises(exc.UsedTokenError, otp.match, token, time,
+                          store=store, store_key="user")
+        self.assertEqual(store.get("user"), counter)
+
+        # simulate another request storing older counter -- should retry & succeed
+        store = MemoryCounterStore()
+        state = dict(raced=False)
+        orig = store.compare_and_set
+        def compare_and_set(key, expected, value):
+            if not state["raced"]:
+                state["raced"] = True
+                orig(key, expected, counter - 1)
+            return orig(key, expected, value)
+        self.patchAttr(store, "compare_and_set", compare_and_set)
+        result = otp.match(token, time, store=store, store_key="user")
+        self.assertEqual(result.counter, counter)
+        self.assertEqual(store.get("user"), counter)
+
+    def test_memory_store(self):
+        """MemoryCounterStore"""
+        from passlib.totp import MemoryCounterStore
+
+        # constructor
+        self.assertRaises(TypeError, MemoryCounterStore, backend=object())
+        self.assertRaises(TypeError, MemoryCounterStore, shards=1.5)
+        self.assertRaises(ValueError, MemoryCounterStore, shards=0)
+        self.assertRaises(ValueError, MemoryCounterStore, flush_size=0)
+
+        store = MemoryCounterStore(shards=4)
+        self.assertEqual(len(store._shards), 4)
+        self._check_store(store)
+        self.assertEqual(len(store), 2)
+        self._check_match(MemoryCounterStore(shards=1))
+
+    def test_memory_store_backend(self):
+        """MemoryCounterStore w/ backend"""
+        from passlib.totp import MemoryCounterStore
+        backend = MemoryCounterStore()
+        backend.compare_and_set("old", None, 5)
+        calls = []
+        orig = backend.set_many
+        def set_many(items):
+            items = sorted(items)
+            calls.append(items)
+            return orig(items)
+        self.patchAttr(backend, "set_many", set_many)
+
+        # entries loaded from backend on demand, changes deferred until flush()
+        store = MemoryCounterStore(backend, flush_size=3, flush_interval=None)
+        self.assertEqual(store.get("old"), 5)
+        self.assertFalse(store.compare_and_set("old", None, 6))
+        self.assertTrue(store.compare_and_set("old", 5, 6))
+        self.assertTrue(store.compare_and_set("a", None, 1))
+        self.assertEqual(backend.get("old"), 5)
+        self.assertEqual(calls, [])
+
+        store.flush()
+        self.assertEqual(calls, [[("a", 1), ("old", 6)]])
+        self.assertEqual(backend.get("old"), 6)
+        store.flush()
+        self.assertEqual(len(calls), 1)
+
+        # flush_size triggers flush
+        store.compare_and_set("a", 1, 2)
+        store.compare_and_set("b", None, 1)
+        self.assertEqual(len(calls), 1)
+        store.compare_and_set("c", None, 1)
+        self.assertEqual(calls[-1], [("a", 2), ("b", 1), ("c", 1)])
+
+        # flush_interval triggers flush
+        store = MemoryCounterStore(backend, flush_interval=0)
+        store.compare_and_set("d", None, 1)
+        self.assertEqual(calls[-1], [("d", 1)])
+
+        # close() flushes
+        store = MemoryCounterStore(backend, flush_interval=None)
+        store.compare_and_set("e", None, 1)
+        store.close()
+        self.assertEqual(backend.get("e"), 1)
+
+        # failed flush should keep changes pending
+        store = MemoryCounterStore(backend, flush_interval=None)
+        store.compare_and_set("f", None, 1)
+        def set_many(items):
+            raise IOError("backend unavailable")
+        self.patchAttr(backend, "set_many", set_many)
+        self.assertRaises(IOError, store.flush)
+        self.assertEqual(store._pending, {"f": 1})
+
+    def test_sqlite_store(self):
+        """SQLiteCounterStore"""
+        from passlib.totp import SQLiteCounterStore
+        self.assertRaises(ValueError, SQLiteCounterStore, ":memory:", table="bad; name")
+
+        store = SQLiteCounterStore(":memory:")
+        self._check_store(store)
+        self._check_match(store)
+        store.close()
+
+        # counters should persist, & be visible to other connections
+        path = self.mktemp()
+        store = SQLiteCounterStore(path, table="otp")
+        store.compare_and_set("a", None, 10)
+        other = SQLiteCounterStore(path, table="otp")
+        self.assertEqual(other.get("a"), 10)
+        self.assertFalse(other.compare_and_set("a", None, 11))
+        self.assertTrue(other.compare_and_set("a", 10, 11))
+        self.assertEqual(store.get("a"), 11)
+        other.close()
+        store.close()
+        store = SQLiteCounterStore(path, table="otp")
+        self.assertEqual(store.get("a"), 11)
+        store.close()
+
+        # as backend for MemoryCounterStore
+        backend = SQLiteCounterStore(":memory:")
+        from passlib.totp import MemoryCounterStore
+        store = MemoryCounterStore(backend, flush_interval=None)
+        self._check_store(store)
+        store.flush()
+        self.assertEqual(backend.get("a"), 15)
+        self.assertEqual(backend.get("b"), 20)
+        backend.close()
+
 #=============================================================================
 # eof
 #=============================================================================
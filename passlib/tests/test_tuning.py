@@ -0,0 +1,118 @@
+"""tests for passlib.tuning"""
+#=============================================================================
+# imports
+#=============================================================================
+from __future__ import with_statement
+# core
+import logging; log = logging.getLogger(__name__)
+# site
+# pkg
+from passlib import tuning
+from passlib.context import CryptContext
+from passlib.tests.utils import TestCase
+from passlib.tuning import tune_context
+# module
+
+#=============================================================================
+# tune_context()
+#=============================================================================
+class TuneContextTest(TestCase):
+    descriptionPrefix = "passlib.tuning"
+
+    def patch_measure(self, speed=1e6):
+        """
+        replace measure_latency() w/ fake that assumes *speed* units of cost per second,
+        where scrypt's cost is ``2**rounds * block_size``
+        """
+        calls = []
+        def measure_latency(handler, **kwds):
+            calls.append((handler.name, kwds))
+            rounds = handler.default_rounds
+            if handler.name == "scrypt":
+                cost = (1 << rounds) * handler.block_size
+            else:
+                cost = rounds
+            return cost / speed
+        self.patchAttr(tuning, "measure_latency", measure_latency)
+        return calls
+
+    def test_helpers(self):
+        """test percentile & median helpers"""
+        self.assertEqual(tuning._percentile([5, 1, 4, 2, 3], 100), 5)
+        self.assertEqual(tuning._percentile([5, 1, 4, 2, 3], 50), 3)
+        self.assertEqual(tuning._percentile([5, 1, 4, 2, 3], 1), 1)
+        self.assertEqual(tuning._percentile([7], 95), 7)
+        self.assertEqual(tuning._median([3, 1, 2]), 2)
+        self.assertEqual(tuning._median([4, 1, 2, 3]), 2.5)
+
+    def test_measure_latency(self):
+        """test measure_latency()"""
+        handler = CryptContext(["sha256_crypt"]).handler().using(rounds=1000)
+        for concurrency in [1, 3]:
+            latency = tuning.measure_latency(handler, concurrency=concurrency, samples=2)
+            self.assertGreater(latency, 0)
+            self.assertLess(latency, 5)
+
+    def test_linear(self):
+        """test tuning linear rounds"""
+        calls = self.patch_measure()
+        ctx = CryptContext(["pbkdf2_sha256", "sha256_crypt", "md5_crypt"],
+                           deprecated=["sha256_crypt"])
+        report = tune_context(ctx, target=.1, concurrency=4, samples=3)
+        self.assertEqual([r.scheme for r in report.results], ["pbkdf2_sha256"])
+        result = report.results[0]
+        self.assertEqual(result.settings, dict(default_rounds=100000))
+        self.assertAlmostEqual(result.latency, .1)
+        self.assertEqual(report.to_dict(), dict(pbkdf2_sha256__default_rounds=100000))
+        self.assertEqual(calls[0][1], dict(concurrency=4, samples=3, warmup=1, percentile=95))
+
+        # tuned context
+        self.assertEqual(report.context.handler("pbkdf2_sha256").default_rounds, 100000)
+        self.assertEqual(report.context.schemes(), ctx.schemes())
+        self.assertEqual(ctx.handler("pbkdf2_sha256").default_rounds,
+                         CryptContext(["pbkdf2_sha256"]).handler().default_rounds)
+
+        # output should be loadable
+        source = report.to_string()
+        self.assertTrue(source.startswith("# tuned for 100ms p95 latency @ concurrency=4\n"))
+        loaded = CryptContext.from_string(source)
+        self.assertEqual(loaded.to_dict(), report.context.to_dict())
+
+        # explicit scheme list
+        report = tune_context(ctx, target=.1, schemes=["sha256_crypt"])
+        self.assertEqual(report.to_dict(), dict(sha256_crypt__default_rounds=100000))
+        self.assertRaises(ValueError, tune_context, ctx, schemes=["md5_crypt"])
+
+    def test_log2(self):
+        """test tuning log2 rounds & memory limit"""
+        self.patch_measure(speed=(1 << 20))
+
+        # rounds=13 takes 62.5ms, rounds=14 takes 125ms
+        report = tune_context(["scrypt"], target=.1)
+        self.assertEqual(report.to_dict(), dict(scrypt__default_rounds=13))
+        self.assertAlmostEqual(report.results[0].latency, .0625)
+        report = tune_context(["scrypt"], target=.06) # within 5%, so rounded up
+        self.assertEqual(report.to_dict(), dict(scrypt__default_rounds=13))
+        report = tune_context(["scrypt"], target=.05)
+        self.assertEqual(report.to_dict(), dict(scrypt__default_rounds=12))
+
+        # memory limit should shrink block_size (128 * 2**13 * 8 = 8mb),
+        # and then keep rounds within limit.
+        report = tune_context(["scrypt"], target=.1, memory_limit=4 << 20)
+        self.assertEqual(report.to_dict(), dict(scrypt__default_rounds=13,
+                                                scrypt__block_size=4))
+        report = tune_context(["scrypt"], target=.1, memory_limit=16 << 20)
+        self.assertEqual(report.to_dict(), dict(scrypt__default_rounds=13))
+
+    def test_invalid(self):
+        """test invalid options"""
+        ctx = CryptContext(["sha256_crypt"])
+        self.assertRaises(ValueError, tune_context, ctx, target=0)
+        self.assertRaises(ValueError, tune_context, ctx, percentile=0)
+        self.assertRaises(ValueError, tune_context, ctx, percentile=101)
+        self.assertRaises(ValueError, tune_context, ctx, concurrency=0)
+        self.assertRaises(ValueError, tune_context, ctx, samples=0)
+
+#=============================================================================
+# eof
+#=============================================================================
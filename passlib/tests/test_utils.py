@@ -10,7 +10,7 @@ import warnings
 # pkg
 # module
 from passlib.utils import is_ascii_safe
-from passlib.utils.compat import irange, PY2, PY3, u, unicode, join_bytes, PYPY
+from passlib.utils.compat import irange, PY2, PY3, u, unicode, join_bytes, join_byte_elems, PYPY
 from passlib.tests.utils import TestCase, hb, run_with_fixed_seeds
 
 #=============================================================================
@@ -413,6 +413,49 @@ class MiscTest(TestCase):
         self.assertEqual(splitcomma(" a , b"), ['a', 'b'])
         self.assertEqual(splitcomma(" a, b, "), ['a', 'b'])
 
+    def test_lru_cache(self):
+        """test LRUCache"""
+        from passlib.utils import LRUCache
+        self.assertRaises(ValueError, LRUCache, 0)
+        self.assertRaises(TypeError, LRUCache, "1")
+
+        # get() / set(), evicting least-recently-used
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertEqual(cache.keys(), ["a", "c"])
+        self.assertIs(cache.get("b"), None)
+        self.assertEqual(cache.get("b", 0), 0)
+        cache.set("a", 4)
+        self.assertEqual(cache.items(), [("c", 3), ("a", 4)])
+        self.assertEqual(cache.pop("c"), 3)
+        self.assertIs(cache.pop("c"), None)
+        self.assertNotIn("c", cache)
+        self.assertEqual(len(cache), 1)
+
+        # load() only calls loader on a miss, and doesn't cache errors
+        calls = []
+        def loader(value):
+            calls.append(value)
+            if value is None:
+                raise ValueError("bad value")
+            return value
+        self.assertEqual(cache.load("a", lambda: loader(5)), 4)
+        self.assertEqual(cache.load("d", lambda: loader(6)), 6)
+        self.assertEqual(cache.load("d", lambda: loader(7)), 6)
+        self.assertRaises(ValueError, cache.load, "e", lambda: loader(None))
+        self.assertNotIn("e", cache)
+        self.assertEqual(calls, [6, None])
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+        self.assertEqual(cache.hit_rate, 0.5)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+        self.assertEqual(cache.hit_rate, 0.0)
+
 #=============================================================================
 # byte/unicode helpers
 #=============================================================================
@@ -794,6 +837,26 @@ class _Base64Test(TestCase):
             else:
                 self.assertEqual(result, encoded)
 
+    def test_codec_generic(self):
+        """test encode_bytes/decode_bytes match generic implementation"""
+        engine = self.engine
+        from passlib.utils import getrandbytes, getrandstr
+        rng = self.getRandom()
+        for i in irange(300):
+            # NOTE: generic version is the python bit-shuffling code which
+            #       encode_bytes() / decode_bytes() used prior to passlib 1.8
+            size = rng.randint(0, 70)
+            raw = getrandbytes(rng, size)
+            self.assertEqual(engine.encode_bytes(raw),
+                             engine._encode_bytes_generic(raw))
+
+            # random encoded data, including any unused bits in last char
+            if size % 4 == 1:
+                size -= 1
+            encoded = getrandstr(rng, engine.bytemap, size)
+            self.assertEqual(engine.decode_bytes(encoded),
+                             engine._decode_bytes_generic(encoded))
+
     def test_repair_unused(self):
         """test repair_unused()"""
         # NOTE: this test relies on encode_bytes() always returning clear
@@ -869,6 +932,22 @@ class _Base64Test(TestCase):
             self.assertRaises(TypeError, engine.decode_transposed_bytes, tmp,
                               offsets)
 
+    def test_transposed_random(self):
+        """test encode/decode_transposed_bytes() against random permutations"""
+        engine = self.engine
+        from passlib.utils import getrandbytes
+        rng = self.getRandom()
+        for size in [1, 2, 16, 20, 32, 64]:
+            offsets = list(irange(size))
+            rng.shuffle(offsets)
+            raw = getrandbytes(rng, size)
+            expected = join_byte_elems(raw[off] for off in offsets)
+            for _ in irange(2):
+                # NOTE: second pass uses offsets cached by the first one
+                encoded = engine.encode_transposed_bytes(raw, offsets)
+                self.assertEqual(engine.decode_bytes(encoded), expected)
+                self.assertEqual(engine.decode_transposed_bytes(encoded, offsets), raw)
+
     #===================================================================
     # test 6bit handling
     #===================================================================
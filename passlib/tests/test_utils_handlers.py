@@ -433,6 +433,155 @@ class SkeletonTest(TestCase):
         self.assertRaises(ValueError, d1.set_backend, 'c')
         self.assertRaises(ValueError, d1.has_backend, 'c')
 
+    def test_42_builtin_pool(self):
+        """test HasManyBackends mixin -- builtin_pool backend"""
+        class d1(uh.HasManyBackends, uh.GenericHandler):
+            name = 'd1'
+            setting_kwds = ()
+
+            backends = ("a", "builtin")
+
+            @classmethod
+            def _load_backend_a(cls):
+                cls._set_calc_checksum_backend(cls._calc_checksum_a)
+                return True
+
+            @classmethod
+            def _load_backend_builtin(cls):
+                cls._set_calc_checksum_backend(cls._calc_checksum_builtin)
+                return True
+
+            def _calc_checksum_a(self, secret):
+                return 'a'
+
+            def _calc_checksum_builtin(self, secret):
+                return 'builtin'
+
+        # not chosen by default
+        self.assertEqual(d1.get_backend(), "a")
+        self.assertTrue(d1.has_backend("builtin_pool"))
+        self.assertEqual(d1.get_backend(), "a")
+
+        # local class can't be imported by workers, so runs in calling thread
+        d1.set_backend("builtin_pool")
+        self.assertEqual(d1.get_backend(), "builtin_pool")
+        self.assertEqual(d1()._calc_checksum('s'), 'builtin')
+        d1.set_backend("a")
+        self.assertEqual(d1()._calc_checksum('s'), 'a')
+
+        # requires builtin backend
+        class d2(d1):
+            backends = ("a",)
+        self.assertRaises(ValueError, d2.set_backend, "builtin_pool")
+        self.assertRaises(ValueError, d2.has_backend, "builtin_pool")
+
+    def test_43_builtin_pool_mixin(self):
+        """test SubclassBackendMixin -- builtin_pool backend"""
+        class d1_common(uh.SubclassBackendMixin, uh.GenericHandler):
+            name = 'd1'
+            setting_kwds = ()
+
+        class d1_a(d1_common):
+            @classmethod
+            def _load_backend_mixin(mixin_cls, name, dryrun):
+                return True
+
+            def _calc_checksum(self, secret):
+                return 'a'
+
+        class d1_builtin(d1_common):
+            @classmethod
+            def _load_backend_mixin(mixin_cls, name, dryrun):
+                return True
+
+            def _calc_checksum(self, secret):
+                return 'builtin'
+
+        class d1(d1_common):
+            backends = ("a", "builtin")
+            _backend_mixin_target = True
+            _backend_mixin_map = {"a": d1_a, "builtin": d1_builtin}
+
+        class d1_wrapper(d1):
+            def _calc_checksum(self, secret):
+                return "w-" + super(d1_wrapper, self)._calc_checksum(secret)
+
+        self.assertEqual(d1.get_backend(), "a")
+        d1_wrapper.set_backend("builtin_pool")
+        self.assertEqual(d1.get_backend(), "builtin_pool")
+        self.assertEqual(d1()._calc_checksum('s'), 'builtin')
+        self.assertEqual(d1_wrapper()._calc_checksum('s'), 'w-builtin')
+        self.assertIn(d1._pool_backend_mixin, d1.__bases__)
+        self.assertTrue(issubclass(d1._pool_backend_mixin, d1_builtin))
+
+        # switching away should remove pool mixin
+        # NOTE: checking __bases__, since ABCMeta caches issubclass() results
+        d1.set_backend("a")
+        self.assertEqual(d1_wrapper()._calc_checksum('s'), 'w-a')
+        self.assertEqual(d1.__bases__, (d1_a, d1_common))
+
+    def test_44_builtin_pool_workers(self):
+        """test BuiltinPool worker processes"""
+        from passlib.hash import md5_crypt
+        self.assertRaises(ValueError, uh.BuiltinPool, size=0)
+        self.assertRaises(ValueError, uh.BuiltinPool, queue_depth=0)
+        self.assertEqual(uh.BuiltinPool(size=3).queue_depth, 12)
+
+        pool = uh.BuiltinPool(size=1, queue_depth=1)
+        self.addCleanup(pool.shutdown)
+        self.patchAttr(uh, "builtin_pool", pool)
+        self.addCleanup(md5_crypt.set_backend, md5_crypt.get_backend())
+        hash = md5_crypt.using(salt="abcdefgh").hash("test")
+        md5_crypt.set_backend("builtin_pool")
+
+        # should run in worker process, w/ settings from using() subclass
+        self.assertEqual(md5_crypt.using(salt="abcdefgh").hash("test"), hash)
+        self.assertTrue(pool._executor)
+        self.assertTrue(md5_crypt.verify("test", hash))
+        self.assertFalse(md5_crypt.verify("wrong", hash))
+
+        # errors raised by worker should be passed through
+        # (builtin md5_crypt asserts secret is bytes)
+        self.assertRaises(AssertionError, md5_crypt._calc_checksum_builtin_pool,
+                          md5_crypt.from_string(hash), None)
+
+        # shutdown() should restart workers on demand
+        pool.shutdown()
+        self.assertIs(pool._executor, None)
+        self.assertTrue(md5_crypt.verify("test", hash))
+        self.assertTrue(pool._executor)
+
+        # pool falls back to calling thread if broken
+        def bad_submit(*a, **k):
+            raise RuntimeError("pool broken")
+        self.patchAttr(pool._executor, "submit", bad_submit)
+        self.assertTrue(md5_crypt.verify("test", hash))
+        self.assertIs(pool._executor, False)
+        self.assertTrue(md5_crypt.verify("test", hash))
+
+    def test_45_builtin_pool_run_many(self):
+        """test BuiltinPool.run_many()"""
+        import operator
+        pool = uh.BuiltinPool(size=2, queue_depth=1)
+        self.addCleanup(pool.shutdown)
+
+        # should preserve order, even if more tasks than queue_depth
+        args = [(idx, 3) for idx in range(5)]
+        self.assertEqual(pool.run_many(operator.mul, args), [0, 3, 6, 9, 12])
+        self.assertEqual(pool.run_many(operator.mul, []), [])
+
+        # errors raised by worker should be passed through
+        self.assertRaises(TypeError, pool.run_many, operator.mul, [(None, None)])
+        self.assertTrue(pool._executor)
+
+        # should return None if pool is broken
+        def bad_submit(*a, **k):
+            raise RuntimeError("pool broken")
+        self.patchAttr(pool._executor, "submit", bad_submit)
+        self.assertIs(pool.run_many(operator.mul, args), None)
+        self.assertIs(pool._executor, False)
+        self.assertIs(pool.run_many(operator.mul, args), None)
+
     def test_50_norm_ident(self):
         """test GenericHandler + HasManyIdents"""
         # setup helpers
@@ -564,6 +713,81 @@ class SkeletonTest(TestCase):
         ##self.assertEqual(hash.fshp.bitsize(variant=1),
         ##                {'checksum': 256, 'rounds': 13, 'salt': 128})
 
+    def test_91_parse_cache(self):
+        """test parse_cache & shared_parse_scope()"""
+        calls = []
+        class d1(uh.HasRounds, uh.GenericHandler):
+            name = 'd1'
+            setting_kwds = ('rounds',)
+            min_rounds = 1
+            max_rounds = 10
+            default_rounds = 5
+
+            @classmethod
+            def from_string(cls, hash):
+                calls.append(hash)
+                rounds, chk = hash.split(":")
+                return cls(rounds=int(rounds), checksum=chk)
+
+            def to_string(self):
+                return "%d:%s" % (self.rounds, self.checksum)
+
+            def _calc_checksum(self, secret):
+                return secret[::-1] + str(self.rounds)
+
+        h1 = d1.hash("abc")
+        self.assertEqual(h1, "5:cba5")
+        h2 = d1.using(rounds=3).hash("xyz")
+
+        # no cache by default
+        self.assertTrue(d1.verify("abc", h1))
+        self.assertFalse(d1.needs_update(h1))
+        self.assertEqual(len(calls), 2)
+
+        # parse_cache
+        from passlib.utils.handlers import ParsedHashCache
+        self.assertRaises(ValueError, ParsedHashCache, 0)
+        self.assertRaises(TypeError, ParsedHashCache, "1")
+        cache = ParsedHashCache(max_size=1)
+        self.patchAttr(d1, "parse_cache", cache)
+        del calls[:]
+        self.assertTrue(d1.verify("abc", h1))
+        self.assertFalse(d1.verify("xxx", h1))
+        self.assertFalse(d1.needs_update(h1))
+        self.assertEqual(d1.verify_many(["x", "abc"], h1), [False, True])
+        self.assertEqual(calls, [h1])
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+        self.assertFalse(d1.needs_update(h2))
+        self.assertEqual(len(cache), 1)
+        self.assertTrue(d1.verify("abc", h1))
+        self.assertEqual(calls, [h1, h2, h1])
+
+        # custom subclasses have separate entries
+        d2 = d1.using(min_desired_rounds=6)
+        self.assertTrue(d2.needs_update(h1))
+        self.assertEqual(calls, [h1, h2, h1, h1])
+
+        # errors aren't cached
+        self.assertRaises(ValueError, d1.verify, "abc", "bad")
+        self.assertRaises(ValueError, d1.verify, "abc", "bad")
+        self.assertEqual(calls[-2:], ["bad", "bad"])
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+        # shared_parse_scope() w/o cache
+        self.patchAttr(d1, "parse_cache", None)
+        del calls[:]
+        with uh.shared_parse_scope():
+            self.assertTrue(d1.verify("abc", h1))
+            with uh.shared_parse_scope():
+                self.assertFalse(d1.needs_update(h1))
+            self.assertFalse(d1.needs_update(h1))
+        self.assertEqual(calls, [h1])
+        self.assertTrue(d1.verify("abc", h1))
+        self.assertEqual(calls, [h1, h1])
+
     #===================================================================
     # eoc
     #===================================================================
@@ -28,7 +28,7 @@ from passlib.tests.backports import TestCase as _TestCase, skip, skipIf, skipUnl
 from passlib.utils import has_rounds_info, has_salt_info, rounds_cost_values, \
                           rng as sys_rng, getrandstr, is_ascii_safe, to_native_str, \
                           repeat_string, tick, batch
-from passlib.utils.compat import iteritems, irange, u, unicode, PY2
+from passlib.utils.compat import iteritems, irange, u, unicode, PY2, get_unbound_method_function
 from passlib.utils.decor import classproperty
 import passlib.utils.handlers as uh
 # local
@@ -528,9 +528,8 @@ class TestCase(_TestCase):
     #===================================================================
     def require_stringprep(self):
         """helper to skip test if stringprep is missing"""
-        from passlib.utils import stringprep
-        if not stringprep:
-            from passlib.utils import _stringprep_missing_reason
+        from passlib.utils import _stringprep_missing_reason
+        if _stringprep_missing_reason:
             raise self.skipTest("not available - stringprep module is " +
                                 _stringprep_missing_reason)
 
@@ -2123,6 +2122,32 @@ class HandlerCase(TestCase):
         for c in chars:
             self.assertRaises(ValueError, self.do_encrypt, base + c + base)
 
+    def prepare_verify_many(self):
+        """
+        subclassable hook called by :meth:`test_verify_many`,
+        e.g. to lower batch thresholds so the batch code path is used for a few secrets.
+        """
+
+    def test_verify_many(self):
+        """test verify_many() matches verify()"""
+        handler = self.handler
+        calc_many = getattr(handler, "_calc_checksum_many", None)
+        if calc_many is None or get_unbound_method_function(calc_many) is \
+                get_unbound_method_function(uh.GenericHandler._calc_checksum_many):
+            raise self.skipTest("handler doesn't implement _calc_checksum_many()")
+        self.prepare_verify_many()
+        context = {}
+        self.populate_context("", context)
+        hash = self.do_encrypt("test")
+        secrets = ["test", "testx", "", u("t\xe9st"), "test", "x" * 40]
+        result = handler.verify_many(secrets, hash, **context)
+        self.assertEqual(result, [self.do_verify(secret, hash) for secret in secrets])
+        self.assertEqual(result[0], not handler.is_disabled)
+        self.assertEqual(handler.verify_many(iter(secrets[:2]), hash, **context), result[:2])
+        self.assertEqual(handler.verify_many([], hash, **context), [])
+        self.assertRaises(ValueError, handler.verify_many, ["test"], hash[:-1], **context)
+        self.assertRaises(TypeError, handler.verify_many, [None], hash, **context)
+
     #===================================================================
     # check identify(), verify(), genhash() against test vectors
     #===================================================================
@@ -13,6 +13,7 @@ import logging; log = logging.getLogger(__name__)
 import math
 import struct
 import sys
+import threading
 import time as _time
 import re
 if PY3:
@@ -36,7 +37,8 @@ except ImportError:
 from passlib import exc
 from passlib.exc import TokenError, MalformedTokenError, InvalidTokenError, UsedTokenError
 from passlib.utils import (to_unicode, to_bytes, consteq,
-                           getrandbytes, rng, SequenceMixin, xor_bytes, getrandstr)
+                           getrandbytes, rng, SequenceMixin, xor_bytes, getrandstr, timer,
+                           LRUCache)
 from passlib.utils.binary import BASE64_CHARS, b32encode, b32decode
 from passlib.utils.compat import (u, unicode, native_string_types, bascii_to_str, int_types, num_types,
                                   irange, byte_elem_value, UnicodeIO, suppress_cause)
@@ -48,6 +50,12 @@ __all__ = [
     # frontend classes
     "AppWallet",
     "TOTP",
+    "TotpVerifier",
+
+    # replay protection
+    "CounterStore",
+    "MemoryCounterStore",
+    "SQLiteCounterStore",
 
     # errors (defined in passlib.exc, but exposed here for convenience)
     "TokenError",
@@ -1155,14 +1163,16 @@ class TOTP(object):
             Can be anything accepted by :meth:`TOTP.from_source`.
 
         :param \*\*kwds:
-            All additional keywords passed to :meth:`TOTP.match`.
+            All additional keywords passed to :meth:`TOTP.match`
+            (e.g. *store* & *store_key*, for replay protection).
 
         :return:
             A :class:`TotpMatch` instance, or raises a :exc:`TokenError`.
         """
         return cls.from_source(source).match(token, **kwds)
 
-    def match(self, token, time=None, window=30, skew=0, last_counter=None):
+    def match(self, token, time=None, window=30, skew=0, last_counter=None,
+              store=None, store_key=None):
         """
         Match TOTP token against specified timestamp.
         Searches within a window before & after the provided time,
@@ -1209,6 +1219,21 @@ class TOTP(object):
             and thus should never provide a token older than previously
             verified value.
 
+        :param store:
+            Optional :class:`CounterStore` instance to track the last counter in,
+            instead of passing in *last_counter*.
+            The last counter is read from the store, and on a successful match,
+            the matched counter is saved via an atomic compare-and-set;
+            so concurrent requests can't both accept the same token.
+
+            .. versionadded:: 1.8
+
+        :param store_key:
+            Key identifying this TOTP object in the *store* (e.g. the user id).
+            Required if *store* is specified.
+
+            .. versionadded:: 1.8
+
         :raises ~passlib.exc.TokenError:
 
             If the token is malformed, fails to match, or has already been used.
@@ -1237,6 +1262,9 @@ class TOTP(object):
                 ...
             InvalidTokenError: Token did not match
         """
+        if store is not None:
+            return self._match_w_store(token, time, window, skew, last_counter,
+                                       store, store_key)
         time = self.normalize_time(time)
         self._check_serial(window, "window")
 
@@ -1245,14 +1273,19 @@ class TOTP(object):
             last_counter = -1
         start = max(last_counter, self._time_to_counter(client_time - window))
         end = self._time_to_counter(client_time + window) + 1
-        # XXX: could pass 'expected = _time_to_counter(client_time + TRANSMISSION_DELAY)'
-        #      to the _find_match() method, would help if window set to very large value.
+        # XXX: could use 'expected = _time_to_counter(client_time + TRANSMISSION_DELAY)'
+        expected = self._time_to_counter(client_time)
 
-        counter = self._find_match(token, start, end)
-        assert counter >= last_counter, "sanity check failed: counter went backward"
+        token = self.normalize_token(token)
+        if start == last_counter >= 0:
+            # NOTE: checking last counter first, so a reused token is always rejected,
+            #       even if it happens to match another counter in the window as well.
+            if consteq(token, self._generate(last_counter)):
+                raise UsedTokenError(expire_time=(last_counter + 1) * self.period)
+            start += 1
 
-        if counter == last_counter:
-            raise UsedTokenError(expire_time=(last_counter + 1) * self.period)
+        counter = self._find_match(token, start, end, expected)
+        assert counter > last_counter, "sanity check failed: counter went backward"
 
         # NOTE: By returning match tied to <time>, not <client_time>, we're
         #       causing .skipped to reflect the observed skew, independent of
@@ -1260,6 +1293,22 @@ class TOTP(object):
         #       can use historical .skipped values to estimate future skew.
         return TotpMatch(self, counter, time, window)
 
+    def _match_w_store(self, token, time, window, skew, last_counter, store, store_key):
+        """helper for match() -- handles 'store' parameter"""
+        if store_key is None:
+            raise TypeError("'store_key' must be specified along with 'store'")
+        if last_counter is not None:
+            raise TypeError("'last_counter' and 'store' are mutually exclusive")
+        last_counter = store.get(store_key)
+        result = self.match(token, time, window, skew, last_counter)
+        # if another request updated the counter since it was read,
+        # this token is only valid if it's still newer than that one.
+        while not store.compare_and_set(store_key, last_counter, result.counter):
+            last_counter = store.get(store_key)
+            if last_counter is not None and last_counter >= result.counter:
+                raise UsedTokenError(expire_time=(last_counter + 1) * self.period)
+        return result
+
     def _find_match(self, token, start, end, expected=None):
         """
         helper for verify() --
@@ -1276,7 +1325,9 @@ class TOTP(object):
 
         :arg expected:
             optional expected value where search should start,
-            to help speed up searches.
+            to help speed up searches. the search works outward from here,
+            alternately checking the counters before & after it;
+            so if the token matches multiple counters, the closest one is returned.
 
         :raises ~passlib.exc.TokenError:
             If the token is malformed, or fails to verify.
@@ -1290,27 +1341,119 @@ class TOTP(object):
         if end <= start:
             raise InvalidTokenError()
         generate = self._generate
-        if not (expected is None or expected < start) and consteq(token, generate(expected)):
+        if expected is None or not start <= expected < end:
+            expected = start
+        if consteq(token, generate(expected)):
             return expected
-        # XXX: if (end - start) is very large (e.g. for resync purposes),
-        #      could start with expected value, and work outward from there,
-        #      alternately checking before & after it until match is found.
+        # NOTE: checking earlier counter first at each step, since clients
+        #       more commonly lag behind (transmission delay, slow clocks).
         # XXX: can't use irange(start, end) here since py2x/win32
         #      throws error on values >= (1<<31), which 'end' can be.
-        counter = start
+        before = expected - 1
+        after = expected + 1
+        while before >= start or after < end:
+            if before >= start:
+                if consteq(token, generate(before)):
+                    return before
+                before -= 1
+            if after < end:
+                if consteq(token, generate(after)):
+                    return after
+                after += 1
+        raise InvalidTokenError()
+
+    def resync(self, tokens, time=None, window=300, skew=0, last_counter=None, min_tokens=2):
+        """
+        Re-synchronize with a client whose clock has drifted too far
+        for :meth:`match` to find its tokens, using a series of consecutive tokens
+        (e.g. read off a hardware token, one period apart).
+        Per the RFC's recommendation, *all* the tokens have to match consecutive counters.
+
+        :arg tokens:
+            Sequence of consecutive tokens, oldest first.
+            The last one should be the token displayed at *time*.
+
+        :param time:
+            Timestamp the last token was received
+            (uses current system time if ``None``).
+
+        :param int window:
+            How far backward and forward in time to search for the last token.
+            Measured in seconds. Defaults to ``300``.
+
+        :param int skew:
+            Clock skew to assume (as per :meth:`match`). Defaults to ``0``.
+
+        :param last_counter:
+            Optional value of last counter value that was successfully used.
+            If specified, none of the tokens may match this counter or earlier.
+
+        :param int min_tokens:
+            Minimum number of tokens required. Defaults to ``2``.
+
+        :raises ValueError:
+            If fewer than *min_tokens* tokens were provided.
+
+        :raises ~passlib.exc.TokenError:
+            If any of the tokens are malformed, or they don't match
+            consecutive counters within the window.
+
+        :returns TotpMatch:
+            :class:`TotpMatch` instance for the last token.
+            Its :attr:`~TotpMatch.skipped` attribute gives the client's drift
+            (in periods), so ``skipped * period`` can be stored, and passed
+            as the *skew* for subsequent :meth:`match` calls.
+
+        .. note::
+
+            This doesn't stop at the first match: each token is compared against
+            every counter in the window, so the time taken doesn't depend on
+            how many of them matched (or where).
+            Each counter's token is only generated once.
+
+        .. versionadded:: 1.8
+        """
+        if len(tokens) < max(min_tokens, 1):
+            raise ValueError("at least %d tokens required" % max(min_tokens, 1))
+        tokens = [self.normalize_token(token) for token in tokens]
+        time = self.normalize_time(time)
+        self._check_serial(window, "window")
+        count = len(tokens)
+
+        # figure out range of counters the *last* token may match
+        client_time = time + skew
+        start = self._time_to_counter(client_time - window)
+        end = self._time_to_counter(client_time + window) + 1
+        start = max(start, count - 1)
+        if last_counter is not None:
+            start = max(start, last_counter + count)
+        if end <= start:
+            raise InvalidTokenError()
+
+        # generate token for every counter that could be matched
+        first = start - count + 1
+        generate = self._generate
+        candidates = []
+        counter = first
         while counter < end:
-            if consteq(token, generate(counter)):
-                return counter
+            candidates.append(generate(counter))
             counter += 1
-        raise InvalidTokenError()
 
-    #-------------------------------------------------------------------------
-    # TODO: resync(self, tokens, time=None, min_tokens=10, window=100)
-    #       helper to re-synchronize using series of sequential tokens,
-    #       all of which must validate; per RFC recommendation.
-    # NOTE: need to make sure this function is constant time
-    #       (i.e. scans ALL tokens, and doesn't short-circuit after first mismatch)
-    #-------------------------------------------------------------------------
+        # check every offset against every token, keeping the match
+        # closest to the expected counter.
+        expected = self._time_to_counter(client_time)
+        found = None
+        for offset in irange(end - start):
+            result = True
+            for idx, token in enumerate(tokens):
+                # NOTE: deliberately not using short-circuiting "and" here
+                result &= consteq(token, candidates[offset + idx])
+            counter = start + offset
+            if result and (found is None or abs(counter - expected) < abs(found - expected)):
+                found = counter
+        if found is None:
+            raise InvalidTokenError()
+        return TotpMatch(self, found, time, window)
 
     #=============================================================================
     # generic parsing
@@ -1878,6 +2021,449 @@ class TotpMatch(SequenceMixin):
         args = (self.counter, self.time, self.cache_seconds)
         return "<TotpMatch counter=%d time=%d cache_seconds=%d>" % args
 
+#=============================================================================
+# bulk verification
+#=============================================================================
+class TotpVerifier(object):
+    """
+    Helper for servers which verify tokens for many users,
+    using each user's serialized TOTP state.
+
+    Calling :meth:`TOTP.verify` for each request means the source has to be parsed,
+    the key decrypted (if it was encrypted via :class:`AppWallet`),
+    and the HMAC key state computed, every time.
+    This object keeps a bounded cache of the :class:`TOTP` instances
+    loaded from each source string, so that's only done the first time
+    a source is seen (or after it changes).
+
+    :param factory:
+        :class:`TOTP` class used to load sources -- usually one returned
+        by :meth:`TOTP.using`, configured with the application's secrets.
+        Defaults to :class:`!TOTP`.
+
+    :param int max_size:
+        Max number of sources to cache (least-recently-used are evicted first).
+        Defaults to ``1024``.
+
+    .. warning::
+
+        Cached :class:`!TOTP` instances are shared between callers (and threads),
+        so they should be treated as read-only. They also hold decrypted keys,
+        so the cache should be sized with that in mind.
+        Only string sources are cached.
+
+    .. automethod:: load
+    .. automethod:: match
+    .. automethod:: match_many
+    .. automethod:: clear
+
+    .. attribute:: hits
+    .. attribute:: misses
+
+        Number of :meth:`load` calls which found / didn't find a cached instance.
+
+    .. autoattribute:: hit_rate
+
+    .. versionadded:: 1.8
+    """
+    #=============================================================================
+    # instance attrs
+    #=============================================================================
+
+    #: TOTP class used to load sources
+    factory = None
+
+    #=============================================================================
+    # init
+    #=============================================================================
+    def __init__(self, factory=None, max_size=1024):
+        if factory is None:
+            factory = TOTP
+        elif not (isinstance(factory, type) and issubclass(factory, TOTP)):
+            raise exc.ExpectedTypeError(factory, "TOTP subclass", "factory")
+        self.factory = factory
+        # maps source string -> TOTP instance
+        self._cache = LRUCache(max_size)
+
+    #=============================================================================
+    # cache
+    #=============================================================================
+    def load(self, source):
+        """
+        Return :class:`TOTP` instance for *source*
+        (as per :meth:`TOTP.from_source`), re-using cached instance if possible.
+
+        :raises ValueError:
+            If the source can't be loaded (see :meth:`TOTP.from_source`).
+        """
+        if not isinstance(source, (bytes, unicode)):
+            # dicts / TOTP instances aren't cached
+            return self._load(source)
+        return self._cache.load(source, lambda: self._load(source))
+
+    def _load(self, source):
+        """load TOTP instance, and precompute its HMAC state"""
+        totp = self.factory.from_source(source)
+        if totp._keyed_hmac is None:
+            # NOTE: done here so it's shared by all users of the cached instance,
+            #       rather than each thread racing to compute it in _generate().
+            totp._keyed_hmac = compile_hmac(totp.alg, totp.key)
+        return totp
+
+    def clear(self):
+        """remove all entries from cache, and reset hit / miss counters"""
+        self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    def max_size(self):
+        """max number of entries"""
+        return self._cache.max_size
+
+    @property
+    def hits(self):
+        return self._cache.hits
+
+    @property
+    def misses(self):
+        return self._cache.misses
+
+    @property
+    def hit_rate(self):
+        """fraction of :meth:`load` calls which were served from the cache (``0.0`` if none)"""
+        return self._cache.hit_rate
+
+    #=============================================================================
+    # matching
+    #=============================================================================
+    def match(self, source, token, time=None, **kwds):
+        """
+        Match token against TOTP loaded from *source*.
+        This is equivalent to :meth:`TOTP.verify`, except the loaded :class:`!TOTP` is cached.
+
+        :returns:
+            :class:`TotpMatch` instance (:attr:`!TotpMatch.totp` is the cached :class:`!TOTP`).
+
+        :raises ~passlib.exc.TokenError:
+            if the token is malformed, fails to match, or has already been used.
+        """
+        return self.load(source).match(token, time, **kwds)
+
+    def match_many(self, items, time=None, window=30, skew=0):
+        """
+        Match a batch of tokens, for (possibly) different TOTP sources.
+
+        :arg items:
+            iterable of ``(source, token, last_counter)`` tuples,
+            *last_counter* may be ``None`` (see :meth:`TOTP.match`).
+
+        :param time:
+            Timestamp the tokens were received, used for the whole batch
+            (uses current time if ``None``).
+
+        :param window:
+        :param skew:
+            passed to :meth:`TOTP.match` for each item.
+
+        :returns:
+            list containing one entry per item, in the same order:
+            either a :class:`TotpMatch` instance, or the :exc:`ValueError`
+            (usually a :exc:`~passlib.exc.TokenError`) raised when matching it;
+            so one bad token doesn't abort the rest of the batch.
+        """
+        # NOTE: normalizing time once for entire batch
+        time = self.factory.normalize_time(time)
+        load = self.load
+        results = []
+        append = results.append
+        for source, token, last_counter in items:
+            try:
+                append(load(source).match(token, time, window=window, skew=skew,
+                                          last_counter=last_counter))
+            except ValueError as err:
+                append(err)
+        return results
+
+    #=============================================================================
+    # eoc
+    #=============================================================================
+
+#=============================================================================
+# replay protection
+#=============================================================================
+
+#: private object used to mark entries which haven't been loaded
+_UNSET = object()
+
+class CounterStore(object):
+    """
+    Base class for stores which track the last counter used by each TOTP object,
+    for use with the *store* parameter of :meth:`TOTP.match`.
+
+    Entries are keyed by an application-chosen string (e.g. the user id),
+    and counters should only ever increase.
+    Subclasses must implement :meth:`get` and :meth:`compare_and_set`.
+
+    .. automethod:: get
+    .. automethod:: compare_and_set
+    .. automethod:: set_many
+    .. automethod:: flush
+    .. automethod:: close
+
+    .. versionadded:: 1.8
+    """
+    def get(self, key):
+        """return last counter stored for *key*, or ``None`` if there isn't one"""
+        raise NotImplementedError("should be implemented by subclass")
+
+    def compare_and_set(self, key, expected, counter):
+        """
+        Atomically set counter for *key*, but only if its current value is *expected*
+        (``None`` meaning there isn't an entry yet).
+
+        :returns: ``True`` if the counter was set, ``False`` if *expected* was out of date.
+        """
+        raise NotImplementedError("should be implemented by subclass")
+
+    def set_many(self, items):
+        """
+        Raise the counters for a batch of ``(key, counter)`` pairs
+        (entries which already have a counter this large are left alone).
+        The default implementation just calls :meth:`compare_and_set` for each one.
+        """
+        for key, counter in items:
+            current = self.get(key)
+            while current is None or current < counter:
+                if self.compare_and_set(key, current, counter):
+                    break
+                current = self.get(key)
+
+    def flush(self):
+        """write any pending changes to durable storage (no-op by default)"""
+
+    def close(self):
+        """flush pending changes, and release any resources"""
+        self.flush()
+
+class MemoryCounterStore(CounterStore):
+    """
+    :class:`CounterStore` which keeps counters in memory,
+    split into *shards* to reduce lock contention between threads.
+
+    On its own, this is only suitable for a single process, and counters are lost
+    when it exits. If a *backend* store is provided, this acts as a write-behind
+    cache in front of it: missing entries are loaded from the backend when first used,
+    and changed counters are written to it in batches via :meth:`~CounterStore.set_many`,
+    whenever *flush_size* changes are pending, or *flush_interval* seconds have passed
+    since the last flush (checked on each change), or :meth:`flush` is called.
+
+    :param backend:
+        Optional :class:`CounterStore` to load from & flush to
+        (e.g. :class:`SQLiteCounterStore`).
+
+    :param int shards:
+        number of independently locked shards (defaults to ``16``).
+
+    :param int flush_size:
+        flush when this many changes are pending (defaults to ``100``).
+
+    :param flush_interval:
+        flush when this many seconds have passed since the last flush
+        (defaults to ``5``, ``None`` to disable).
+
+    .. warning::
+
+        With a backend, counters changed since the last flush will be lost if
+        the process crashes; tokens for those counters could then be replayed,
+        until they fall outside the match window. Call :meth:`close` at shutdown,
+        and keep *flush_interval* short relative to the window.
+        This cache also isn't shared between processes -- if multiple processes
+        use the same backend, each should use the backend directly instead.
+
+    .. versionadded:: 1.8
+    """
+    #=============================================================================
+    # instance attrs
+    #=============================================================================
+
+    #: backend store (or ``None``)
+    backend = None
+
+    #: flush options
+    flush_size = 100
+    flush_interval = 5
+
+    #=============================================================================
+    # init
+    #=============================================================================
+    def __init__(self, backend=None, shards=16, flush_size=100, flush_interval=5):
+        if backend is not None and not isinstance(backend, CounterStore):
+            raise exc.ExpectedTypeError(backend, "CounterStore", "backend")
+        if not isinstance(shards, int_types):
+            raise exc.ExpectedTypeError(shards, "int", "shards")
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        if flush_size < 1:
+            raise ValueError("flush_size must be at least 1")
+        self.backend = backend
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        # list of (dict mapping key -> counter, lock) pairs
+        self._shards = [({}, threading.Lock()) for _ in irange(shards)]
+        # dict mapping key -> counter, for changes not yet written to backend
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._last_flush = timer()
+
+    def _get_shard(self, key):
+        shards = self._shards
+        return shards[hash(key) % len(shards)]
+
+    #=============================================================================
+    # CounterStore interface
+    #=============================================================================
+    def get(self, key):
+        entries, lock = self._get_shard(key)
+        with lock:
+            value = entries.get(key, _UNSET)
+        if value is not _UNSET:
+            return value
+        if self.backend is None:
+            return None
+        # NOTE: loading outside lock; if another thread stored a value in the meantime,
+        #       that one wins.
+        value = self.backend.get(key)
+        with lock:
+            return entries.setdefault(key, value)
+
+    def compare_and_set(self, key, expected, counter):
+        entries, lock = self._get_shard(key)
+        if self.backend is not None:
+            # make sure entry has been loaded from backend
+            self.get(key)
+        with lock:
+            if entries.get(key) != expected:
+                return False
+            entries[key] = counter
+        if self.backend is not None:
+            with self._pending_lock:
+                self._pending[key] = counter
+                need_flush = (len(self._pending) >= self.flush_size or
+                              (self.flush_interval is not None and
+                               timer() - self._last_flush >= self.flush_interval))
+            if need_flush:
+                self.flush()
+        return True
+
+    def flush(self):
+        """write pending changes to backend"""
+        if self.backend is None:
+            return
+        with self._pending_lock:
+            pending = self._pending
+            self._pending = {}
+            self._last_flush = timer()
+        if not pending:
+            return
+        try:
+            self.backend.set_many(pending.items())
+        except Exception:
+            # put changes back, so they're retried next flush
+            with self._pending_lock:
+                current = self._pending
+                for key, counter in pending.items():
+                    if current.get(key, -1) < counter:
+                        current[key] = counter
+            raise
+
+    def __len__(self):
+        return sum(len(entries) for entries, _ in self._shards)
+
+    #=============================================================================
+    # eoc
+    #=============================================================================
+
+class SQLiteCounterStore(CounterStore):
+    """
+    :class:`CounterStore` which keeps counters in an SQLite database
+    (via the stdlib :mod:`!sqlite3` module).
+    Changes are atomic across threads & processes sharing the same database file.
+
+    :arg path:
+        path to database file (created if it doesn't exist).
+
+    :param table:
+        name of table to store counters in (created if it doesn't exist),
+        defaults to ``"totp_counters"``.
+
+    .. versionadded:: 1.8
+    """
+    #=============================================================================
+    # init
+    #=============================================================================
+    def __init__(self, path, table="totp_counters"):
+        import sqlite3
+        if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", table):
+            raise ValueError("invalid table name: %r" % (table,))
+        self.path = path
+        self.table = table
+        # NOTE: using autocommit mode (isolation_level=None), with explicit
+        #       transactions for batches; connection is shared between threads
+        #       via self._lock.
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS %s "
+                               "(key TEXT PRIMARY KEY, counter INTEGER NOT NULL)" % table)
+
+    #=============================================================================
+    # CounterStore interface
+    #=============================================================================
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT counter FROM %s WHERE key = ?" % self.table,
+                                     (key,)).fetchone()
+        return row[0] if row else None
+
+    def compare_and_set(self, key, expected, counter):
+        table = self.table
+        with self._lock:
+            if expected is None:
+                cursor = self._conn.execute("INSERT OR IGNORE INTO %s (key, counter) "
+                                            "VALUES (?, ?)" % table, (key, counter))
+            else:
+                cursor = self._conn.execute("UPDATE %s SET counter = ? "
+                                            "WHERE key = ? AND counter = ?" % table,
+                                            (counter, key, expected))
+            return cursor.rowcount == 1
+
+    def set_many(self, items):
+        """raise counters for batch of ``(key, counter)`` pairs, within a single transaction"""
+        items = list(items)
+        table = self.table
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("INSERT OR IGNORE INTO %s (key, counter) VALUES (?, ?)" % table,
+                                 items)
+                conn.executemany("UPDATE %s SET counter = ? WHERE key = ? AND counter < ?" % table,
+                                 [(counter, key, counter) for key, counter in items])
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    #=============================================================================
+    # eoc
+    #=============================================================================
+
 #=============================================================================
 # convenience helpers
 #=============================================================================
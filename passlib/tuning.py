@@ -0,0 +1,333 @@
+"""passlib.tuning -- calibrate CryptContext cost settings for the current hardware
+
+This module measures how long each scheme in a :class:`~passlib.context.CryptContext`
+takes to verify a hash, and picks cost settings (``default_rounds``,
+argon2's ``memory_cost``, scrypt's ``block_size``) which will hit a target latency.
+The result can be rendered as an INI fragment, suitable for
+:meth:`CryptContext.from_string() <passlib.context.CryptContext.from_string>`.
+
+.. versionadded:: 1.8
+"""
+#=============================================================================
+# imports
+#=============================================================================
+# core
+from __future__ import absolute_import, division, print_function
+import math
+import logging; log = logging.getLogger(__name__)
+import threading
+# site
+# pkg
+from passlib.context import CryptContext
+from passlib.utils import timer
+from passlib.utils.compat import irange, iteritems, int_types
+# local
+__all__ = [
+    "measure_latency",
+    "tune_context",
+    "SchemeTuning",
+    "TuningReport",
+]
+
+#=============================================================================
+# measurement
+#=============================================================================
+
+#: secret used when timing verify() calls
+_SAMPLE_SECRET = "tuning-S3cr3t"
+
+def _percentile(values, percent):
+    """return nearest-rank *percent*'th percentile of (non-empty) *values*"""
+    values = sorted(values)
+    rank = int(math.ceil(percent / 100.0 * len(values)))
+    return values[max(rank, 1) - 1]
+
+def _median(values):
+    values = sorted(values)
+    count = len(values)
+    mid = count // 2
+    if count & 1:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) / 2
+
+def measure_latency(handler, concurrency=1, samples=5, warmup=1, percentile=95):
+    """
+    measure how long it takes *handler* to verify a hash.
+
+    Each sample runs *concurrency* threads, each of which verifies
+    a hash once, and takes the *percentile*'th latency of those calls.
+    The median of the *samples* is returned (in seconds).
+    Before any of this, *warmup* untimed samples are run
+    (to load backends, fill caches, etc).
+
+    .. note::
+
+        Concurrent calls are run in threads, so this reflects the behavior
+        of threaded servers -- backends which hold the GIL will see their latency
+        scale linearly with *concurrency*, backends which release it may not.
+    """
+    hash = handler.hash(_SAMPLE_SECRET)
+    verify = handler.verify
+
+    def run_sample():
+        latencies = []
+        def worker():
+            start = timer()
+            verify(_SAMPLE_SECRET, hash)
+            latencies.append(timer() - start)
+        if concurrency == 1:
+            worker()
+        else:
+            threads = [threading.Thread(target=worker) for _ in irange(concurrency)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return _percentile(latencies, percentile)
+
+    for _ in irange(warmup):
+        run_sample()
+    return _median([run_sample() for _ in irange(samples)])
+
+#=============================================================================
+# results
+#=============================================================================
+class SchemeTuning(object):
+    """
+    result of tuning a single scheme, as returned in :attr:`TuningReport.results`.
+
+    .. attribute:: scheme
+
+        name of scheme
+
+    .. attribute:: settings
+
+        dict of chosen settings, e.g. ``{"default_rounds": 12}``
+
+    .. attribute:: latency
+
+        latency measured using the chosen settings (in seconds)
+    """
+    def __init__(self, scheme, settings, latency):
+        self.scheme = scheme
+        self.settings = settings
+        self.latency = latency
+
+    def __repr__(self):
+        return "<SchemeTuning %s %r latency=%.3fs>" % (self.scheme, self.settings, self.latency)
+
+class TuningReport(object):
+    """
+    result of :func:`tune_context`.
+
+    .. attribute:: context
+
+        copy of the original :class:`!CryptContext`, with the tuned settings applied.
+
+    .. attribute:: results
+
+        list of :class:`SchemeTuning` objects, one per tuned scheme.
+
+    .. automethod:: to_string
+    """
+    def __init__(self, context, results, target, percentile, concurrency):
+        self.context = context
+        self.results = results
+        self.target = target
+        self.percentile = percentile
+        self.concurrency = concurrency
+
+    def to_dict(self):
+        """return dict of tuned ``<scheme>__<setting>`` keys"""
+        return _results_to_dict(self.results)
+
+    def to_string(self, section="passlib"):
+        """
+        render tuned configuration as INI string, suitable for passing to
+        :meth:`CryptContext.from_string() <passlib.context.CryptContext.from_string>`.
+        this contains the full configuration of :attr:`context`,
+        preceded by comments listing the measured latencies.
+
+        :param section: name of INI section to write.
+        """
+        lines = [
+            "# tuned for %dms p%s latency @ concurrency=%d" %
+            (self.target * 1000, self.percentile, self.concurrency),
+        ]
+        for result in self.results:
+            lines.append("# %s: measured %dms" % (result.scheme, result.latency * 1000))
+        return "\n".join(lines) + "\n" + self.context.to_string(section=section)
+
+def _results_to_dict(results):
+    """helper for TuningReport.to_dict()"""
+    return dict(("%s__%s" % (result.scheme, key), value)
+                for result in results
+                for key, value in iteritems(result.settings))
+
+#=============================================================================
+# tuner
+#=============================================================================
+class _RoundsTuner(object):
+    """helper for tune_context() -- tunes the settings for a single scheme"""
+
+    def __init__(self, handler, target, measure, memory_limit):
+        self.handler = handler
+        self.target = target
+        self.measure = measure
+        self.memory_limit = memory_limit
+        self.settings = {}
+        if handler.rounds_cost == "log2":
+            # time cost varies logarithmically with rounds parameter
+            self.rounds_to_cost = lambda rounds: 2 ** rounds
+            self.cost_to_rounds = lambda cost: math.log(cost, 2)
+        else:
+            # time cost varies linearly with rounds parameter
+            assert handler.rounds_cost == "linear"
+            self.rounds_to_cost = self.cost_to_rounds = lambda value: value
+
+    def clamp_rounds(self, rounds):
+        """convert float rounds to int value, clamped to handler's limits"""
+        handler = self.handler
+        if handler.max_rounds and rounds > handler.max_rounds:
+            rounds = handler.max_rounds
+        rounds = int(rounds)
+        if getattr(handler, "_avoid_even_rounds", False):
+            rounds |= 1
+        return max(handler.min_rounds, rounds)
+
+    def measure_rounds(self, rounds):
+        """return ``(latency, speed)`` using specified rounds"""
+        latency = self.measure(self.handler.using(rounds=rounds, **self.settings))
+        return latency, self.rounds_to_cost(rounds) / latency
+
+    def pick_rounds(self, speed):
+        """pick rounds value closest to target, given speed estimate"""
+        rounds = self.cost_to_rounds(speed * self.target)
+        if self.handler.rounds_cost == "log2":
+            # target will usually fall between two integer values;
+            # round up only if that's within 5% of target.
+            upper = self.clamp_rounds(math.ceil(rounds))
+            if self.rounds_to_cost(upper) / speed <= self.target * 1.05:
+                return upper
+            return self.clamp_rounds(rounds)
+        return self.clamp_rounds(round(rounds))
+
+    def tune_rounds(self, iterations=3):
+        """estimate rounds value for target, returns ``(rounds, latency)``"""
+        handler = self.handler
+        # get rough estimate of speed using small fraction of default_rounds
+        # (so we don't take crazy long amounts of time on slow systems / backends),
+        # then re-do estimate using a more accurate number of rounds.
+        rounds = self.clamp_rounds(self.cost_to_rounds(
+            self.rounds_to_cost(handler.default_rounds) / 64))
+        latency, speed = self.measure_rounds(rounds)
+        for _ in irange(iterations):
+            new_rounds = self.pick_rounds(speed)
+            if new_rounds == rounds:
+                break
+            rounds = new_rounds
+            latency, speed = self.measure_rounds(rounds)
+        return rounds, latency
+
+    def tune(self):
+        """returns :class:`SchemeTuning` instance"""
+        handler = self.handler
+        limit = self.memory_limit
+        settings = self.settings
+        if limit and "memory_cost" in handler.setting_kwds:
+            # argon2: memory_cost is kib
+            settings['memory_cost'] = max(8 * handler.parallelism, limit // 1024)
+        rounds, latency = self.tune_rounds()
+        if limit and "block_size" in handler.setting_kwds:
+            # scrypt: uses 128 * block_size * 2**rounds bytes of memory.
+            # if tuned rounds exceeds limit, shrink block_size to fit, and re-tune.
+            block_size = settings.get("block_size", handler.block_size)
+            fit = limit // (128 * (1 << rounds))
+            if fit < block_size:
+                settings['block_size'] = max(1, fit)
+                rounds, latency = self.tune_rounds()
+                # shrinking block_size may have let rounds grow past limit again
+                while rounds > handler.min_rounds and \
+                        128 * settings['block_size'] * (1 << rounds) > limit:
+                    rounds -= 1
+                    latency = self.measure_rounds(rounds)[0]
+        settings['default_rounds'] = rounds
+        return SchemeTuning(handler.name, settings, latency)
+
+#=============================================================================
+# frontend
+#=============================================================================
+def tune_context(context, target=.350, percentile=95, concurrency=1, samples=5, warmup=1,
+                 schemes=None, memory_limit=None):
+    """
+    calibrate cost settings for the schemes in a :class:`~passlib.context.CryptContext`.
+
+    :arg context:
+        :class:`!CryptContext` instance, or list of scheme names.
+
+    :param target:
+        target verify() latency, in seconds (defaults to 350ms).
+
+    :param percentile:
+        which latency percentile should meet the target (defaults to 95).
+
+    :param concurrency:
+        number of verify() calls to run concurrently when measuring (defaults to 1).
+        this should match how many hashes the server may be checking at once.
+
+    :param samples:
+        number of samples to take the median of (see :func:`measure_latency`).
+
+    :param warmup:
+        number of untimed samples to run first.
+
+    :param schemes:
+        optional list of schemes to tune. defaults to all non-deprecated schemes
+        which support a variable number of rounds.
+
+    :param memory_limit:
+        optional max memory (in bytes) that a single hash may use.
+        if set, argon2's ``memory_cost`` will be set to this value,
+        and scrypt's ``block_size`` will be reduced if needed to fit inside it.
+
+    :returns:
+        :class:`TuningReport` instance.
+
+    .. note::
+
+        Only the default (non-category) settings are tuned.
+    """
+    if not isinstance(context, CryptContext):
+        context = CryptContext(schemes=context)
+    if target <= 0:
+        raise ValueError("target must be > 0")
+    if not 0 < percentile <= 100:
+        raise ValueError("percentile must be in range (0, 100]")
+    if not isinstance(concurrency, int_types) or concurrency < 1:
+        raise ValueError("concurrency must be integer >= 1")
+    if samples < 1:
+        raise ValueError("samples must be >= 1")
+
+    def measure(handler):
+        return measure_latency(handler, concurrency=concurrency, samples=samples,
+                               warmup=warmup, percentile=percentile)
+
+    if schemes is None:
+        schemes = [name for name in context.schemes()
+                   if "rounds" in context.handler(name).setting_kwds
+                   and not context.handler(name).deprecated]
+    results = []
+    for name in schemes:
+        handler = context.handler(name)
+        if "rounds" not in handler.setting_kwds:
+            raise ValueError("%s does not support variable rounds" % name)
+        result = _RoundsTuner(handler, target, measure, memory_limit).tune()
+        log.debug("tuned %r: %r", name, result)
+        results.append(result)
+
+    tuned = context.copy(**_results_to_dict(results))
+    return TuningReport(tuned, results, target, percentile, concurrency)
+
+#=============================================================================
+# eof
+#=============================================================================
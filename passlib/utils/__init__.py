@@ -10,26 +10,24 @@ import collections
 from codecs import lookup as _lookup_codec
 from functools import update_wrapper
 import itertools
-import inspect
 import logging; log = logging.getLogger(__name__)
 import math
 import os
 import sys
 import random
 import re
+import threading
+# NOTE: 'stringprep' & 'unicodedata' are only needed by saslprep(),
+#       so they're imported on demand, to keep 'import passlib' fast.
+_stringprep_missing_reason = None
 if JYTHON: # pragma: no cover -- runtime detection
     # Jython 2.5.2 lacks stringprep module -
     # see http://bugs.jython.org/issue1758320
     try:
         import stringprep
     except ImportError:
-        stringprep = None
         _stringprep_missing_reason = "not present under Jython"
-else:
-    import stringprep
 import time
-if stringprep:
-    import unicodedata
 import types
 from warnings import warn
 # site
@@ -48,11 +46,11 @@ from passlib.utils.decor import (
     classproperty,
     hybrid_method,
 )
-from passlib.exc import ExpectedStringError
+from passlib.exc import ExpectedStringError, ExpectedTypeError
 from passlib.utils.compat import (add_doc, join_bytes, join_byte_values,
                                   join_byte_elems, irange, imap, PY3, u,
                                   join_unicode, unicode, byte_elem_value, nextgetter,
-                                  unicode_or_bytes_types,
+                                  unicode_or_bytes_types, int_types,
                                   get_method_function, suppress_cause)
 # local
 __all__ = [
@@ -62,6 +60,9 @@ __all__ = [
     'unix_crypt_schemes',
     'rounds_cost_values',
 
+    # collection helpers
+    'LRUCache',
+
     # unicode helpers
     'consteq',
     'saslprep',
@@ -82,6 +83,7 @@ __all__ = [
     'test_crypt',
     'safe_crypt',
     'tick',
+    'cpu_count',
 
     # randomness
     'rng',
@@ -154,29 +156,30 @@ class SequenceMixin(object):
     def __ne__(self, other):
         return not self.__eq__(other)
 
+# NOTE: 'inspect' is slow to import, and these are only used when loading backends,
+#       so it's imported on demand.
 if PY3:
     # getargspec() is deprecated, use this under py3.
     # even though it's a lot more awkward to get basic info :|
 
-    _VAR_KEYWORD = inspect.Parameter.VAR_KEYWORD
-    _VAR_ANY_SET = set([_VAR_KEYWORD, inspect.Parameter.VAR_POSITIONAL])
-
     def accepts_keyword(func, key):
         """test if function accepts specified keyword"""
-        params = inspect.signature(get_method_function(func)).parameters
+        from inspect import Parameter, signature
+        params = signature(get_method_function(func)).parameters
         if not params:
             return False
         arg = params.get(key)
-        if arg and arg.kind not in _VAR_ANY_SET:
+        if arg and arg.kind not in (Parameter.VAR_KEYWORD, Parameter.VAR_POSITIONAL):
             return True
         # XXX: annoying what we have to do to determine if VAR_KWDS in use.
-        return params[list(params)[-1]].kind == _VAR_KEYWORD
+        return params[list(params)[-1]].kind == Parameter.VAR_KEYWORD
 
 else:
 
     def accepts_keyword(func, key):
         """test if function accepts specified keyword"""
-        spec = inspect.getargspec(get_method_function(func))
+        from inspect import getargspec
+        spec = getargspec(get_method_function(func))
         return key in spec.args or spec.keywords is not None
 
 def update_mixin_classes(target, add=None, remove=None, append=False,
@@ -291,6 +294,124 @@ def batch(source, size):
     else:
         raise TypeError("source must be iterable")
 
+if PY3:
+    def _move_to_end(odict, key):
+        odict.move_to_end(key)
+else:
+    def _move_to_end(odict, key):
+        # NOTE: py2's OrderedDict lacks move_to_end()
+        odict[key] = odict.pop(key)
+
+class LRUCache(object):
+    """
+    thread-safe mapping which holds at most *max_size* entries,
+    evicting the least-recently-used entries first.
+    used as the backing store for passlib's various caches
+    (e.g. :class:`passlib.utils.handlers.ParsedHashCache`).
+
+    :param max_size:
+        max number of entries to keep.
+    """
+    #===================================================================
+    # instance attrs
+    #===================================================================
+
+    #: max number of entries
+    max_size = 1024
+
+    #: number of :meth:`load` calls which found / didn't find a cached entry
+    hits = 0
+    misses = 0
+
+    #===================================================================
+    # init
+    #===================================================================
+    def __init__(self, max_size=1024):
+        if not isinstance(max_size, int_types):
+            raise ExpectedTypeError(max_size, "int", "max_size")
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    #===================================================================
+    # public methods
+    #===================================================================
+    def get(self, key, default=None):
+        """return entry for *key* (marking it most-recently-used), or *default*"""
+        with self._lock:
+            entries = self._entries
+            if key not in entries:
+                return default
+            _move_to_end(entries, key)
+            return entries[key]
+
+    def set(self, key, value):
+        """store entry for *key* (as most-recently-used), evicting old entries if needed"""
+        with self._lock:
+            entries = self._entries
+            entries.pop(key, None)
+            entries[key] = value
+            while len(entries) > self.max_size:
+                entries.popitem(last=False)
+
+    def load(self, key, loader):
+        """
+        return entry for *key*, or call ``loader()`` and store the result if not found.
+        updates :attr:`hits` & :attr:`misses`.
+        """
+        entries = self._entries
+        with self._lock:
+            if key in entries:
+                _move_to_end(entries, key)
+                self.hits += 1
+                return entries[key]
+            self.misses += 1
+
+        # NOTE: loader called outside lock; worst case two threads both load the same key.
+        #       any errors are propagated, and not cached.
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def pop(self, key, default=None):
+        """remove & return entry for *key*, or return *default*"""
+        with self._lock:
+            return self._entries.pop(key, default)
+
+    def clear(self):
+        """remove all entries, and reset hit / miss counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def keys(self):
+        """return list of keys, least-recently-used first"""
+        with self._lock:
+            return list(self._entries)
+
+    def items(self):
+        """return list of ``(key, value)`` pairs, least-recently-used first"""
+        with self._lock:
+            return list(self._entries.items())
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        """fraction of :meth:`load` calls which found a cached entry (``0.0`` if none)"""
+        total = self.hits + self.misses
+        return float(self.hits) / total if total else 0.0
+
+    #===================================================================
+    # eoc
+    #===================================================================
+
 #=============================================================================
 # unicode helpers
 #=============================================================================
@@ -430,6 +551,7 @@ def saslprep(source, param="value"):
     if not isinstance(source, unicode):
         raise TypeError("input must be unicode string, not %s" %
                         (type(source),))
+    import stringprep, unicodedata
 
     # mapping stage
     #   - map non-ascii spaces to U+0020 (stringprep C.1.2)
@@ -511,7 +633,7 @@ def saslprep(source, param="value"):
     return data
 
 # replace saslprep() with stub when stringprep is missing
-if stringprep is None: # pragma: no cover -- runtime detection
+if _stringprep_missing_reason: # pragma: no cover -- runtime detection
     def saslprep(source, param="value"):
         """stub for saslprep()"""
         raise NotImplementedError("saslprep() support requires the 'stringprep' "
@@ -743,7 +865,17 @@ def as_bool(value, none=None, param="boolean"):
 #=============================================================================
 
 try:
-    from crypt import crypt as _crypt
+    # NOTE: under py3, importing the 'crypt' module calls crypt() for each of
+    #       the METHODS it knows about, which is slow (and the module is deprecated
+    #       as of python 3.11). since safe_crypt() always passes in a config string,
+    #       using the underlying C function directly is equivalent.
+    if PY3:
+        try:
+            from _crypt import crypt as _crypt
+        except ImportError: # pragma: no cover -- e.g. pypy
+            from crypt import crypt as _crypt
+    else:
+        from crypt import crypt as _crypt
 except ImportError: # pragma: no cover
     _crypt = None
     has_crypt = False
@@ -847,6 +979,17 @@ else:
 # legacy alias, will be removed in passlib 2.0
 tick = timer
 
+def cpu_count():
+    """return number of cpus (or 1 if unknown)"""
+    try:
+        return os.cpu_count() or 1
+    except AttributeError: # pragma: no cover -- py2
+        import multiprocessing
+        try:
+            return multiprocessing.cpu_count()
+        except NotImplementedError:
+            return 1
+
 def parse_version(source):
     """helper to parse version string"""
     m = re.search(r"(\d+(?:\.\d+)+)", source)
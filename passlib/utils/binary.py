@@ -14,6 +14,7 @@ from base64 import (
 )
 from binascii import b2a_base64, a2b_base64, Error as _BinAsciiError
 import logging
+from operator import itemgetter
 log = logging.getLogger(__name__)
 # site
 # pkg
@@ -250,6 +251,20 @@ def b32decode(source):
 # base64-variant encoding
 #=============================================================================
 
+#: standard base64 alphabet as bytes, used to build Base64Engine's translation tables
+_BASE64_BYTES = BASE64_CHARS.encode("ascii")
+
+#: byte translation table which reverses the bit order of each byte
+_REVERSE_BITS_TABLE = join_byte_values(
+    int("{0:08b}".format(value)[::-1], 2) for value in irange(256))
+
+def _reverse_bits6(value):
+    """reverse bit order of 6-bit integer"""
+    return int("{0:06b}".format(value)[::-1], 2)
+
+#: max number of offset lists cached by each Base64Engine instance
+_MAX_TRANSPOSE_MAPS = 32
+
 class Base64Engine(object):
     """Provides routines for encoding/decoding base64 data using
     arbitrary character mappings, selectable endianness, etc.
@@ -331,6 +346,15 @@ class Base64Engine(object):
     _encode_bytes = None # throws IndexError if bad value (shouldn't happen)
     _decode_bytes = None # throws KeyError if bad char.
 
+    # byte translation tables filled in by init, used by the binascii-based
+    # fast path of encode_bytes() / decode_bytes() (see __init__ for details)
+    _encode_table = None # std base64 char -> charmap char
+    _decode_table = None # charmap char -> std base64 char
+    _bit_table = None # per-byte bit reversal (little-endian only, else None)
+
+    # cache of offsets -> (transpose getter, inverse getter) for the transposed methods
+    _transpose_maps = None
+
     #===================================================================
     # init
     #===================================================================
@@ -358,6 +382,24 @@ class Base64Engine(object):
             self._encode_bytes = self._encode_bytes_little
             self._decode_bytes = self._decode_bytes_little
 
+        # build translation tables so encode_bytes() / decode_bytes() can
+        # let binascii do the actual bit shuffling.  big-endian encoding is
+        # just std base64 with a different alphabet.  for little-endian encoding,
+        # reversing the bits of every byte turns the little-endian bit stream
+        # into a big-endian one, whose 6-bit groups are each bit-reversed;
+        # so the alphabet is permuted to match.
+        if big:
+            reorder = int
+        else:
+            reorder = _reverse_bits6
+            self._bit_table = _REVERSE_BITS_TABLE
+        std = _BASE64_BYTES
+        self._encode_table = compile_byte_translation(dict(
+            (std[idx:idx+1], charmap[reorder(idx):reorder(idx)+1]) for idx in irange(64)))
+        self._decode_table = compile_byte_translation(dict(
+            (charmap[idx:idx+1], std[reorder(idx):reorder(idx)+1]) for idx in irange(64)))
+        self._transpose_maps = {}
+
         # TODO: support padding character
         ##if padding is not None:
         ##    if isinstance(padding, unicode):
@@ -384,6 +426,16 @@ class Base64Engine(object):
         """
         if not isinstance(source, bytes):
             raise TypeError("source must be bytes, not %s" % (type(source),))
+        bit_table = self._bit_table
+        if bit_table:
+            source = source.translate(bit_table)
+        return b2a_base64(source).rstrip(_BASE64_STRIP).translate(self._encode_table)
+
+    def _encode_bytes_generic(self, source):
+        """
+        reference implementation of encode_bytes(),
+        which shuffles bits in python via the endian-specific helpers below.
+        """
         chunks, tail = divmod(len(source), 3)
         if PY3:
             next_value = nextgetter(iter(source))
@@ -491,6 +543,32 @@ class Base64Engine(object):
         ##if padding:
         ##    # TODO: add padding size check?
         ##    source = source.rstrip(padding)
+        tail = len(source) & 3
+        if tail == 1:
+            # only 6 bits left, can't encode a whole byte!
+            raise ValueError("input string length cannot be == 1 mod 4")
+        if source.translate(None, self.bytemap):
+            # NOTE: a2b_base64() silently skips unknown chars, so invalid input
+            #       is handed off to the generic version, which reports the bad char.
+            return self._decode_bytes_generic(source)
+        data = source.translate(self._decode_table)
+        if tail == 2:
+            data += _BASE64_PAD2
+        elif tail == 3:
+            data += _BASE64_PAD1
+        # NOTE: a2b_base64() ignores the unused bits in the last char,
+        #       same as the generic version does.
+        result = a2b_base64(data)
+        bit_table = self._bit_table
+        if bit_table:
+            result = result.translate(bit_table)
+        return result
+
+    def _decode_bytes_generic(self, source):
+        """
+        reference implementation of decode_bytes(),
+        which shuffles bits in python via the endian-specific helpers below.
+        """
         chunks, tail = divmod(len(source), 4)
         if tail == 1:
             # only 6 bits left, can't encode a whole byte!
@@ -657,19 +735,58 @@ class Base64Engine(object):
     #===================================================================
     # transposed encoding/decoding
     #===================================================================
+    def _get_transpose_map(self, offsets):
+        """
+        return ``(transpose, restore)`` pair of precompiled getters for offset list.
+        *transpose* returns bytes elems of source in order given by *offsets*;
+        *restore* does the inverse, or is ``None`` if *offsets* isn't a permutation.
+        """
+        key = offsets if isinstance(offsets, tuple) else tuple(offsets)
+        try:
+            return self._transpose_maps[key]
+        except KeyError:
+            pass
+        if len(key) > 1:
+            transpose = itemgetter(*key)
+        else:
+            # NOTE: itemgetter() w/ 1 arg returns elem, not tuple
+            transpose = lambda source: tuple(source[off] for off in key)
+        restore = None
+        if len(key) > 1 and sorted(key) == list(irange(len(key))):
+            inverse = [None] * len(key)
+            for idx, off in enumerate(key):
+                inverse[off] = idx
+            restore = itemgetter(*inverse)
+        entry = transpose, restore
+        # NOTE: callers generally pass module-level constants, but capping the
+        #       cache size just in case they don't.
+        if len(self._transpose_maps) < _MAX_TRANSPOSE_MAPS:
+            self._transpose_maps[key] = entry
+        return entry
+
     def encode_transposed_bytes(self, source, offsets):
         """encode byte string, first transposing source using offset list"""
         if not isinstance(source, bytes):
             raise TypeError("source must be bytes, not %s" % (type(source),))
-        tmp = join_byte_elems(source[off] for off in offsets)
+        transpose = self._get_transpose_map(offsets)[0]
+        if PY3:
+            tmp = bytes(transpose(source))
+        else:
+            tmp = B_EMPTY.join(transpose(source))
         return self.encode_bytes(tmp)
 
     def decode_transposed_bytes(self, source, offsets):
         """decode byte string, then reverse transposition described by offset list"""
+        tmp = self.decode_bytes(source)
+        restore = self._get_transpose_map(offsets)[1]
+        if restore is not None and len(tmp) == len(offsets):
+            if PY3:
+                return bytes(restore(tmp))
+            else:
+                return B_EMPTY.join(restore(tmp))
         # NOTE: if transposition does not use all bytes of source,
         # the original can't be recovered... and join_byte_elems() will throw
         # an error because 1+ values in <buf> will be None.
-        tmp = self.decode_bytes(source)
         buf = [None] * len(offsets)
         for off, char in zip(offsets, tmp):
             buf[off] = char
@@ -4,9 +4,10 @@
 #=============================================================================
 from __future__ import with_statement
 # core
-import inspect
 import logging; log = logging.getLogger(__name__)
 import math
+import os
+import sys
 import threading
 from warnings import warn
 # site
@@ -21,7 +22,7 @@ from passlib.utils import (
     rng, to_native_str,
     is_crypt_handler, to_unicode,
     MAX_PASSWORD_SIZE, accepts_keyword, as_bool,
-    update_mixin_classes)
+    update_mixin_classes, cpu_count, LRUCache)
 from passlib.utils.binary import (
     BASE64_CHARS, HASH64_CHARS, PADDED_BASE64_CHARS,
     HEX_CHARS, UPPER_HEX_CHARS, LOWER_HEX_CHARS,
@@ -52,6 +53,11 @@ __all__ = [
 
     # other helpers
     'PrefixWrapper',
+    'ParsedHashCache',
+    'shared_parse_scope',
+    'SelfTestCache',
+    'BuiltinPool',
+    'get_builtin_pool',
 
     # TODO: a bunch of other things are commonly assumed in this namespace
     #       (e.g. HEX_CHARS etc); need to audit uses and update this list.
@@ -84,7 +90,8 @@ def guess_app_stacklevel(start=1):
     try to guess stacklevel for application warning.
     looks for first frame not part of passlib.
     """
-    frame = inspect.currentframe()
+    from inspect import currentframe
+    frame = currentframe()
     count = -start
     try:
         while frame:
@@ -364,6 +371,91 @@ def norm_integer(handler, value, min=1, max=None, # *
 
     return value
 
+#=============================================================================
+# parsed hash cache
+#=============================================================================
+class ParsedHashCache(object):
+    """
+    bounded LRU cache of parsed hash instances,
+    used by :class:`GenericHandler` to avoid re-parsing the same hash string
+    in :meth:`~GenericHandler.verify` and :meth:`~GenericHandler.needs_update`.
+
+    this is disabled by default; to enable it, assign an instance to
+    :attr:`GenericHandler.parse_cache` (or to a specific handler's ``parse_cache``).
+
+    .. warning::
+
+        cached instances are shared between callers (and threads),
+        so they must be treated as read-only.
+
+    :param max_size:
+        max number of parsed hashes to keep (least-recently-used are evicted first).
+    """
+    #===================================================================
+    # init
+    #===================================================================
+    def __init__(self, max_size=1024):
+        # maps (handler, hash) -> parsed instance
+        self._cache = LRUCache(max_size)
+
+    #===================================================================
+    # public methods
+    #===================================================================
+    def get(self, handler, hash):
+        """return ``handler.from_string(hash)``, re-using cached instance if possible"""
+        return self._cache.load((handler, hash), lambda: handler.from_string(hash))
+
+    def clear(self):
+        """remove all entries from cache, and reset hit / miss counters"""
+        self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    def max_size(self):
+        """max number of entries"""
+        return self._cache.max_size
+
+    @property
+    def hits(self):
+        """number of lookups which found a cached entry"""
+        return self._cache.hits
+
+    @property
+    def misses(self):
+        """number of lookups which didn't find a cached entry"""
+        return self._cache.misses
+
+    #===================================================================
+    # eoc
+    #===================================================================
+
+#: thread-local state used by shared_parse_scope()
+_parse_scope_state = threading.local()
+
+class shared_parse_scope(object):
+    """
+    context manager which lets :class:`GenericHandler` share parsed hash instances
+    between calls made inside the ``with`` block (in the current thread).
+    this is used by :meth:`CryptContext.verify_and_update() <passlib.context.CryptContext.verify_and_update>`,
+    so the stored hash is only parsed once by :meth:`~GenericHandler.verify`
+    and :meth:`~GenericHandler.needs_update`.
+    nested scopes share the outermost scope's instances.
+    """
+    _owner = False
+
+    def __enter__(self):
+        if getattr(_parse_scope_state, "memo", None) is None:
+            _parse_scope_state.memo = {}
+            self._owner = True
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._owner:
+            _parse_scope_state.memo = None
+            self._owner = False
+
 #=============================================================================
 # MinimalHandler
 #=============================================================================
@@ -652,6 +744,39 @@ class GenericHandler(MinimalHandler):
         except ValueError:
             return False
 
+    #: optional :class:`ParsedHashCache` instance used by :meth:`verify`,
+    #: :meth:`verify_many` and :meth:`needs_update` (disabled by default).
+    parse_cache = None
+
+    @classmethod
+    def _from_string_cached(cls, hash, **context):
+        """
+        return parsed instance from hash string, like :meth:`from_string`,
+        but re-using previously parsed instances from :func:`shared_parse_scope`
+        or :attr:`parse_cache` when possible.
+
+        instances returned by this method may be shared, and must not be modified.
+        """
+        if context:
+            # context kwds may be stored in instance (e.g. 'user'), so don't share it.
+            return cls.from_string(hash, **context)
+        memo = getattr(_parse_scope_state, "memo", None)
+        if memo is not None:
+            key = (cls, hash)
+            self = memo.get(key)
+            if self is None:
+                self = memo[key] = cls._from_string_parse_cache(hash)
+            return self
+        return cls._from_string_parse_cache(hash)
+
+    @classmethod
+    def _from_string_parse_cache(cls, hash):
+        """helper for _from_string_cached() -- consults parse_cache, if set"""
+        cache = cls.parse_cache
+        if cache is None:
+            return cls.from_string(hash)
+        return cache.get(cls, hash)
+
     @classmethod
     def from_string(cls, hash, **context): # pragma: no cover
         """return parsed instance from hash/configuration string
@@ -717,6 +842,16 @@ class GenericHandler(MinimalHandler):
         raise NotImplementedError("%s must implement _calc_checksum()" %
                                   (self.__class__,))
 
+    def _calc_checksum_many(self, secrets):
+        """given list of secrets; calculate and return list of encoded checksums,
+        taking config from object state.
+
+        the default implementation just calls :meth:`_calc_checksum` for each secret;
+        handlers with a backend that can process many secrets in a single pass
+        (e.g. :class:`~passlib.hash.bcrypt`'s ``builtin_batch`` backend) override this.
+        """
+        return [self._calc_checksum(secret) for secret in secrets]
+
     #===================================================================
     #'application' interface (default implementation)
     #===================================================================
@@ -745,12 +880,38 @@ class GenericHandler(MinimalHandler):
         # override this method, or ensure that from_string() / _norm_checksum()
         # ensures .checksum always uses a single canonical representation.
         validate_secret(secret)
-        self = cls.from_string(hash, **context)
+        self = cls._from_string_cached(hash, **context)
         chk = self.checksum
         if chk is None:
             raise exc.MissingDigestError(cls)
         return consteq(self._calc_checksum(secret), chk)
 
+    @classmethod
+    def verify_many(cls, secrets, hash, **context):
+        """verify multiple candidate secrets against a single hash.
+
+        :arg secrets: iterable of candidate secrets.
+        :arg hash: hash string to compare against.
+        :returns: list of ``True`` / ``False`` values, one per secret.
+
+        This acts like calling :meth:`~passlib.ifc.PasswordHash.verify` for each secret,
+        but lets handlers with a batch-capable backend process all the secrets at once.
+
+        .. versionadded:: 1.8
+        """
+        if cls.verify.__func__ is not GenericHandler.verify.__func__:
+            # handler has its own verify() semantics (e.g. case-insensitive checksums,
+            # multiple digests), so comparing _calc_checksum_many() output may be wrong.
+            return [cls.verify(secret, hash, **context) for secret in secrets]
+        secrets = list(secrets)
+        for secret in secrets:
+            validate_secret(secret)
+        self = cls._from_string_cached(hash, **context)
+        chk = self.checksum
+        if chk is None:
+            raise exc.MissingDigestError(cls)
+        return [consteq(result, chk) for result in self._calc_checksum_many(secrets)]
+
     #===================================================================
     # legacy crypt interface
     #===================================================================
@@ -786,7 +947,7 @@ class GenericHandler(MinimalHandler):
     def needs_update(cls, hash, secret=None, **kwds):
         # NOTE: subclasses should generally just wrap _calc_needs_update()
         #       to check their particular keywords.
-        self = cls.from_string(hash)
+        self = cls._from_string_cached(hash)
         assert isinstance(self, cls)
         return self._calc_needs_update(secret=secret, **kwds)
 
@@ -1900,6 +2061,132 @@ class ParallelismMixin(GenericHandler):
 #: class-level state that may be modified during a "dry run"
 _backend_lock = threading.RLock()
 
+class SelfTestCache(object):
+    """
+    on-disk cache of backend self-test results.
+
+    Some backends (e.g. all of :class:`~passlib.hash.bcrypt`'s) run a series
+    of known-answer tests when they're first loaded, to detect bugs
+    they need to work around.  When this cache is enabled (see :data:`selftest_cache`,
+    and :func:`passlib.registry.warmup`), those results are stored
+    in a JSON file, keyed by handler, backend, and the backend library's version;
+    and re-used by later processes instead of re-running the tests.
+
+    The whole file is ignored if the Passlib or Python version changes.
+
+    .. warning::
+
+        Since the cached results control which security workarounds are enabled,
+        the cache file should be protected just like the application's code.
+
+    :arg path:
+        path to JSON file. it will be created by :meth:`save` if it doesn't exist.
+
+    .. versionadded:: 1.8
+    """
+    #===================================================================
+    # instance attrs
+    #===================================================================
+
+    #: version of file format
+    format_version = 1
+
+    #: path to cache file
+    path = None
+
+    #: number of lookups which did / didn't find a matching entry
+    hits = 0
+    misses = 0
+
+    #: set when entries have changed since file was loaded
+    _dirty = False
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = self._read()
+
+    #===================================================================
+    # file i/o
+    #===================================================================
+    @classmethod
+    def _get_environ(cls):
+        """return dict identifying current runtime (entries are only valid for same runtime)"""
+        from passlib import __version__
+        return dict(format=cls.format_version, passlib=__version__, python=sys.version)
+
+    def _read(self):
+        """load entries from file"""
+        import json
+        try:
+            with open(self.path, "r") as fh:
+                data = json.load(fh)
+        except (IOError, OSError):
+            return {}
+        except ValueError:
+            log.warning("ignoring malformed self-test cache: %r", self.path)
+            return {}
+        if not isinstance(data, dict) or data.get("environ") != self._get_environ():
+            log.debug("ignoring self-test cache from different environment: %r", self.path)
+            return {}
+        entries = data.get("entries")
+        if not isinstance(entries, dict):
+            return {}
+        return entries
+
+    def save(self):
+        """write entries to file (if they've changed)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            import json
+            data = dict(environ=self._get_environ(), entries=self._entries)
+            tmp_path = "%s.%s.tmp" % (self.path, os.getpid())
+            with open(tmp_path, "w") as fh:
+                json.dump(data, fh, indent=1, sort_keys=True)
+            getattr(os, "replace", os.rename)(tmp_path, self.path)
+            self._dirty = False
+
+    #===================================================================
+    # entries
+    #===================================================================
+    @staticmethod
+    def _key(handler, backend):
+        return "%s:%s" % (handler.name, backend)
+
+    def get(self, handler, backend, version):
+        """
+        return self-test state stored for backend,
+        or ``None`` if not present (or stored for a different *version*).
+        """
+        with self._lock:
+            entry = self._entries.get(self._key(handler, backend))
+        if isinstance(entry, dict) and entry.get("version") == version:
+            self.hits += 1
+            return entry.get("state")
+        self.misses += 1
+        return None
+
+    def set(self, handler, backend, version, state):
+        """store self-test state for backend"""
+        entry = dict(version=version, state=state)
+        with self._lock:
+            key = self._key(handler, backend)
+            if self._entries.get(key) != entry:
+                self._entries[key] = entry
+                self._dirty = True
+
+    def __len__(self):
+        return len(self._entries)
+
+    #===================================================================
+    # eoc
+    #===================================================================
+
+#: :class:`SelfTestCache` instance consulted by backends' self-tests,
+#: or ``None`` (the default) to always run them.
+selftest_cache = None
+
 class BackendMixin(PasswordHash):
     """
     PasswordHash mixin which provides generic framework for supporting multiple backends
@@ -2046,6 +2333,12 @@ class BackendMixin(PasswordHash):
 
             * any string in :attr:`backends`, loads specified backend.
 
+            * ``"builtin_pool"`` -- for classes with a ``"builtin"`` backend,
+              loads the builtin backend, but runs it inside a pool of worker processes
+              (see :class:`BuiltinPool`).
+
+              .. versionadded:: 1.8
+
         :param dryrun:
             If True, this perform all setup actions *except* switching over to the new backend.
             (this flag is used to implement :meth:`has_backend`).
@@ -2095,7 +2388,8 @@ class BackendMixin(PasswordHash):
             raise default_error
 
         # validate name
-        if name not in cls.backends:
+        if name not in cls.backends and not (name == _POOL_BACKEND and
+                                             "builtin" in cls.backends):
             raise exc.UnknownBackendError(cls, name)
 
         # hand off to _set_backend()
@@ -2236,13 +2530,16 @@ class SubclassBackendMixin(BackendMixin):
         # pick mixin class
         mixin_map = cls._backend_mixin_map
         assert mixin_map, "_backend_mixin_map not specified"
-        mixin_cls = mixin_map[name]
+        mixin_cls = cls._get_backend_mixin(name)
         assert issubclass(mixin_cls, SubclassBackendMixin), "invalid mixin class"
 
         # modify <cls> to remove existing backend mixins, and insert the new one
+        remove = list(mixin_map.values())
+        if cls._pool_backend_mixin:
+            remove.append(cls._pool_backend_mixin)
         update_mixin_classes(cls,
             add=mixin_cls,
-            remove=mixin_map.values(),
+            remove=remove,
             append=True, before=SubclassBackendMixin,
             dryrun=dryrun,
         )
@@ -2250,7 +2547,56 @@ class SubclassBackendMixin(BackendMixin):
     @classmethod
     def _get_backend_loader(cls, name):
         assert cls._backend_mixin_map, "_backend_mixin_map not specified"
-        return cls._backend_mixin_map[name]._load_backend_mixin
+        return cls._get_backend_mixin(name)._load_backend_mixin
+
+    @classmethod
+    def _get_backend_mixin(cls, name):
+        """return mixin class for backend"""
+        if name == _POOL_BACKEND:
+            return cls._get_pool_backend_mixin()
+        return cls._backend_mixin_map[name]
+
+    #===================================================================
+    # builtin_pool backend
+    #===================================================================
+
+    #: NON-INHERITED mixin class for "builtin_pool" backend (created by _get_pool_backend_mixin)
+    _pool_backend_mixin = None
+
+    @classmethod
+    def _get_pool_backend_mixin(cls):
+        """
+        return mixin class for "builtin_pool" backend, creating it if needed --
+        this subclasses the "builtin" backend's mixin, and replaces its
+        :meth:`_calc_checksum` with one that dispatches to the :class:`BuiltinPool`
+        (which calls :meth:`!_calc_checksum_in_pool` inside the worker process).
+        """
+        mixin_cls = cls.__dict__.get("_pool_backend_mixin")
+        if mixin_cls is None:
+            owner = cls
+            builtin_cls = cls._backend_mixin_map["builtin"]
+
+            def _load_backend_mixin(mixin_cls, dryrun):
+                # NOTE: this loads builtin backend's dependencies & self-tests,
+                #       but doesn't switch owner's bases over to builtin mixin.
+                super(SubclassBackendMixin, owner)._set_backend("builtin", dryrun)
+                return True
+
+            def _calc_checksum(self, secret):
+                return get_builtin_pool().calc_checksum(self, secret)
+
+            def _calc_checksum_in_pool(self, secret):
+                return builtin_cls._calc_checksum(self, secret)
+
+            mixin_cls = type(builtin_cls.__name__ + "Pool", (builtin_cls,), dict(
+                __module__=builtin_cls.__module__,
+                __doc__="backend which runs builtin backend in a BuiltinPool",
+                _load_backend_mixin=classmethod(_load_backend_mixin),
+                _calc_checksum=_calc_checksum,
+                _calc_checksum_in_pool=_calc_checksum_in_pool,
+            ))
+            cls._pool_backend_mixin = mixin_cls
+        return mixin_cls
 
     #===================================================================
     # eoc
@@ -2373,10 +2719,256 @@ class HasManyBackends(BackendMixin, GenericHandler):
         if not cls._pending_dry_run:
             cls._calc_checksum_backend = func
 
+    #===================================================================
+    # builtin_pool backend
+    #===================================================================
+
+    #: builtin backend's :meth:`_calc_checksum_backend`, saved by "builtin_pool" loader
+    _builtin_pool_target = None
+
+    @classmethod
+    def _load_backend_builtin_pool(cls, dryrun=False):
+        """
+        loader for "builtin_pool" backend --
+        loads the "builtin" backend, then replaces it with a wrapper
+        which dispatches to the :class:`BuiltinPool`.
+        """
+        cls._set_backend("builtin", dryrun)
+        if not dryrun:
+            cls._builtin_pool_target = cls._calc_checksum_backend
+        cls._set_calc_checksum_backend(cls._calc_checksum_builtin_pool)
+        return True
+
+    def _calc_checksum_builtin_pool(self, secret):
+        return get_builtin_pool().calc_checksum(self, secret)
+
+    def _calc_checksum_in_pool(self, secret):
+        """
+        calculate checksum using builtin backend,
+        called by :class:`BuiltinPool` (inside worker process) once "builtin_pool" backend is loaded.
+        """
+        return self._builtin_pool_target(secret)
+
+    #===================================================================
+    # eoc
+    #===================================================================
+
+#=============================================================================
+# builtin_pool backend
+#=============================================================================
+
+#: name of backend which runs "builtin" backend in a BuiltinPool
+_POOL_BACKEND = "builtin_pool"
+
+class BuiltinPool(object):
+    """
+    Pool of worker processes used by the ``"builtin_pool"`` backend.
+
+    Pure-python backends (e.g. :class:`~passlib.hash.sha512_crypt`'s ``"builtin"`` backend)
+    hold the GIL for the whole calculation, stalling all other threads in the process.
+    Calling ``handler.set_backend("builtin_pool")`` on a class which has a ``"builtin"``
+    backend will instead send each calculation to a pool of worker processes
+    (passing only the hash's settings & the secret), and wait for the checksum to come back.
+    The pool is created on first use, and can be configured by assigning
+    an instance of this class to :data:`builtin_pool`.
+
+    The same pool is also used by other pure-python code which can split its work
+    into independent calculations, when they're configured to do so
+    (e.g. ``passlib.crypto.digest.pbkdf2_pool_threshold``), via :meth:`run_many`.
+
+    :param size:
+        max number of worker processes (defaults to number of cpus).
+
+    :param queue_depth:
+        max number of calculations which may be queued or running at once
+        (defaults to ``4 * size``). Once reached, further callers block
+        until a slot frees up.
+
+    If a pool can't be used (e.g. :mod:`!concurrent.futures` isn't available,
+    or the process is itself a daemonic worker), or the handler class
+    can't be imported by the worker processes, calculations run in the calling thread.
+
+    .. automethod:: calc_checksum
+    .. automethod:: run_many
+    .. automethod:: shutdown
+
+    .. versionadded:: 1.8
+    """
+    #===================================================================
+    # instance attrs
+    #===================================================================
+
+    #: max number of worker processes
+    size = None
+
+    #: max number of calculations queued or running at once
+    queue_depth = None
+
+    #: executor, created on demand by _get_executor();
+    #: set to False if pool can't be used.
+    _executor = None
+
+    def __init__(self, size=None, queue_depth=None):
+        if size is None:
+            size = cpu_count()
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        if queue_depth is None:
+            queue_depth = 4 * size
+        if queue_depth < 1:
+            raise ValueError("queue_depth must be at least 1")
+        self.size = size
+        self.queue_depth = queue_depth
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(queue_depth)
+
+    #===================================================================
+    # executor management
+    #===================================================================
+    def _get_executor(self):
+        """return executor, or ``None`` if pool can't be used"""
+        executor = self._executor
+        if executor is None:
+            with self._lock:
+                executor = self._executor
+                if executor is None:
+                    try:
+                        from concurrent.futures import ProcessPoolExecutor
+                    except ImportError: # pragma: no cover -- py2 w/o 'futures' backport
+                        log.warning("concurrent.futures not available, "
+                                    "builtin_pool backend will run in calling thread")
+                        executor = False
+                    else:
+                        executor = ProcessPoolExecutor(self.size)
+                    self._executor = executor
+        return executor or None
+
+    def _disable(self, err):
+        """shut down executor after it failed, and run calculations in calling thread"""
+        log.warning("builtin_pool failed, falling back to calling thread: %r", err)
+        with self._lock:
+            executor = self._executor
+            self._executor = False
+        if executor:
+            executor.shutdown(wait=False)
+
+    def shutdown(self, wait=True):
+        """
+        shut down worker processes
+        (they'll be restarted if any more calculations are submitted).
+        """
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor:
+            executor.shutdown(wait=wait)
+
+    #===================================================================
+    # calculation
+    #===================================================================
+    def run_many(self, func, arglist):
+        """
+        call ``func(*args)`` in worker processes, for each tuple in *arglist*.
+        *func* must be a module-level function (so it can be pickled).
+
+        :returns:
+            list of results, or ``None`` if the pool can't be used
+            (in which case the caller should perform the calculations itself).
+        """
+        executor = self._get_executor()
+        if executor is None:
+            return None
+        slots = self._slots
+        release = lambda future: slots.release()
+        futures = []
+        try:
+            for args in arglist:
+                slots.acquire()
+                try:
+                    future = executor.submit(func, *args)
+                except:
+                    slots.release()
+                    raise
+                future.add_done_callback(release)
+                futures.append(future)
+        except Exception as err:
+            # e.g. pool was shut down, broken by a worker being killed,
+            # or we're running inside a daemonic process.
+            self._disable(err)
+            return None
+        try:
+            return [future.result() for future in futures]
+        except Exception as err:
+            if not _is_broken_pool_error(err):
+                raise
+            self._disable(err)
+            return None
+
+    def calc_checksum(self, obj, secret):
+        """
+        calculate checksum of *secret* for handler instance *obj*
+        (whose class must have the ``"builtin_pool"`` backend loaded),
+        using a worker process.
+        """
+        handler = _get_importable_class(type(obj))
+        if handler is not None:
+            state = dict(obj.__dict__)
+            state.pop("checksum", None)
+            results = self.run_many(_builtin_pool_worker, [(handler, state, secret)])
+            if results is not None:
+                return results[0]
+        return obj._calc_checksum_in_pool(secret)
+
     #===================================================================
     # eoc
     #===================================================================
 
+#: :class:`BuiltinPool` used by ``"builtin_pool"`` backends,
+#: or ``None`` (the default) to create one with default settings when first needed.
+builtin_pool = None
+
+def get_builtin_pool():
+    """return :data:`builtin_pool`, creating default one if needed"""
+    global builtin_pool
+    pool = builtin_pool
+    if pool is None:
+        with _backend_lock:
+            pool = builtin_pool
+            if pool is None:
+                pool = builtin_pool = BuiltinPool()
+    return pool
+
+def _get_importable_class(cls):
+    """
+    return first class in *cls*'s mro which implements the same hash,
+    and can be imported by name (and so pickled to a worker process);
+    skipping e.g. classes created by ``using()``. returns ``None`` if not found.
+    """
+    name = cls.name
+    for base in cls.__mro__:
+        if getattr(base, "name", None) != name:
+            break
+        module = sys.modules.get(base.__module__)
+        if module is not None and getattr(module, base.__name__, None) is base:
+            return base
+    return None
+
+def _is_broken_pool_error(err):
+    """check if error means pool itself failed"""
+    try:
+        from concurrent.futures.process import BrokenProcessPool
+    except ImportError: # pragma: no cover -- py2 / py32
+        return False
+    return isinstance(err, BrokenProcessPool)
+
+def _builtin_pool_worker(handler, state, secret):
+    """runs inside :class:`BuiltinPool` worker process -- calculate checksum"""
+    # NOTE: set_backend() is a no-op if backend was inherited from parent via fork()
+    handler.set_backend(_POOL_BACKEND)
+    obj = handler.__new__(handler)
+    obj.__dict__.update(state)
+    return obj._calc_checksum_in_pool(secret)
+
 #=============================================================================
 # wrappers
 #=============================================================================